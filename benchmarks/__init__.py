@@ -0,0 +1 @@
+"""Performance benchmarks for the data plane; see run.py for usage."""
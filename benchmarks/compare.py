@@ -0,0 +1,90 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 10]
+
+Exits non-zero when any scenario's p50/p95 latency, throughput or peak RSS
+got worse by more than the threshold percentage.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+
+# (label, path into a scenario result, True when higher is better)
+METRICS: List[Tuple[str, Tuple[str, ...], bool]] = [
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("rows/s", ("rows_per_second",), True),
+    ("MB/s", ("mb_per_second",), True),
+    ("CPU ms/MB", ("cpu_ms_per_mb",), False),
+    ("peak RSS MB", ("peak_rss_mb",), False),
+]
+
+
+def _get(result: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    value: Any = result
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a comparison table and return the regressions found."""
+    regressions = []
+    print(f"baseline  {baseline['meta'].get('commit')}  ({baseline['spec']['rows']} rows)")
+    print(f"candidate {candidate['meta'].get('commit')}  ({candidate['spec']['rows']} rows)")
+    if baseline['spec'] != candidate['spec']:
+        print("warning: dataset specs differ; numbers are not directly comparable")
+    print()
+    print(f"{'scenario':<40} {'metric':<12} {'baseline':>12} {'candidate':>12} {'change':>9}")
+
+    for name, base_result in baseline['scenarios'].items():
+        cand_result = candidate['scenarios'].get(name)
+        if cand_result is None:
+            print(f"{name:<40} missing from candidate")
+            continue
+        if cand_result['errors']:
+            regressions.append(f"{name}: failed ({'; '.join(cand_result['errors'])})")
+            continue
+        for label, path, higher_is_better in METRICS:
+            before, after = _get(base_result, path), _get(cand_result, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            print(f"{name:<40} {label:<12} {before:>12,.2f} {after:>12,.2f} {change:>+8.1f}%{flag}")
+            if flag:
+                regressions.append(f"{name}: {label} {before:,.2f} -> {after:,.2f} ({change:+.1f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed worsening in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, "rb") as f:
+        baseline = orjson.loads(f.read())
+    with open(args.candidate, "rb") as f:
+        candidate = orjson.loads(f.read())
+
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
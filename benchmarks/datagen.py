@@ -0,0 +1,153 @@
+"""Reproducible synthetic datasets for benchmarks."""
+
+import csv
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+COLUMN_TYPES = ("int", "float", "str", "bool", "date")
+
+# Column every dataset carries for stratified and cluster sampling
+SEGMENT_COLUMN = "segment"
+
+_PARQUET_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "str": pa.string(),
+    "bool": pa.bool_(),
+    "date": pa.string(),
+}
+
+_EPOCH = date(2000, 1, 1)
+
+
+@dataclass
+class ColumnSpec:
+    """One generated column; `cardinality` caps its distinct values (None = unbounded)."""
+    name: str
+    type: str
+    cardinality: Optional[int] = None
+
+
+@dataclass
+class DatasetSpec:
+    """
+    Shape of a synthetic dataset.
+
+    The same spec and seed always produce the same rows. `dedup_ratio` is
+    the fraction of rows that repeat the content of an earlier row, which
+    is what content-addressed row storage deduplicates on import.
+    """
+    rows: int = 100_000
+    columns: List[ColumnSpec] = field(default_factory=list)
+    dedup_ratio: float = 0.0
+    seed: int = 42
+
+    @classmethod
+    def build(
+        cls,
+        rows: int,
+        num_columns: int,
+        types: Optional[List[str]] = None,
+        cardinality: Optional[int] = None,
+        segment_cardinality: int = 10,
+        dedup_ratio: float = 0.0,
+        seed: int = 42
+    ) -> 'DatasetSpec':
+        """Spec with a segment column plus `num_columns` columns cycling through `types`."""
+        types = types or list(COLUMN_TYPES)
+        unknown = [t for t in types if t not in COLUMN_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown column types: {', '.join(unknown)}")
+        if not 0.0 <= dedup_ratio < 1.0:
+            raise ValueError("dedup_ratio must be in [0, 1)")
+
+        columns = [ColumnSpec(SEGMENT_COLUMN, "str", segment_cardinality)]
+        for i in range(num_columns):
+            col_type = types[i % len(types)]
+            columns.append(ColumnSpec(f"c{i}_{col_type}", col_type, cardinality))
+        return cls(rows=rows, columns=columns, dedup_ratio=dedup_ratio, seed=seed)
+
+    def first_column_of(self, col_type: str) -> Optional[str]:
+        """Name of the first generated column of a type, if any."""
+        for column in self.columns[1:]:
+            if column.type == col_type:
+                return column.name
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _value(rng: random.Random, column: ColumnSpec) -> Any:
+    """Draw one value for a column."""
+    if column.cardinality:
+        pick = rng.randrange(column.cardinality)
+    else:
+        pick = None
+
+    if column.type == "int":
+        return pick if pick is not None else rng.randrange(-10**9, 10**9)
+    if column.type == "float":
+        return round(pick * 1.5 if pick is not None else rng.uniform(-1e6, 1e6), 4)
+    if column.type == "bool":
+        return bool(pick % 2) if pick is not None else rng.random() < 0.5
+    if column.type == "date":
+        offset = pick if pick is not None else rng.randrange(365 * 30)
+        return (_EPOCH + timedelta(days=offset)).isoformat()
+    if pick is not None:
+        return f"{column.name}_{pick}"
+    return f"{column.name}_{rng.getrandbits(48):012x}"
+
+
+def iter_rows(spec: DatasetSpec) -> Iterator[List[Any]]:
+    """Yield the rows of a spec as value lists in column order."""
+    rng = random.Random(spec.seed)
+    # Duplicates are drawn from a bounded window so memory stays flat
+    window: List[List[Any]] = []
+    window_size = 10_000
+    for _ in range(spec.rows):
+        if window and rng.random() < spec.dedup_ratio:
+            yield window[rng.randrange(len(window))]
+            continue
+        row = [_value(rng, column) for column in spec.columns]
+        if len(window) < window_size:
+            window.append(row)
+        else:
+            window[rng.randrange(window_size)] = row
+        yield row
+
+
+def write_csv(spec: DatasetSpec, path: str) -> int:
+    """Write the dataset as CSV; returns the file size in bytes."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([column.name for column in spec.columns])
+        for row in iter_rows(spec):
+            writer.writerow(row)
+        return f.tell()
+
+
+def write_parquet(spec: DatasetSpec, path: str, row_group_size: int = 100_000) -> int:
+    """Write the dataset as Parquet; returns the file size in bytes."""
+    schema = pa.schema([pa.field(c.name, _PARQUET_TYPES[c.type]) for c in spec.columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        batch: List[List[Any]] = []
+        for row in iter_rows(spec):
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(pa.Table.from_pylist(
+                    [dict(zip(schema.names, r)) for r in batch], schema=schema
+                ))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(
+                [dict(zip(schema.names, r)) for r in batch], schema=schema
+            ))
+    with open(path, "rb") as f:
+        return f.seek(0, 2)
@@ -0,0 +1,131 @@
+"""Timing, percentile and peak-RSS measurement for benchmark scenarios."""
+
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import psutil
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty sample list."""
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class RssSampler:
+    """
+    Samples resident memory of this process and its children in a thread.
+
+    Import conversion runs in worker processes, so children are included.
+    The peak is reset per measurement.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self._interval = interval
+        self._process = psutil.Process()
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _rss(self) -> int:
+        total = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._peak = max(self._peak, self._rss())
+            self._stop.wait(self._interval)
+
+    def start(self) -> None:
+        self._peak = self._rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> int:
+        """Stop sampling and return the peak RSS in bytes."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return max(self._peak, self._rss())
+
+
+class Measurement:
+    """Latencies, processed volume and peak RSS of one scenario."""
+
+    def __init__(self, name: str, params: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.params = params or {}
+        self.latencies: List[float] = []
+        self.cpu_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.peak_rss = 0
+        self.errors: List[str] = []
+        self.extra: Dict[str, Any] = {}
+
+    @contextmanager
+    def iteration(self) -> Iterator[None]:
+        """Time one iteration (wall and process CPU)."""
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+            self.cpu_seconds += time.process_time() - cpu_start
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = sum(self.latencies)
+        result: Dict[str, Any] = {
+            'params': self.params,
+            'iterations': len(self.latencies),
+            'errors': self.errors,
+            'peak_rss_mb': round(self.peak_rss / 2**20, 1),
+        }
+        if self.latencies:
+            result['latency_ms'] = {
+                'min': round(min(self.latencies) * 1000, 2),
+                'mean': round(statistics.fmean(self.latencies) * 1000, 2),
+                'p50': round(percentile(self.latencies, 50) * 1000, 2),
+                'p90': round(percentile(self.latencies, 90) * 1000, 2),
+                'p95': round(percentile(self.latencies, 95) * 1000, 2),
+                'p99': round(percentile(self.latencies, 99) * 1000, 2),
+                'max': round(max(self.latencies) * 1000, 2),
+            }
+            result['cpu_seconds'] = round(self.cpu_seconds, 3)
+        if total > 0 and self.rows:
+            result['rows_per_second'] = round(self.rows / total, 1)
+        if total > 0 and self.bytes:
+            result['mb_per_second'] = round(self.bytes / 2**20 / total, 2)
+            result['cpu_ms_per_mb'] = round(self.cpu_seconds * 1000 / (self.bytes / 2**20), 2)
+        result.update(self.extra)
+        return result
+
+
+@contextmanager
+def measure(name: str, results: Dict[str, Any], params: Optional[Dict[str, Any]] = None) -> Iterator[Measurement]:
+    """Collect one scenario's measurement into `results[name]`, recording failures instead of raising."""
+    measurement = Measurement(name, params)
+    sampler = RssSampler()
+    sampler.start()
+    try:
+        yield measurement
+    except Exception as e:
+        measurement.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        measurement.peak_rss = sampler.stop()
+        results[name] = measurement.to_dict()
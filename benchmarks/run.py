@@ -0,0 +1,211 @@
+"""Run the data-plane benchmarks against a local Postgres and write results as JSON.
+
+Usage:
+    python -m benchmarks.run --rows 100000 --columns 12 --soeid <user>
+    python -m benchmarks.compare results/old.json results/new.json
+
+The database comes from the usual POSTGRESQL_* settings and must have the
+schema applied. Requests go through the ASGI app in-process as the given
+user, so no server needs to be running.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote_plus
+
+import httpx
+import orjson
+
+from src.api.dependencies import set_database_pool, set_event_bus
+from src.core.auth import create_access_token
+from src.core.events import InMemoryEventBus
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.statements import GET_USER_BY_SOEID
+from src.main import app
+from src.workers.job_worker import JobWorker
+from src.workers.registry import register_executors
+
+from .datagen import COLUMN_TYPES, DatasetSpec, write_csv, write_parquet
+from .scenarios import SCENARIOS, STANDALONE_SCENARIOS, BenchContext, resolve_main
+
+
+logger = logging.getLogger("benchmarks")
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", *args], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the generated table")
+    parser.add_argument("--columns", type=int, default=10, help="Generated columns besides the segment column")
+    parser.add_argument("--types", default=",".join(COLUMN_TYPES),
+                        help="Comma-separated column types to cycle through")
+    parser.add_argument("--cardinality", type=int, default=None,
+                        help="Distinct values per generated column (default: unbounded)")
+    parser.add_argument("--segment-cardinality", type=int, default=10,
+                        help="Distinct values of the segment column used for strata and clusters")
+    parser.add_argument("--dedup-ratio", type=float, default=0.0,
+                        help="Fraction of rows repeating an earlier row's content")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--file-formats", default="csv", help="Import file formats: csv, parquet")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--dataset-id", type=int, default=None,
+                        help="Reuse an imported dataset instead of the one the import scenario creates")
+    parser.add_argument("--soeid", default=os.getenv("BENCH_SOEID"), help="User to run requests as")
+    parser.add_argument("--accept-encoding", default="identity",
+                        help="Accept-Encoding sent with requests (identity measures uncompressed paths)")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+async def _token_for(pool: DatabasePool, soeid: str) -> str:
+    async with pool.acquire() as conn:
+        user = await conn.fetchrow(GET_USER_BY_SOEID, soeid)
+    if not user:
+        raise SystemExit(f"User '{soeid}' not found; pass --soeid of an existing user")
+    return create_access_token(
+        subject=user['soeid'],
+        role_id=user['role_id'],
+        role_name=user['role_name'],
+        user_id=user['id']
+    )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if not args.soeid:
+        raise SystemExit("--soeid (or BENCH_SOEID) is required")
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+    if args.dataset_id is None and "import" not in selected and set(selected) - STANDALONE_SCENARIOS:
+        raise SystemExit("Scenarios other than import and encoding need --dataset-id or the import scenario")
+
+    spec = DatasetSpec.build(
+        rows=args.rows,
+        num_columns=args.columns,
+        types=[t.strip() for t in args.types.split(",") if t.strip()],
+        cardinality=args.cardinality,
+        segment_cardinality=args.segment_cardinality,
+        dedup_ratio=args.dedup_ratio,
+        seed=args.seed
+    )
+
+    settings = get_settings()
+    dsn = (
+        f"postgresql://{settings.POSTGRESQL_USER}:{quote_plus(settings.POSTGRESQL_PASSWORD)}"
+        f"@{settings.POSTGRESQL_HOST}:{settings.POSTGRESQL_PORT}/{settings.POSTGRESQL_DATABASE}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize()
+    set_database_pool(pool)
+    set_event_bus(InMemoryEventBus())
+
+    worker = register_executors(JobWorker(pool))
+
+    work_dir = tempfile.mkdtemp(prefix="dsa_bench_")
+    files: Dict[str, str] = {}
+    if "import" in selected:
+        writers = {'csv': write_csv, 'parquet': write_parquet}
+        for file_format in [f.strip() for f in args.file_formats.split(",") if f.strip()]:
+            if file_format not in writers:
+                raise SystemExit(f"Unsupported file format: {file_format}")
+            path = os.path.join(work_dir, f"bench.{file_format}")
+            started = time.perf_counter()
+            size = writers[file_format](spec, path)
+            logger.info(f"Generated {file_format} ({size / 2**20:.1f} MB) in {time.perf_counter() - started:.1f}s")
+            files[file_format] = path
+
+    started_at = datetime.utcnow()
+    try:
+        token = await _token_for(pool, args.soeid)
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": args.accept_encoding}
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers=headers,
+            timeout=None
+        ) as client:
+            ctx = BenchContext(
+                client=client,
+                pool=pool,
+                worker=worker,
+                spec=spec,
+                files=files,
+                iterations=args.iterations,
+                dataset_id=args.dataset_id
+            )
+            for name in SCENARIOS:
+                if name not in selected:
+                    continue
+                if name not in STANDALONE_SCENARIOS and ctx.commit_id is None:
+                    await resolve_main(ctx)
+                logger.info(f"Running {name}")
+                await SCENARIOS[name](ctx)
+    finally:
+        await pool.close()
+        for path in files.values():
+            os.remove(path)
+        os.rmdir(work_dir)
+
+    return {
+        'meta': {
+            'commit': _git("rev-parse", "HEAD"),
+            'dirty': bool(_git("status", "--porcelain", "--untracked-files=no")),
+            'started_at': started_at.isoformat(),
+            'duration_seconds': round((datetime.utcnow() - started_at).total_seconds(), 1),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'iterations': args.iterations,
+            'dataset_id': ctx.dataset_id,
+        },
+        'spec': spec.to_dict(),
+        'scenarios': ctx.results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    # Keep per-job worker logging out of the timings' output
+    logging.getLogger("src").setLevel(logging.WARNING)
+
+    args = _parse_args(argv)
+    results = asyncio.run(run(args))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = (results['meta']['commit'] or "nocommit")[:8]
+        output = os.path.join(RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{commit}.json")
+    with open(output, "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
+    failed = [name for name, result in results['scenarios'].items() if result['errors']]
+    logger.info(f"Wrote {output}")
+    if failed:
+        logger.error(f"Scenarios with errors: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+"""Benchmark scenarios for the data plane.
+
+Each scenario drives the same code paths as production: HTTP endpoints go
+through the ASGI app in-process, and queued jobs are run by a JobWorker
+with the production executors, one job at a time so each is timed alone.
+"""
+
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import brotli
+import httpx
+import orjson
+import zstandard
+
+from src.api.encoding import RawRows, encode_arrow
+from src.api.models.requests import ColumnFilter, DataFilters, SortSpec
+from src.features.sql_workbench.utils import SqlExecutor
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.statements import GET_REF
+from src.infrastructure.postgres.table_reader import PostgresTableReader
+from src.workers.job_worker import JobWorker
+from src.workers.sampling_executor import SamplingJobExecutor
+
+from .datagen import SEGMENT_COLUMN, DatasetSpec, iter_rows
+from .measure import measure
+
+
+TABLE_KEY = "primary"
+
+# One sampling round per SAMPLING_QUERIES template, plus proportional
+# stratified sampling, which builds its query instead of using a template
+SAMPLING_CASES: Dict[str, Dict[str, Any]] = {
+    'random_unseeded': {'method': 'random', 'parameters': {'sample_size': 1000}},
+    'random_seeded_exact': {'method': 'random', 'parameters': {'sample_size': 1000, 'seed': 42}},
+    # A row estimate above the threshold selects the hash-filtering query
+    'random_seeded_scalable': {
+        'method': 'random',
+        'parameters': {'sample_size': 1000, 'seed': 42, 'total_rows': 100_000_001}
+    },
+    'systematic': {'method': 'systematic', 'parameters': {'interval': 100}},
+    'cluster_percentage': {
+        'method': 'cluster',
+        'parameters': {'cluster_column': SEGMENT_COLUMN, 'num_clusters': 3, 'sample_percentage': 10}
+    },
+    'cluster_fixed': {
+        'method': 'cluster',
+        'parameters': {'cluster_column': SEGMENT_COLUMN, 'num_clusters': 3, 'samples_per_cluster': 100}
+    },
+    'stratified_disproportional_fixed': {
+        'method': 'stratified',
+        'parameters': {'strata_columns': [SEGMENT_COLUMN], 'samples_per_stratum': 50}
+    },
+    'stratified_proportional': {
+        'method': 'stratified',
+        'parameters': {'strata_columns': [SEGMENT_COLUMN], 'sample_size': 1000, 'seed': 42}
+    },
+}
+
+_missing = set(SamplingJobExecutor.SAMPLING_QUERIES) - set(SAMPLING_CASES)
+if _missing:
+    raise RuntimeError(f"No benchmark case for sampling queries: {', '.join(sorted(_missing))}")
+
+DOWNLOAD_CASES = {
+    'table_csv': ("tables/{table_key}/download", "csv"),
+    'table_parquet': ("tables/{table_key}/download", "parquet"),
+    'dataset_zip': ("download", "zip"),
+    'dataset_zip_parquet': ("download", "zip-parquet"),
+    'dataset_excel': ("download", "excel"),
+}
+
+
+@dataclass
+class BenchContext:
+    """Everything scenarios share: the app client, pool, worker and generated data."""
+    client: httpx.AsyncClient
+    pool: DatabasePool
+    worker: JobWorker
+    spec: DatasetSpec
+    files: Dict[str, str]
+    iterations: int
+    results: Dict[str, Any] = field(default_factory=dict)
+    dataset_id: Optional[int] = None
+    commit_id: Optional[str] = None
+
+
+# ========== Helpers ==========
+
+async def create_dataset(ctx: BenchContext, name: str) -> int:
+    response = await ctx.client.post("/api/datasets/", json={
+        "name": f"{name}_{int(time.time() * 1_000_000)}",
+        "description": "Benchmark dataset",
+        "tags": ["benchmark"]
+    })
+    response.raise_for_status()
+    return response.json()["dataset_id"]
+
+
+async def run_job(ctx: BenchContext, job_id: str) -> Dict[str, Any]:
+    """Run a queued job to completion and return its output summary."""
+    async with ctx.pool.acquire() as conn:
+        job = await conn.fetchrow(
+            """
+            SELECT id, run_type::text, dataset_id, source_commit_id, user_id, run_parameters
+            FROM dsa_jobs.analysis_runs WHERE id = $1::uuid
+            """,
+            job_id
+        )
+    if not job:
+        raise RuntimeError(f"Job {job_id} not found")
+
+    await ctx.worker.process_job(dict(job))
+
+    async with ctx.pool.acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT status::text, error_message, output_summary FROM dsa_jobs.analysis_runs WHERE id = $1::uuid",
+            job_id
+        )
+    if row['status'] != 'completed':
+        raise RuntimeError(f"Job {job_id} {row['status']}: {row['error_message']}")
+    output = row['output_summary']
+    return json.loads(output) if isinstance(output, str) else output or {}
+
+
+async def resolve_main(ctx: BenchContext) -> None:
+    async with ctx.pool.acquire() as conn:
+        ref = await conn.fetchrow(GET_REF, ctx.dataset_id, "main")
+    if not ref or not ref['commit_id']:
+        raise RuntimeError(f"Dataset {ctx.dataset_id} has no commit on main")
+    ctx.commit_id = ref['commit_id']
+
+
+# ========== Scenarios ==========
+
+async def bench_import(ctx: BenchContext) -> None:
+    """Upload and import each generated file into a fresh dataset."""
+    for file_format, path in ctx.files.items():
+        name = f"import_{file_format}"
+        with measure(name, ctx.results, {'rows': ctx.spec.rows}) as m:
+            with open(path, "rb") as f:
+                content = f.read()
+            for i in range(ctx.iterations):
+                dataset_id = await create_dataset(ctx, f"bench_{name}_{i}")
+                with m.iteration():
+                    response = await ctx.client.post(
+                        f"/api/datasets/{dataset_id}/refs/main/import",
+                        files={"file": (f"bench.{file_format}", content)},
+                        data={"commit_message": f"Benchmark import {i}"}
+                    )
+                    response.raise_for_status()
+                    await run_job(ctx, response.json()["job_id"])
+                m.rows += ctx.spec.rows
+                m.bytes += len(content)
+                if ctx.dataset_id is None:
+                    ctx.dataset_id = dataset_id
+
+
+async def bench_paging(ctx: BenchContext) -> None:
+    """Read pages through PostgresTableReader.get_table_data_enhanced."""
+    sort_column = ctx.spec.first_column_of("int") or SEGMENT_COLUMN
+    cases = {
+        'paging_first_page': dict(offset=0),
+        'paging_deep_offset': dict(offset=max(ctx.spec.rows // 2, 0)),
+        'paging_sorted': dict(offset=0, sorting=[SortSpec(column=sort_column, desc=True)]),
+        'paging_filtered': dict(offset=0, filters=DataFilters(columns=[
+            ColumnFilter(column=SEGMENT_COLUMN, operator="eq", value=f"{SEGMENT_COLUMN}_1")
+        ])),
+    }
+    for name, kwargs in cases.items():
+        with measure(name, ctx.results, {'limit': 100}) as m:
+            for _ in range(ctx.iterations):
+                async with ctx.pool.acquire() as conn:
+                    reader = PostgresTableReader(conn)
+                    with m.iteration():
+                        rows = await reader.get_table_data_enhanced(
+                            ctx.commit_id, TABLE_KEY, limit=100, **kwargs
+                        )
+                m.rows += len(rows)
+
+
+async def bench_downloads(ctx: BenchContext) -> None:
+    """Stream every download format to completion."""
+    for name, (path, file_format) in DOWNLOAD_CASES.items():
+        url = f"/api/datasets/{ctx.dataset_id}/refs/main/{path.format(table_key=TABLE_KEY)}"
+        with measure(f"download_{name}", ctx.results) as m:
+            for _ in range(ctx.iterations):
+                with m.iteration():
+                    async with ctx.client.stream("GET", url, params={"format": file_format}) as response:
+                        response.raise_for_status()
+                        async for chunk in response.aiter_raw():
+                            m.bytes += len(chunk)
+                m.rows += ctx.spec.rows
+
+
+async def bench_table_analysis(ctx: BenchContext) -> None:
+    url = f"/api/datasets/{ctx.dataset_id}/refs/main/tables/{TABLE_KEY}/analysis"
+    with measure("table_analysis", ctx.results) as m:
+        for _ in range(ctx.iterations):
+            with m.iteration():
+                response = await ctx.client.get(url)
+                response.raise_for_status()
+
+
+def _workbench_source(ctx: BenchContext) -> Dict[str, Any]:
+    return {"alias": "t", "dataset_id": ctx.dataset_id, "ref": "main", "table_key": TABLE_KEY}
+
+
+async def bench_workbench_preview(ctx: BenchContext) -> None:
+    cases = {
+        'workbench_preview_select': "SELECT * FROM t",
+        'workbench_preview_aggregate': (
+            f"SELECT data->>'{SEGMENT_COLUMN}' AS {SEGMENT_COLUMN}, COUNT(*) AS n "
+            f"FROM t GROUP BY 1 ORDER BY 2 DESC"
+        ),
+    }
+    for name, sql in cases.items():
+        with measure(name, ctx.results, {'sql': sql}) as m:
+            for _ in range(ctx.iterations):
+                with m.iteration():
+                    response = await ctx.client.post("/api/workbench/sql-transform", json={
+                        "sources": [_workbench_source(ctx)],
+                        "sql": sql,
+                        "save": False,
+                        "limit": 1000
+                    })
+                    response.raise_for_status()
+                m.rows += response.json().get("row_count") or 0
+
+
+async def bench_workbench_transform(ctx: BenchContext) -> None:
+    sql = f"SELECT * FROM t WHERE data->>'{SEGMENT_COLUMN}' <> '{SEGMENT_COLUMN}_0'"
+    with measure("workbench_transform", ctx.results, {'sql': sql}) as m:
+        for i in range(ctx.iterations):
+            with m.iteration():
+                response = await ctx.client.post("/api/workbench/sql-transform", json={
+                    "sources": [_workbench_source(ctx)],
+                    "sql": sql,
+                    "save": True,
+                    "target": {
+                        "dataset_id": ctx.dataset_id,
+                        "ref": "main",
+                        "table_key": TABLE_KEY,
+                        "message": f"Benchmark transform {i}",
+                        "create_new_dataset": True,
+                        "new_dataset_name": f"bench_transform_{int(time.time() * 1_000_000)}"
+                    }
+                })
+                response.raise_for_status()
+                await run_job(ctx, response.json()["job_id"])
+            m.rows += ctx.spec.rows
+    
+    # The same query written by a plain CREATE TABLE AS, the floor the
+    # streamed commit is compared against
+    query = SqlExecutor.build_query(sql, [{'alias': 't', 'commit_id': ctx.commit_id, 'table_key': TABLE_KEY}])
+    with measure("workbench_transform_ctas_baseline", ctx.results, {'sql': sql}) as m:
+        for _ in range(ctx.iterations):
+            async with ctx.pool.acquire() as conn:
+                with m.iteration():
+                    await conn.execute(f"CREATE TEMPORARY TABLE bench_transform_ctas AS {query}")
+                await conn.execute("DROP TABLE bench_transform_ctas")
+            m.rows += ctx.spec.rows
+
+
+def _engine_cases(ctx: BenchContext) -> Dict[str, str]:
+    """Analytical queries both workbench engines must answer identically."""
+    num = ctx.spec.first_column_of("float") or ctx.spec.first_column_of("int")
+    text = ctx.spec.first_column_of("str") or SEGMENT_COLUMN
+    seg = SEGMENT_COLUMN
+    cases = {
+        'group_count': f"SELECT data->>'{seg}' AS seg, COUNT(*) AS n FROM t GROUP BY 1",
+        'count_distinct': f"SELECT COUNT(DISTINCT data->>'{text}') AS n FROM t",
+        'self_join': (
+            f"SELECT a.data->>'{seg}' AS seg, COUNT(*) AS n FROM t a "
+            f"JOIN (SELECT DISTINCT data->>'{seg}' AS seg FROM t) b ON a.data->>'{seg}' = b.seg GROUP BY 1"
+        ),
+    }
+    if num:
+        cases['group_sum'] = (
+            f"SELECT data->>'{seg}' AS seg, SUM((data->>'{num}')::numeric) AS total, "
+            f"MAX((data->>'{num}')::numeric) AS top FROM t GROUP BY 1"
+        )
+        cases['filtered_count'] = f"SELECT COUNT(*) AS n FROM t WHERE (data->>'{num}')::numeric > 0"
+    return cases
+
+
+def _comparable(rows: list) -> list:
+    """Rows as sorted tuples with numbers cut to 9 significant digits, for order-insensitive comparison."""
+    def norm(value: Any) -> Any:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(f"{value:.9g}")
+        if isinstance(value, str):
+            try:
+                return float(f"{float(value):.9g}")
+            except ValueError:
+                return value
+        return value
+    return sorted((tuple(norm(v) for v in row.values()) for row in rows), key=repr)
+
+
+async def bench_workbench_engines(ctx: BenchContext) -> None:
+    """Time analytical previews on Postgres and DuckDB and check they agree."""
+    async def preview(sql: str, engine: str, tag: str) -> list:
+        response = await ctx.client.post("/api/workbench/sql-transform", json={
+            "sources": [_workbench_source(ctx)],
+            # The comment keeps the preview cache from answering repeat runs
+            "sql": f"/* bench {engine} {tag} */ {sql}",
+            "save": False,
+            "limit": 10000,
+            "engine": engine
+        })
+        response.raise_for_status()
+        return response.json().get("data") or []
+
+    cases = _engine_cases(ctx)
+    with measure("workbench_duckdb_materialize", ctx.results) as m:
+        with m.iteration():
+            await preview(next(iter(cases.values())), "duckdb", "warmup")
+        m.rows += ctx.spec.rows
+
+    for name, sql in cases.items():
+        results = {}
+        timings = {}
+        for engine in ("postgres", "duckdb"):
+            with measure(f"workbench_engine_{name}_{engine}", ctx.results, {'sql': sql}) as m:
+                for i in range(ctx.iterations):
+                    with m.iteration():
+                        results[engine] = await preview(sql, engine, str(i))
+                m.rows += ctx.spec.rows * ctx.iterations
+                timings[engine] = m
+        duckdb_m = timings['duckdb']
+        if duckdb_m.latencies and timings['postgres'].latencies:
+            duckdb_m.extra['speedup'] = round(
+                sum(timings['postgres'].latencies) / max(sum(duckdb_m.latencies), 1e-9), 1
+            )
+        if _comparable(results.get('postgres', [])) != _comparable(results.get('duckdb', [])):
+            duckdb_m.errors.append("results differ from the postgres engine")
+        ctx.results[f"workbench_engine_{name}_duckdb"] = duckdb_m.to_dict()
+
+
+def _pushdown_cases(ctx: BenchContext) -> Dict[str, str]:
+    """Joins where pushed-down predicates, keys and limits cut the rows reaching the join."""
+    text = ctx.spec.first_column_of("str") or SEGMENT_COLUMN
+    num = ctx.spec.first_column_of("float") or ctx.spec.first_column_of("int") or text
+    seg = SEGMENT_COLUMN
+    return {
+        'filtered_self_join': (
+            f"SELECT a.data->>'{seg}' AS seg, COUNT(*) AS n FROM t a "
+            f"JOIN t b ON a.data->>'{text}' = b.data->>'{text}' "
+            f"WHERE a.data->>'{seg}' = '{seg}_0' AND b.data->>'{seg}' = '{seg}_0' GROUP BY 1"
+        ),
+        'filtered_row_join': (
+            f"SELECT a.data->>'{num}' AS num, b.data->>'{text}' AS txt FROM t a "
+            f"JOIN t b ON a.logical_row_id = b.logical_row_id WHERE a.data->>'{seg}' = '{seg}_1'"
+        ),
+        'left_join_page': (
+            f"SELECT a.data->>'{seg}' AS seg, b.data->>'{num}' AS num FROM t a "
+            f"LEFT JOIN t b ON a.logical_row_id = b.logical_row_id LIMIT 1000"
+        ),
+    }
+
+
+async def bench_workbench_pushdown(ctx: BenchContext) -> None:
+    """Time workbench joins with and without source pushdown, and check they agree."""
+    sources = [{'alias': 't', 'commit_id': ctx.commit_id, 'table_key': TABLE_KEY}]
+    for name, sql in _pushdown_cases(ctx).items():
+        results = {}
+        timings = {}
+        for pushdown in (False, True):
+            label = "pushdown" if pushdown else "plain"
+            query = SqlExecutor.build_query(sql, sources, pushdown=pushdown)
+            with measure(f"workbench_{name}_{label}", ctx.results, {'sql': sql}) as m:
+                for _ in range(ctx.iterations):
+                    async with ctx.pool.acquire() as conn:
+                        with m.iteration():
+                            results[pushdown] = await conn.fetch(query)
+                m.rows += ctx.spec.rows * ctx.iterations
+                timings[pushdown] = m
+        pushed_m = timings[True]
+        if pushed_m.latencies and timings[False].latencies:
+            pushed_m.extra['speedup'] = round(
+                sum(timings[False].latencies) / max(sum(pushed_m.latencies), 1e-9), 1
+            )
+        # Unordered pages may pick different rows, so only full results are compared
+        if 'LIMIT' not in sql and _comparable(results.get(True, [])) != _comparable(results.get(False, [])):
+            pushed_m.errors.append("results differ without pushdown")
+        elif len(results.get(True, [])) != len(results.get(False, [])):
+            pushed_m.errors.append("row count differs without pushdown")
+        ctx.results[f"workbench_{name}_pushdown"] = pushed_m.to_dict()
+
+
+async def bench_sampling(ctx: BenchContext) -> None:
+    for case, round_config in SAMPLING_CASES.items():
+        with measure(f"sampling_{case}", ctx.results, round_config) as m:
+            for i in range(ctx.iterations):
+                with m.iteration():
+                    response = await ctx.client.post(
+                        f"/api/sampling/datasets/{ctx.dataset_id}/jobs",
+                        json={
+                            "source_ref": "main",
+                            "table_key": TABLE_KEY,
+                            "output_name": f"bench_{case}_{i}_{int(time.time())}",
+                            "rounds": [{"round_number": 1, **round_config}]
+                        }
+                    )
+                    response.raise_for_status()
+                    output = await run_job(ctx, response.json()["job_id"])
+                m.rows += output.get('total_sampled', 0)
+
+
+async def bench_encoding(ctx: BenchContext) -> None:
+    """
+    CPU per MB of response encoding and compression.
+
+    Runs without the database on rows shaped like stored table rows, so the
+    numbers isolate the serializer and compressor costs.
+    """
+    settings = get_settings()
+    names = [column.name for column in ctx.spec.columns]
+    limit = min(ctx.spec.rows, 50_000)
+    records = []
+    for i, row in enumerate(iter_rows(ctx.spec)):
+        if i >= limit:
+            break
+        records.append({
+            'logical_row_id': f"{TABLE_KEY}:{i}",
+            'data': orjson.dumps(dict(zip(names, row))).decode('utf-8')
+        })
+    rows = RawRows(TABLE_KEY, records)
+
+    encoders = {
+        'encode_json': rows.encode,
+        'encode_ndjson': lambda: b'\n'.join(rows.iter_encoded()),
+        'encode_arrow': lambda: encode_arrow(rows),
+    }
+    payload = b''
+    for name, encoder in encoders.items():
+        with measure(name, ctx.results, {'rows': len(records)}) as m:
+            for _ in range(ctx.iterations):
+                with m.iteration():
+                    encoded = encoder()
+                m.rows += len(records)
+                m.bytes += len(encoded)
+            m.extra['output_bytes'] = len(encoded)
+        if name == 'encode_json':
+            payload = encoded
+
+    compressors = {
+        'compress_zstd': lambda data: zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(data),
+        'compress_brotli': lambda data: brotli.compress(data, quality=settings.compression_brotli_quality),
+        'compress_gzip': lambda data: gzip.compress(data, compresslevel=settings.compression_gzip_level),
+    }
+    for name, compress in compressors.items():
+        with measure(name, ctx.results, {'input_bytes': len(payload)}) as m:
+            for _ in range(ctx.iterations):
+                with m.iteration():
+                    compressed = compress(payload)
+                m.bytes += len(payload)
+            m.extra['ratio'] = round(len(payload) / max(len(compressed), 1), 2)
+
+
+# Run order matters: later scenarios read the dataset the import created
+SCENARIOS = {
+    'import': bench_import,
+    'paging': bench_paging,
+    'downloads': bench_downloads,
+    'table_analysis': bench_table_analysis,
+    'workbench_preview': bench_workbench_preview,
+    'workbench_engines': bench_workbench_engines,
+    'workbench_pushdown': bench_workbench_pushdown,
+    'sampling': bench_sampling,
+    'workbench_transform': bench_workbench_transform,
+    'encoding': bench_encoding,
+}
+
+# Scenarios that run without a dataset
+STANDALONE_SCENARIOS = {'import', 'encoding'}
@@ -154,10 +154,10 @@ def reset_database():
         
         print("Database recreated successfully from schema.sql!")
         
-        # Refresh materialized view
-        print("\nRefreshing materialized view...")
-        cursor.execute("REFRESH MATERIALIZED VIEW dsa_search.datasets_summary;")
-        print("Materialized view refreshed successfully!")
+        # Build search index
+        print("\nBuilding search index...")
+        cursor.execute("SELECT dsa_search.refresh_datasets_summary();")
+        print("Search index built successfully!")
         
         # Insert default roles
         print("\nInserting default roles...")
@@ -181,10 +181,550 @@ CREATE TYPE dsa_search.search_result AS (
 
 
 --
--- Name: search(integer, text, boolean, text[], integer[], timestamp with time zone, timestamp with time zone, timestamp with time zone, timestamp with time zone, integer, integer, text, text, boolean, text[]); Type: FUNCTION; Schema: dsa_search; Owner: -
+-- Name: commit_table_entries(character, text, bigint, bigint); Type: FUNCTION; Schema: dsa_core; Owner: -
 --
 
-CREATE FUNCTION dsa_search.search(p_current_user_id integer, p_query text DEFAULT NULL::text, p_fuzzy boolean DEFAULT true, p_tags text[] DEFAULT NULL::text[], p_created_by integer[] DEFAULT NULL::integer[], p_created_after timestamp with time zone DEFAULT NULL::timestamp with time zone, p_created_before timestamp with time zone DEFAULT NULL::timestamp with time zone, p_updated_after timestamp with time zone DEFAULT NULL::timestamp with time zone, p_updated_before timestamp with time zone DEFAULT NULL::timestamp with time zone, p_limit integer DEFAULT 20, p_offset integer DEFAULT 0, p_sort_by text DEFAULT 'relevance'::text, p_sort_order text DEFAULT 'desc'::text, p_include_facets boolean DEFAULT true, p_facet_fields text[] DEFAULT ARRAY['tags'::text, 'created_by'::text]) RETURNS jsonb
+CREATE FUNCTION dsa_core.commit_table_entries(p_commit_id character, p_table_key text, p_offset bigint DEFAULT 0, p_limit bigint DEFAULT NULL::bigint) RETURNS TABLE(logical_row_id text, row_hash character, pos bigint)
+    LANGUAGE sql STABLE
+    AS $$
+    -- A single SQL query, so the planner inlines it into the caller and
+    -- rows stream out instead of being collected first. pos numbers the
+    -- table's rows from 1 in key order; readers order by it.
+
+    -- Not sealed yet: page through the flat manifest
+    SELECT f.logical_row_id, f.row_hash, p_offset + row_number() OVER (ORDER BY f.logical_row_id COLLATE "C")
+    FROM (
+        SELECT m.logical_row_id, m.row_hash
+        FROM dsa_core.commit_manifest m
+        WHERE m.commit_id = p_commit_id
+          AND m.logical_row_id LIKE p_table_key || ':%'
+          AND EXISTS (
+              SELECT 1 FROM dsa_core.commit_rows cr
+              WHERE cr.commit_id = p_commit_id AND cr.logical_row_id LIKE p_table_key || ':%'
+          )
+        ORDER BY m.logical_row_id COLLATE "C"
+        OFFSET p_offset LIMIT p_limit
+    ) f
+    UNION ALL
+    -- Sealed: whole chunks outside the window are skipped using their row offsets
+    SELECT p_table_key || ':' || e.row_key, e.row_hash, cc.row_offset + e.ord
+    FROM dsa_core.commit_chunks cc
+    JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+    CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) WITH ORDINALITY AS e(row_key, row_hash, ord)
+    WHERE cc.commit_id = p_commit_id
+      AND cc.table_key = p_table_key
+      AND cc.row_offset + cc.row_count > p_offset
+      AND (p_limit IS NULL OR cc.row_offset < p_offset + p_limit)
+      AND cc.row_offset + e.ord > p_offset
+      AND (p_limit IS NULL OR cc.row_offset + e.ord <= p_offset + p_limit)
+      AND NOT EXISTS (
+          SELECT 1 FROM dsa_core.commit_rows cr
+          WHERE cr.commit_id = p_commit_id AND cr.logical_row_id LIKE p_table_key || ':%'
+      )
+$$;
+
+
+--
+-- Name: commit_table_keys(character); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.commit_table_keys(p_commit_id character) RETURNS SETOF text
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT cc.table_key
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id
+    UNION
+    SELECT split_part(cr.logical_row_id, ':', 1)
+    FROM dsa_core.commit_rows cr
+    WHERE cr.commit_id = p_commit_id AND position(':' in cr.logical_row_id) > 0
+$$;
+
+
+--
+-- Name: commit_table_row_count(character, text); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.commit_table_row_count(p_commit_id character, p_table_key text DEFAULT NULL::text) RETURNS bigint
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE((
+        SELECT sum(cc.row_count)
+        FROM dsa_core.commit_chunks cc
+        WHERE cc.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cc.table_key = p_table_key)
+    ), 0)::bigint + (
+        SELECT count(*)
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cr.logical_row_id LIKE p_table_key || ':%')
+    )
+$$;
+
+
+--
+-- Name: derive_commit_table(character, character, text, text, text[], integer); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.derive_commit_table(p_commit_id character, p_source_commit_id character, p_source_table_key text, p_table_key text, p_excluded_row_keys text[] DEFAULT NULL::text[], p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    -- Commits written before chunking keep a flat manifest; seal it so its chunks can be shared
+    IF EXISTS (
+        SELECT 1 FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_source_commit_id
+          AND cr.logical_row_id LIKE p_source_table_key || ':%'
+    ) THEN
+        PERFORM dsa_core.seal_commit_manifest(p_source_commit_id, p_chunk_size);
+    END IF;
+
+    -- Share every chunk of the source table
+    INSERT INTO dsa_core.commit_chunks (commit_id, table_key, chunk_index, chunk_hash, row_offset, row_count)
+    SELECT p_commit_id, p_table_key, cc.chunk_index, cc.chunk_hash, cc.row_offset, cc.row_count
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_source_commit_id AND cc.table_key = p_source_table_key;
+
+    IF COALESCE(cardinality(p_excluded_row_keys), 0) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    -- Drop the excluded keys; only the chunks holding them are rewritten
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_edits;
+
+    INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+    SELECT DISTINCT k, NULL::character(64)
+    FROM unnest(p_excluded_row_keys) AS k;
+
+    RETURN dsa_core.rebuild_commit_table_chunks(p_commit_id, p_table_key, p_chunk_size);
+END;
+$$;
+
+
+--
+-- Name: manifest_key_is_boundary(text, integer); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.manifest_key_is_boundary(p_row_key text, p_chunk_size integer) RETURNS boolean
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$
+    SELECT ('x' || substr(md5(p_row_key), 1, 7))::bit(28)::integer % p_chunk_size = 0
+$$;
+
+
+--
+-- Name: manifest_unshared_entries(character, character, text, text, text); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.manifest_unshared_entries(p_commit_id character, p_other_commit_id character, p_table_key text DEFAULT NULL::text, p_after text DEFAULT ''::text, p_upper text DEFAULT NULL::text) RETURNS TABLE(logical_row_id text, row_hash character)
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT e.logical_row_id, e.row_hash
+    FROM (
+        SELECT cc.table_key || ':' || u.row_key AS logical_row_id, u.row_hash
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS u(row_key, row_hash)
+        WHERE cc.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cc.table_key = p_table_key)
+          AND (cc.table_key || ':' || mc.last_key) COLLATE "C" > p_after
+          AND (p_upper IS NULL OR (cc.table_key || ':' || mc.first_key) COLLATE "C" <= p_upper)
+          AND NOT EXISTS (
+              SELECT 1 FROM dsa_core.commit_chunks oc
+              WHERE oc.commit_id = p_other_commit_id
+                AND oc.table_key = cc.table_key
+                AND oc.chunk_hash = cc.chunk_hash
+          )
+        UNION ALL
+        SELECT cr.logical_row_id, cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cr.logical_row_id LIKE p_table_key || ':%')
+    ) e
+    WHERE e.logical_row_id COLLATE "C" > p_after
+      AND (p_upper IS NULL OR e.logical_row_id COLLATE "C" <= p_upper)
+$$;
+
+
+--
+-- Name: rebuild_commit_table_chunks(character, text, integer); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.rebuild_commit_table_chunks(p_commit_id character, p_table_key text, p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_last_index INTEGER;
+    v_written INTEGER;
+BEGIN
+    -- Applies pg_temp.manifest_edits (row_key, row_hash) to the table's chunk
+    -- list; a NULL row_hash deletes the key. Only chunks holding an edited key
+    -- are rewritten, every other chunk pointer is kept as is.
+    SELECT max(cc.chunk_index) INTO v_last_index
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key;
+
+    -- An edit belongs to the first chunk whose last key is >= the edited key,
+    -- or to the last chunk when it sorts past the end of the table
+    CREATE TEMP TABLE IF NOT EXISTS manifest_placed (
+        row_key text COLLATE "C",
+        row_hash character(64),
+        chunk_index integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_placed;
+
+    INSERT INTO pg_temp.manifest_placed (row_key, row_hash, chunk_index)
+    SELECT m.row_key, m.row_hash, LEAST(m.chunks_before, v_last_index)
+    FROM (
+        SELECT k.row_key, k.row_hash, k.is_edit,
+               (count(*) FILTER (WHERE NOT k.is_edit) OVER (
+                   ORDER BY k.row_key, k.is_edit DESC ROWS UNBOUNDED PRECEDING
+               ))::integer AS chunks_before
+        FROM (
+            SELECT e.row_key, e.row_hash, true AS is_edit
+            FROM pg_temp.manifest_edits e
+            UNION ALL
+            SELECT mc.last_key, NULL::character(64), false
+            FROM dsa_core.commit_chunks cc
+            JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+            WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key
+        ) k
+    ) m
+    WHERE m.is_edit;
+
+    -- Adjacent touched chunks form a run and are re-chunked together
+    CREATE TEMP TABLE IF NOT EXISTS manifest_touched (
+        chunk_index integer,
+        run_id integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_touched;
+
+    INSERT INTO pg_temp.manifest_touched (chunk_index, run_id)
+    SELECT t.chunk_index, t.chunk_index - (row_number() OVER (ORDER BY t.chunk_index))::integer
+    FROM (SELECT DISTINCT p.chunk_index FROM pg_temp.manifest_placed p) t;
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_rechunk (
+        run_id integer,
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_rechunk;
+
+    INSERT INTO pg_temp.manifest_rechunk (run_id, row_key, row_hash)
+    SELECT DISTINCT ON (u.row_key) u.run_id, u.row_key, u.row_hash
+    FROM (
+        -- Edits take precedence over the entries they replace
+        SELECT t.run_id, p.row_key, p.row_hash, 0 AS precedence
+        FROM pg_temp.manifest_placed p
+        JOIN pg_temp.manifest_touched t ON t.chunk_index = p.chunk_index
+        UNION ALL
+        SELECT t.run_id, e.row_key COLLATE "C", e.row_hash, 1
+        FROM pg_temp.manifest_touched t
+        JOIN dsa_core.commit_chunks cc
+          ON cc.commit_id = p_commit_id AND cc.table_key = p_table_key AND cc.chunk_index = t.chunk_index
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS e(row_key, row_hash)
+    ) u
+    ORDER BY u.row_key, u.precedence;
+
+    DELETE FROM pg_temp.manifest_rechunk WHERE row_hash IS NULL;
+
+    -- Content-defined boundaries: a chunk ends after a key whose hash hits the
+    -- boundary condition, so edits leave neighbouring chunks unchanged. Chunks
+    -- are capped at four times the target size.
+    CREATE TEMP TABLE IF NOT EXISTS manifest_new_chunks (
+        chunk_hash character(64),
+        row_count integer,
+        first_key text COLLATE "C",
+        last_key text COLLATE "C",
+        row_keys text[],
+        row_hashes character(64)[]
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_new_chunks;
+
+    INSERT INTO pg_temp.manifest_new_chunks (chunk_hash, row_count, first_key, last_key, row_keys, row_hashes)
+    SELECT encode(sha256(convert_to(string_agg(c.row_key || '=' || c.row_hash, E'\n' ORDER BY c.row_key), 'UTF8')), 'hex'),
+           count(*),
+           min(c.row_key),
+           max(c.row_key),
+           array_agg(c.row_key ORDER BY c.row_key),
+           array_agg(c.row_hash ORDER BY c.row_key)
+    FROM (
+        SELECT b.run_id, b.row_key, b.row_hash, b.chunk_no,
+               (row_number() OVER (PARTITION BY b.run_id, b.chunk_no ORDER BY b.row_key) - 1) / (p_chunk_size * 4) AS part_no
+        FROM (
+            SELECT r.run_id, r.row_key, r.row_hash,
+                   COALESCE(sum(dsa_core.manifest_key_is_boundary(r.row_key, p_chunk_size)::integer) OVER (
+                       PARTITION BY r.run_id ORDER BY r.row_key
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ), 0) AS chunk_no
+            FROM pg_temp.manifest_rechunk r
+        ) b
+    ) c
+    GROUP BY c.run_id, c.chunk_no, c.part_no;
+    GET DIAGNOSTICS v_written = ROW_COUNT;
+
+    INSERT INTO dsa_core.manifest_chunks (chunk_hash, row_count, first_key, last_key, row_keys, row_hashes)
+    SELECT n.chunk_hash, n.row_count, n.first_key, n.last_key, n.row_keys, n.row_hashes
+    FROM pg_temp.manifest_new_chunks n
+    ON CONFLICT (chunk_hash) DO NOTHING;
+
+    -- Rebuild the pointer list: untouched chunks plus the new ones, in key order
+    CREATE TEMP TABLE IF NOT EXISTS manifest_chunk_list (
+        chunk_hash character(64),
+        first_key text COLLATE "C",
+        row_count integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_chunk_list;
+
+    INSERT INTO pg_temp.manifest_chunk_list (chunk_hash, first_key, row_count)
+    SELECT mc.chunk_hash, mc.first_key, mc.row_count
+    FROM dsa_core.commit_chunks cc
+    JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+    WHERE cc.commit_id = p_commit_id
+      AND cc.table_key = p_table_key
+      AND cc.chunk_index NOT IN (SELECT t.chunk_index FROM pg_temp.manifest_touched t)
+    UNION ALL
+    SELECT n.chunk_hash, n.first_key, n.row_count
+    FROM pg_temp.manifest_new_chunks n;
+
+    DELETE FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key;
+
+    INSERT INTO dsa_core.commit_chunks (commit_id, table_key, chunk_index, chunk_hash, row_offset, row_count)
+    SELECT p_commit_id,
+           p_table_key,
+           (row_number() OVER w - 1)::integer,
+           l.chunk_hash,
+           sum(l.row_count) OVER w - l.row_count,
+           l.row_count
+    FROM pg_temp.manifest_chunk_list l
+    WINDOW w AS (ORDER BY l.first_key ROWS UNBOUNDED PRECEDING);
+
+    RETURN v_written;
+END;
+$$;
+
+
+--
+-- Name: seal_commit_manifest(character, integer); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.seal_commit_manifest(p_commit_id character, p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_table_key TEXT;
+    v_written INTEGER := 0;
+BEGIN
+    -- Moves the commit's staged commit_rows entries into its chunk lists.
+    -- Entries of a table that already has chunks (e.g. derived from the
+    -- parent) are applied as upserts on top of them.
+    PERFORM pg_advisory_xact_lock(hashtext('dsa_core.seal_commit_manifest'), hashtext(p_commit_id::text));
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+
+    FOR v_table_key IN
+        SELECT DISTINCT split_part(cr.logical_row_id, ':', 1)
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id AND position(':' in cr.logical_row_id) > 0
+    LOOP
+        TRUNCATE pg_temp.manifest_edits;
+
+        INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+        SELECT substr(cr.logical_row_id, length(v_table_key) + 2), cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND position(':' in cr.logical_row_id) > 0
+          AND split_part(cr.logical_row_id, ':', 1) = v_table_key;
+
+        v_written := v_written + dsa_core.rebuild_commit_table_chunks(p_commit_id, v_table_key, p_chunk_size);
+
+        DELETE FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND position(':' in cr.logical_row_id) > 0
+          AND split_part(cr.logical_row_id, ':', 1) = v_table_key;
+    END LOOP;
+
+    RETURN v_written;
+END;
+$$;
+
+
+--
+-- Name: seal_staged_table(character, text, integer, boolean); Type: FUNCTION; Schema: dsa_core; Owner: -
+--
+
+CREATE FUNCTION dsa_core.seal_staged_table(p_commit_id character, p_table_key text, p_chunk_size integer DEFAULT 1024, p_replace boolean DEFAULT false) RETURNS bigint
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_written BIGINT;
+    v_held BIGINT;
+    v_deleted BIGINT;
+BEGIN
+    -- Applies a table's rows staged in dsa_staging.import_row_keys straight
+    -- to the commit's chunk list and clears them, so staged rows are never
+    -- written to commit_rows. When a key is staged more than once its
+    -- highest line number wins; keys the table already holds with the same
+    -- hash are left alone. With p_replace the staged rows are the whole
+    -- table and the keys it holds that were not staged are deleted.
+    -- Returns the number of row keys written or deleted.
+    PERFORM pg_advisory_xact_lock(hashtext('dsa_core.seal_commit_manifest'), hashtext(p_commit_id::text));
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_edits;
+
+    INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+    SELECT DISTINCT ON (ik.row_key) ik.row_key, ik.row_hash
+    FROM dsa_staging.import_row_keys ik
+    WHERE ik.commit_id = p_commit_id AND ik.table_key = p_table_key
+    ORDER BY ik.row_key, ik.line_number DESC;
+    GET DIAGNOSTICS v_written = ROW_COUNT;
+
+    IF v_written > 0 AND EXISTS (
+        SELECT 1 FROM dsa_core.commit_chunks cc
+        WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key
+    ) THEN
+        -- Drop edits the table already holds. Each staged key can only be in
+        -- the first chunk whose last key is >= it, so only those chunks are
+        -- unnested and sealing costs what was staged, not the table's size.
+        DELETE FROM pg_temp.manifest_edits ed
+        USING dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS e(row_key, row_hash)
+        WHERE cc.commit_id = p_commit_id
+          AND cc.table_key = p_table_key
+          AND cc.chunk_index IN (
+              SELECT DISTINCT m.chunks_before
+              FROM (
+                  SELECT k.is_edit,
+                         (count(*) FILTER (WHERE NOT k.is_edit) OVER (
+                             ORDER BY k.row_key, k.is_edit DESC ROWS UNBOUNDED PRECEDING
+                         ))::integer AS chunks_before
+                  FROM (
+                      SELECT x.row_key, true AS is_edit
+                      FROM pg_temp.manifest_edits x
+                      UNION ALL
+                      SELECT lc.last_key, false
+                      FROM dsa_core.commit_chunks lcc
+                      JOIN dsa_core.manifest_chunks lc ON lc.chunk_hash = lcc.chunk_hash
+                      WHERE lcc.commit_id = p_commit_id AND lcc.table_key = p_table_key
+                  ) k
+              ) m
+              WHERE m.is_edit
+          )
+          AND e.row_key COLLATE "C" = ed.row_key
+          AND e.row_hash = ed.row_hash;
+        GET DIAGNOSTICS v_held = ROW_COUNT;
+        v_written := v_written - v_held;
+    END IF;
+
+    IF p_replace THEN
+        -- Every held key is read once here; keys that were staged are kept
+        -- by the anti-join on the staging index, whatever their hash
+        INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+        SELECT e.row_key, NULL
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys) AS e(row_key)
+        WHERE cc.commit_id = p_commit_id
+          AND cc.table_key = p_table_key
+          AND NOT EXISTS (
+              SELECT 1 FROM dsa_staging.import_row_keys ik
+              WHERE ik.commit_id = p_commit_id
+                AND ik.table_key = p_table_key
+                AND ik.row_key = e.row_key
+          );
+        GET DIAGNOSTICS v_deleted = ROW_COUNT;
+        v_written := v_written + v_deleted;
+    END IF;
+
+    IF v_written > 0 THEN
+        PERFORM dsa_core.rebuild_commit_table_chunks(p_commit_id, p_table_key, p_chunk_size);
+    END IF;
+
+    DELETE FROM dsa_staging.import_row_keys ik
+    WHERE ik.commit_id = p_commit_id AND ik.table_key = p_table_key;
+
+    RETURN v_written;
+END;
+$$;
+
+
+--
+-- Name: refresh_datasets_summary(integer[]); Type: FUNCTION; Schema: dsa_search; Owner: -
+--
+
+CREATE FUNCTION dsa_search.refresh_datasets_summary(p_dataset_ids integer[] DEFAULT NULL::integer[]) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_deleted INTEGER;
+    v_upserted INTEGER;
+BEGIN
+    -- Drop summaries whose dataset no longer exists
+    DELETE FROM dsa_search.datasets_summary s
+    WHERE (p_dataset_ids IS NULL OR s.dataset_id = ANY(p_dataset_ids))
+      AND NOT EXISTS (SELECT 1 FROM dsa_core.datasets d WHERE d.id = s.dataset_id);
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    -- Recompute the summary rows for the requested datasets (all when NULL)
+    INSERT INTO dsa_search.datasets_summary (
+        dataset_id, name, description, created_by_id, created_by_name,
+        created_at, updated_at, tags, search_text, search_tsv
+    )
+    SELECT d.id,
+        d.name,
+        d.description,
+        d.created_by,
+        u.soeid,
+        d.created_at,
+        d.updated_at,
+        COALESCE(dta.tags, '{}'::character varying[]),
+        (d.name)::text || ' ' || COALESCE(d.description, '') || ' ' || array_to_string(COALESCE(dta.tags, '{}'::character varying[]), ' '),
+        to_tsvector('english'::regconfig, (d.name)::text) || to_tsvector('english'::regconfig, COALESCE(d.description, '')) || to_tsvector('english'::regconfig, array_to_string(COALESCE(dta.tags, '{}'::character varying[]), ' '))
+    FROM dsa_core.datasets d
+    LEFT JOIN dsa_auth.users u ON d.created_by = u.id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(t.tag_name ORDER BY t.tag_name) AS tags
+        FROM dsa_core.dataset_tags dt
+        JOIN dsa_core.tags t ON dt.tag_id = t.id
+        WHERE dt.dataset_id = d.id
+    ) dta ON true
+    WHERE p_dataset_ids IS NULL OR d.id = ANY(p_dataset_ids)
+    ON CONFLICT (dataset_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        description = EXCLUDED.description,
+        created_by_id = EXCLUDED.created_by_id,
+        created_by_name = EXCLUDED.created_by_name,
+        created_at = EXCLUDED.created_at,
+        updated_at = EXCLUDED.updated_at,
+        tags = EXCLUDED.tags,
+        search_text = EXCLUDED.search_text,
+        search_tsv = EXCLUDED.search_tsv;
+    GET DIAGNOSTICS v_upserted = ROW_COUNT;
+
+    RETURN v_deleted + v_upserted;
+END;
+$$;
+
+
+--
+-- Name: search(integer, text, boolean, text[], integer[], timestamp with time zone, timestamp with time zone, timestamp with time zone, timestamp with time zone, integer, integer, text, text, boolean, text[], real, timestamp with time zone, integer); Type: FUNCTION; Schema: dsa_search; Owner: -
+--
+
+CREATE FUNCTION dsa_search.search(p_current_user_id integer, p_query text DEFAULT NULL::text, p_fuzzy boolean DEFAULT true, p_tags text[] DEFAULT NULL::text[], p_created_by integer[] DEFAULT NULL::integer[], p_created_after timestamp with time zone DEFAULT NULL::timestamp with time zone, p_created_before timestamp with time zone DEFAULT NULL::timestamp with time zone, p_updated_after timestamp with time zone DEFAULT NULL::timestamp with time zone, p_updated_before timestamp with time zone DEFAULT NULL::timestamp with time zone, p_limit integer DEFAULT 20, p_offset integer DEFAULT 0, p_sort_by text DEFAULT 'relevance'::text, p_sort_order text DEFAULT 'desc'::text, p_include_facets boolean DEFAULT true, p_facet_fields text[] DEFAULT ARRAY['tags'::text, 'created_by'::text], p_cursor_score real DEFAULT NULL::real, p_cursor_updated_at timestamp with time zone DEFAULT NULL::timestamp with time zone, p_cursor_id integer DEFAULT NULL::integer) RETURNS jsonb
     LANGUAGE plpgsql
     AS $$
 DECLARE
@@ -200,10 +740,18 @@ DECLARE
     v_kv_match RECORD;
     v_parsed_tags TEXT[] := '{}';
     v_parsed_users TEXT[] := '{}';
+    v_sort_key TEXT;
+    v_sort_dir TEXT := CASE WHEN lower(p_sort_order) = 'asc' THEN 'asc' ELSE 'desc' END;
+    v_keyset_clause TEXT := '';
+    v_use_keyset BOOLEAN := p_cursor_id IS NOT NULL;
+    v_has_more BOOLEAN;
 BEGIN
     -- Validate and sanitize inputs
     p_limit := LEAST(GREATEST(p_limit, 1), 100);
     p_offset := GREATEST(p_offset, 0);
+    IF v_use_keyset THEN
+        p_offset := 0;
+    END IF;
 
     -- PERMISSION MODEL: Uses an INNER JOIN for performance
     v_base_from := format(
@@ -287,16 +835,41 @@ BEGIN
         v_where_clauses := v_where_clauses || format('s.updated_at <= %L', p_updated_before);
     END IF;
 
+    -- Resolve the effective sort key; dataset_id breaks ties so pages are stable
+    IF v_main_query_text IS NOT NULL AND v_main_query_text <> '' AND p_sort_by = 'relevance' THEN
+        v_sort_key := 'score';
+    ELSIF p_sort_by IN ('name', 'created_at', 'updated_at') THEN
+        v_sort_key := p_sort_by;
+    ELSE
+        v_sort_key := 'updated_at';
+        v_sort_dir := 'desc';
+    END IF;
+
     -- Build ORDER BY clause
     v_order_by_clause := CASE
-        WHEN v_main_query_text IS NOT NULL AND v_main_query_text <> '' AND p_sort_by = 'relevance' THEN
-            format('similarity(fr.search_text, %L) %s', v_main_query_text, p_sort_order)
-        WHEN p_sort_by = 'name' THEN 'fr.name ' || p_sort_order
-        WHEN p_sort_by = 'created_at' THEN 'fr.created_at ' || p_sort_order
-        WHEN p_sort_by = 'updated_at' THEN 'fr.updated_at ' || p_sort_order
-        ELSE 'fr.updated_at DESC'
+        WHEN v_sort_key = 'score' THEN
+            format('similarity(fr.search_text, %L)::real %s, fr.dataset_id %s', v_main_query_text, v_sort_dir, v_sort_dir)
+        ELSE format('fr.%I %s, fr.dataset_id %s', v_sort_key, v_sort_dir, v_sort_dir)
     END;
 
+    -- Keyset cursor: continue strictly after the last row of the previous page
+    IF v_use_keyset THEN
+        v_keyset_clause := CASE
+            WHEN v_sort_key = 'score' AND p_cursor_score IS NOT NULL THEN
+                format('WHERE (similarity(fr.search_text, %L)::real, fr.dataset_id) %s (%L::real, %L::integer)',
+                       v_main_query_text, CASE WHEN v_sort_dir = 'asc' THEN '>' ELSE '<' END,
+                       p_cursor_score, p_cursor_id)
+            WHEN v_sort_key = 'updated_at' AND p_cursor_updated_at IS NOT NULL THEN
+                format('WHERE (fr.updated_at, fr.dataset_id) %s (%L::timestamptz, %L::integer)',
+                       CASE WHEN v_sort_dir = 'asc' THEN '>' ELSE '<' END,
+                       p_cursor_updated_at, p_cursor_id)
+        END;
+        IF v_keyset_clause IS NULL THEN
+            RAISE EXCEPTION 'Cursor does not match sort key %', v_sort_key
+                USING ERRCODE = 'invalid_parameter_value';
+        END IF;
+    END IF;
+
     -- Build and execute main query
     DECLARE
         v_where_string TEXT := CASE
@@ -311,10 +884,11 @@ BEGIN
             v_base_from, v_where_string
         );
     BEGIN
-        -- Get results and total count
+        -- Get one extra row to detect further pages; the total is only
+        -- counted for the first page of a keyset scan
         v_sql := v_base_cte || format('
             SELECT
-                (SELECT COUNT(*) FROM filtered_results),
+                (SELECT CASE WHEN %L THEN NULL ELSE COUNT(*) END FROM filtered_results),
                 (SELECT COALESCE(jsonb_agg(r), ''[]''::jsonb)
                  FROM (
                      SELECT
@@ -329,15 +903,22 @@ BEGIN
                          (CASE WHEN %L IS NOT NULL THEN similarity(fr.search_text, %L) ELSE NULL END)::real AS score,
                          fr.user_permission
                      FROM filtered_results fr
+                     %s
                      ORDER BY %s
                      LIMIT %L
                      OFFSET %L
                  ) r)',
-            v_main_query_text, v_main_query_text, v_order_by_clause, p_limit, p_offset
+            v_use_keyset, v_main_query_text, v_main_query_text, v_keyset_clause,
+            v_order_by_clause, p_limit + 1, p_offset
         );
 
         EXECUTE v_sql INTO v_total_count, v_results;
 
+        v_has_more := jsonb_array_length(v_results) > p_limit;
+        IF v_has_more THEN
+            v_results := v_results - p_limit;
+        END IF;
+
         -- Calculate facets if requested
         IF p_include_facets THEN
             DECLARE v_tag_facets jsonb; v_created_by_facets jsonb;
@@ -380,7 +961,8 @@ BEGIN
         'total', v_total_count,
         'limit', p_limit,
         'offset', p_offset,
-        'has_more', (p_offset + p_limit) < v_total_count,
+        'has_more', v_has_more,
+        'sort_key', v_sort_key,
         'query', p_query,
         'execution_time_ms', (EXTRACT(EPOCH FROM clock_timestamp() - v_start_time) * 1000)::int,
         'facets', CASE WHEN p_include_facets THEN v_facets ELSE NULL END
@@ -561,6 +1143,27 @@ CREATE SEQUENCE dsa_auth.users_id_seq
 ALTER SEQUENCE dsa_auth.users_id_seq OWNED BY dsa_auth.users.id;
 
 
+--
+-- Name: commit_chunks; Type: TABLE; Schema: dsa_core; Owner: -
+--
+
+CREATE TABLE dsa_core.commit_chunks (
+    commit_id character(64) NOT NULL,
+    table_key text NOT NULL,
+    chunk_index integer NOT NULL,
+    chunk_hash character(64) NOT NULL,
+    row_offset bigint NOT NULL,
+    row_count integer NOT NULL
+);
+
+
+--
+-- Name: TABLE commit_chunks; Type: COMMENT; Schema: dsa_core; Owner: -
+--
+
+COMMENT ON TABLE dsa_core.commit_chunks IS 'Ordered list of manifest chunks making up each table of a commit. Unchanged chunks are shared with the parent.';
+
+
 --
 -- Name: commit_rows; Type: TABLE; Schema: dsa_core; Owner: -
 --
@@ -576,7 +1179,7 @@ CREATE TABLE dsa_core.commit_rows (
 -- Name: TABLE commit_rows; Type: COMMENT; Schema: dsa_core; Owner: -
 --
 
-COMMENT ON TABLE dsa_core.commit_rows IS 'The manifest linking a commit to its constituent rows.';
+COMMENT ON TABLE dsa_core.commit_rows IS 'Staged manifest entries of a commit; sealed into commit_chunks once the commit is written.';
 
 
 --
@@ -684,6 +1287,52 @@ CREATE SEQUENCE dsa_core.datasets_id_seq
 ALTER SEQUENCE dsa_core.datasets_id_seq OWNED BY dsa_core.datasets.id;
 
 
+--
+-- Name: manifest_chunks; Type: TABLE; Schema: dsa_core; Owner: -
+--
+
+CREATE TABLE dsa_core.manifest_chunks (
+    chunk_hash character(64) NOT NULL,
+    row_count integer NOT NULL,
+    first_key text COLLATE pg_catalog."C" NOT NULL,
+    last_key text COLLATE pg_catalog."C" NOT NULL,
+    row_keys text[] NOT NULL,
+    row_hashes character(64)[] NOT NULL
+);
+
+
+--
+-- Name: TABLE manifest_chunks; Type: COMMENT; Schema: dsa_core; Owner: -
+--
+
+COMMENT ON TABLE dsa_core.manifest_chunks IS 'Content-addressed runs of sorted (row key, row hash) pointers, keyed relative to the table.';
+
+
+--
+-- Name: commit_manifest; Type: VIEW; Schema: dsa_core; Owner: -
+--
+
+CREATE VIEW dsa_core.commit_manifest AS
+ SELECT cr.commit_id,
+    cr.logical_row_id,
+    cr.row_hash
+   FROM dsa_core.commit_rows cr
+UNION ALL
+ SELECT cc.commit_id,
+    ((cc.table_key || ':'::text) || e.row_key) AS logical_row_id,
+    e.row_hash
+   FROM ((dsa_core.commit_chunks cc
+     JOIN dsa_core.manifest_chunks mc ON ((mc.chunk_hash = cc.chunk_hash)))
+     CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) e(row_key, row_hash));
+
+
+--
+-- Name: VIEW commit_manifest; Type: COMMENT; Schema: dsa_core; Owner: -
+--
+
+COMMENT ON VIEW dsa_core.commit_manifest IS 'Every (commit, logical row, row hash) entry, whether staged in commit_rows or sealed into chunks.';
+
+
 --
 -- Name: refs; Type: TABLE; Schema: dsa_core; Owner: -
 --
@@ -864,7 +1513,9 @@ CREATE TABLE dsa_jobs.analysis_runs (
     output_summary jsonb,
     error_message text,
     created_at timestamp with time zone DEFAULT now() NOT NULL,
-    completed_at timestamp with time zone
+    completed_at timestamp with time zone,
+    claimed_by text,
+    heartbeat_at timestamp with time zone
 );
 
 
@@ -876,31 +1527,48 @@ COMMENT ON TABLE dsa_jobs.analysis_runs IS 'The master job queue for all asynchr
 
 
 --
--- Name: datasets_summary; Type: MATERIALIZED VIEW; Schema: dsa_search; Owner: -
+-- Name: job_progress; Type: TABLE; Schema: dsa_jobs; Owner: -
+--
+
+CREATE TABLE dsa_jobs.job_progress (
+    job_id uuid NOT NULL,
+    user_id integer,
+    progress jsonb NOT NULL,
+    updated_at timestamp with time zone DEFAULT now() NOT NULL
+)
+WITH (fillfactor='50');
+
+
+--
+-- Name: TABLE job_progress; Type: COMMENT; Schema: dsa_jobs; Owner: -
+--
+
+COMMENT ON TABLE dsa_jobs.job_progress IS 'Latest progress of each job, kept apart from analysis_runs so frequent updates stay small HOT updates.';
+
+
+--
+-- Name: datasets_summary; Type: TABLE; Schema: dsa_search; Owner: -
+--
+
+CREATE TABLE dsa_search.datasets_summary (
+    dataset_id integer NOT NULL,
+    name character varying(255) NOT NULL,
+    description text,
+    created_by_id integer,
+    created_by_name character varying(20),
+    created_at timestamp with time zone,
+    updated_at timestamp with time zone,
+    tags character varying[] DEFAULT '{}'::character varying[] NOT NULL,
+    search_text text NOT NULL,
+    search_tsv tsvector NOT NULL
+);
+
+
+--
+-- Name: TABLE datasets_summary; Type: COMMENT; Schema: dsa_search; Owner: -
 --
 
-CREATE MATERIALIZED VIEW dsa_search.datasets_summary AS
- WITH dataset_tags_agg AS (
-         SELECT dt.dataset_id,
-            array_agg(t.tag_name ORDER BY t.tag_name) AS tags
-           FROM (dsa_core.dataset_tags dt
-             JOIN dsa_core.tags t ON ((dt.tag_id = t.id)))
-          GROUP BY dt.dataset_id
-        )
- SELECT d.id AS dataset_id,
-    d.name,
-    d.description,
-    d.created_by AS created_by_id,
-    u.soeid AS created_by_name,
-    d.created_at,
-    d.updated_at,
-    COALESCE(dta.tags, ('{}'::text[])::character varying[]) AS tags,
-    (((((d.name)::text || ' '::text) || COALESCE(d.description, ''::text)) || ' '::text) || array_to_string(COALESCE(dta.tags, '{}'::character varying[]), ' '::text)) AS search_text,
-    ((to_tsvector('english'::regconfig, (d.name)::text) || to_tsvector('english'::regconfig, COALESCE(d.description, ''::text))) || to_tsvector('english'::regconfig, array_to_string(COALESCE(dta.tags, '{}'::character varying[]), ' '::text))) AS search_tsv
-   FROM ((dsa_core.datasets d
-     LEFT JOIN dsa_auth.users u ON ((d.created_by = u.id)))
-     LEFT JOIN dataset_tags_agg dta ON ((d.id = dta.dataset_id)))
-  WITH NO DATA;
+COMMENT ON TABLE dsa_search.datasets_summary IS 'Search index maintained per dataset by dsa_search.refresh_datasets_summary().';
 
 
 --
@@ -995,6 +1663,48 @@ CREATE SEQUENCE dsa_staging.import_data_row_num_seq
 ALTER SEQUENCE dsa_staging.import_data_row_num_seq OWNED BY dsa_staging.import_data.row_num;
 
 
+--
+-- Name: import_row_keys; Type: TABLE; Schema: dsa_staging; Owner: -
+--
+
+CREATE UNLOGGED TABLE dsa_staging.import_row_keys (
+    commit_id character(64) NOT NULL,
+    table_key text NOT NULL,
+    row_key text NOT NULL,
+    row_hash character(64) NOT NULL,
+    line_number bigint NOT NULL
+);
+
+
+--
+-- Name: TABLE import_row_keys; Type: COMMENT; Schema: dsa_staging; Owner: -
+--
+
+COMMENT ON TABLE dsa_staging.import_row_keys IS 'Row keys and hashes written by imports, transformations and sampling, until seal_staged_table() applies them to the commit''s manifest chunks';
+
+
+--
+-- Name: preview_sessions; Type: TABLE; Schema: dsa_staging; Owner: -
+--
+
+CREATE UNLOGGED TABLE dsa_staging.preview_sessions (
+    session_token text NOT NULL,
+    user_id integer NOT NULL,
+    columns text[] NOT NULL,
+    row_count bigint NOT NULL,
+    truncated boolean DEFAULT false NOT NULL,
+    created_at timestamp with time zone DEFAULT now() NOT NULL,
+    last_accessed_at timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+--
+-- Name: TABLE preview_sessions; Type: COMMENT; Schema: dsa_staging; Owner: -
+--
+
+COMMENT ON TABLE dsa_staging.preview_sessions IS 'Workbench preview sessions; each spools its result into dsa_staging.preview_session_<token>';
+
+
 --
 -- Name: roles; Type: TABLE; Schema: public; Owner: -
 --
@@ -1123,6 +1833,14 @@ ALTER TABLE ONLY dsa_auth.users
     ADD CONSTRAINT users_soeid_key UNIQUE (soeid);
 
 
+--
+-- Name: commit_chunks commit_chunks_pkey; Type: CONSTRAINT; Schema: dsa_core; Owner: -
+--
+
+ALTER TABLE ONLY dsa_core.commit_chunks
+    ADD CONSTRAINT commit_chunks_pkey PRIMARY KEY (commit_id, table_key, chunk_index);
+
+
 --
 -- Name: commit_rows commit_rows_pkey; Type: CONSTRAINT; Schema: dsa_core; Owner: -
 --
@@ -1179,6 +1897,14 @@ ALTER TABLE ONLY dsa_core.datasets
     ADD CONSTRAINT datasets_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: manifest_chunks manifest_chunks_pkey; Type: CONSTRAINT; Schema: dsa_core; Owner: -
+--
+
+ALTER TABLE ONLY dsa_core.manifest_chunks
+    ADD CONSTRAINT manifest_chunks_pkey PRIMARY KEY (chunk_hash);
+
+
 --
 -- Name: refs refs_dataset_id_name_key; Type: CONSTRAINT; Schema: dsa_core; Owner: -
 --
@@ -1267,6 +1993,14 @@ ALTER TABLE ONLY dsa_jobs.analysis_runs
     ADD CONSTRAINT analysis_runs_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: job_progress job_progress_pkey; Type: CONSTRAINT; Schema: dsa_jobs; Owner: -
+--
+
+ALTER TABLE ONLY dsa_jobs.job_progress
+    ADD CONSTRAINT job_progress_pkey PRIMARY KEY (job_id);
+
+
 --
 -- Name: commit_manifest commit_manifest_pkey; Type: CONSTRAINT; Schema: dsa_staging; Owner: -
 --
@@ -1283,6 +2017,14 @@ ALTER TABLE ONLY dsa_staging.import_data
     ADD CONSTRAINT import_data_pkey PRIMARY KEY (row_num);
 
 
+--
+-- Name: preview_sessions preview_sessions_pkey; Type: CONSTRAINT; Schema: dsa_staging; Owner: -
+--
+
+ALTER TABLE ONLY dsa_staging.preview_sessions
+    ADD CONSTRAINT preview_sessions_pkey PRIMARY KEY (session_token);
+
+
 --
 -- Name: roles roles_name_key; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -1341,6 +2083,20 @@ CREATE INDEX idx_dataset_permissions_dataset_id ON dsa_auth.dataset_permissions
 CREATE INDEX idx_dataset_permissions_user_id ON dsa_auth.dataset_permissions USING btree (user_id);
 
 
+--
+-- Name: idx_commit_chunks_offset; Type: INDEX; Schema: dsa_core; Owner: -
+--
+
+CREATE INDEX idx_commit_chunks_offset ON dsa_core.commit_chunks USING btree (commit_id, table_key, row_offset);
+
+
+--
+-- Name: idx_commit_chunks_shared; Type: INDEX; Schema: dsa_core; Owner: -
+--
+
+CREATE INDEX idx_commit_chunks_shared ON dsa_core.commit_chunks USING btree (commit_id, table_key, chunk_hash);
+
+
 --
 -- Name: idx_commit_rows_row_hash; Type: INDEX; Schema: dsa_core; Owner: -
 --
@@ -1425,6 +2181,34 @@ CREATE INDEX idx_analysis_runs_dataset_id ON dsa_jobs.analysis_runs USING btree
 CREATE INDEX idx_analysis_runs_pending_jobs ON dsa_jobs.analysis_runs USING btree (status, run_type) WHERE (status = 'pending'::dsa_jobs.analysis_run_status);
 
 
+--
+-- Name: idx_analysis_runs_pending_created; Type: INDEX; Schema: dsa_jobs; Owner: -
+--
+
+CREATE INDEX idx_analysis_runs_pending_created ON dsa_jobs.analysis_runs USING btree (status, created_at) WHERE (status = 'pending'::dsa_jobs.analysis_run_status);
+
+
+--
+-- Name: idx_analysis_runs_running_heartbeat; Type: INDEX; Schema: dsa_jobs; Owner: -
+--
+
+CREATE INDEX idx_analysis_runs_running_heartbeat ON dsa_jobs.analysis_runs USING btree (heartbeat_at) WHERE (status = 'running'::dsa_jobs.analysis_run_status);
+
+
+--
+-- Name: idx_analysis_runs_running_dataset; Type: INDEX; Schema: dsa_jobs; Owner: -
+--
+
+CREATE INDEX idx_analysis_runs_running_dataset ON dsa_jobs.analysis_runs USING btree (dataset_id) WHERE (status = 'running'::dsa_jobs.analysis_run_status);
+
+
+--
+-- Name: idx_analysis_runs_running_user; Type: INDEX; Schema: dsa_jobs; Owner: -
+--
+
+CREATE INDEX idx_analysis_runs_running_user ON dsa_jobs.analysis_runs USING btree (user_id) WHERE (status = 'running'::dsa_jobs.analysis_run_status);
+
+
 --
 -- Name: idx_datasets_summary_created_at; Type: INDEX; Schema: dsa_search; Owner: -
 --
@@ -1495,6 +2279,13 @@ CREATE INDEX idx_datasets_summary_updated_at ON dsa_search.datasets_summary USIN
 CREATE INDEX idx_import_row_num ON dsa_staging.import_data USING btree (row_num);
 
 
+--
+-- Name: idx_import_row_keys_commit_table; Type: INDEX; Schema: dsa_staging; Owner: -
+--
+
+CREATE INDEX idx_import_row_keys_commit_table ON dsa_staging.import_row_keys USING btree (commit_id, table_key);
+
+
 --
 -- Name: idx_manifest_hash; Type: INDEX; Schema: dsa_staging; Owner: -
 --
@@ -1502,6 +2293,13 @@ CREATE INDEX idx_import_row_num ON dsa_staging.import_data USING btree (row_num)
 CREATE INDEX idx_manifest_hash ON dsa_staging.commit_manifest USING btree (row_hash);
 
 
+--
+-- Name: idx_preview_sessions_user_id; Type: INDEX; Schema: dsa_staging; Owner: -
+--
+
+CREATE INDEX idx_preview_sessions_user_id ON dsa_staging.preview_sessions USING btree (user_id);
+
+
 --
 -- Name: dataset_permissions dataset_permissions_dataset_id_fkey; Type: FK CONSTRAINT; Schema: dsa_auth; Owner: -
 --
@@ -1526,6 +2324,22 @@ ALTER TABLE ONLY dsa_auth.users
     ADD CONSTRAINT users_role_id_fkey FOREIGN KEY (role_id) REFERENCES dsa_auth.roles(id);
 
 
+--
+-- Name: commit_chunks commit_chunks_chunk_hash_fkey; Type: FK CONSTRAINT; Schema: dsa_core; Owner: -
+--
+
+ALTER TABLE ONLY dsa_core.commit_chunks
+    ADD CONSTRAINT commit_chunks_chunk_hash_fkey FOREIGN KEY (chunk_hash) REFERENCES dsa_core.manifest_chunks(chunk_hash);
+
+
+--
+-- Name: commit_chunks commit_chunks_commit_id_fkey; Type: FK CONSTRAINT; Schema: dsa_core; Owner: -
+--
+
+ALTER TABLE ONLY dsa_core.commit_chunks
+    ADD CONSTRAINT commit_chunks_commit_id_fkey FOREIGN KEY (commit_id) REFERENCES dsa_core.commits(commit_id) ON DELETE CASCADE;
+
+
 --
 -- Name: commit_rows commit_rows_commit_id_fkey; Type: FK CONSTRAINT; Schema: dsa_core; Owner: -
 --
@@ -1654,6 +2468,14 @@ ALTER TABLE ONLY dsa_jobs.analysis_runs
     ADD CONSTRAINT analysis_runs_user_id_fkey FOREIGN KEY (user_id) REFERENCES dsa_auth.users(id) ON DELETE SET NULL;
 
 
+--
+-- Name: job_progress job_progress_job_id_fkey; Type: FK CONSTRAINT; Schema: dsa_jobs; Owner: -
+--
+
+ALTER TABLE ONLY dsa_jobs.job_progress
+    ADD CONSTRAINT job_progress_job_id_fkey FOREIGN KEY (job_id) REFERENCES dsa_jobs.analysis_runs(id) ON DELETE CASCADE;
+
+
 --
 -- PostgreSQL database dump complete
 --
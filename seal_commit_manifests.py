@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Seal the flat manifests of existing commits into manifest chunks.
+
+Commits written before manifests were chunked keep their entries in
+dsa_core.commit_rows. They stay readable as they are and are sealed lazily
+when a new commit derives from them; this backfill seals all of them at
+once, one commit per transaction, so it can be stopped and re-run at any
+time. Run it against a database that already has the chunk tables and
+functions of schema.sql.
+"""
+
+import psycopg2
+import sys
+
+# Database connection parameters
+DB_PARAMS = {
+    'host': 'localhost',
+    'user': 'postgres',
+    'password': 'postgres',
+    'database': 'postgres'
+}
+
+def seal_commit_manifests():
+    """Seal every commit that still has entries in commit_rows"""
+
+    conn = None
+    cursor = None
+
+    try:
+        # Connect to database
+        conn = psycopg2.connect(**DB_PARAMS)
+        cursor = conn.cursor()
+
+        print("Connected to database")
+
+        cursor.execute("SELECT DISTINCT commit_id FROM dsa_core.commit_rows ORDER BY commit_id;")
+        commit_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        print(f"Found {len(commit_ids)} commit(s) with a flat manifest")
+
+        for index, commit_id in enumerate(commit_ids, 1):
+            cursor.execute("SELECT dsa_core.seal_commit_manifest(%s);", (commit_id,))
+            chunks_written = cursor.fetchone()[0]
+            conn.commit()
+            print(f"  [{index}/{len(commit_ids)}] {commit_id.strip()}: {chunks_written} chunk(s) written")
+
+        # The moved entries leave dead tuples behind
+        print("\nVacuuming commit_rows...")
+        conn.autocommit = True
+        cursor.execute("VACUUM (ANALYZE) dsa_core.commit_rows;")
+
+        return True
+
+    except Exception as e:
+        print(f"ERROR: {e}")
+        if conn and not conn.autocommit:
+            conn.rollback()
+        return False
+
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    print("=== Commit Manifest Backfill ===")
+
+    if seal_commit_manifests():
+        print("\nAll commit manifests sealed successfully!")
+    else:
+        print("\nCommit manifest backfill failed!")
+        sys.exit(1)
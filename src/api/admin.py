@@ -0,0 +1,67 @@
+"""Administrative diagnostics endpoints."""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Query, status
+
+from ..api.models import CurrentUser
+from ..core.authorization import require_admin_role
+from ..core.domain_exceptions import resource_not_found
+from ..infrastructure.postgres.query_profiler import get_query_profiler
+from ..features.sql_workbench.services.preview_cache import get_preview_cache
+from ..features.sql_workbench.services.admission import get_admission_controller
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(20, ge=1, le=500, description="Number of queries to return"),
+    include_plans: bool = Query(False, description="Include captured EXPLAIN plans"),
+    _: CurrentUser = Depends(require_admin_role)
+) -> Dict[str, Any]:
+    """Slowest queries by total time, as captured by the slow-query profiler."""
+    profiler = get_query_profiler()
+    return {
+        "enabled": profiler.enabled,
+        "threshold_ms": profiler.threshold_seconds * 1000,
+        "queries": profiler.top(limit, include_plans)
+    }
+
+
+@router.get("/slow-queries/{fingerprint}")
+async def get_slow_query(
+    fingerprint: str,
+    _: CurrentUser = Depends(require_admin_role)
+) -> Dict[str, Any]:
+    """A single slow query with its latest EXPLAIN plan."""
+    entry = get_query_profiler().get(fingerprint)
+    if entry is None:
+        raise resource_not_found("SlowQuery", fingerprint)
+    return entry
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries(
+    _: CurrentUser = Depends(require_admin_role)
+) -> None:
+    """Clear the collected slow queries."""
+    get_query_profiler().reset()
+
+
+@router.get("/preview-cache")
+async def preview_cache_stats(
+    _: CurrentUser = Depends(require_admin_role)
+) -> Dict[str, Any]:
+    """Size and hit ratio of the workbench preview cache."""
+    cache = get_preview_cache()
+    return {"enabled": cache is not None, **(cache.stats() if cache else {})}
+
+
+@router.get("/workbench-admission")
+async def workbench_admission_stats(
+    _: CurrentUser = Depends(require_admin_role)
+) -> Dict[str, Any]:
+    """Workbench queries running now against the concurrency limits and cost budget."""
+    return get_admission_controller().stats()
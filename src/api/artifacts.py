@@ -0,0 +1,97 @@
+"""HTTP responses for job artifacts: ETag, byte ranges and zstd passthrough."""
+
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from ..infrastructure.external.artifact_store import ArtifactStore, get_artifact_store
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into inclusive (start, end).
+
+    Returns None when the header should be ignored (other units or several
+    ranges) and raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError(header)
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(header)
+
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def _accepts_zstd(request: Request) -> bool:
+    for part in request.headers.get('accept-encoding', '').split(','):
+        token, *params = [p.strip() for p in part.split(';')]
+        if token.lower() == 'zstd':
+            return not any(p.replace(' ', '') in ('q=0', 'q=0.0') for p in params)
+    return False
+
+
+def artifact_response(ref: Dict[str, Any], request: Request, filename: Optional[str] = None) -> Response:
+    """
+    Stream an artifact to the client.
+
+    The content digest is the ETag, so a matching If-None-Match gets a 304.
+    A single byte range gets a 206 of the decompressed content. Otherwise
+    clients that accept zstd get the stored bytes as-is, and others get the
+    content decompressed as it streams.
+    """
+    store = get_artifact_store()
+    etag = f'"{ref["digest"]}"'
+    size = ref['size']
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, max-age=0, must-revalidate'
+    }
+    if filename:
+        headers['Content-Disposition'] = f'inline; filename="{filename}"'
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{size}'})
+        if byte_range is not None:
+            start, end = byte_range
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            headers['Content-Length'] = str(end - start + 1)
+            return StreamingResponse(
+                store.stream(ref, start, end),
+                status_code=206,
+                media_type=ref['content_type'],
+                headers=headers
+            )
+
+    headers['Vary'] = 'Accept-Encoding'
+    if ref.get('encoding') == ArtifactStore.ENCODING and _accepts_zstd(request):
+        headers['Content-Encoding'] = ArtifactStore.ENCODING
+        headers['Content-Length'] = str(ref['stored_size'])
+        return StreamingResponse(store.stream_compressed(ref), media_type=ref['content_type'], headers=headers)
+
+    headers['Content-Length'] = str(size)
+    return StreamingResponse(store.stream(ref), media_type=ref['content_type'], headers=headers)
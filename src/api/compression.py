@@ -0,0 +1,180 @@
+"""Streaming response compression with zstd, brotli or gzip."""
+
+import zlib
+from typing import Callable, Dict, Optional
+
+import brotli
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..infrastructure.config import get_settings
+
+
+# Content types that must reach the client unbuffered and uncompressed
+_EXCLUDED_MEDIA_TYPES = ("text/event-stream",)
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best encoding the client accepts.
+
+    zstd is preferred over brotli and brotli over gzip. Bodies are compressed
+    as they are sent, with each chunk flushed, so streamed responses (ndjson,
+    Arrow, file downloads) stay streamed. Single-chunk bodies below
+    `minimum_size` and responses that already carry a Content-Encoding are
+    passed through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        zstd_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+        gzip_level: Optional[int] = None
+    ):
+        settings = get_settings()
+        zstd_level = zstd_level if zstd_level is not None else settings.compression_zstd_level
+        brotli_quality = brotli_quality if brotli_quality is not None else settings.compression_brotli_quality
+        gzip_level = gzip_level if gzip_level is not None else settings.compression_gzip_level
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.compression_minimum_size
+        self._factories: Dict[str, Callable[[], object]] = {
+            'zstd': lambda: _ZstdCompressor(zstd_level),
+            'br': lambda: _BrotliCompressor(brotli_quality),
+            'gzip': lambda: _GzipCompressor(gzip_level),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        sender = _CompressingSender(send, encoding, self._factories[encoding], self.minimum_size)
+        await self.app(scope, receive, sender)
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred supported encoding with a non-zero quality."""
+        qualities: Dict[str, float] = {}
+        for part in accept_encoding.split(','):
+            token, *params = [p.strip() for p in part.split(';')]
+            if not token:
+                continue
+            q = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip() == 'q':
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            qualities[token.lower()] = q
+
+        for encoding in self._factories:
+            if qualities.get(encoding, qualities.get('*', 0.0)) > 0:
+                return encoding
+        return None
+
+
+class _CompressingSender:
+    """ASGI send wrapper that compresses the response body."""
+
+    def __init__(self, send: Send, encoding: str, factory: Callable[[], object], minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._factory = factory
+        self._minimum_size = minimum_size
+        self._start_message: Optional[Message] = None
+        self._compressor = None
+        self._passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            # Held back until the first body chunk decides whether to compress
+            self._start_message = message
+            return
+
+        if message['type'] != 'http.response.body':
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self._start_message is not None:
+            start, self._start_message = self._start_message, None
+            headers = MutableHeaders(raw=start['headers'])
+            media_type = headers.get('content-type', '').split(';')[0].strip()
+            # Range responses stay as they are: their byte offsets refer to the
+            # uncompressed representation
+            if (
+                'content-encoding' in headers
+                or start['status'] == 206
+                or 'content-range' in headers
+                or media_type in _EXCLUDED_MEDIA_TYPES
+                or (not more_body and len(body) < self._minimum_size)
+            ):
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self._compressor = self._factory()
+            headers['Content-Encoding'] = self._encoding
+            headers.add_vary_header('Accept-Encoding')
+            if not more_body:
+                body = self._compressor.finish(body)
+                headers['Content-Length'] = str(len(body))
+                await self._send(start)
+                await self._send({'type': 'http.response.body', 'body': body})
+                return
+
+            if 'content-length' in headers:
+                del headers['Content-Length']
+            await self._send(start)
+
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        chunk = self._compressor.compress(body) if more_body else self._compressor.finish(body)
+        await self._send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
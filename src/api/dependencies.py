@@ -1,7 +1,7 @@
 """Dependency injection configuration for the FastAPI application."""
 
 from typing import AsyncGenerator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
 from ..infrastructure.postgres.database import DatabasePool
@@ -14,6 +14,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
 # Global instances (these would be initialized in main.py)
 _db_pool: Optional[DatabasePool] = None
+_preview_pool: Optional[DatabasePool] = None
 _event_bus: Optional[EventBus] = None
 
 
@@ -23,6 +24,12 @@ def set_database_pool(pool: DatabasePool) -> None:
     _db_pool = pool
 
 
+def set_preview_pool(pool: Optional[DatabasePool]) -> None:
+    """Set the pool dedicated to workbench preview queries."""
+    global _preview_pool
+    _preview_pool = pool
+
+
 
 def set_event_bus(event_bus: EventBus) -> None:
     """Set the global event bus instance."""
@@ -37,10 +44,27 @@ async def get_db_pool() -> DatabasePool:
     return _db_pool
 
 
-async def get_uow() -> AsyncGenerator[PostgresUnitOfWork, None]:
-    """Get unit of work dependency."""
+async def get_preview_pool() -> DatabasePool:
+    """Get the workbench preview pool, or the main pool when none is configured."""
+    if _preview_pool is not None:
+        return _preview_pool
+    return await get_db_pool()
+
+
+# Methods whose requests get a read-only unit of work
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+async def get_uow(request: Request) -> AsyncGenerator[PostgresUnitOfWork, None]:
+    """Get the request-scoped unit of work.
+    
+    FastAPI caches dependencies per request, so authentication, permission
+    checks and the endpoint share this unit of work and its connection. The
+    connection is only acquired on the first query, and reads (GET/HEAD)
+    share one read-only snapshot.
+    """
     pool = await get_db_pool()
-    uow = PostgresUnitOfWork(pool)
+    uow = PostgresUnitOfWork(pool, read_only=request.method in READ_ONLY_METHODS)
     async with uow:
         yield uow
 
@@ -59,8 +83,7 @@ async def get_event_bus() -> Optional[EventBus]:
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    uow: PostgresUnitOfWork = Depends(get_uow)
+    token: str = Depends(oauth2_scheme)
 ) -> dict:
     """
     Get current authenticated user from JWT token.
@@ -89,6 +112,8 @@ async def get_current_user(
         return {
             "sub": user_data.get("soeid"),
             "soeid": user_data.get("soeid"),
+            "user_id": user_data.get("user_id"),
+            "issued_at": user_data.get("issued_at"),
             "role_id": 1,  # Force admin role for dev
             "role_name": "admin"  # Force admin role for dev
         }
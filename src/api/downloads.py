@@ -21,6 +21,7 @@ from ..core.authorization import get_current_user_info, require_dataset_read
 from .dependencies import get_uow
 from ..infrastructure.postgres.uow import PostgresUnitOfWork
 from ..core.domain_exceptions import EntityNotFoundException
+from ..infrastructure.metrics import timed_stream
 
 logger = logging.getLogger(__name__)
 
@@ -28,13 +29,32 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/datasets", tags=["downloads"])
 
 
+# Rows of one table in key order. Sealed tables are read chunk by chunk in
+# chunk order, so no sort over the whole table is needed; tables still staged
+# in commit_rows are ordered by key.
+_TABLE_ROWS_QUERY = """
+    SELECT r.data, m.logical_row_id
+    FROM (
+        SELECT cc.chunk_index, e.ord, cc.table_key || ':' || e.row_key AS logical_row_id, e.row_hash
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) WITH ORDINALITY AS e(row_key, row_hash, ord)
+        WHERE cc.commit_id = $1 AND cc.table_key = $2
+        UNION ALL
+        SELECT -1, row_number() OVER (ORDER BY cr.logical_row_id COLLATE "C"), cr.logical_row_id, cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2 || ':%'
+    ) m
+    JOIN dsa_core.rows r ON r.row_hash = m.row_hash
+    ORDER BY m.chunk_index, m.ord
+"""
+
+
 async def _get_table_keys_for_commit(conn, commit_id: str) -> List[str]:
     """Get all unique table keys for a commit."""
     query = """
-        SELECT DISTINCT 
-            SPLIT_PART(logical_row_id, ':', 1) as table_key
-        FROM dsa_core.commit_rows
-        WHERE commit_id = $1
+        SELECT table_key
+        FROM dsa_core.commit_table_keys($1) AS table_key
         ORDER BY table_key
     """
     
@@ -135,19 +155,12 @@ async def _stream_csv_direct_copy(
     """
     # Simplified, index-friendly query
     if table_key:
-        query = """
-            SELECT r.data, cr.logical_row_id
-            FROM dsa_core.commit_rows cr
-            JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 
-            AND cr.logical_row_id LIKE $2
-            ORDER BY cr.logical_row_id
-        """
-        params = [commit_id, f"{table_key}_%"]
+        query = _TABLE_ROWS_QUERY
+        params = [commit_id, table_key]
     else:
         query = """
             SELECT r.data, cr.logical_row_id
-            FROM dsa_core.commit_rows cr
+            FROM dsa_core.commit_manifest cr
             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
             WHERE cr.commit_id = $1
             ORDER BY cr.logical_row_id
@@ -219,19 +232,12 @@ async def _stream_parquet_data(
     """
     # Query for data
     if table_key:
-        query = """
-            SELECT r.data, cr.logical_row_id
-            FROM dsa_core.commit_rows cr
-            JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 
-            AND cr.logical_row_id LIKE $2
-            ORDER BY cr.logical_row_id
-        """
-        params = [commit_id, f"{table_key}_%"]
+        query = _TABLE_ROWS_QUERY
+        params = [commit_id, table_key]
     else:
         query = """
             SELECT r.data, cr.logical_row_id
-            FROM dsa_core.commit_rows cr
+            FROM dsa_core.commit_manifest cr
             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
             WHERE cr.commit_id = $1
             ORDER BY cr.logical_row_id
@@ -312,15 +318,8 @@ async def _generate_excel_data(
             ws = wb.create_sheet(title=sheet_name)
             
             # Query for data
-            query = """
-                SELECT r.data, cr.logical_row_id
-                FROM dsa_core.commit_rows cr
-                JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                WHERE cr.commit_id = $1 
-                AND cr.logical_row_id LIKE $2
-                ORDER BY cr.logical_row_id
-            """
-            params = [commit_id, f"{table_key}_%"]
+            query = _TABLE_ROWS_QUERY
+            params = [commit_id, table_key]
             
             # Get headers from schema
             headers = await _get_schema_headers(conn, commit_id, table_key)
@@ -384,7 +383,7 @@ async def _create_streaming_download_response(
             filename = f"{dataset['name']}_{table_key}.parquet"
         
         return StreamingResponse(
-            generate_parquet_stream(),
+            timed_stream(generate_parquet_stream(), "parquet"),
             media_type="application/octet-stream",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
@@ -401,7 +400,7 @@ async def _create_streaming_download_response(
             filename = f"{dataset['name']}_{table_key}.csv"
         
         return StreamingResponse(
-            generate_csv_stream(),
+            timed_stream(generate_csv_stream(), "csv"),
             media_type="text/csv",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
@@ -472,7 +471,7 @@ async def _create_streaming_zip_response(
     filename = f"{dataset['name']}.zip"
     
     return StreamingResponse(
-        generate_zip_stream(),
+        timed_stream(generate_zip_stream(), "zip-parquet" if format == "parquet" else "zip"),
         media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
@@ -549,7 +548,7 @@ async def download_dataset(
         
         filename = f"{dataset['name']}.xlsx"
         return StreamingResponse(
-            generate_excel_stream(),
+            timed_stream(generate_excel_stream(), "excel"),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": f'attachment; filename="{filename}"'}
         )
@@ -0,0 +1,206 @@
+"""Response encoding for large data payloads."""
+
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import orjson
+import pyarrow as pa
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Accept media types for each row format, in server preference order
+_FORMAT_MEDIA_TYPES = {
+    JSON_MEDIA_TYPE: "json",
+    NDJSON_MEDIA_TYPE: "ndjson",
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+}
+
+# Rows per body chunk when streaming ndjson
+_NDJSON_CHUNK_ROWS = 1000
+
+
+def _orjson_default(value: Any) -> Any:
+    """Serialize the values orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as JSON bytes."""
+    if isinstance(content, BaseModel):
+        content = content.model_dump()
+    return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; accepts pydantic models as content."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawRows:
+    """
+    Rows of one table whose data is still the JSON text read from the database.
+
+    Services put this in place of a list of DataRow models when the stored
+    row payloads can be returned unchanged. It encodes to the same JSON as
+    the DataRow list would, splicing each payload into the output without
+    parsing it or building a model per row.
+    """
+
+    __slots__ = ('sheet_name', 'records')
+
+    def __init__(self, sheet_name: str, records: Sequence[Any]):
+        self.sheet_name = sheet_name
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def iter_encoded(self) -> Iterator[bytes]:
+        """Yield each row encoded as a DataRow JSON object."""
+        prefix = b'{"sheet_name":' + orjson.dumps(self.sheet_name) + b',"logical_row_id":'
+        for record in self.records:
+            data = record['data']
+            payload = data.encode('utf-8') if isinstance(data, str) else orjson.dumps(data)
+            yield prefix + orjson.dumps(record['logical_row_id']) + b',"data":' + payload + b'}'
+
+    def encode(self) -> bytes:
+        """Encode the rows as a JSON array of DataRow objects."""
+        return b'[' + b','.join(self.iter_encoded()) + b']'
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Parse the rows into flat dicts keyed by column, plus _logical_row_id."""
+        result = []
+        for record in self.records:
+            data = record['data']
+            if isinstance(data, str):
+                data = orjson.loads(data)
+            result.append({'_logical_row_id': record['logical_row_id'], **data})
+        return result
+
+
+Rows = Union[RawRows, Sequence[Any]]
+
+
+def encode_data_page(page: BaseModel) -> bytes:
+    """Encode a data response model whose `rows` hold RawRows."""
+    head = dumps(page.model_dump(exclude={'rows'}))
+    separator = b',' if len(head) > 2 else b''
+    return head[:-1] + separator + b'"rows":' + page.rows.encode() + b'}'
+
+
+class DataPageResponse(Response):
+    """JSON response for a data page carrying RawRows."""
+
+    media_type = JSON_MEDIA_TYPE
+
+    def render(self, content: BaseModel) -> bytes:
+        return encode_data_page(content)
+
+
+# ========== Content Negotiation ==========
+
+def negotiate_format(request: Optional[Request]) -> str:
+    """
+    Pick the row format ('json', 'ndjson' or 'arrow') from the Accept header.
+
+    The highest quality supported media type wins; ties go to the order in
+    the header. Anything else, including a missing header, gets JSON.
+    """
+    accept = request.headers.get('accept', '') if request is not None else ''
+    best, best_q = "json", 0.0
+    for part in accept.split(','):
+        media_type, *params = [p.strip() for p in part.split(';')]
+        fmt = _FORMAT_MEDIA_TYPES.get(media_type.lower())
+        if fmt is None:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def _encode_ndjson(rows: Rows) -> Iterator[bytes]:
+    """Yield ndjson body chunks, one row per line."""
+    lines = rows.iter_encoded() if isinstance(rows, RawRows) else (dumps(row) for row in rows)
+    chunk: List[bytes] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= _NDJSON_CHUNK_ROWS:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+def _flat_rows(rows: Rows) -> List[Dict[str, Any]]:
+    """Rows as flat dicts; DataRow objects become their data plus _logical_row_id."""
+    if isinstance(rows, RawRows):
+        return rows.to_dicts()
+    result = []
+    for row in rows:
+        if isinstance(row, BaseModel) and hasattr(row, 'logical_row_id'):
+            result.append({'_logical_row_id': row.logical_row_id, **row.data})
+        elif isinstance(row, BaseModel):
+            result.append(row.model_dump())
+        else:
+            result.append(row)
+    return result
+
+
+def encode_arrow(rows: Rows) -> bytes:
+    """Encode rows as an Arrow IPC stream."""
+    flat = _flat_rows(rows)
+    try:
+        table = pa.Table.from_pylist(flat)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columns with mixed value types are sent as strings
+        flat = [{k: None if v is None else str(v) for k, v in row.items()} for row in flat]
+        table = pa.Table.from_pylist(flat)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def rows_response(rows: Rows, fmt: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Return rows alone as ndjson or Arrow; page metadata goes in the headers."""
+    if fmt == "ndjson":
+        return StreamingResponse(_encode_ndjson(rows), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return Response(encode_arrow(rows), media_type=ARROW_STREAM_MEDIA_TYPE, headers=headers)
+
+
+def data_page_response(page: BaseModel, request: Optional[Request] = None) -> Response:
+    """Encode a GetDataResponse page in the format the client asked for."""
+    fmt = negotiate_format(request)
+    if fmt == "json":
+        if isinstance(page.rows, RawRows):
+            return DataPageResponse(page)
+        return ORJSONResponse(page)
+
+    headers = {
+        'X-Total-Rows': str(page.total_rows),
+        'X-Has-More': 'true' if page.has_more else 'false'
+    }
+    if page.next_cursor:
+        headers['X-Next-Cursor'] = page.next_cursor
+    return rows_response(page.rows, fmt, headers)
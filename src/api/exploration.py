@@ -2,7 +2,7 @@
 
 import json
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Depends, Query, Path, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from pydantic import BaseModel, Field
 from uuid import UUID
@@ -14,6 +14,7 @@ from ..core.authorization import get_current_user_info, require_dataset_read
 from ..core.domain_exceptions import resource_not_found
 from ..core.domain_exceptions import ValidationException, BusinessRuleViolation
 from ..api.models import CurrentUser
+from .artifacts import artifact_response
 from .dependencies import get_db_pool, get_uow
 
 
@@ -204,6 +205,7 @@ async def get_user_exploration_history(
 
 @router.get("/jobs/{job_id}/result")
 async def get_exploration_result(
+    http_request: Request,
     job_id: UUID = Path(..., description="Job ID"),
     format: str = Query("html", description="Output format (html, json, info)"),
     current_user: CurrentUser = Depends(get_current_user_info),
@@ -220,6 +222,9 @@ async def get_exploration_result(
         format=format
     )
     
+    if "artifact" in result:
+        return artifact_response(result["artifact"], http_request)
+    
     # Return appropriate response based on format
     if format == "html":
         return HTMLResponse(content=result["content"])
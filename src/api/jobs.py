@@ -1,20 +1,56 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from uuid import UUID
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
+import asyncio
+import json
 
 from src.api.models import (
     JobListResponse, JobDetailResponse, JobSummary, JobDetail
 )
 from src.features.jobs.services import JobService
+from src.features.jobs.services.progress import (
+    TERMINAL_STATUSES, get_active_job_snapshots, get_job_progress_listener, get_job_snapshot
+)
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.database import DatabasePool
 from src.core.authorization import get_current_user_info
 from src.core.domain_exceptions import resource_not_found
-from src.api.dependencies import get_uow, get_permission_service
+from src.api.dependencies import get_uow, get_db_pool, get_permission_service
 from src.infrastructure.postgres.uow import PostgresUnitOfWork
 from src.api.models import CurrentUser
+from src.api.artifacts import artifact_response
 
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+# Keep proxies from buffering the stream
+_EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: Dict[str, Any]) -> bytes:
+    """A job event as a Server-Sent Event, named for what it carries."""
+    name = "status" if "status" in event else "progress"
+    return f"event: {name}\ndata: {json.dumps(event, default=str)}\n\n".encode()
+
+
+async def _job_events(
+    request: Request,
+    queue: asyncio.Queue,
+    until_finished: bool
+) -> AsyncIterator[bytes]:
+    """Stream events from a subscription, with keepalive comments while it is quiet."""
+    keepalive = get_settings().job_progress_stream_keepalive_seconds
+    while not await request.is_disconnected():
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+        except asyncio.TimeoutError:
+            yield b": keepalive\n\n"
+            continue
+        yield _sse(event)
+        if until_finished and event.get("status") in TERMINAL_STATUSES:
+            return
+
 
 @router.get("", response_model=JobListResponse)
 async def get_jobs(
@@ -79,6 +115,34 @@ async def get_jobs(
     )
 
 
+@router.get("/progress/stream")
+async def stream_my_job_progress(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user_info),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    db_pool: DatabasePool = Depends(get_db_pool)
+) -> StreamingResponse:
+    """Server-Sent Events with the progress and status changes of all the current user's jobs
+    
+    Opens with a status event for each pending or running job, then streams
+    events as they happen until the client disconnects.
+    """
+    # The stream outlives the request's unit of work; don't hold its connection
+    await uow.release()
+    
+    async def generate() -> AsyncIterator[bytes]:
+        # Subscribe before reading the snapshot so no event falls in between
+        async with get_job_progress_listener().subscribe(user_id=current_user.user_id) as queue:
+            async with db_pool.acquire() as conn:
+                snapshots = await get_active_job_snapshots(conn, current_user.user_id)
+            for snapshot in snapshots:
+                yield _sse(snapshot)
+            async for chunk in _job_events(request, queue, until_finished=False):
+                yield chunk
+    
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=_EVENT_STREAM_HEADERS)
+
+
 @router.get("/{job_id}", response_model=JobDetail)
 async def get_job_by_id(
     job_id: UUID,
@@ -114,4 +178,75 @@ async def get_job_by_id(
         created_at=job["created_at"],
         updated_at=job.get("updated_at", job["created_at"]),  # Use created_at if updated_at not available
         completed_at=job["completed_at"]
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/{job_id}/artifacts/{name}")
+async def get_job_artifact(
+    job_id: UUID,
+    name: str,
+    http_request: Request,
+    current_user: CurrentUser = Depends(get_current_user_info),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    permission_service = Depends(get_permission_service)
+):
+    """Download a stored job artifact; supports ETag revalidation and byte ranges"""
+    service = JobService(uow, permissions=permission_service)
+    
+    job = await service.get_job_by_id(
+        job_id=job_id,
+        current_user_id=current_user.user_id
+    )
+    
+    if not job:
+        raise resource_not_found("Job", job_id)
+    
+    artifacts = (job["output_summary"] or {}).get("artifacts", {})
+    if name not in artifacts:
+        raise resource_not_found("Artifact", name)
+    
+    return artifact_response(artifacts[name], http_request, filename=name)
+
+
+@router.get("/{job_id}/progress/stream")
+async def stream_job_progress(
+    job_id: UUID,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user_info),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    db_pool: DatabasePool = Depends(get_db_pool),
+    permission_service = Depends(get_permission_service)
+) -> StreamingResponse:
+    """Server-Sent Events with a job's progress and status changes
+    
+    Opens with the job's current status and progress, and ends after the
+    event announcing that the job finished. Progress events are coalesced
+    to job_progress_max_updates_per_second.
+    """
+    service = JobService(uow, permissions=permission_service)
+    
+    job = await service.get_job_by_id(
+        job_id=job_id,
+        current_user_id=current_user.user_id
+    )
+    
+    if not job:
+        raise resource_not_found("Job", job_id)
+    
+    # The stream outlives the request's unit of work; don't hold its connection
+    await uow.release()
+    
+    async def generate() -> AsyncIterator[bytes]:
+        # Subscribe before reading the snapshot so no event falls in between
+        async with get_job_progress_listener().subscribe(job_id=str(job_id)) as queue:
+            async with db_pool.acquire() as conn:
+                snapshot = await get_job_snapshot(conn, str(job_id))
+            if snapshot is None:
+                return
+            yield _sse(snapshot)
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+            async for chunk in _job_events(request, queue, until_finished=True):
+                yield chunk
+    
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=_EVENT_STREAM_HEADERS)
@@ -55,6 +55,7 @@ from .responses import (
     CheckoutResponse,
     CreateBranchResponse,
     ListRefsResponse,
+    CommitDiffResponse,
     
     # Data access responses
     GetDataResponse,
@@ -100,6 +101,8 @@ from .common import (
     TableInfo,
     RefWithTables,
     SearchResult,
+    TableDiffSummary,
+    RowChange,
 )
 
 __all__ = [
@@ -138,6 +141,7 @@ __all__ = [
     "CheckoutResponse",
     "CreateBranchResponse",
     "ListRefsResponse",
+    "CommitDiffResponse",
     "GetDataResponse",
     "GetSchemaResponse",
     "CommitSchemaResponse",
@@ -168,4 +172,6 @@ __all__ = [
     "TableInfo",
     "RefWithTables",
     "SearchResult",
+    "TableDiffSummary",
+    "RowChange",
 ]
\ No newline at end of file
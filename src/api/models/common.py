@@ -177,6 +177,30 @@ class TableInfo(BaseModel):
     commit_id: str
 
 
+class TableDiffSummary(BaseModel):
+    """Per-table change counts between two commits."""
+    table_key: str
+    added: int = 0
+    removed: int = 0
+    modified: int = 0
+    unchanged: int = 0
+    # column name -> number of modified rows where that column changed
+    column_changes: Optional[Dict[str, int]] = None
+
+
+class RowChange(BaseModel):
+    """A single row difference between two commits."""
+    table_key: str
+    logical_row_id: str
+    change: str  # added, removed or modified
+    old_hash: Optional[str] = None
+    new_hash: Optional[str] = None
+    # Cell-level detail, only when requested
+    old_data: Optional[Dict[str, Any]] = None
+    new_data: Optional[Dict[str, Any]] = None
+    changed_columns: Optional[List[str]] = None
+
+
 class RefWithTables(BaseModel):
     """Reference with associated tables."""
     ref_name: str
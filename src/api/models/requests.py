@@ -168,6 +168,14 @@ class DataQueryRequest(BaseModel):
     format: Literal["nested", "flat"] = Field("nested", description="Response format")
 
 
+class TableStreamRequest(BaseModel):
+    """Bulk table read streamed as Arrow IPC record batches."""
+    select_columns: Optional[List[str]] = Field(None, description="Columns to return (default: all schema columns)")
+    filters: Optional[DataFilters] = Field(None, description="Data filters")
+    include_row_id: bool = Field(False, description="Add a _logical_row_id column")
+    batch_size: int = Field(50000, ge=1000, le=500000, description="Rows per record batch")
+
+
 # ============================================
 # Permission Request Models
 # ============================================
@@ -11,7 +11,8 @@ T = TypeVar('T', bound=BaseModel)
 from .common import (
     DatasetSummary, UserSummary, JobSummary, JobDetail,
     DataRow, SheetSchema, CommitInfo, RefInfo,
-    TableInfo, RefWithTables, SearchResult
+    TableInfo, RefWithTables, SearchResult,
+    TableDiffSummary, RowChange
 )
 
 
@@ -220,6 +221,18 @@ class ListRefsResponse(BaseModel):
     default_branch: str = "main"
 
 
+class CommitDiffResponse(BaseModel):
+    """Differences between two commits."""
+    dataset_id: int
+    from_commit_id: str
+    to_commit_id: str
+    tables: List[TableDiffSummary]
+    # Row-level changes, omitted in summary-only mode
+    changes: Optional[List[RowChange]] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
 # ============================================
 # Data Access Response Models
 # ============================================
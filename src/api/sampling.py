@@ -1,7 +1,7 @@
 """API endpoints for data sampling operations."""
 
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Depends, Query, Path, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
@@ -16,6 +16,7 @@ from ..core.domain_exceptions import ValidationException
 from ..api.models import CurrentUser
 from ..features.sampling.services import SamplingService
 from .dependencies import get_uow, get_permission_service
+from .encoding import ORJSONResponse, negotiate_format, rows_response
 
 
 # Sampling method enum
@@ -218,6 +219,7 @@ async def get_sampling_methods(
 
 @router.get("/jobs/{job_id}/data")
 async def get_sampling_job_data(
+    http_request: Request,
     job_id: str = Path(..., description="Job ID"),
     table_key: str = Query("primary", description="Table to retrieve"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
@@ -288,7 +290,14 @@ async def get_sampling_job_data(
             }
         )
     
-    return result
+    fmt = negotiate_format(http_request)
+    if fmt != "json":
+        pagination = result['pagination']
+        return rows_response(result['data'], fmt, headers={
+            'X-Total-Rows': str(pagination['total']),
+            'X-Has-More': 'true' if pagination['has_more'] else 'false'
+        })
+    return ORJSONResponse(result)
 
 
 
@@ -71,6 +71,10 @@ async def search_datasets(
         ge=0, 
         description="Number of results to skip"
     ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset cursor from a previous response's next_cursor; overrides offset"
+    ),
     
     # Sorting parameters
     sort_by: str = Query(
@@ -106,7 +110,9 @@ async def search_datasets(
     - Faceted search for discovering filter options
     - Special query syntax: 'tag:finance', 'user:jsmith'
     
-    Returns paginated results with relevance scores and facet counts.
+    Returns paginated results with relevance scores and facet counts. When
+    sorting by relevance or updated_at, pass next_cursor back as `cursor`
+    to page without OFFSET scans.
     """
     # Validate sort_by parameter
     valid_sort_by = ['relevance', 'name', 'created_at', 'updated_at']
@@ -144,7 +150,8 @@ async def search_datasets(
         sort_by=sort_by,
         sort_order=sort_order,
         include_facets=include_facets,
-        facet_fields=facet_fields
+        facet_fields=facet_fields,
+        cursor=cursor
     )
 
 
@@ -188,12 +195,11 @@ async def refresh_search_index(
     uow: PostgresUnitOfWork = Depends(get_uow)
 ):
     """
-    Manually refresh the search materialized view.
+    Rebuild the search index for all datasets.
     
-    This endpoint should be called:
-    - After bulk data imports
-    - When immediate index updates are needed
-    - During maintenance windows
+    The index is normally kept current per dataset from domain events;
+    this endpoint is a recovery tool for manual data fixes or initial
+    population of an existing database.
     
     Note: This operation may take some time for large datasets.
     Admin access required.
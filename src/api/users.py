@@ -11,7 +11,7 @@ from ..api.models import (
     CurrentUser
 )
 from ..core.authorization import require_admin_role, get_current_user_info
-from .dependencies import get_db_pool, get_permission_service, get_uow
+from .dependencies import get_db_pool, get_permission_service, get_uow, get_event_bus
 from ..core.domain_exceptions import ConflictException
 from typing import List, Optional
 from pydantic import BaseModel
@@ -207,7 +207,8 @@ async def update_user(
     current_user: CurrentUser = Depends(require_admin_role),
     uow: PostgresUnitOfWork = Depends(get_uow),
     user_repo: PostgresUserRepository = Depends(get_user_repo),
-    permission_service = Depends(get_permission_service)
+    permission_service = Depends(get_permission_service),
+    event_bus = Depends(get_event_bus)
 ):
     """Update user information (admin only)."""
     from ..features.users.models import UpdateUserCommand
@@ -222,7 +223,7 @@ async def update_user(
     )
     
     # Create service and execute
-    service = UserService(uow, user_repo, permission_service)
+    service = UserService(uow, user_repo, permission_service, event_bus=event_bus)
     result = await service.update_user(command)
     
     # Return updated user
@@ -241,7 +242,8 @@ async def delete_user(
     current_user: CurrentUser = Depends(require_admin_role),
     uow: PostgresUnitOfWork = Depends(get_uow),
     user_repo: PostgresUserRepository = Depends(get_user_repo),
-    permission_service = Depends(get_permission_service)
+    permission_service = Depends(get_permission_service),
+    event_bus = Depends(get_event_bus)
 ):
     """Delete a user (admin only)."""
     from ..features.users.models import DeleteUserCommand
@@ -253,7 +255,7 @@ async def delete_user(
     )
     
     # Create service and execute
-    service = UserService(uow, user_repo, permission_service)
+    service = UserService(uow, user_repo, permission_service, event_bus=event_bus)
     result = await service.delete_user(command)
     
     return {
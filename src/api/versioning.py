@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, Query, File, UploadFile, Form, Path
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Query, File, UploadFile, Form, Path, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, AsyncIterator
+import json
 
 from src.api.models import (
     CreateCommitRequest, CreateCommitResponse,
@@ -7,16 +10,21 @@ from src.api.models import (
     CommitSchemaResponse, QueueImportResponse,
     GetCommitHistoryResponse, CurrentUser,
     ListRefsResponse, CreateBranchRequest, CreateBranchResponse,
-    TableAnalysisResponse, DatasetOverviewResponse
+    TableAnalysisResponse, DatasetOverviewResponse,
+    CommitDiffResponse
 )
-from src.api.models.requests import DataQueryRequest
-from src.features.versioning.services import VersioningService
+from src.api.models.requests import DataQueryRequest, TableStreamRequest
+from src.api.encoding import data_page_response, ARROW_STREAM_MEDIA_TYPE
+from src.features.versioning.services import VersioningService, CommitDiffService, ArrowStreamService
 from src.features.versioning.services.commit_preparation_service import CommitPreparationService
+from src.features.versioning.services.versioning_service import ImportMode
 from src.core.domain_exceptions import EntityNotFoundException
 from src.infrastructure.postgres.database import DatabasePool
 from src.core.authorization import get_current_user_info, require_dataset_read, require_dataset_write
 from src.api.dependencies import get_uow, get_db_pool, get_event_bus, get_permission_service
 from src.infrastructure.postgres.uow import PostgresUnitOfWork
+from src.infrastructure.postgres.versioning_repo import PostgresCommitRepository
+from src.infrastructure.postgres.table_reader import PostgresTableReader
 
 
 router = APIRouter(tags=["versioning"])
@@ -60,12 +68,30 @@ async def import_file(
     ref_name: str,
     file: UploadFile = File(...),
     commit_message: str = Form(...),
+    import_mode: ImportMode = Form("full", description="full, append, upsert or replace_table"),
+    key_columns: Optional[str] = Form(None, description="Comma-separated key columns for upsert"),
     current_user: CurrentUser = Depends(get_current_user_info),
     uow: PostgresUnitOfWork = Depends(get_uow),
     permission_service = Depends(get_permission_service),
     _: CurrentUser = Depends(require_dataset_write)
 ):
-    """Upload a file to import as a new commit"""
+    """Upload a file to import as a new commit.
+
+    `full` replaces the whole dataset with the file's tables. The other modes
+    start from the ref's current commit and only write rows that changed:
+    `append` adds the file's rows after the table's last row, `upsert`
+    matches rows on `key_columns`, and `replace_table` replaces only the
+    file's tables.
+    """
+    columns = [c.strip() for c in key_columns.split(',') if c.strip()] if key_columns else None
+    if columns and import_mode != "upsert":
+        raise RequestValidationError([{
+            "type": "value_error",
+            "loc": ("body", "key_columns"),
+            "msg": "key_columns is only accepted with import_mode 'upsert'",
+            "input": key_columns
+        }])
+    
     # Save uploaded file temporarily
     import tempfile
     import shutil
@@ -80,7 +106,9 @@ async def import_file(
         file_name=file.filename,
         branch_name=ref_name,
         user_id=current_user.user_id,
-        commit_message=commit_message
+        commit_message=commit_message,
+        import_mode=import_mode,
+        key_columns=columns
     )
 
 
@@ -90,6 +118,7 @@ async def get_data_at_ref(
     ref_name: str,
     table_key: str,
     query: DataQueryRequest,
+    http_request: Request,
     current_user: CurrentUser = Depends(get_current_user_info),
     uow: PostgresUnitOfWork = Depends(get_uow),
     permission_service = Depends(get_permission_service),
@@ -105,9 +134,50 @@ async def get_data_at_ref(
     - Row flattening option for nested data
     - Cursor-based pagination for infinite scroll
     - Column selection for payload optimization
+    - Rows as ndjson or an Arrow IPC stream, chosen by the Accept header
     """
     service = VersioningService(uow, permissions=permission_service)
-    return await service.query_data_at_ref(dataset_id, ref_name, table_key, query, current_user.user_id)
+    page = await service.query_data_at_ref(dataset_id, ref_name, table_key, query, current_user.user_id)
+    return data_page_response(page, http_request)
+
+
+@router.post("/datasets/{dataset_id}/refs/{ref_name}/tables/{table_key}/arrow")
+async def stream_table_arrow(
+    dataset_id: int,
+    ref_name: str,
+    table_key: str,
+    request: Optional[TableStreamRequest] = None,
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    db_pool: DatabasePool = Depends(get_db_pool),
+    _: CurrentUser = Depends(require_dataset_read)
+) -> StreamingResponse:
+    """Stream a whole table as an Arrow IPC stream for programmatic clients.
+    
+    Columns are typed from the commit schema. Supports column projection and
+    the same filters as the data endpoint; rows come in key order. Read it with
+    e.g. `pyarrow.ipc.open_stream(response.raw)`, then pandas/polars/DuckDB.
+    """
+    request = request or TableStreamRequest()
+    
+    # Resolve the ref and schema up front so errors surface before the stream starts
+    resolver = ArrowStreamService(uow.commits, uow.table_reader)
+    commit_id, schema = await resolver.prepare(
+        dataset_id, ref_name, table_key, request.select_columns, request.include_row_id
+    )
+    
+    async def generate() -> AsyncIterator[bytes]:
+        # The request connection is released once the handler returns,
+        # so the stream holds its own
+        async with db_pool.acquire() as conn:
+            service = ArrowStreamService(PostgresCommitRepository(conn), PostgresTableReader(conn))
+            async for chunk in service.iter_ipc(commit_id, table_key, schema, request.filters, request.batch_size):
+                yield chunk
+    
+    return StreamingResponse(
+        generate(),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
+        headers={"X-Commit-Id": commit_id}
+    )
 
 
 @router.get("/datasets/{dataset_id}/commits/{commit_id}/schema", response_model=CommitSchemaResponse)
@@ -211,6 +281,7 @@ async def get_commit_history(
 
 @router.get("/datasets/{dataset_id}/commits/{commit_id}/data", response_model=GetDataResponse)
 async def checkout_commit(
+    http_request: Request,
     dataset_id: int = Path(..., description="Dataset ID"),
     commit_id: str = Path(..., description="Commit ID to checkout"),
     table_key: Optional[str] = Query(None, description="Specific table/sheet to retrieve"),
@@ -224,7 +295,8 @@ async def checkout_commit(
     """Get the data as it existed at a specific commit."""
     # Checkout commit
     service = VersioningService(uow, permissions=permission_service)
-    return await service.checkout_commit(dataset_id, commit_id, current_user.user_id, table_key or "primary", offset, limit)
+    page = await service.checkout_commit(dataset_id, commit_id, current_user.user_id, table_key or "primary", offset, limit)
+    return data_page_response(page, http_request)
 
 
 # Branch/Ref management endpoints
@@ -284,4 +356,85 @@ async def get_dataset_overview(
     dropdowns for the columns endpoint.
     """
     service = VersioningService(uow, permissions=permission_service)
-    return await service.get_dataset_overview(dataset_id, "main", current_user.user_id)
\ No newline at end of file
+    return await service.get_dataset_overview(dataset_id, "main", current_user.user_id)
+
+
+# Commit diff endpoints
+@router.get("/datasets/{dataset_id}/diff", response_model=CommitDiffResponse)
+async def get_commit_diff(
+    dataset_id: int = Path(..., description="Dataset ID"),
+    from_ref: str = Query(..., alias="from", description="Base ref name or commit ID"),
+    to_ref: str = Query(..., alias="to", description="Target ref name or commit ID"),
+    table_key: Optional[str] = Query(None, description="Limit the diff to one table"),
+    summary_only: bool = Query(False, description="Return per-table counts only"),
+    include_cells: bool = Query(False, description="Include old/new row data and changed columns"),
+    include_column_counts: bool = Query(False, description="Count modified rows per changed column"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of row changes to return"),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    _: CurrentUser = Depends(require_dataset_read)
+) -> CommitDiffResponse:
+    """Get added, removed and modified rows between two refs or commits.
+    
+    Rows are compared by content hash, so the cost depends on the number
+    of rows in the commits' manifests rather than on the size of the row data.
+    """
+    service = CommitDiffService(uow.commits, uow.table_reader)
+    return await service.get_diff(
+        dataset_id, from_ref, to_ref,
+        table_key=table_key,
+        summary_only=summary_only,
+        include_cells=include_cells,
+        include_column_counts=include_column_counts,
+        cursor=cursor,
+        limit=limit
+    )
+
+
+@router.get("/datasets/{dataset_id}/diff/stream")
+async def stream_commit_diff(
+    dataset_id: int = Path(..., description="Dataset ID"),
+    from_ref: str = Query(..., alias="from", description="Base ref name or commit ID"),
+    to_ref: str = Query(..., alias="to", description="Target ref name or commit ID"),
+    table_key: Optional[str] = Query(None, description="Limit the diff to one table"),
+    include_cells: bool = Query(False, description="Include old/new row data and changed columns"),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    db_pool: DatabasePool = Depends(get_db_pool),
+    _: CurrentUser = Depends(require_dataset_read)
+) -> StreamingResponse:
+    """Stream every row change between two refs or commits as NDJSON.
+    
+    Each line is a row change; the final line is the per-table summary.
+    """
+    # Resolve refs up front so missing refs fail before the stream starts
+    resolver = CommitDiffService(uow.commits, uow.table_reader)
+    from_commit_id = await resolver.resolve_commit(dataset_id, from_ref)
+    to_commit_id = await resolver.resolve_commit(dataset_id, to_ref)
+
+    async def generate() -> AsyncIterator[bytes]:
+        # The request connection is released once the handler returns,
+        # so the stream holds its own
+        async with db_pool.acquire() as conn:
+            service = CommitDiffService(PostgresCommitRepository(conn), PostgresTableReader(conn))
+            async for batch in service.iter_changes(
+                from_commit_id, to_commit_id, table_key, include_cells=include_cells
+            ):
+                yield ''.join(
+                    json.dumps(change.model_dump(exclude_none=True), default=str) + '\n'
+                    for change in batch
+                ).encode('utf-8')
+
+            tables = await service.summarize(from_commit_id, to_commit_id, table_key)
+            yield (json.dumps({
+                'summary': {
+                    'from_commit_id': from_commit_id,
+                    'to_commit_id': to_commit_id,
+                    'tables': [t.model_dump() for t in tables]
+                }
+            }) + '\n').encode('utf-8')
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="diff_{dataset_id}.ndjson"'}
+    )
@@ -1,6 +1,12 @@
 """API endpoints for SQL workbench functionality."""
 
-from fastapi import APIRouter, Depends
+import asyncio
+import contextlib
+import logging
+import uuid
+from typing import Any, Awaitable, Dict
+
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status
 
 from ..infrastructure.postgres.uow import PostgresUnitOfWork
 from ..infrastructure.postgres.table_reader import PostgresTableReader
@@ -12,10 +18,20 @@ from ..core.authorization import get_current_user_info
 from ..api.models import CurrentUser
 from ..features.sql_workbench.models.sql_transform import SqlTransformRequest, SqlTransformResponse
 from ..features.sql_workbench.services.sql_workbench_service import SqlWorkbenchService
-from .dependencies import get_uow, get_permission_service
+from ..features.sql_workbench.services.preview_sessions import SESSION_TOKEN_PATTERN
+from ..features.sql_workbench.utils.preview_control import PREVIEW_TOKEN_PATTERN, get_preview_registry
+from ..infrastructure.postgres.database import DatabasePool
+from ..core.domain_exceptions import resource_not_found
+from .dependencies import get_uow, get_permission_service, get_db_pool, get_preview_pool
+from .encoding import ORJSONResponse, negotiate_format, rows_response
 
 router = APIRouter(prefix="/workbench", tags=["workbench"])
 
+logger = logging.getLogger(__name__)
+
+# How often a running preview checks whether its client went away
+DISCONNECT_POLL_SECONDS = 0.5
+
 
 # Local dependency helpers
 async def get_table_reader(
@@ -46,17 +62,49 @@ async def get_commit_repository(
     return uow.commits
 
 
+async def _cancel_on_disconnect(
+    work: Awaitable[Any],
+    http_request: Request,
+    preview_token: str,
+    user_id: int,
+    db_pool: DatabasePool
+) -> Any:
+    """
+    Await a preview, cancelling its query if the client disconnects first.
+    
+    Returns None when the preview was cancelled that way.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                logger.info(f"Client disconnected; cancelling preview {preview_token}")
+                # Cancel on the main pool; the preview pool may be saturated
+                await get_preview_registry().cancel(preview_token, user_id, db_pool)
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+                return None
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 @router.post("/sql-transform", response_model=SqlTransformResponse)
 async def transform_sql(
     request: SqlTransformRequest,
+    http_request: Request,
     current_user: CurrentUser = Depends(get_current_user_info),
     uow: PostgresUnitOfWork = Depends(get_uow),
     job_repository: PostgresJobRepository = Depends(get_job_repository),
     dataset_repository: PostgresDatasetRepository = Depends(get_dataset_repository),
     commit_repository: PostgresCommitRepository = Depends(get_commit_repository),
-    permission_service = Depends(get_permission_service)
+    permission_service = Depends(get_permission_service),
+    preview_pool: DatabasePool = Depends(get_preview_pool),
+    db_pool: DatabasePool = Depends(get_db_pool)
 ):
     """
     Execute SQL transformation - preview or save results.
@@ -76,6 +124,14 @@ async def transform_sql(
         
     Raises:
         400 for validation errors, 403 for permission errors, 404 for not found
+        
+    A preview runs under `preview_token` (generated if not given). It can be
+    cancelled with POST /workbench/previews/{preview_token}/cancel and is
+    cancelled automatically if the client disconnects.
+    
+    With session=True the whole result is spooled once and the response
+    carries a `session_token`; further pages are read from
+    GET /workbench/sessions/{session_token}/rows without re-running the query.
     """
     service = SqlWorkbenchService(
         uow, 
@@ -83,8 +139,92 @@ async def transform_sql(
         sql_executor=None,  # Will use default SqlExecutor
         job_repository=job_repository,
         dataset_repository=dataset_repository,
-        commit_repository=commit_repository
+        commit_repository=commit_repository,
+        preview_pool=preview_pool
     )
-    return await service.transform_sql(request, current_user.user_id)
+    if request.save:
+        response = await service.transform_sql(request, current_user.user_id)
+    else:
+        request.preview_token = request.preview_token or uuid.uuid4().hex
+        response = await _cancel_on_disconnect(
+            service.transform_sql(request, current_user.user_id),
+            http_request,
+            request.preview_token,
+            current_user.user_id,
+            db_pool
+        )
+        if response is None:
+            # Nobody is left to read this; 499 is the usual "client closed request"
+            return Response(status_code=499)
+    if response.data is None:
+        return response
+    return _preview_rows_response(response, http_request)
+
+
+def _preview_rows_response(response: SqlTransformResponse, http_request: Request) -> Response:
+    """Preview rows skip response-model validation and may go out as ndjson or Arrow."""
+    fmt = negotiate_format(http_request)
+    if fmt != "json":
+        headers = {
+            'X-Row-Count': str(response.row_count),
+            'X-Has-More': 'true' if response.has_more else 'false'
+        }
+        if response.preview_token:
+            headers['X-Preview-Token'] = response.preview_token
+        if response.session_token:
+            headers['X-Session-Token'] = response.session_token
+        return rows_response(response.data, fmt, headers=headers)
+    return ORJSONResponse(response)
+
+
+@router.get("/previews")
+async def list_running_previews(
+    current_user: CurrentUser = Depends(get_current_user_info),
+    db_pool: DatabasePool = Depends(get_db_pool)
+) -> Dict[str, Any]:
+    """The current user's preview queries running on the database."""
+    return {"previews": await get_preview_registry().list_backends(current_user.user_id, db_pool)}
 
 
+@router.post("/previews/{preview_token}/cancel", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_preview(
+    preview_token: str = Path(..., pattern=PREVIEW_TOKEN_PATTERN),
+    current_user: CurrentUser = Depends(get_current_user_info),
+    db_pool: DatabasePool = Depends(get_db_pool)
+):
+    """Cancel a running preview of the current user by its preview_token."""
+    if not await get_preview_registry().cancel(preview_token, current_user.user_id, db_pool):
+        raise resource_not_found(f"Running preview '{preview_token}'")
+
+
+@router.get("/sessions/{session_token}/rows", response_model=SqlTransformResponse)
+async def read_preview_session(
+    http_request: Request,
+    session_token: str = Path(..., pattern=SESSION_TOKEN_PATTERN),
+    offset: int = Query(0, ge=0, description="Number of rows to skip"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of rows to return"),
+    current_user: CurrentUser = Depends(get_current_user_info),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    permission_service = Depends(get_permission_service),
+    preview_pool: DatabasePool = Depends(get_preview_pool)
+):
+    """A page of a preview session opened by POST /workbench/sql-transform with session=True."""
+    service = SqlWorkbenchService(uow, permissions=permission_service, preview_pool=preview_pool)
+    response = await service.read_preview_session(session_token, current_user.user_id, offset, limit)
+    if response is None:
+        raise resource_not_found(f"Preview session '{session_token}'")
+    return _preview_rows_response(response, http_request)
+
+
+@router.delete("/sessions/{session_token}", status_code=status.HTTP_204_NO_CONTENT)
+async def close_preview_session(
+    session_token: str = Path(..., pattern=SESSION_TOKEN_PATTERN),
+    current_user: CurrentUser = Depends(get_current_user_info),
+    uow: PostgresUnitOfWork = Depends(get_uow),
+    permission_service = Depends(get_permission_service),
+    preview_pool: DatabasePool = Depends(get_preview_pool)
+):
+    """Close a preview session of the current user and drop its spooled rows."""
+    service = SqlWorkbenchService(uow, permissions=permission_service, preview_pool=preview_pool)
+    if not await service.close_preview_session(session_token, current_user.user_id):
+        raise resource_not_found(f"Preview session '{session_token}'")
@@ -16,17 +16,25 @@ def create_access_token(
     subject: str, 
     role_id: int, 
     role_name: Optional[str] = None, 
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    user_id: Optional[int] = None
 ) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token.
+    
+    When `user_id` is given it is embedded as the `uid` claim, so requests
+    can resolve the principal without looking the subject up.
+    """
     to_encode = {"sub": subject, "role_id": role_id}
     if role_name:
         to_encode["role_name"] = role_name
+    if user_id is not None:
+        to_encode["uid"] = user_id
     
-    expire = datetime.utcnow() + (
+    now = datetime.utcnow()
+    expire = now + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now})
     
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
@@ -93,8 +101,10 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
         
         return {
             "soeid": soeid,
+            "user_id": payload.get("uid"),
             "role_id": payload.get("role_id"),
-            "role_name": payload.get("role_name")
+            "role_name": payload.get("role_name"),
+            "issued_at": payload.get("iat")
         }
         
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,149 @@
+"""Process-wide caches for authenticated principals and permission checks."""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..infrastructure.config import get_settings
+
+
+class PrincipalCache:
+    """
+    Maps token subjects (SOEIDs) to user ids.
+
+    Entries expire after a TTL and are evicted least recently used first.
+    Tokens that carry the user id are trusted on a miss, as the claim is
+    signed, so the cache also remembers when a user was last changed in
+    this process: a token issued before that point is resolved from the
+    database again. Other processes keep trusting such a token until it
+    expires, so the access token lifetime bounds how long they miss a change.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, int]]" = OrderedDict()
+        self._changed_at: Dict[int, float] = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, subject: str) -> Optional[int]:
+        """Return the cached user id for a subject, if fresh."""
+        entry = self._entries.get(subject)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(subject)
+        self.stats['hits'] += 1
+        return entry[1]
+
+    def put(self, subject: str, user_id: int) -> None:
+        """Cache the user id of a subject."""
+        self._entries[subject] = (time.monotonic(), user_id)
+        self._entries.move_to_end(subject)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_current(self, user_id: int, issued_at: Optional[float]) -> bool:
+        """Check that a token issued at `issued_at` (epoch seconds) predates no user change."""
+        changed_at = self._changed_at.get(user_id)
+        if changed_at is None:
+            return True
+        return issued_at is not None and issued_at > changed_at
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a user's entries and distrust tokens issued before now."""
+        self._changed_at[user_id] = time.time()
+        stale = [subject for subject, (_, cached_id) in self._entries.items() if cached_id == user_id]
+        for subject in stale:
+            del self._entries[subject]
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+        self._changed_at.clear()
+
+
+class PermissionCache:
+    """
+    Caches permission check results per (user, resource).
+
+    Each entry holds the results of the permission levels checked so far for
+    one user on one resource. Entries expire after a TTL, are evicted least
+    recently used first, and are dropped when permissions on the resource or
+    the user change.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str, int], Tuple[float, Dict[str, bool]]]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get(self, user_id: int, resource: str, resource_id: int, permission: str) -> Optional[bool]:
+        """Return a cached check result, if fresh."""
+        key = (user_id, resource, resource_id)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds or permission not in entry[1]:
+            self.stats['misses'] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry[1][permission]
+
+    def put(self, user_id: int, resource: str, resource_id: int, permission: str, granted: bool) -> None:
+        """Cache a check result."""
+        key = (user_id, resource, resource_id)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            entry = (time.monotonic(), {})
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        entry[1][permission] = granted
+        self._entries.move_to_end(key)
+
+    def invalidate_resource(self, resource: str, resource_id: int) -> None:
+        """Drop all users' entries for one resource."""
+        stale = [key for key in self._entries if key[1] == resource and key[2] == resource_id]
+        for key in stale:
+            del self._entries[key]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop all entries of one user."""
+        stale = [key for key in self._entries if key[0] == user_id]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+
+_principal_cache: Optional[PrincipalCache] = None
+_permission_cache: Optional[PermissionCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the process-wide principal cache."""
+    global _principal_cache
+    if _principal_cache is None:
+        settings = get_settings()
+        _principal_cache = PrincipalCache(
+            ttl_seconds=settings.principal_cache_ttl_seconds,
+            max_entries=settings.principal_cache_max_entries
+        )
+    return _principal_cache
+
+
+def get_permission_cache() -> PermissionCache:
+    """Get the process-wide permission cache."""
+    global _permission_cache
+    if _permission_cache is None:
+        settings = get_settings()
+        _permission_cache = PermissionCache(
+            ttl_seconds=settings.permission_cache_ttl_seconds,
+            max_entries=settings.permission_cache_max_entries
+        )
+    return _permission_cache
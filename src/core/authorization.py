@@ -7,16 +7,18 @@ from ..api.dependencies import get_current_user
 from ..api.models import CurrentUser, PermissionType
 from ..infrastructure.postgres.database import DatabasePool
 from .domain_exceptions import PermissionDeniedError, permission_denied, unauthorized
+from .auth_cache import get_principal_cache, get_permission_cache
 
 
 # Import get_db_pool from api.dependencies
 # This will be injected by FastAPI's dependency system
-from ..api.dependencies import get_db_pool
+from ..api.dependencies import get_db_pool, get_uow
+from ..infrastructure.postgres.uow import PostgresUnitOfWork
 
 
 async def get_current_user_info(
     token_data: Dict[str, Any] = Depends(get_current_user),
-    db_pool: DatabasePool = Depends(get_db_pool)
+    uow: PostgresUnitOfWork = Depends(get_uow)
 ) -> CurrentUser:
     """Convert token data to CurrentUser model with full user info."""
     if not token_data.get("role_id"):
@@ -25,23 +27,39 @@ async def get_current_user_info(
             detail="Token missing role information",
         )
     
-    # Get user_id from database based on soeid
-    from ..infrastructure.postgres.uow import PostgresUnitOfWork
+    soeid = token_data["soeid"]
+    principals = get_principal_cache()
     
-    # Create unit of work to access repository through interface
-    uow = PostgresUnitOfWork(db_pool)
-    async with uow:
-        user = await uow.users.get_by_soeid(token_data["soeid"])
+    user_id = principals.get(soeid)
+    token_user_id = token_data.get("user_id")
+    if user_id is None and token_user_id is not None and principals.is_current(
+        token_user_id, token_data.get("issued_at")
+    ):
+        # The user id claim is signed, so a miss needs no lookup
+        user_id = token_user_id
+        principals.put(soeid, user_id)
+    elif user_id is None:
+        # Get user_id from database based on soeid, on the request's unit of work
+        user = await uow.users.get_by_soeid(soeid)
         
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
             )
+        user_id = user["id"]
+        principals.put(soeid, user_id)
+    
+    # Tokens of a deleted user don't carry over to a new user with the same SOEID
+    if token_user_id is not None and token_user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
     
     return CurrentUser(
-        soeid=token_data["soeid"],
-        user_id=user["id"],
+        soeid=soeid,
+        user_id=user_id,
         role_id=token_data["role_id"],
         role_name=token_data.get("role_name")
     )
@@ -60,21 +78,26 @@ class PermissionChecker:
         db_pool: DatabasePool = Depends(get_db_pool)
     ) -> CurrentUser:
         """Check if user has required permission on dataset."""
-        # TEMPORARILY DISABLED - ALL PERMISSIONS GRANTED
-        return current_user
-        
         # Admin users have all permissions
         if current_user.is_admin():
             return current_user
         
-        # Check specific dataset permission
-        from .infrastructure.postgres import PostgresDatasetRepository
-        async with db_pool.acquire() as conn:
-            dataset_repo = PostgresDatasetRepository(conn)
-            has_permission = await dataset_repo.check_user_permission(
-                dataset_id=dataset_id,
-                user_id=current_user.user_id,
-                required_permission=self.required_permission.value
+        # Check specific dataset permission, shared with PermissionService
+        permissions = get_permission_cache()
+        has_permission = permissions.get(
+            current_user.user_id, "dataset", dataset_id, self.required_permission.value
+        )
+        if has_permission is None:
+            from ..infrastructure.postgres import PostgresDatasetRepository
+            async with db_pool.acquire() as conn:
+                dataset_repo = PostgresDatasetRepository(conn)
+                has_permission = await dataset_repo.check_user_permission(
+                    dataset_id=dataset_id,
+                    user_id=current_user.user_id,
+                    required_permission=self.required_permission.value
+                )
+            permissions.put(
+                current_user.user_id, "dataset", dataset_id, self.required_permission.value, has_permission
             )
         
         if not has_permission:
@@ -99,6 +99,9 @@ class DatasetUpdatedEvent(DomainEvent):
     
     def __post_init__(self):
         super().__init__()
+        self.event_type = EventType.DATASET_UPDATED
+        self.aggregate_type = "dataset"
+        self.aggregate_id = str(self.dataset_id)
 
 
 @dataclass
@@ -110,6 +113,9 @@ class DatasetDeletedEvent(DomainEvent):
     
     def __post_init__(self):
         super().__init__()
+        self.event_type = EventType.DATASET_DELETED
+        self.aggregate_type = "dataset"
+        self.aggregate_id = str(self.dataset_id)
 
 
 # Permission Events
@@ -123,6 +129,9 @@ class PermissionGrantedEvent(DomainEvent):
     
     def __post_init__(self):
         super().__init__()
+        self.event_type = EventType.PERMISSION_GRANTED
+        self.aggregate_type = "dataset"
+        self.aggregate_id = str(self.dataset_id)
 
 
 @dataclass
@@ -135,6 +144,9 @@ class PermissionRevokedEvent(DomainEvent):
     
     def __post_init__(self):
         super().__init__()
+        self.event_type = EventType.PERMISSION_REVOKED
+        self.aggregate_type = "dataset"
+        self.aggregate_id = str(self.dataset_id)
 
 
 # Job Events
@@ -4,6 +4,7 @@ from typing import List, Optional
 from dataclasses import dataclass
 from ..infrastructure.postgres.uow import PostgresUnitOfWork
 from .domain_exceptions import PermissionDeniedError
+from .auth_cache import get_permission_cache
 
 
 @dataclass
@@ -23,7 +24,11 @@ class PermissionType:
 
 
 class PermissionService:
-    """Centralized permission checking service with request-scoped caching."""
+    """Centralized permission checking service.
+    
+    Results are cached per request and in the process-wide permission cache,
+    which PermissionChecker shares and permission events invalidate.
+    """
     
     def __init__(self, uow: PostgresUnitOfWork):
         """Initialize with unit of work."""
@@ -43,14 +48,7 @@ class PermissionService:
         Raises:
             PermissionDeniedError: If permission is not granted
         """
-        # TEMPORARILY DISABLED - ALL PERMISSIONS GRANTED
-        return
-        
-        cache_key = f"{resource}:{resource_id}:{user_id}:{permission}"
-        if cache_key not in self._cache:
-            self._cache[cache_key] = await self._check_permission(resource, resource_id, user_id, permission)
-        
-        if not self._cache[cache_key]:
+        if not await self._cached_check(resource, resource_id, user_id, permission):
             raise PermissionDeniedError(f"{resource}:{resource_id}", permission, user_id)
     
     async def has_permission(self, resource: str, resource_id: int, user_id: int, permission: str) -> bool:
@@ -66,13 +64,7 @@ class PermissionService:
         Returns:
             bool: True if permission is granted, False otherwise
         """
-        # TEMPORARILY DISABLED - ALL PERMISSIONS GRANTED
-        return True
-        
-        cache_key = f"{resource}:{resource_id}:{user_id}:{permission}"
-        if cache_key not in self._cache:
-            self._cache[cache_key] = await self._check_permission(resource, resource_id, user_id, permission)
-        return self._cache[cache_key]
+        return await self._cached_check(resource, resource_id, user_id, permission)
     
     async def require_any(self, resource: str, resource_id: int, user_id: int, permissions: List[str]):
         """
@@ -127,6 +119,18 @@ class PermissionService:
         elif role_name == "manager" and user_role not in ["admin", "manager"]:
             raise PermissionDeniedError("system", "manager", user_id)
     
+    async def _cached_check(self, resource: str, resource_id: int, user_id: int, permission: str) -> bool:
+        """Check a permission through the request cache, then the process-wide cache."""
+        cache_key = f"{resource}:{resource_id}:{user_id}:{permission}"
+        if cache_key not in self._cache:
+            shared = get_permission_cache()
+            granted = shared.get(user_id, resource, resource_id, permission)
+            if granted is None:
+                granted = await self._check_permission(resource, resource_id, user_id, permission)
+                shared.put(user_id, resource, resource_id, permission, granted)
+            self._cache[cache_key] = granted
+        return self._cache[cache_key]
+    
     async def _check_permission(self, resource: str, resource_id: int, user_id: int, permission: str) -> bool:
         """
         Internal method to check permission from repository.
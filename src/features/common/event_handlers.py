@@ -7,6 +7,7 @@ import json
 
 from src.core.events.publisher import DomainEvent
 from src.core.events.publisher import EventType
+from src.core.auth_cache import get_principal_cache, get_permission_cache
 from src.infrastructure.postgres.database import DatabasePool
 
 
@@ -78,6 +79,36 @@ class CacheInvalidationHandler:
         return "CacheInvalidationHandler"
 
 
+class AuthCacheInvalidationHandler:
+    """Handler for keeping the principal and permission caches in sync."""
+    
+    def handles(self) -> List[EventType]:
+        """Return list of event types this handler processes."""
+        return [
+            EventType.USER_UPDATED,
+            EventType.USER_DELETED,
+            EventType.PERMISSION_GRANTED,
+            EventType.PERMISSION_REVOKED,
+            EventType.DATASET_DELETED
+        ]
+    
+    async def handle(self, event: DomainEvent) -> None:
+        """Drop cached entries affected by the event."""
+        if event.event_type in (EventType.USER_UPDATED, EventType.USER_DELETED):
+            get_principal_cache().invalidate_user(event.user_id)
+            get_permission_cache().invalidate_user(event.user_id)
+        elif event.event_type in (EventType.PERMISSION_GRANTED, EventType.PERMISSION_REVOKED):
+            get_permission_cache().invalidate_resource("dataset", event.dataset_id)
+        else:
+            get_permission_cache().invalidate_resource("dataset", int(event.aggregate_id))
+        logger.debug(f"Invalidated auth caches for {event.event_type.value}:{event.aggregate_id}")
+    
+    @property
+    def handler_name(self) -> str:
+        """Return the name of this handler for logging."""
+        return "AuthCacheInvalidationHandler"
+
+
 class AuditLogHandler:
     """Handler for creating audit logs from domain events."""
     
@@ -338,6 +338,7 @@ class DatasetService:
             )
         
         # Handle tags update
+        old_tags = await self._dataset_repo.get_dataset_tags(command.dataset_id)
         if command.tags is not None:
             await self._dataset_repo.remove_dataset_tags(command.dataset_id)
             if command.tags:
@@ -358,7 +359,6 @@ class DatasetService:
             if command.description is not None and existing.get('description') != command.description:
                 changes['description'] = {'old': existing.get('description'), 'new': command.description}
             if command.tags is not None:
-                old_tags = await self._dataset_repo.get_dataset_tags(command.dataset_id)
                 if set(old_tags) != set(command.tags):
                     changes['tags'] = {'old': old_tags, 'new': command.tags}
             
@@ -467,10 +467,6 @@ class DatasetService:
                 permission_type=command.permission_type
             ))
         
-        # Refresh search index to reflect permission changes
-        if hasattr(self._uow, 'search_repository'):
-            await self._uow.search_repository.refresh_search_index()
-        
         return GrantPermissionResponse(
             dataset_id=command.dataset_id,
             user_id=command.target_user_id,
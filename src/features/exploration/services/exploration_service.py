@@ -199,6 +199,15 @@ class ExplorationService:
             if not output_summary:
                 raise EntityNotFoundException("Result", job_id)
             
+            # Large outputs are kept in the artifact store; older jobs have them inline
+            artifacts = output_summary.get("artifacts", {})
+            artifact_name = {"html": "profile_html", "json": "profile_json"}.get(format)
+            if artifact_name in artifacts:
+                return {
+                    "artifact": artifacts[artifact_name],
+                    "content_type": artifacts[artifact_name]["content_type"]
+                }
+            
             # Return appropriate response based on format
             if format == "html":
                 return {
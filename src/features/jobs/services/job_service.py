@@ -15,6 +15,7 @@ from ..models import (
     CreateJobCommand, CancelJobCommand,
     Job, JobParameters, JobType, JobStatus
 )
+from .progress import announce_job_status
 
 logger = logging.getLogger(__name__)
 
@@ -217,6 +218,8 @@ class JobService:
         else:
             # Use repository method
             await self._job_repo.cancel_job(job_id)
+        # Ends progress streams of the job once the cancellation commits
+        await announce_job_status(self._uow.connection, job_id)
         
         # Publish event if event bus available
         if self._event_bus:
@@ -0,0 +1,263 @@
+"""Job progress: coalesced writes, NOTIFY fan-out and streaming subscriptions."""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from uuid import UUID
+
+import asyncpg
+
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.database import DatabasePool
+
+logger = logging.getLogger(__name__)
+
+
+JOB_PROGRESS_CHANNEL = 'dsa_job_progress'
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+# NOTIFY payloads are limited to 8000 bytes; larger progress is announced
+# without its body, for clients to read from the job instead
+_NOTIFY_PROGRESS_MAX_BYTES = 7000
+
+# Upsert a job's progress and announce it in one round trip
+_WRITE_PROGRESS = """
+    WITH written AS (
+        INSERT INTO dsa_jobs.job_progress (job_id, user_id, progress, updated_at)
+        SELECT id, user_id, $2::jsonb, now()
+        FROM dsa_jobs.analysis_runs
+        WHERE id = $1
+        ON CONFLICT (job_id) DO UPDATE
+        SET progress = EXCLUDED.progress, updated_at = EXCLUDED.updated_at
+        RETURNING job_id, user_id
+    )
+    SELECT pg_notify($3, json_build_object(
+        'job_id', job_id,
+        'user_id', user_id,
+        'progress', CASE WHEN $4 THEN $2::jsonb END
+    )::text)
+    FROM written
+"""
+
+_NOTIFY_STATUS = """
+    SELECT pg_notify($2, json_build_object('job_id', id, 'user_id', user_id, 'status', status)::text)
+    FROM dsa_jobs.analysis_runs
+    WHERE id = $1
+"""
+
+_JOB_SNAPSHOT = """
+    SELECT ar.id, ar.user_id, ar.status::text AS status, jp.progress
+    FROM dsa_jobs.analysis_runs ar
+    LEFT JOIN dsa_jobs.job_progress jp ON jp.job_id = ar.id
+"""
+
+
+@dataclass(eq=False)
+class _PendingProgress:
+    db_pool: DatabasePool
+    latest: Optional[Dict[str, Any]] = None
+    last_write: float = float('-inf')
+    flush_task: Optional[asyncio.Task] = None
+
+
+class JobProgressPublisher:
+    """
+    Per-process writer of job progress.
+
+    Executors may report progress as often as they like: each job's
+    reports are coalesced to at most job_progress_max_updates_per_second
+    writes, and the latest report is always written once the interval
+    allows. Progress lives in the narrow job_progress table rather than
+    the job's row, so frequent updates don't rewrite its parameters and
+    results, and every write is announced on JOB_PROGRESS_CHANNEL.
+    """
+
+    def __init__(self, max_updates_per_second: Optional[float] = None):
+        rate = max_updates_per_second or get_settings().job_progress_max_updates_per_second
+        self._interval = 1.0 / rate
+        self._jobs: Dict[str, _PendingProgress] = {}
+
+    async def report(self, db_pool: DatabasePool, job_id: str, progress: Dict[str, Any]) -> None:
+        """Record a job's progress; written now or once the job's interval has passed."""
+        state = self._jobs.get(job_id)
+        if state is None:
+            state = self._jobs[job_id] = _PendingProgress(db_pool)
+        state.latest = progress
+        wait = state.last_write + self._interval - time.monotonic()
+        if wait <= 0:
+            await self._write(job_id, state)
+        elif state.flush_task is None:
+            state.flush_task = asyncio.create_task(self._write_later(job_id, state, wait))
+
+    async def status_changed(self, db_pool: DatabasePool, job_id: str, status: str) -> None:
+        """Announce a job's new status; finished jobs first get their last progress written."""
+        if status in TERMINAL_STATUSES:
+            state = self._jobs.pop(job_id, None)
+            if state is not None:
+                if state.flush_task is not None:
+                    state.flush_task.cancel()
+                await self._write(job_id, state)
+        try:
+            async with db_pool.acquire() as conn:
+                await announce_job_status(conn, job_id)
+        except Exception as e:
+            logger.warning(f"Failed to announce status of job {job_id}: {e}")
+
+    def forget(self, job_id: str) -> None:
+        """Drop a job's unwritten progress, for jobs this process stopped running."""
+        state = self._jobs.pop(job_id, None)
+        if state is not None and state.flush_task is not None:
+            state.flush_task.cancel()
+
+    async def _write_later(self, job_id: str, state: _PendingProgress, delay: float) -> None:
+        await asyncio.sleep(delay)
+        state.flush_task = None
+        await self._write(job_id, state)
+
+    async def _write(self, job_id: str, state: _PendingProgress) -> None:
+        progress, state.latest = state.latest, None
+        if progress is None:
+            return
+        state.last_write = time.monotonic()
+        try:
+            async with state.db_pool.acquire() as conn:
+                encoded = json.dumps(progress, default=str)
+                await conn.execute(
+                    _WRITE_PROGRESS,
+                    UUID(job_id), encoded, JOB_PROGRESS_CHANNEL,
+                    len(encoded.encode()) <= _NOTIFY_PROGRESS_MAX_BYTES
+                )
+        except Exception as e:
+            logger.warning(f"Failed to write progress of job {job_id}: {e}")
+
+
+@dataclass(eq=False)
+class _Subscription:
+    job_id: Optional[str]
+    user_id: Optional[int]
+    queue: asyncio.Queue
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.job_id is not None and event.get('job_id') != self.job_id:
+            return False
+        return self.user_id is None or event.get('user_id') == self.user_id
+
+    def put(self, event: Dict[str, Any]) -> None:
+        # A client that fell behind only needs the newest events
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class JobProgressListener:
+    """
+    Fans progress notifications out to streaming clients in this process.
+
+    One connection LISTENs on JOB_PROGRESS_CHANNEL for the whole process,
+    so open streams cost no database connections or polling. Subscribers
+    get the events of one job or of all of a user's jobs on a bounded
+    queue that drops the oldest events when the client falls behind.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self._queue_size = queue_size or get_settings().job_progress_subscriber_queue_size
+        self._subscriptions: Set[_Subscription] = set()
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        job_id: Optional[str] = None,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[asyncio.Queue]:
+        """Queue of the events of `job_id`, or of every job of `user_id`, while open."""
+        subscription = _Subscription(job_id, user_id, asyncio.Queue(maxsize=self._queue_size))
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription.queue
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed job progress notification: {payload[:200]}")
+            return
+        for subscription in list(self._subscriptions):
+            if subscription.matches(event):
+                subscription.put(event)
+
+    async def run(self, dsn: str, reconnect_seconds: float = 5.0) -> None:
+        """Listen until cancelled, reconnecting whenever the connection drops."""
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(JOB_PROGRESS_CHANNEL, self._dispatch)
+                logger.info("Listening for job progress")
+                await closed.wait()
+                logger.warning("Job progress listener lost its connection")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job progress listener failed: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(reconnect_seconds)
+
+
+def _snapshot(row: Dict[str, Any]) -> Dict[str, Any]:
+    progress = row['progress']
+    return {
+        'job_id': str(row['id']),
+        'user_id': row['user_id'],
+        'status': row['status'],
+        'progress': json.loads(progress) if isinstance(progress, str) else progress
+    }
+
+
+async def announce_job_status(conn, job_id: str) -> None:
+    """Notify listeners of a job's current status; inside a transaction, once it commits."""
+    await conn.execute(_NOTIFY_STATUS, UUID(str(job_id)), JOB_PROGRESS_CHANNEL)
+
+
+async def get_job_snapshot(conn, job_id: str) -> Optional[Dict[str, Any]]:
+    """A job's status and latest progress, shaped like its notifications."""
+    row = await conn.fetchrow(_JOB_SNAPSHOT + " WHERE ar.id = $1", UUID(str(job_id)))
+    return _snapshot(row) if row else None
+
+
+async def get_active_job_snapshots(conn, user_id: int) -> List[Dict[str, Any]]:
+    """Snapshots of a user's pending and running jobs, oldest first."""
+    rows = await conn.fetch(
+        _JOB_SNAPSHOT + " WHERE ar.user_id = $1 AND ar.status IN ('pending', 'running') ORDER BY ar.created_at",
+        user_id
+    )
+    return [_snapshot(row) for row in rows]
+
+
+_publisher: Optional[JobProgressPublisher] = None
+_listener: Optional[JobProgressListener] = None
+
+
+def get_job_progress_publisher() -> JobProgressPublisher:
+    """Get the process-wide job progress publisher."""
+    global _publisher
+    if _publisher is None:
+        _publisher = JobProgressPublisher()
+    return _publisher
+
+
+def get_job_progress_listener() -> JobProgressListener:
+    """Get the process-wide job progress listener."""
+    global _listener
+    if _listener is None:
+        _listener = JobProgressListener()
+    return _listener
@@ -2,6 +2,7 @@
 
 from .services import SearchService
 from .event_handlers import SearchIndexEventHandler
+from .cache import SearchCache, get_search_cache
 from .models import (
     SearchRequest,
     SuggestRequest,
@@ -19,6 +20,10 @@ __all__ = [
     # Event Handlers
     'SearchIndexEventHandler',
     
+    # Caching
+    'SearchCache',
+    'get_search_cache',
+    
     # Models
     'SearchRequest',
     'SuggestRequest',
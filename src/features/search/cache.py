@@ -0,0 +1,153 @@
+"""In-process caches for search facets and autocomplete suggestions."""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Hashable
+
+from src.infrastructure.config import get_settings
+
+
+class _SuggestNode:
+    """Trie node keyed by one character of a normalized suggest query."""
+
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children: Dict[str, '_SuggestNode'] = {}
+        # limit -> (stored_at, payload)
+        self.entries: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+
+
+class SearchCache:
+    """
+    Per-user caches for search facets and suggestions.
+
+    Facet counts depend only on the user's visible datasets and the search
+    filters, not on sorting or paging, so they are cached per user keyed by
+    the filter set. Suggestions are stored in a per-user trie keyed by the
+    typed query, so the keystroke sequence of one search box shares a path
+    and a user's entries can be dropped in one step.
+
+    Entries expire after a TTL; dataset changes clear everything and
+    permission changes clear the affected user.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_users: int = 1000,
+        max_facet_entries_per_user: int = 50,
+        max_suggest_nodes_per_user: int = 5000
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.max_facet_entries_per_user = max_facet_entries_per_user
+        self.max_suggest_nodes_per_user = max_suggest_nodes_per_user
+        self._facets: "OrderedDict[int, OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]]" = OrderedDict()
+        self._suggest_roots: "OrderedDict[int, _SuggestNode]" = OrderedDict()
+        self._suggest_node_counts: Dict[int, int] = {}
+        self.stats = {'facet_hits': 0, 'facet_misses': 0, 'suggest_hits': 0, 'suggest_misses': 0}
+
+    # ========== Facets ==========
+
+    def get_facets(self, user_id: int, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return cached facets for a user's filter set, if fresh."""
+        user_entries = self._facets.get(user_id)
+        entry = user_entries.get(key) if user_entries is not None else None
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self.stats['facet_misses'] += 1
+            return None
+
+        self._facets.move_to_end(user_id)
+        user_entries.move_to_end(key)
+        self.stats['facet_hits'] += 1
+        return entry[1]
+
+    def put_facets(self, user_id: int, key: Hashable, facets: Dict[str, Any]) -> None:
+        """Store facets for a user's filter set."""
+        user_entries = self._facets.get(user_id)
+        if user_entries is None:
+            user_entries = OrderedDict()
+            self._facets[user_id] = user_entries
+            if len(self._facets) > self.max_users:
+                self._facets.popitem(last=False)
+        else:
+            self._facets.move_to_end(user_id)
+
+        user_entries[key] = (time.monotonic(), facets)
+        user_entries.move_to_end(key)
+        if len(user_entries) > self.max_facet_entries_per_user:
+            user_entries.popitem(last=False)
+
+    # ========== Suggestions ==========
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a suggest query the same way for lookups and stores."""
+        return ' '.join(query.lower().split())
+
+    def get_suggestions(self, user_id: int, query: str, limit: int) -> Optional[Dict[str, Any]]:
+        """Return cached suggestions for the exact (normalized) query, if fresh."""
+        node = self._suggest_roots.get(user_id)
+        for char in self.normalize_query(query):
+            if node is None:
+                break
+            node = node.children.get(char)
+
+        entry = node.entries.get(limit) if node is not None else None
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self.stats['suggest_misses'] += 1
+            return None
+
+        self._suggest_roots.move_to_end(user_id)
+        self.stats['suggest_hits'] += 1
+        return entry[1]
+
+    def put_suggestions(self, user_id: int, query: str, limit: int, payload: Dict[str, Any]) -> None:
+        """Store suggestions under the query's trie path."""
+        root = self._suggest_roots.get(user_id)
+        if root is None or self._suggest_node_counts.get(user_id, 0) > self.max_suggest_nodes_per_user:
+            root = _SuggestNode()
+            self._suggest_roots[user_id] = root
+            self._suggest_node_counts[user_id] = 0
+            if len(self._suggest_roots) > self.max_users:
+                evicted, _ = self._suggest_roots.popitem(last=False)
+                self._suggest_node_counts.pop(evicted, None)
+        else:
+            self._suggest_roots.move_to_end(user_id)
+
+        node = root
+        for char in self.normalize_query(query):
+            child = node.children.get(char)
+            if child is None:
+                child = _SuggestNode()
+                node.children[char] = child
+                self._suggest_node_counts[user_id] += 1
+            node = child
+        node.entries[limit] = (time.monotonic(), payload)
+
+    # ========== Invalidation ==========
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop all cached entries for one user."""
+        self._facets.pop(user_id, None)
+        self._suggest_roots.pop(user_id, None)
+        self._suggest_node_counts.pop(user_id, None)
+
+    def invalidate_all(self) -> None:
+        """Drop all cached entries."""
+        self._facets.clear()
+        self._suggest_roots.clear()
+        self._suggest_node_counts.clear()
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """Get the process-wide search cache."""
+    global _search_cache
+    if _search_cache is None:
+        settings = get_settings()
+        _search_cache = SearchCache(ttl_seconds=settings.search_cache_ttl_seconds)
+    return _search_cache
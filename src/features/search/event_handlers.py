@@ -1,89 +1,110 @@
 """Event handlers for search indexing."""
 
+import asyncio
 import logging
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from src.core.events.publisher import (
     DomainEvent,
-    DatasetCreatedEvent, DatasetUpdatedEvent, DatasetDeletedEvent
+    DatasetCreatedEvent, DatasetUpdatedEvent, DatasetDeletedEvent,
+    PermissionGrantedEvent, PermissionRevokedEvent
 )
 from src.core.events.publisher import EventType
+from src.infrastructure.config import get_settings
 from src.infrastructure.postgres.database import DatabasePool
-from src.infrastructure.postgres.uow import PostgresUnitOfWork
+from src.infrastructure.postgres.uow import PostgresUnitOfWork, current_unit_of_work
 from .services import SearchService
+from .cache import get_search_cache
 
 
 logger = logging.getLogger(__name__)
 
 
 class SearchIndexEventHandler:
-    """Handler for updating search indexes based on dataset events."""
-    
-    def __init__(self, db_pool: DatabasePool):
+    """
+    Handler for keeping the search index and caches in sync with events.
+
+    Affected dataset ids are queued once the publishing unit of work
+    commits, so index rows are always recomputed from committed source
+    rows, and are flushed in batches of at most `max_batch_size`. Commits
+    that land while a flush runs are picked up together by the next one.
+    Cached facets and suggestions are invalidated on the same flush: all
+    of them for dataset changes, only the target user's for permission
+    changes.
+    """
+
+    def __init__(self, db_pool: DatabasePool, max_batch_size: Optional[int] = None):
         self._db_pool = db_pool
-        self._search_service: Optional[SearchService] = None
-    
-    async def _get_service(self) -> SearchService:
-        """Get or create the search service instance."""
-        if not self._search_service:
-            uow = PostgresUnitOfWork(self._db_pool)
-            self._search_service = SearchService(uow)
-        return self._search_service
-    
+        self._max_batch_size = max_batch_size or get_settings().search_index_max_batch_size
+        self._pending: Set[int] = set()
+        self._pending_users: Set[int] = set()
+        self._flush_lock = asyncio.Lock()
+
     def handles(self) -> List[EventType]:
         """Return list of event types this handler processes."""
         return [
             EventType.DATASET_CREATED,
             EventType.DATASET_UPDATED,
-            EventType.DATASET_DELETED
+            EventType.DATASET_DELETED,
+            EventType.PERMISSION_GRANTED,
+            EventType.PERMISSION_REVOKED
         ]
-    
+
     async def handle(self, event: DomainEvent) -> None:
-        """Handle dataset events by updating search indexes."""
-        logger.info(f"SearchIndexEventHandler processing {event.event_type.value}")
-        
-        if event.event_type == EventType.DATASET_CREATED:
-            await self._handle_dataset_created(event)
-        elif event.event_type == EventType.DATASET_UPDATED:
-            await self._handle_dataset_updated(event)
-        elif event.event_type == EventType.DATASET_DELETED:
-            await self._handle_dataset_deleted(event)
-    
-    async def _handle_dataset_created(self, event: DatasetCreatedEvent) -> None:
-        """Handle dataset creation by adding to search index."""
-        dataset_id = int(event.aggregate_id)
-        
-        # Use service to handle the update
-        service = await self._get_service()
-        await service.handle_dataset_created(dataset_id)
-        
-        logger.info(f"Added dataset {dataset_id} to search index")
-    
-    async def _handle_dataset_updated(self, event: DatasetUpdatedEvent) -> None:
-        """Handle dataset update by refreshing search index."""
-        dataset_id = int(event.aggregate_id)
-        changes = event.payload.get('changes', {})
-        
-        # Use service to handle the update
-        service = await self._get_service()
-        await service.handle_dataset_updated(dataset_id, changes)
-        
-        # Only log if searchable fields changed
+        """Flush the affected dataset or user once the publishing transaction commits."""
+        if event.event_type in (EventType.PERMISSION_GRANTED, EventType.PERMISSION_REVOKED):
+            dataset_ids, user_ids = set(), {event.target_user_id}
+        elif event.event_type == EventType.DATASET_UPDATED and not self._affects_index(event):
+            return
+        else:
+            dataset_ids, user_ids = {int(event.aggregate_id)}, set()
+
+        async def flush_committed() -> None:
+            self._pending.update(dataset_ids)
+            self._pending_users.update(user_ids)
+            await self.flush()
+
+        uow = current_unit_of_work()
+        if uow is None:
+            # Published outside a transaction: the change is already visible
+            await flush_committed()
+        else:
+            uow.after_commit(flush_committed)
+
+    def _affects_index(self, event: DatasetUpdatedEvent) -> bool:
+        """Check whether an update touched any searchable field."""
         searchable_fields = {'name', 'description', 'tags'}
-        if any(field in changes for field in searchable_fields):
-            logger.info(f"Updated dataset {dataset_id} in search index")
-    
-    async def _handle_dataset_deleted(self, event: DatasetDeletedEvent) -> None:
-        """Handle dataset deletion by removing from search index."""
-        dataset_id = int(event.aggregate_id)
-        
-        # Use service to handle the deletion
-        service = await self._get_service()
-        await service.handle_dataset_deleted(dataset_id)
-        
-        logger.info(f"Removed dataset {dataset_id} from search index")
-    
+        return any(field in event.changes for field in searchable_fields)
+
+    async def flush(self) -> None:
+        """Recompute index rows for pending datasets and drop stale cache entries."""
+        async with self._flush_lock:
+            cache = get_search_cache()
+            for user_id in self._pending_users:
+                cache.invalidate_user(user_id)
+            self._pending_users.clear()
+
+            while self._pending:
+                dataset_ids = sorted(self._pending)[:self._max_batch_size]
+                self._pending.difference_update(dataset_ids)
+                try:
+                    async with PostgresUnitOfWork(self._db_pool) as uow:
+                        touched = await SearchService(uow).refresh_datasets(dataset_ids)
+                    cache.invalidate_all()
+                    logger.info(
+                        f"Search index updated for {len(dataset_ids)} datasets ({touched} rows)"
+                    )
+                except Exception as e:
+                    # Keep the ids so the next flush retries them
+                    self._pending.update(dataset_ids)
+                    logger.error(f"Failed to update search index for {dataset_ids}: {e}")
+                    return
+
+    async def close(self) -> None:
+        """Flush whatever is still queued."""
+        await self.flush()
+
     @property
     def handler_name(self) -> str:
         """Return the name of this handler for logging."""
-        return "SearchIndexEventHandler"
\ No newline at end of file
+        return "SearchIndexEventHandler"
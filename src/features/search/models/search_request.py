@@ -26,6 +26,7 @@ class SearchRequest(BaseModel):
     # Pagination parameters
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # Keyset cursor from a previous response
     
     # Sorting parameters
     sort_by: Literal['relevance', 'name', 'created_at', 'updated_at'] = 'relevance'
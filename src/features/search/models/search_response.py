@@ -37,10 +37,11 @@ class SearchResponse(BaseModel):
     """Response model for dataset search."""
     
     results: List[SearchResult]
-    total: int
+    total: Optional[int]  # Not counted on keyset pages after the first
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
     query: Optional[str]
     execution_time_ms: int
     facets: Optional[SearchFacets]
@@ -67,6 +68,7 @@ class SearchResponse(BaseModel):
                 "limit": 20,
                 "offset": 0,
                 "has_more": True,
+                "next_cursor": "eyJrIjogInNjb3JlIiwgInYiOiAwLjg1LCAiaWQiOiAxMjN9",
                 "query": "financial report",
                 "execution_time_ms": 23,
                 "facets": {
@@ -1,13 +1,16 @@
 """Consolidated service for all search operations."""
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+import base64
+import json
 import logging
 
 from src.infrastructure.postgres.uow import PostgresUnitOfWork
 from src.core.domain_exceptions import ValidationException
 from ...base_handler import with_error_handling
+from ..cache import SearchCache, get_search_cache
 from ..models import (
     SearchRequest,
     SuggestRequest,
@@ -21,11 +24,16 @@ logger = logging.getLogger(__name__)
 class SearchService:
     """Consolidated service for all search operations."""
     
+    # Result field holding the sort value for each keyset sort key
+    _CURSOR_KEYS = {'score': 'score', 'updated_at': 'updated_at'}
+    
     def __init__(
         self,
-        uow: PostgresUnitOfWork
+        uow: PostgresUnitOfWork,
+        cache: Optional[SearchCache] = None
     ):
         self._uow = uow
+        self._cache = cache or get_search_cache()
     
     # ========== Query Methods ==========
     
@@ -46,7 +54,8 @@ class SearchService:
         sort_by: str = 'relevance',
         sort_order: str = 'desc',
         include_facets: bool = True,
-        facet_fields: Optional[List[str]] = None
+        facet_fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None
     ) -> SearchResponse:
         """
         Execute a dataset search with advanced filtering and faceting.
@@ -57,6 +66,9 @@ class SearchService:
         - Sorting by relevance, name, or timestamps
         - Faceted search for discovering filter options
         - Special query syntax: 'tag:finance', 'user:jsmith'
+        - Keyset pagination via next_cursor when sorting by relevance or updated_at
+        
+        Facet counts are served from the per-user search cache when available.
         """
         # Validate sort parameters
         valid_sort_by = ['relevance', 'name', 'created_at', 'updated_at']
@@ -76,6 +88,18 @@ class SearchService:
             if field not in valid_facet_fields:
                 raise ValidationException(f"Invalid facet field: {field}. Must be one of: {', '.join(valid_facet_fields)}")
         
+        if cursor and sort_by not in ('relevance', 'updated_at'):
+            raise ValidationException("Cursor pagination is only supported when sorting by relevance or updated_at")
+        cursor_values = self._decode_cursor(cursor) if cursor else {}
+        
+        # Facets don't depend on sorting or paging, so reuse cached counts
+        facet_key = (
+            query, fuzzy, tuple(sorted(tags or [])), tuple(sorted(created_by or [])),
+            created_after, created_before, updated_after, updated_before,
+            tuple(sorted(facet_fields))
+        )
+        cached_facets = self._cache.get_facets(user_id, facet_key) if include_facets else None
+        
         async with self._uow as uow:
             # Execute search through repository
             result = await uow.search_repository.search(
@@ -92,12 +116,51 @@ class SearchService:
                 offset=offset,
                 sort_by=sort_by,
                 sort_order=sort_order,
-                include_facets=include_facets,
-                facet_fields=facet_fields
+                include_facets=include_facets and cached_facets is None,
+                facet_fields=facet_fields,
+                **cursor_values
             )
-            
-            # Convert the result dictionary to SearchResponse
-            return SearchResponse(**result)
+        
+        if include_facets:
+            if cached_facets is None:
+                self._cache.put_facets(user_id, facet_key, result.get('facets') or {})
+            else:
+                result['facets'] = cached_facets
+        
+        sort_key = result.pop('sort_key', None)
+        if result.get('has_more') and result.get('results') and sort_key in self._CURSOR_KEYS:
+            result['next_cursor'] = self._encode_cursor(sort_key, result['results'][-1])
+        
+        # Convert the result dictionary to SearchResponse
+        return SearchResponse(**result)
+    
+    @staticmethod
+    def _encode_cursor(sort_key: str, last_result: Dict[str, Any]) -> str:
+        """Encode the last row's sort position as an opaque cursor."""
+        cursor_data = {
+            'k': sort_key,
+            'v': last_result[SearchService._CURSOR_KEYS[sort_key]],
+            'id': last_result['id']
+        }
+        return base64.urlsafe_b64encode(json.dumps(cursor_data).encode()).decode('utf-8')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Dict[str, Any]:
+        """Decode a cursor into keyword arguments for the search repository."""
+        try:
+            cursor_data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode('utf-8'))
+            sort_key = cursor_data['k']
+            cursor_id = int(cursor_data['id'])
+            if sort_key == 'score':
+                return {'cursor_score': float(cursor_data['v']), 'cursor_id': cursor_id}
+            if sort_key == 'updated_at':
+                return {
+                    'cursor_updated_at': datetime.fromisoformat(cursor_data['v']),
+                    'cursor_id': cursor_id
+                }
+        except (ValueError, KeyError, TypeError):
+            pass
+        raise ValidationException("Invalid search cursor", field="cursor")
     
     @with_error_handling
     async def suggest(
@@ -122,6 +185,10 @@ class SearchService:
         if limit < 1 or limit > 50:
             raise ValidationException("Limit must be between 1 and 50")
         
+        cached = self._cache.get_suggestions(user_id, query, limit)
+        if cached is not None:
+            return SuggestResponse(**{**cached, 'query': query, 'execution_time_ms': 0})
+        
         async with self._uow as uow:
             # Get suggestions through repository
             result = await uow.search_repository.suggest(
@@ -129,69 +196,66 @@ class SearchService:
                 query=query,
                 limit=limit
             )
-            
-            # Convert the result dictionary to SuggestResponse
-            return SuggestResponse(**result)
+        
+        self._cache.put_suggestions(user_id, query, limit, result)
+        
+        # Convert the result dictionary to SuggestResponse
+        return SuggestResponse(**result)
     
     # ========== Index Management Methods ==========
     
     @with_error_handling
     async def refresh_search_index(self) -> Dict[str, Any]:
         """
-        Manually refresh the search materialized view.
-        
-        This is typically called:
-        - After bulk imports
-        - During maintenance windows
-        - When immediate index updates are needed
+        Rebuild the search index for every dataset.
         
-        Note: REFRESH MATERIALIZED VIEW is a DDL operation that auto-commits.
+        Normal operation keeps the index current per dataset via domain events;
+        a full rebuild is only needed for:
+        - Recovery after manual data fixes
+        - Initial population of an existing database
         """
-        logger.info("Starting search index refresh")
+        logger.info("Starting search index rebuild")
         async with self._uow as uow:
             success = await uow.search_repository.refresh_search_index()
             
-            # Commit is not needed for REFRESH MATERIALIZED VIEW
-            # as it's a DDL operation that auto-commits
-            
             if success:
-                logger.info("Search index refresh completed successfully")
+                logger.info("Search index rebuild completed successfully")
             else:
-                logger.error("Search index refresh failed - check repository logs for details")
+                logger.error("Search index rebuild failed - check repository logs for details")
             
             return {
                 "success": success,
                 "message": "Search index refreshed successfully" if success else "Failed to refresh search index"
             }
     
-    # ========== Event Handler Helper Methods ==========
-    
-    async def handle_dataset_created(self, dataset_id: int) -> None:
+    async def refresh_datasets(self, dataset_ids: List[int]) -> int:
         """
-        Handle dataset creation by updating search index.
+        Recompute the search index rows for a batch of datasets.
         
-        Note: In production, consider batching these updates for better performance.
+        Deleted datasets are dropped from the index. Returns the number of
+        index rows touched.
         """
-        # For now, we refresh the entire index
-        # In future, consider incremental updates
-        await self.refresh_search_index()
+        if not dataset_ids:
+            return 0
+        async with self._uow as uow:
+            return await uow.search_repository.refresh_dataset_summaries(dataset_ids)
+    
+    # ========== Event Handler Helper Methods ==========
+    
+    async def handle_dataset_created(self, dataset_id: int) -> None:
+        """Add a newly created dataset to the search index."""
+        await self.refresh_datasets([dataset_id])
     
     async def handle_dataset_updated(self, dataset_id: int, changes: Dict[str, Any]) -> None:
         """
-        Handle dataset update by refreshing search index if searchable fields changed.
+        Update a dataset's index row if searchable fields changed.
         
         Only refreshes if fields that affect search results have changed.
         """
-        # Only refresh if searchable fields changed
         searchable_fields = {'name', 'description', 'tags'}
         if any(field in changes for field in searchable_fields):
-            await self.refresh_search_index()
+            await self.refresh_datasets([dataset_id])
     
     async def handle_dataset_deleted(self, dataset_id: int) -> None:
-        """
-        Handle dataset deletion by updating search index.
-        
-        The materialized view will automatically exclude deleted datasets
-        on next refresh since they won't exist in the source tables.
-        """
-        await self.refresh_search_index()
\ No newline at end of file
+        """Remove a deleted dataset from the search index."""
+        await self.refresh_datasets([dataset_id])
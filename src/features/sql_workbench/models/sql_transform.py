@@ -1,9 +1,10 @@
 """Request and response models for SQL transformation functionality."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from pydantic import BaseModel, Field, validator
 
 from .sql_preview import SqlSource
+from ..utils.preview_control import PREVIEW_TOKEN_PATTERN
 
 
 class SqlTransformTarget(BaseModel):
@@ -37,6 +38,10 @@ class SqlTransformRequest(BaseModel):
     offset: int = Field(0, ge=0, description="Number of rows to skip (for preview mode)")
     quick_preview: bool = Field(False, description="Use sampling for faster preview (approximate results)")
     sample_percent: float = Field(1.0, gt=0, le=100, description="Percentage of rows to sample when quick_preview=true (0.1-100)")
+    engine: Optional[Literal['postgres', 'duckdb']] = Field(None, description="Execution engine; defaults to the server's workbench_engine setting")
+    preview_token: Optional[str] = Field(None, pattern=PREVIEW_TOKEN_PATTERN, description="Client-chosen token for cancelling this preview while it runs (for preview mode)")
+    timeout_ms: Optional[int] = Field(None, ge=100, description="Statement timeout for the preview, capped by the server's limit (for preview mode)")
+    session: bool = Field(False, description="Spool the full result into a preview session whose pages are read by session_token (for preview mode)")
     
     @validator('sources')
     def validate_unique_aliases(cls, v):
@@ -112,6 +117,10 @@ class SqlTransformResponse(BaseModel):
     execution_time_ms: Optional[int] = Field(None, description="Query execution time in milliseconds (when save=False)")
     columns: Optional[List[Dict[str, str]]] = Field(None, description="Column names and types (when save=False)")
     has_more: Optional[bool] = Field(None, description="Whether more rows are available (when save=False)")
+    approximate: Optional[bool] = Field(None, description="Whether rows were computed over a random sample of the sources (when save=False)")
+    cost: Optional[Dict[str, Any]] = Field(None, description="Planner cost estimate the query was routed by")
+    preview_token: Optional[str] = Field(None, description="Token the preview ran under (when save=False)")
+    session_token: Optional[str] = Field(None, description="Token for reading further pages of the preview session (when session=True)")
     
     class Config:
         json_schema_extra = {
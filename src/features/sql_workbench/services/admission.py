@@ -0,0 +1,121 @@
+"""Admission control for workbench queries running on the API's pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.core.domain_exceptions import ResourceExhaustedException
+from src.infrastructure.config import get_settings
+
+
+class AdmissionController:
+    """
+    Limits concurrent workbench queries per user and in total.
+
+    Each admitted query holds its estimated cost against a global budget
+    and one of a fixed number of slots, so a few heavy queries can't take
+    every pooled connection from the rest of the API. A user already at
+    their concurrency limit is refused at once; otherwise a query waits up
+    to `wait_seconds` for budget and a slot before it is refused. A query
+    costing more than the whole budget is admitted alone.
+    """
+
+    def __init__(
+        self,
+        per_user_limit: int,
+        max_concurrent: int,
+        cost_budget: float,
+        wait_seconds: float
+    ):
+        self.per_user_limit = per_user_limit
+        self.max_concurrent = max_concurrent
+        self.cost_budget = cost_budget
+        self.wait_seconds = wait_seconds
+        self._per_user: Dict[int, int] = {}
+        self._running = 0
+        self._cost_in_use = 0.0
+        self._rejected = 0
+        self._condition = asyncio.Condition()
+
+    def _has_room(self, cost: float) -> bool:
+        return self._running < self.max_concurrent and self._cost_in_use + cost <= self.cost_budget
+
+    @asynccontextmanager
+    async def admit(self, user_id: int, cost: float = 0.0) -> AsyncIterator[None]:
+        """
+        Hold a slot and `cost` of the budget while the block runs.
+
+        Raises:
+            ResourceExhaustedException: If the user is at their limit or no
+                room frees up in time
+        """
+        cost = min(max(cost, 0.0), self.cost_budget)
+        if self._per_user.get(user_id, 0) >= self.per_user_limit:
+            self._rejected += 1
+            raise ResourceExhaustedException(
+                f"Too many concurrent workbench queries (limit {self.per_user_limit} per user)",
+                resource_type="workbench_user_queries",
+                limit=self.per_user_limit,
+                retry_after=1
+            )
+
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        try:
+            async with self._condition:
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(lambda: self._has_room(cost)),
+                        timeout=self.wait_seconds
+                    )
+                except asyncio.TimeoutError:
+                    self._rejected += 1
+                    raise ResourceExhaustedException(
+                        "The workbench is busy; try again shortly",
+                        resource_type="workbench_capacity",
+                        limit=self.max_concurrent,
+                        retry_after=max(int(self.wait_seconds), 1),
+                        details={'cost': round(cost, 1), 'cost_budget': self.cost_budget}
+                    )
+                self._running += 1
+                self._cost_in_use += cost
+            try:
+                yield
+            finally:
+                async with self._condition:
+                    self._running -= 1
+                    self._cost_in_use -= cost
+                    self._condition.notify_all()
+        finally:
+            remaining = self._per_user[user_id] - 1
+            if remaining:
+                self._per_user[user_id] = remaining
+            else:
+                del self._per_user[user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._running,
+            'max_concurrent': self.max_concurrent,
+            'cost_in_use': round(self._cost_in_use, 1),
+            'cost_budget': self.cost_budget,
+            'users': len(self._per_user),
+            'per_user_limit': self.per_user_limit,
+            'rejected': self._rejected,
+        }
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide workbench admission controller."""
+    global _admission_controller
+    if _admission_controller is None:
+        settings = get_settings()
+        _admission_controller = AdmissionController(
+            per_user_limit=settings.workbench_max_concurrent_per_user,
+            max_concurrent=settings.workbench_max_concurrent,
+            cost_budget=settings.workbench_cost_budget,
+            wait_seconds=settings.workbench_admission_wait_seconds
+        )
+    return _admission_controller
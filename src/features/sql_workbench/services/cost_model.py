@@ -0,0 +1,162 @@
+"""Cost estimates of workbench SQL from Postgres plans, and the routing they imply."""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.statements import COUNT_TABLE_ROWS
+from src.features.sql_workbench.utils import SqlExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# Source tables whose row counts are remembered; commits are immutable
+_MAX_CACHED_SOURCES = 4096
+
+
+class QueryClass(Enum):
+    """How a workbench query may be run, cheapest first."""
+    FAST = "fast"        # Exact preview on the API's pool
+    SAMPLE = "sample"    # Preview only over a random sample of the sources
+    JOB = "job"          # Too heavy for a preview; run it as a transform job
+    REJECT = "reject"    # Too heavy to run at all
+
+
+@dataclass
+class QueryCost:
+    """Planner estimate of one query, corrected with exact source row counts."""
+    estimated_rows: int
+    total_cost: float
+    width: int
+    source_rows: int
+    classification: QueryClass
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.estimated_rows * self.width
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'estimated_rows': self.estimated_rows,
+            'total_cost': round(self.total_cost, 1),
+            'width': self.width,
+            'source_rows': self.source_rows,
+            'classification': self.classification.value,
+            'reasons': self.reasons,
+        }
+
+
+class QueryCostModel:
+    """
+    Estimates workbench queries with EXPLAIN (FORMAT JSON) on the full CTE query.
+
+    The planner knows little about a single commit's share of the manifest
+    (sealed chunks are unnested, which it guesses at), so each source's
+    planned row count is compared with its exact count from the commit's
+    chunk totals. When the planner underestimates a source, the query's
+    cost and row estimate are scaled up by the worst such ratio. Nothing
+    is executed; EXPLAIN without ANALYZE only plans the query.
+    """
+
+    def __init__(
+        self,
+        fast_max_cost: float,
+        sample_max_cost: float,
+        job_max_cost: float,
+        max_result_bytes: int
+    ):
+        self.fast_max_cost = fast_max_cost
+        self.sample_max_cost = sample_max_cost
+        self.job_max_cost = job_max_cost
+        self.max_result_bytes = max_result_bytes
+        # (commit_id, table_key) -> (exact rows, planned rows)
+        self._source_stats: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+    async def estimate(self, sql: str, sources: List[Dict[str, Any]], db_pool) -> QueryCost:
+        """
+        Estimate `sql` over sources resolved to commit ids.
+
+        Raises:
+            ValueError: If Postgres cannot plan the query
+        """
+        if not db_pool:
+            raise ValueError("Database pool not available")
+
+        async with db_pool.acquire() as conn:
+            try:
+                plan = await self._explain(conn, SqlExecutor.build_query(sql, sources))
+                source_stats = [await self._source_stats_for(conn, source) for source in sources]
+            except Exception as e:
+                raise ValueError(f"SQL planning failed: {str(e)}")
+
+        source_rows = sum(exact for exact, _ in source_stats)
+        skew = max((exact / max(planned, 1.0) for exact, planned in source_stats), default=1.0)
+        scale = max(skew, 1.0)
+
+        cost = QueryCost(
+            estimated_rows=int(plan['Plan Rows'] * scale),
+            total_cost=plan['Total Cost'] * scale,
+            width=int(plan['Plan Width']),
+            source_rows=source_rows,
+            classification=QueryClass.FAST
+        )
+        if scale > 1.0:
+            cost.reasons.append(f"planner underestimated source rows by {scale:.1f}x")
+        self._classify(cost)
+        logger.debug(f"Workbench query cost: {cost.to_dict()}")
+        return cost
+
+    def _classify(self, cost: QueryCost) -> None:
+        if cost.total_cost > self.job_max_cost:
+            cost.classification = QueryClass.REJECT
+            cost.reasons.append(f"cost {cost.total_cost:.0f} exceeds the limit of {self.job_max_cost:.0f}")
+        elif cost.total_cost > self.sample_max_cost:
+            cost.classification = QueryClass.JOB
+            cost.reasons.append(f"cost {cost.total_cost:.0f} is above the preview limit of {self.sample_max_cost:.0f}")
+        elif cost.estimated_bytes > self.max_result_bytes:
+            cost.classification = QueryClass.JOB
+            cost.reasons.append(f"about {cost.estimated_bytes // (1024 * 1024)} MB of results")
+        elif cost.total_cost > self.fast_max_cost:
+            cost.classification = QueryClass.SAMPLE
+            cost.reasons.append(f"cost {cost.total_cost:.0f} is above the exact preview limit of {self.fast_max_cost:.0f}")
+
+    @staticmethod
+    async def _explain(conn, query: str) -> Dict[str, Any]:
+        """Root node of the query's plan."""
+        plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}")
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    async def _source_stats_for(self, conn, source: Dict[str, Any]) -> Tuple[int, float]:
+        key = (source['commit_id'], source['table_key'])
+        stats = self._source_stats.get(key)
+        if stats is None:
+            exact = await conn.fetchval(COUNT_TABLE_ROWS, source['commit_id'], source['table_key'])
+            planned = await self._explain(conn, SqlExecutor.source_cte_body(source))
+            stats = (int(exact or 0), float(planned['Plan Rows']))
+            if len(self._source_stats) >= _MAX_CACHED_SOURCES:
+                self._source_stats.clear()
+            self._source_stats[key] = stats
+        return stats
+
+
+_cost_model: Optional[QueryCostModel] = None
+
+
+def get_query_cost_model() -> QueryCostModel:
+    """Get the process-wide workbench cost model."""
+    global _cost_model
+    if _cost_model is None:
+        settings = get_settings()
+        _cost_model = QueryCostModel(
+            fast_max_cost=settings.workbench_fast_max_cost,
+            sample_max_cost=settings.workbench_sample_max_cost,
+            job_max_cost=settings.workbench_job_max_cost,
+            max_result_bytes=settings.workbench_preview_max_result_mb * 1024 * 1024
+        )
+    return _cost_model
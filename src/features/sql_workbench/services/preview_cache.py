@@ -1,98 +1,176 @@
-"""Simple in-memory cache for preview results in IDE-like environment."""
+"""Shared cache of workbench preview results, addressed by query and source commits."""
 
 import hashlib
-import time
-from typing import Dict, Any, Optional, Tuple
+import itertools
+from collections import OrderedDict
 from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import zstandard
+from sqlglot.errors import SqlglotError
+
+from src.features.sql_workbench.utils.sql_ast import SqlParseError, canonical_sql
+from src.infrastructure.config import get_settings
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Text that identifies a query in cache keys.
+
+    The query as regenerated by the parser, so reformatting or commenting
+    it keeps its cached results; SQL the parser rejects keys on its exact
+    text, never sharing a key with a different query.
+    """
+    try:
+        return canonical_sql(sql)
+    except (SqlParseError, SqlglotError):
+        return sql
+
+
+def _encode_default(value: Any) -> Any:
+    # Same conversions the API applies when it encodes the preview response
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
 
 @dataclass
-class CachedResult:
-    """Cached query result with metadata."""
-    data: list[Dict[str, Any]]
-    columns: list[Dict[str, str]]
-    total_row_count: Optional[int]
-    execution_time_ms: int
-    cached_at: float
-    query_hash: str
+class CachedBlock:
+    """One block of consecutive result rows, stored compressed."""
+    payload: bytes
+    row_count: int
+    is_last: bool
+    execution: int
 
 
 class PreviewCache:
     """
-    Simple LRU cache for preview query results.
-    Perfect for IDE-like environments where users run the same query multiple times.
+    LRU cache of preview results, bounded by compressed size.
+
+    A result is cached in fixed-size blocks of rows keyed by the normalized
+    SQL and the commit ids its sources resolved to. Commits are immutable,
+    so entries never go stale and are only evicted for space; a moved ref
+    resolves to a different commit and therefore a different key. Pages
+    that fall inside cached blocks are served without running the query.
+
+    Without a total ORDER BY, two executions of a query can return its rows
+    in different orders, so every block records the execution it came from
+    and a page is only served from blocks of a single execution.
     """
-    
-    def __init__(self, max_entries: int = 100, ttl_seconds: int = 300):
-        self.cache: Dict[str, CachedResult] = {}
-        self.max_entries = max_entries
-        self.ttl_seconds = ttl_seconds
-        self.access_order: list[str] = []
-    
-    def _compute_cache_key(self, sql: str, sources: list[Dict], limit: int, offset: int) -> str:
-        """Generate cache key from query parameters."""
-        # Include sources to handle same query on different datasets/refs
-        key_data = {
-            'sql': sql,
-            'sources': sorted(sources, key=lambda x: x['alias']),
-            'limit': limit,
-            'offset': offset
-        }
-        key_str = str(key_data)
-        return hashlib.md5(key_str.encode()).hexdigest()
-    
-    def get(self, sql: str, sources: list[Dict], limit: int, offset: int) -> Optional[CachedResult]:
-        """Get cached result if available and not expired."""
-        cache_key = self._compute_cache_key(sql, sources, limit, offset)
-        
-        if cache_key in self.cache:
-            result = self.cache[cache_key]
-            
-            # Check if expired
-            if time.time() - result.cached_at > self.ttl_seconds:
-                del self.cache[cache_key]
-                self.access_order.remove(cache_key)
+
+    def __init__(self, max_bytes: int, block_rows: int, compression_level: int = 3):
+        self.max_bytes = max_bytes
+        self.block_rows = block_rows
+        self._compression_level = compression_level
+        self._blocks: 'OrderedDict[Tuple[str, int], CachedBlock]' = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._executions = itertools.count(1)
+
+    @staticmethod
+    def query_key(sql: str, sources: List[Dict[str, Any]], engine: str = "postgres") -> str:
+        """Key of a query over sources resolved to commit ids."""
+        resolved = sorted(
+            (s['alias'], s['commit_id'], s['table_key']) for s in sources
+        )
+        key_data = orjson.dumps([normalize_sql(sql), resolved, engine])
+        return hashlib.sha256(key_data).hexdigest()
+
+    def new_execution(self) -> int:
+        """Id for the blocks of a new execution of a query."""
+        return next(self._executions)
+
+    def get_blocks(self, key: str, first: int, last: int) -> Optional[List[Tuple[List[str], List[list], bool]]]:
+        """
+        Columns, rows and end-of-result flag of blocks first..last.
+
+        Stops early at the block ending the result. None unless every block
+        is cached and all of them come from the same execution.
+        """
+        blocks = self._page_blocks(key, first, last)
+        if blocks is None:
+            self._misses += 1
+            return None
+        result = []
+        for index, block in blocks:
+            self._blocks.move_to_end((key, index))
+            columns, rows = orjson.loads(zstandard.ZstdDecompressor().decompress(block.payload))
+            result.append((columns, rows, block.is_last))
+        self._hits += len(result)
+        return result
+
+    def covers(self, key: str, offset: int, limit: int) -> bool:
+        """Whether a page can be served from cached blocks alone."""
+        return self._page_blocks(
+            key, offset // self.block_rows, (offset + limit - 1) // self.block_rows
+        ) is not None
+
+    def _page_blocks(self, key: str, first: int, last: int) -> Optional[List[Tuple[int, CachedBlock]]]:
+        blocks = []
+        for index in range(first, last + 1):
+            block = self._blocks.get((key, index))
+            if block is None or (blocks and block.execution != blocks[0][1].execution):
                 return None
-            
-            # Update access order (LRU)
-            self.access_order.remove(cache_key)
-            self.access_order.append(cache_key)
-            
-            return result
-        
+            blocks.append((index, block))
+            if block.is_last:
+                break
+        return blocks
+
+    def put_block(
+        self, key: str, index: int, columns: List[str], rows: List[list], is_last: bool, execution: int
+    ) -> None:
+        """Cache a block of `execution`; blocks larger than an eighth of the budget are not kept."""
+        encoded = orjson.dumps([columns, rows], default=_encode_default)
+        payload = zstandard.ZstdCompressor(level=self._compression_level).compress(encoded)
+        if len(payload) > self.max_bytes // 8:
+            return
+
+        previous = self._blocks.pop((key, index), None)
+        if previous is not None:
+            self._bytes -= len(previous.payload)
+        self._blocks[(key, index)] = CachedBlock(payload, len(rows), is_last, execution)
+        self._bytes += len(payload)
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._blocks.popitem(last=False)
+            self._bytes -= len(evicted.payload)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            'blocks': len(self._blocks),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'block_rows': self.block_rows,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_ratio': round(self._hits / lookups, 3) if lookups else 0.0,
+            'evictions': self._evictions,
+        }
+
+
+_preview_cache: Optional[PreviewCache] = None
+
+
+def get_preview_cache() -> Optional[PreviewCache]:
+    """Get the process-wide preview cache, or None when it is disabled."""
+    global _preview_cache
+    settings = get_settings()
+    if not settings.preview_cache_enabled:
         return None
-    
-    def put(self, sql: str, sources: list[Dict], limit: int, offset: int,
-            data: list[Dict[str, Any]], columns: list[Dict[str, str]], 
-            execution_time_ms: int, total_row_count: Optional[int] = None):
-        """Cache query result."""
-        cache_key = self._compute_cache_key(sql, sources, limit, offset)
-        
-        # Evict oldest if at capacity
-        if len(self.cache) >= self.max_entries and cache_key not in self.cache:
-            oldest_key = self.access_order.pop(0)
-            del self.cache[oldest_key]
-        
-        # Add to cache
-        self.cache[cache_key] = CachedResult(
-            data=data,
-            columns=columns,
-            total_row_count=total_row_count,
-            execution_time_ms=execution_time_ms,
-            cached_at=time.time(),
-            query_hash=cache_key
+    if _preview_cache is None:
+        _preview_cache = PreviewCache(
+            max_bytes=settings.preview_cache_max_mb * 1024 * 1024,
+            block_rows=settings.preview_cache_block_rows,
+            compression_level=settings.preview_cache_compression_level
         )
-        
-        if cache_key in self.access_order:
-            self.access_order.remove(cache_key)
-        self.access_order.append(cache_key)
-    
-    def invalidate_dataset(self, dataset_id: int):
-        """Invalidate all cached queries for a dataset."""
-        # In production, would track which queries use which datasets
-        # For now, clear all on any change
-        self.cache.clear()
-        self.access_order.clear()
-
-
-# Global cache instance
-_preview_cache = PreviewCache()
\ No newline at end of file
+    return _preview_cache
@@ -0,0 +1,286 @@
+"""Spooled workbench results that are paged without running the query again."""
+
+import asyncio
+import logging
+import secrets
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+
+from src.core.domain_exceptions import DomainException, ResourceExhaustedException
+from src.features.sql_workbench.utils.preview_control import interruption_error, limited_transaction
+from src.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Opaque session tokens; they also name the spool table
+SESSION_TOKEN_PATTERN = r"^[0-9a-f]{32}$"
+
+# Position of each spooled row, indexed so any page is one range scan
+ROW_NUMBER_COLUMN = "__session_row"
+
+# Rows read from the query's cursor per COPY into the spool table
+SPOOL_BATCH_ROWS = 5000
+
+# Class of the per-user advisory locks held while a session is created,
+# so that the user's session limit can't be overrun by concurrent creates
+SESSION_LOCK_CLASS = 0x64737073  # 'dsps'
+
+_SESSION_COLUMNS = "session_token, user_id, columns, row_count, truncated, created_at, last_accessed_at"
+
+
+@dataclass
+class PreviewSession:
+    """A query result spooled into an unlogged table in dsa_staging."""
+    token: str
+    user_id: int
+    columns: List[str]
+    row_count: int
+    truncated: bool  # The result had more rows than were spooled
+    created_at: datetime
+    last_accessed_at: datetime
+
+    @property
+    def spool_table(self) -> str:
+        return spool_table(self.token)
+
+    @classmethod
+    def from_row(cls, row: Any) -> 'PreviewSession':
+        return cls(
+            token=row['session_token'],
+            user_id=row['user_id'],
+            columns=list(row['columns']),
+            row_count=row['row_count'],
+            truncated=row['truncated'],
+            created_at=row['created_at'],
+            last_accessed_at=row['last_accessed_at']
+        )
+
+
+def spool_table(token: str) -> str:
+    return f"dsa_staging.preview_session_{token}"
+
+
+class PreviewSessionStore:
+    """
+    Preview sessions, shared by every API process through the database.
+
+    Creating a session runs the query once into an unlogged table numbered
+    by row, in the order a cursor over the query returns them; each page is then an index range scan on the row number, so
+    reading deep into a result costs the same as reading its first page.
+    Unlike WITH HOLD cursors, spooled tables don't pin a pooled connection
+    and can be read from any process. Sessions idle longer than
+    `idle_seconds` or older than `max_age_seconds` are reaped, and a user
+    may hold at most `max_per_user` at a time.
+    """
+
+    def __init__(self, max_rows: int, max_per_user: int, idle_seconds: int, max_age_seconds: int):
+        self.max_rows = max_rows
+        self.max_per_user = max_per_user
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+
+    async def create(self, user_id: int, query: str, db_pool) -> PreviewSession:
+        """
+        Spool the result of `query` into a new session of the user.
+
+        Raises:
+            ResourceExhaustedException: If the user already holds their
+                limit of live sessions
+        """
+        await self.reap(db_pool)
+        token = secrets.token_hex(16)
+        table = spool_table(token)
+
+        async with db_pool.acquire() as conn:
+            try:
+                async with limited_transaction(conn):
+                    # Held until commit, so concurrent creates of one user
+                    # count each other's sessions
+                    await conn.execute(
+                        "SELECT pg_advisory_xact_lock($1, $2)", SESSION_LOCK_CLASS, user_id
+                    )
+                    live = await conn.fetchval(
+                        "SELECT count(*) FROM dsa_staging.preview_sessions WHERE user_id = $1", user_id
+                    )
+                    if live >= self.max_per_user:
+                        raise ResourceExhaustedException(
+                            f"Too many open preview sessions (limit {self.max_per_user}); close one first",
+                            resource_type="workbench_preview_sessions",
+                            limit=self.max_per_user
+                        )
+
+                    await conn.execute(f"""
+                        CREATE UNLOGGED TABLE {table} AS
+                        SELECT 0::bigint AS {ROW_NUMBER_COLUMN}, spooled.*
+                        FROM ({query}) AS spooled
+                        WITH NO DATA
+                    """)
+                    row_count, truncated = await self._spool(conn, token, query)
+                    await conn.execute(f"CREATE UNIQUE INDEX ON {table} ({ROW_NUMBER_COLUMN})")
+                    columns = await conn.fetch(
+                        """
+                        SELECT attname::text AS attname FROM pg_attribute
+                        WHERE attrelid = $1::regclass AND attnum > 1 AND NOT attisdropped
+                        ORDER BY attnum
+                        """,
+                        table
+                    )
+                    row = await conn.fetchrow(
+                        f"""
+                        INSERT INTO dsa_staging.preview_sessions
+                            (session_token, user_id, columns, row_count, truncated)
+                        VALUES ($1, $2, $3, $4, $5)
+                        RETURNING {_SESSION_COLUMNS}
+                        """,
+                        token, user_id, [c['attname'] for c in columns], row_count, truncated
+                    )
+            except DomainException:
+                raise
+            except asyncpg.DuplicateColumnError as e:
+                raise ValueError(f"Preview sessions need distinct column names; alias the repeated columns ({e})")
+            except Exception as e:
+                error = interruption_error(e)
+                if error is not e:
+                    raise error
+                raise ValueError(f"Preview session failed: {str(e)}")
+
+        logger.info(f"Opened preview session {token} of user {user_id} with {row_count} rows")
+        return PreviewSession.from_row(row)
+
+    async def _spool(self, conn, token: str, query: str) -> Tuple[int, bool]:
+        """
+        Copy the query's rows into the session's table, numbered in the
+        order its cursor returns them.
+
+        Returns:
+            The number of rows spooled, and whether the result had more
+            than `max_rows`
+        """
+        raw = conn.raw_connection
+        row_count = 0
+        truncated = False
+        batch: List[tuple] = []
+        # One row past the cap tells whether the result was cut
+        async for record in raw.cursor(
+            f"SELECT * FROM ({query}) AS spooled LIMIT {self.max_rows + 1}", prefetch=SPOOL_BATCH_ROWS
+        ):
+            if row_count == self.max_rows:
+                truncated = True
+                break
+            row_count += 1
+            batch.append((row_count, *record.values()))
+            if len(batch) == SPOOL_BATCH_ROWS:
+                await self._copy_batch(raw, token, batch)
+                batch = []
+        if batch:
+            await self._copy_batch(raw, token, batch)
+        return row_count, truncated
+
+    @staticmethod
+    async def _copy_batch(raw, token: str, batch: List[tuple]) -> None:
+        await raw.copy_records_to_table(
+            f"preview_session_{token}", schema_name="dsa_staging", records=batch
+        )
+
+    async def get(self, token: str, user_id: int, db_pool) -> Optional[PreviewSession]:
+        """A live session of the user, marked as used; None if unknown or expired."""
+        row = await db_pool.fetchrow(
+            f"""
+            UPDATE dsa_staging.preview_sessions
+            SET last_accessed_at = now()
+            WHERE session_token = $1 AND user_id = $2
+            AND last_accessed_at > now() - make_interval(secs => $3)
+            AND created_at > now() - make_interval(secs => $4)
+            RETURNING {_SESSION_COLUMNS}
+            """,
+            token, user_id, float(self.idle_seconds), float(self.max_age_seconds)
+        )
+        return PreviewSession.from_row(row) if row else None
+
+    async def fetch(self, session: PreviewSession, offset: int, limit: int, db_pool) -> Optional[Dict[str, Any]]:
+        """
+        One page of a session as {'rows', 'columns'}.
+
+        Returns None if the session was reaped in the meantime.
+        """
+        try:
+            rows = await db_pool.fetch(
+                f"""
+                SELECT * FROM {session.spool_table}
+                WHERE {ROW_NUMBER_COLUMN} > $1
+                ORDER BY {ROW_NUMBER_COLUMN}
+                LIMIT $2
+                """,
+                offset, limit
+            )
+        except asyncpg.UndefinedTableError:
+            return None
+        return {
+            'rows': [list(row.values())[1:] for row in rows],
+            'columns': session.columns if rows else []
+        }
+
+    async def close(self, token: str, user_id: int, db_pool) -> bool:
+        """Drop a session of the user; False if it doesn't exist."""
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                deleted = await conn.fetchval(
+                    """
+                    DELETE FROM dsa_staging.preview_sessions
+                    WHERE session_token = $1 AND user_id = $2
+                    RETURNING session_token
+                    """,
+                    token, user_id
+                )
+                if deleted:
+                    await conn.execute(f"DROP TABLE IF EXISTS {spool_table(token)}")
+        return deleted is not None
+
+    async def reap(self, db_pool) -> int:
+        """Drop idle and expired sessions of every user; returns how many."""
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(
+                    """
+                    DELETE FROM dsa_staging.preview_sessions
+                    WHERE last_accessed_at <= now() - make_interval(secs => $1)
+                    OR created_at <= now() - make_interval(secs => $2)
+                    RETURNING session_token
+                    """,
+                    float(self.idle_seconds), float(self.max_age_seconds)
+                )
+                for row in rows:
+                    await conn.execute(f"DROP TABLE IF EXISTS {spool_table(row['session_token'])}")
+        if rows:
+            logger.info(f"Reaped {len(rows)} preview session(s)")
+        return len(rows)
+
+    async def run_reaper(self, db_pool, interval_seconds: float) -> None:
+        """Reap sessions every `interval_seconds` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.reap(db_pool)
+            except Exception as e:
+                logger.warning(f"Failed to reap preview sessions: {e}")
+
+
+_preview_session_store: Optional[PreviewSessionStore] = None
+
+
+def get_preview_session_store() -> PreviewSessionStore:
+    """Get the process-wide preview session store."""
+    global _preview_session_store
+    if _preview_session_store is None:
+        settings = get_settings()
+        _preview_session_store = PreviewSessionStore(
+            max_rows=settings.preview_session_max_rows,
+            max_per_user=settings.preview_sessions_per_user,
+            idle_seconds=settings.preview_session_idle_seconds,
+            max_age_seconds=settings.preview_session_max_age_seconds
+        )
+    return _preview_session_store
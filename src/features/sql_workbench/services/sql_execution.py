@@ -3,11 +3,18 @@
 import re
 import json
 import hashlib
+import logging
 import time
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 import asyncpg
 from .sql_validator import SqlValidator, ValidationLevel
+from src.features.sql_workbench.utils import DuckDBExecutor, DuckDBExecutionError
+from src.features.sql_workbench.utils.sql_ast import SqlParseError, parse_query
+from .cost_model import QueryCost, get_query_cost_model
+from .transform_output import ResultBatches, TransformOutputWriter, iter_query_batches
+from src.infrastructure.config import get_settings
+from src.features.jobs.services.progress import get_job_progress_publisher
 
 from dataclasses import dataclass
 from typing import Optional
@@ -41,6 +48,7 @@ class SqlExecutionPlan:
     estimated_rows: Optional[int] = None
     estimated_memory_mb: Optional[float] = None
     optimization_hints: Optional[List[str]] = None
+    engine: str = "postgres"
 
 @dataclass
 class SqlExecutionResult:
@@ -56,6 +64,8 @@ class SqlExecutionResult:
 # TableSchema now imported from src.core.models
 from src.infrastructure.postgres.database import DatabasePool
 
+logger = logging.getLogger(__name__)
+
 
 class SqlValidationService:
     """Service for validating SQL queries using unified validator."""
@@ -85,29 +95,34 @@ class SqlValidationService:
         self,
         sql: str,
         sources: List[SqlSource],
-        table_reader
+        table_reader,
+        cost: Optional[QueryCost] = None
     ) -> Dict[str, Any]:
         """Estimate memory and time requirements for the query."""
         # Use validator's resource estimation
         estimate = self._validator.get_resource_estimate(sql)
         
-        # Add source-specific estimations
-        # Basic estimation - assume 10000 rows per source
-        estimated_rows = len(sources) * 10000
-        
-        # Adjust based on complexity
-        if estimate['complexity'] == 'high':
-            estimated_rows *= 2
-        elif estimate['complexity'] == 'medium':
-            estimated_rows *= 1.5
-        
-        # Memory estimation (very rough)
-        bytes_per_row = 1000  # Assume 1KB per row average
-        estimated_memory_mb = (estimated_rows * bytes_per_row) / (1024 * 1024)
-        
-        # Adjust memory based on validator's assessment
-        if estimate['memory_usage'] == 'high':
-            estimated_memory_mb *= 2
+        if cost is not None:
+            # Planner estimate of the output rows and their width
+            estimated_rows = cost.estimated_rows
+            estimated_memory_mb = cost.estimated_bytes / (1024 * 1024)
+        else:
+            # Without a plan, assume 10000 rows per source
+            estimated_rows = len(sources) * 10000
+            
+            # Adjust based on complexity
+            if estimate['complexity'] == 'high':
+                estimated_rows *= 2
+            elif estimate['complexity'] == 'medium':
+                estimated_rows *= 1.5
+            
+            # Memory estimation (very rough)
+            bytes_per_row = 1000  # Assume 1KB per row average
+            estimated_memory_mb = (estimated_rows * bytes_per_row) / (1024 * 1024)
+            
+            # Adjust memory based on validator's assessment
+            if estimate['memory_usage'] == 'high':
+                estimated_memory_mb *= 2
         
         # Analyze SQL for operations
         sql_upper = sql.upper()
@@ -161,7 +176,8 @@ class SqlExecutionService:
         self,
         sources: List[SqlSource],
         sql: str,
-        target: SqlTarget
+        target: SqlTarget,
+        engine: str = "postgres"
     ) -> SqlExecutionPlan:
         """Create an optimized execution plan."""
         # Validate query first
@@ -173,8 +189,9 @@ class SqlExecutionService:
         sanitized_sql = self._validation_service.sanitize_query(sql)
         
         # Estimate resources
+        cost = await self._estimate_cost(sanitized_sql, sources)
         estimates = await self._validation_service.estimate_resource_usage(
-            sanitized_sql, sources, self._table_reader
+            sanitized_sql, sources, self._table_reader, cost
         )
         
         # Create plan
@@ -184,9 +201,34 @@ class SqlExecutionService:
             target=target,
             estimated_rows=estimates['estimated_rows'],
             estimated_memory_mb=estimates['estimated_memory_mb'],
-            optimization_hints=self._generate_optimization_hints(sanitized_sql, estimates)
+            optimization_hints=self._generate_optimization_hints(sanitized_sql, estimates),
+            engine=engine
         )
     
+    async def _estimate_cost(self, sql: str, sources: List[SqlSource]) -> Optional[QueryCost]:
+        """Planner cost over the sources' current commits, or None if it can't be planned."""
+        resolved = []
+        async with self._db_pool.acquire() as conn:
+            for source in sources:
+                commit_id = await conn.fetchval(
+                    "SELECT commit_id FROM dsa_core.refs WHERE dataset_id = $1 AND name = $2",
+                    source.dataset_id,
+                    source.ref
+                )
+                if commit_id is None:
+                    return None
+                resolved.append({
+                    'alias': source.alias,
+                    'commit_id': commit_id,
+                    'table_key': source.table_key
+                })
+        try:
+            return await get_query_cost_model().estimate(sql, resolved, self._db_pool)
+        except ValueError as e:
+            # Execution reports the same problem with its own error
+            logger.warning(f"Could not estimate SQL transformation cost: {e}")
+            return None
+    
     async def execute_transformation(
         self,
         plan: SqlExecutionPlan,
@@ -196,45 +238,32 @@ class SqlExecutionService:
         """Execute the SQL transformation according to the plan."""
         start_time = time.time()
         
+        duckdb_results = None
+        if plan.engine == "duckdb":
+            duckdb_results = await self._start_duckdb_transformation(plan)
+        
         async with self._db_pool.acquire() as conn:
             async with conn.transaction():
                 view_names = []
                 try:
-                    # Create temporary views for sources
-                    try:
-                        view_names = await self._create_source_views(
-                            conn, plan.sources, job_id
-                        )
-                    except Exception as e:
-                        import logging
-                        logger = logging.getLogger(__name__)
-                        logger.error(f"Failed to create source views: {str(e)}")
-                        raise Exception(f"View creation failed: {str(e)}")
-                    
-                    # Replace aliases with view names
-                    modified_sql = self._replace_aliases_with_views(
-                        plan.sql_query, view_names
-                    )
-                    
-                    # Log the modified SQL for debugging
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.info(f"Original SQL: {plan.sql_query}")
-                    logger.info(f"Modified SQL: {modified_sql}")
-                    
-                    # For save mode, use server-side processing
-                    # This avoids loading any data into application memory
-                    try:
-                        new_commit_id, rows_processed = await self._create_commit_with_results_server_side(
-                            conn,
-                            modified_sql,
-                            plan.target,
-                            user_id
+                    if duckdb_results is not None:
+                        # Results computed by DuckDB stream into the commit
+                        # through the same writer as Postgres results
+                        try:
+                            new_commit_id, rows_processed = await self._create_commit_with_results(
+                                conn,
+                                self._duckdb_batches(duckdb_results),
+                                plan,
+                                job_id,
+                                user_id
+                            )
+                        except Exception as e:
+                            logger.error(f"Committing DuckDB results failed: {str(e)}")
+                            raise Exception(f"SQL execution error: {str(e)}")
+                    else:
+                        new_commit_id, rows_processed = await self._execute_on_postgres(
+                            conn, plan, job_id, user_id, view_names
                         )
-                    except Exception as e:
-                        logger.error(f"SQL execution failed: {str(e)}")
-                        logger.error(f"Failed SQL was: {modified_sql}")
-                        raise Exception(f"SQL execution error: {str(e)}")
                     
                     # Update ref with optimistic locking if specified
                     await self._update_ref(
@@ -286,6 +315,93 @@ class SqlExecutionService:
                         except:
                             pass
     
+    async def _execute_on_postgres(
+        self,
+        conn,
+        plan: SqlExecutionPlan,
+        job_id: str,
+        user_id: int,
+        view_names: List[Tuple[str, str]]
+    ) -> Tuple[str, int]:
+        """Run the transformation in Postgres over temporary source views.
+        
+        The views created are appended to view_names so the caller drops them.
+        """
+        # Create temporary views for sources
+        try:
+            view_names.extend(await self._create_source_views(
+                conn, plan.sources, job_id
+            ))
+        except Exception as e:
+            logger.error(f"Failed to create source views: {str(e)}")
+            raise Exception(f"View creation failed: {str(e)}")
+        
+        # Replace aliases with view names
+        modified_sql = self._replace_aliases_with_views(
+            plan.sql_query, view_names
+        )
+        
+        # Log the modified SQL for debugging
+        logger.info(f"Original SQL: {plan.sql_query}")
+        logger.info(f"Modified SQL: {modified_sql}")
+        
+        # Results stream out of a server-side cursor in batches, so only a
+        # batch or two is ever held in application memory
+        try:
+            return await self._create_commit_with_results(
+                conn,
+                iter_query_batches(conn, modified_sql, get_settings().transform_batch_rows),
+                plan,
+                job_id,
+                user_id
+            )
+        except Exception as e:
+            logger.error(f"SQL execution failed: {str(e)}")
+            logger.error(f"Failed SQL was: {modified_sql}")
+            raise Exception(f"SQL execution error: {str(e)}")
+    
+    async def _start_duckdb_transformation(self, plan: SqlExecutionPlan):
+        """Start the transformation on DuckDB and read its first batch.
+        
+        Returns None when DuckDB can't run the query, so the caller uses
+        Postgres instead; queries fail to parse or bind before any rows are
+        produced, so nothing has been staged at that point.
+        """
+        async with self._db_pool.acquire() as conn:
+            sources = []
+            for source in plan.sources:
+                ref = await conn.fetchrow(
+                    "SELECT commit_id FROM dsa_core.refs WHERE dataset_id = $1 AND name = $2",
+                    source.dataset_id, source.ref
+                )
+                if not ref:
+                    raise ValueError(f"Ref '{source.ref}' not found")
+                sources.append({
+                    'alias': source.alias,
+                    'commit_id': ref['commit_id'],
+                    'table_key': source.table_key
+                })
+        
+        batches = DuckDBExecutor().iter_batches(plan.sql_query, sources, self._db_pool)
+        try:
+            first = await batches.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except DuckDBExecutionError as e:
+            logger.warning(f"DuckDB could not run the transformation, using Postgres: {e}")
+            return None
+        return first, batches
+    
+    @staticmethod
+    async def _duckdb_batches(duckdb_results) -> ResultBatches:
+        """The batches of a transformation started on DuckDB, first batch included."""
+        first, batches = duckdb_results
+        if first is None:
+            return
+        yield first
+        async for batch in batches:
+            yield batch
+    
     async def preview_results(
         self,
         sources: List[SqlSource],
@@ -357,10 +473,8 @@ class SqlExecutionService:
                 SELECT 
                     cr.logical_row_id,
                     r.data as data
-                FROM dsa_core.commit_rows cr
+                FROM dsa_core.commit_table_entries('{commit_id}', '{escaped_table_key}') cr
                 JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                WHERE cr.commit_id = '{commit_id}'
-                AND cr.logical_row_id LIKE '{escaped_table_key}:%'
             """)
             
             view_names.append((source.alias, view_name))
@@ -372,7 +486,19 @@ class SqlExecutionService:
         sql: str,
         view_names: List[Tuple[str, str]]
     ) -> str:
-        """Replace table aliases with temporary view names."""
+        """Replace table aliases with temporary view names.
+        
+        References are renamed on the parsed query, keeping each alias so
+        qualified columns still resolve; the text substitution below is
+        only used for SQL that doesn't parse.
+        """
+        try:
+            return parse_query(sql, [alias for alias, _ in view_names]).rename_sources(
+                {alias.lower(): view_name for alias, view_name in view_names}
+            )
+        except SqlParseError:
+            pass
+        
         modified_sql = sql
         
         # Sort by length descending to avoid partial replacements
@@ -412,14 +538,21 @@ class SqlExecutionService:
         
         return modified_sql
     
-    async def _create_commit_with_results_server_side(
+    async def _create_commit_with_results(
         self,
         conn: asyncpg.Connection,
-        transformation_sql: str,
-        target: SqlTarget,
+        batches: ResultBatches,
+        plan: SqlExecutionPlan,
+        job_id: str,
         user_id: int
     ) -> tuple[str, int]:
-        """Create a new commit with transformation results using server-side processing."""
+        """Create a new commit whose primary table holds the streamed result batches.
+        
+        Rows keep the order of the result, and the output schema is
+        inferred from the batches as they are written.
+        """
+        target = plan.target
+        
         # Generate commit ID with random component to ensure uniqueness
         import uuid
         commit_id = hashlib.sha256(
@@ -447,112 +580,46 @@ class SqlExecutionService:
         
         # Copy existing tables except the primary table (which we're replacing)
         if parent_commit_id:
-            await conn.execute("""
-                INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-                SELECT $1, logical_row_id, row_hash
-                FROM dsa_core.commit_rows
-                WHERE commit_id = $2
-                AND NOT (logical_row_id LIKE 'primary:%' OR logical_row_id LIKE 'primary\\_%')
-            """, commit_id, parent_commit_id)
-        
-        # Use server-side processing to insert transformation results
-        # This never loads data into application memory
-        # Build the query dynamically but safely
-        query_template = """
-            WITH transformation_results AS (
-                -- User's transformation SQL goes here
-                {transformation_sql}
-            ),
-            numbered_results AS (
-                SELECT 
-                    row_to_json(t.*)::jsonb as result_data,
-                    row_number() OVER () as row_num
-                FROM transformation_results t
-            ),
-            prepared_rows AS (
-                SELECT 
-                    json_build_object(
-                        'sheet_name', 'primary',
-                        'row_number', row_num,
-                        'data', result_data
-                    )::jsonb as full_data,
-                    -- For hash calculation, we only hash the actual data content
-                    -- This ensures deduplication works correctly
-                    encode(sha256(result_data::text::bytea), 'hex') as row_hash,
-                    row_num
-                FROM numbered_results
-            ),
-            row_inserts AS (
-                INSERT INTO dsa_core.rows (row_hash, data)
-                SELECT DISTINCT
-                    row_hash,
-                    full_data
-                FROM prepared_rows
-                ON CONFLICT (row_hash) DO NOTHING
+            # Untouched tables share the parent's manifest chunks
+            parent_tables = await conn.fetch(
+                "SELECT dsa_core.commit_table_keys($1) AS table_key", parent_commit_id
             )
-            INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-            SELECT 
-                '{commit_id}' as commit_id,
-                '{table_key}' || ':' || row_hash as logical_row_id,
-                row_hash
-            FROM prepared_rows
-            ON CONFLICT (commit_id, logical_row_id) DO NOTHING
-        """
+            for record in parent_tables:
+                if record['table_key'] != 'primary':
+                    await conn.execute(
+                        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3)",
+                        commit_id, parent_commit_id, record['table_key']
+                    )
         
-        # Format the query with actual values
-        # Note: commit_id is safe as it comes from our system
-        # Always use 'primary' as table key for workbench transformations
-        final_query = query_template.format(
-            transformation_sql=transformation_sql,
-            commit_id=commit_id,
-            table_key='primary'  # Workbench always outputs to primary table
+        async def report_progress(rows_written: int) -> None:
+            progress = {"rows_processed": rows_written, "stage": "writing"}
+            if plan.estimated_rows:
+                # The planner's estimate can be low; stay short of done until the commit is
+                progress["percentage"] = min(99, rows_written * 100 // plan.estimated_rows)
+            await self._update_job_progress(job_id, progress)
+        
+        # Workbench always outputs to the primary table
+        writer = TransformOutputWriter(
+            conn,
+            commit_id,
+            table_key='primary',
+            on_progress=report_progress,
+            progress_interval_seconds=get_settings().transform_progress_interval_seconds
         )
+        row_count = await writer.write(batches)
+        await conn.execute("SELECT dsa_core.seal_staged_table($1, 'primary')", commit_id)
         
-        rows_processed = await conn.execute(final_query)
-        
-        # Get actual count of rows processed
-        row_count = await conn.fetchval("""
-            SELECT COUNT(*) FROM dsa_core.commit_rows 
-            WHERE commit_id = $1 AND logical_row_id LIKE $2 || ':%'
-        """, commit_id, 'primary')  # Always use 'primary' for workbench
-        
-        # Create schema for the workbench output
-        # First, get a sample row to extract column names
-        sample_row = await conn.fetchrow("""
-            SELECT r.data
-            FROM dsa_core.commit_rows cr
-            JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE 'primary:%'
-            LIMIT 1
-        """, commit_id)
-        
-        columns_list = []
-        if sample_row and sample_row['data']:
-            data = sample_row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-            
-            # Extract actual data from standardized format
-            if isinstance(data, dict) and 'data' in data:
-                actual_data = data['data']
-                if isinstance(actual_data, dict):
-                    columns_list = list(actual_data.keys())
-        
-        # Create schema with 'primary' table
-        schema = {
-            'primary': {
-                'columns': columns_list
-            }
-        }
-        
-        # Insert the schema
         await conn.execute("""
             INSERT INTO dsa_core.commit_schemas (commit_id, schema_definition)
             VALUES ($1, $2)
             ON CONFLICT (commit_id) DO UPDATE SET schema_definition = EXCLUDED.schema_definition
-        """, commit_id, json.dumps(schema))
+        """, commit_id, json.dumps({'primary': writer.schema()}))
         
-        return commit_id, row_count or 0
+        return commit_id, row_count
+    
+    async def _update_job_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        """Record job progress outside the transformation's transaction, so it is visible while running."""
+        await get_job_progress_publisher().report(self._db_pool, job_id, progress)
     
     async def _update_ref(
         self,
@@ -4,6 +4,8 @@ from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from src.features.sql_workbench.utils.sql_ast import SqlParseError, WorkbenchQuery, parse_query
+
 
 class ValidationLevel(Enum):
     """Validation levels for SQL queries."""
@@ -26,14 +28,14 @@ class ValidationResult:
 
 
 class SqlValidator:
-    """Unified service for SQL query validation."""
+    """
+    Unified service for SQL query validation.
     
-    # Comprehensive list of disallowed SQL keywords for security
-    DISALLOWED_KEYWORDS = [
-        'DROP', 'CREATE', 'ALTER', 'TRUNCATE', 'DELETE', 'UPDATE', 
-        'INSERT', 'GRANT', 'REVOKE', 'EXECUTE', 'CALL', 'EXEC',
-        'MERGE', 'REPLACE', 'RENAME', 'COMMENT'
-    ]
+    Syntax, security and semantic checks run on the parsed query, so
+    keywords inside string literals or comments aren't mistaken for
+    statements, and errors carry the line and column they refer to.
+    Performance hints are still simple pattern matches on the text.
+    """
     
     # Performance-impacting patterns
     PERFORMANCE_WARNINGS = {
@@ -70,31 +72,26 @@ class SqlValidator:
         sql_normalized = sql.strip()
         sql_upper = sql_normalized.upper()
         
-        # Basic syntax validation
-        if level in [ValidationLevel.SYNTAX, ValidationLevel.ALL]:
-            syntax_errors = self._validate_syntax(sql_normalized)
-            errors.extend(syntax_errors)
+        # Parse once; syntax errors also stop the checks that need the tree
+        query, parse_error = self._parse(sql_normalized, sources)
+        if parse_error and level != ValidationLevel.PERFORMANCE:
+            errors.append(parse_error)
         
         # Security validation
-        if level in [ValidationLevel.SECURITY, ValidationLevel.ALL]:
-            security_errors = self._validate_security(sql_upper)
-            errors.extend(security_errors)
+        if query and level in [ValidationLevel.SECURITY, ValidationLevel.ALL]:
+            errors.extend(str(issue) for issue in query.security_issues())
         
         # Semantic validation (requires sources)
-        if level in [ValidationLevel.SEMANTIC, ValidationLevel.ALL] and sources:
-            semantic_errors, used_tables = self._validate_semantic(sql_normalized, sources)
-            errors.extend(semantic_errors)
-            referenced_tables.extend(used_tables)
+        if query and level in [ValidationLevel.SEMANTIC, ValidationLevel.ALL] and sources:
+            errors.extend(str(issue) for issue in query.semantic_issues())
         
         # Performance validation
         if level in [ValidationLevel.PERFORMANCE, ValidationLevel.ALL]:
             perf_warnings = self._validate_performance(sql_normalized)
             warnings.extend(perf_warnings)
         
-        # Extract referenced tables
-        tables = self._extract_referenced_tables(sql_normalized)
-        referenced_tables.extend(tables)
-        referenced_tables = list(set(referenced_tables))  # Remove duplicates
+        if query:
+            referenced_tables = query.table_names()
         
         # Add metadata
         metadata['query_length'] = len(sql_normalized)
@@ -111,138 +108,19 @@ class SqlValidator:
             metadata=metadata
         )
     
-    def _validate_syntax(self, sql: str) -> List[str]:
-        """Validate SQL syntax."""
-        errors = []
-        
+    @staticmethod
+    def _parse(
+        sql: str,
+        sources: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[Optional[WorkbenchQuery], Optional[str]]:
+        """The parsed query, or the syntax error that stopped it."""
         if not sql:
-            errors.append("SQL query cannot be empty")
-            return errors
-        
-        # Check for balanced parentheses
-        if sql.count('(') != sql.count(')'):
-            errors.append("Unbalanced parentheses in SQL query")
-        
-        # Check for balanced quotes
-        single_quotes = sql.count("'")
-        if single_quotes % 2 != 0:
-            errors.append("Unbalanced single quotes in SQL query")
-        
-        double_quotes = sql.count('"')
-        if double_quotes % 2 != 0:
-            errors.append("Unbalanced double quotes in SQL query")
-        
-        # Check for semicolon (warning, not error)
-        if not sql.rstrip().endswith(';'):
-            # This is a warning, not an error, handled in performance validation
-            pass
-        
-        # Check basic SELECT structure
-        if 'SELECT' in sql.upper() and 'FROM' not in sql.upper():
-            errors.append("SELECT statement missing FROM clause")
-        
-        return errors
-    
-    def _validate_security(self, sql_upper: str) -> List[str]:
-        """Validate SQL for security issues."""
-        errors = []
-        
-        # Check for disallowed keywords
-        for keyword in self.DISALLOWED_KEYWORDS:
-            if re.search(r'\b' + keyword + r'\b', sql_upper):
-                errors.append(f"Disallowed operation '{keyword}' not permitted in transformations")
-        
-        # Check for SQL injection patterns
-        if '--' in sql_upper:
-            errors.append("SQL comments (--) are not allowed for security reasons")
-        
-        if '/*' in sql_upper or '*/' in sql_upper:
-            errors.append("Block comments (/* */) are not allowed for security reasons")
-        
-        # Check for system tables/functions
-        system_patterns = ['INFORMATION_SCHEMA', 'PG_', 'MYSQL.', 'SYS.']
-        for pattern in system_patterns:
-            if pattern in sql_upper:
-                errors.append(f"Access to system tables/schemas ({pattern}) is not allowed")
-        
-        return errors
-    
-    def _validate_semantic(
-        self, 
-        sql: str, 
-        sources: List[Dict[str, Any]]
-    ) -> Tuple[List[str], List[str]]:
-        """Validate semantic correctness with available sources."""
-        errors = []
-        used_tables = []
-        
-        # Get available aliases
-        available_aliases = {source.get('alias', '') for source in sources}
-        available_aliases.discard('')  # Remove empty strings
-        
-        # First, remove SQL functions and their contents to avoid false positives
-        # This handles COUNT(), SUM(), json_extract(), etc.
-        sql_cleaned = sql
-        function_pattern = r'\b(?:COUNT|SUM|AVG|MAX|MIN|LENGTH|SUBSTR|SUBSTRING|TRIM|UPPER|LOWER|COALESCE|CAST|CONVERT|DATE|TIME|YEAR|MONTH|DAY|jsonb_extract_path|jsonb_extract_path_text|json_build_object|json_agg)\s*\([^)]*\)'
-        sql_cleaned = re.sub(function_pattern, ' FUNCTION_PLACEHOLDER ', sql_cleaned, flags=re.IGNORECASE)
-        
-        # Remove string literals
-        sql_cleaned = re.sub(r"'[^']*'", " STRING_LITERAL ", sql_cleaned)
-        sql_cleaned = re.sub(r'"[^"]*"', " STRING_LITERAL ", sql_cleaned)
-        
-        # Remove numeric literals
-        sql_cleaned = re.sub(r'\b\d+\b', " NUMBER ", sql_cleaned)
-        
-        # Find table references in SQL
-        # More specific patterns that only match actual table positions
-        table_patterns = [
-            # FROM table or FROM table alias
-            r'FROM\s+([a-zA-Z_]\w*)(?:\s+(?:AS\s+)?([a-zA-Z_]\w*))?',
-            # JOIN table or JOIN table alias  
-            r'(?:LEFT|RIGHT|INNER|OUTER|CROSS)?\s*JOIN\s+([a-zA-Z_]\w*)(?:\s+(?:AS\s+)?([a-zA-Z_]\w*))?',
-            # Additional tables in FROM clause (after commas)
-            r'FROM\s+[^,]+,\s*([a-zA-Z_]\w*)(?:\s+(?:AS\s+)?([a-zA-Z_]\w*))?'
-        ]
-        
-        found_tables = []
-        for pattern in table_patterns:
-            matches = re.findall(pattern, sql_cleaned, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                table_name = match[0]
-                alias = match[1] if len(match) > 1 and match[1] else None
-                
-                # Skip SQL keywords that might be caught
-                sql_keywords = {'DUAL', 'VALUES', 'LATERAL', 'UNNEST', 'TABLE', 'ONLY'}
-                if table_name.upper() in sql_keywords:
-                    continue
-                    
-                found_tables.append((table_name, alias))
-                used_tables.append(table_name)
-        
-        # Validate found tables against available sources
-        for table_name, alias in found_tables:
-            # Check if the table reference matches an available alias
-            if table_name in available_aliases:
-                continue
-            elif alias and alias in available_aliases:
-                # Table name doesn't matter if alias matches
-                continue
-            else:
-                # Check if it might be a CTE or subquery
-                if not self._is_cte_or_subquery(sql, table_name):
-                    errors.append(f"Table '{table_name}' not found in available sources")
-        
-        # Check for column references that look like table.column
-        # but where 'table' is actually an alias
-        column_ref_pattern = r'([a-zA-Z_]\w*)\.([a-zA-Z_]\w*)'
-        column_refs = re.findall(column_ref_pattern, sql_cleaned)
-        for table_ref, column_name in column_refs:
-            if table_ref not in available_aliases and table_ref not in [t[1] for t in found_tables if t[1]]:
-                # Only report error if it's not a function name or keyword
-                if table_ref.upper() not in sql_keywords and table_ref.upper() not in ['COUNT', 'SUM', 'AVG', 'MAX', 'MIN']:
-                    errors.append(f"Table or alias '{table_ref}' not found in query")
-        
-        return errors, used_tables
+            return None, "SQL query cannot be empty"
+        aliases = [source.get('alias', '') for source in sources or []]
+        try:
+            return parse_query(sql, [alias for alias in aliases if alias]), None
+        except SqlParseError as e:
+            return None, f"Invalid SQL: {e}"
     
     def _validate_performance(self, sql: str) -> List[str]:
         """Validate for performance issues."""
@@ -273,57 +151,6 @@ class SqlValidator:
         
         return warnings
     
-    def _extract_referenced_tables(self, sql: str) -> List[str]:
-        """Extract all referenced table names from SQL."""
-        tables = []
-        
-        # Remove string literals to avoid false matches
-        sql_cleaned = re.sub(r"'[^']*'", ' STRING ', sql)
-        sql_cleaned = re.sub(r'"[^"]*"', ' STRING ', sql_cleaned)
-        
-        # Remove function calls to avoid matching function names
-        function_pattern = r'\b(?:COUNT|SUM|AVG|MAX|MIN|LENGTH|SUBSTR|SUBSTRING|TRIM|UPPER|LOWER|COALESCE|CAST|CONVERT|DATE|TIME|YEAR|MONTH|DAY|jsonb_extract_path|jsonb_extract_path_text|json_build_object|json_agg)\s*\([^)]*\)'
-        sql_cleaned = re.sub(function_pattern, ' FUNCTION ', sql_cleaned, flags=re.IGNORECASE)
-        
-        # Find tables in FROM and JOIN clauses - more specific patterns
-        patterns = [
-            r'FROM\s+([a-zA-Z_]\w*)(?:\s+(?:AS\s+)?[a-zA-Z_]\w*)?',
-            r'(?:LEFT|RIGHT|INNER|OUTER|CROSS)?\s*JOIN\s+([a-zA-Z_]\w*)',
-            r'INTO\s+([a-zA-Z_]\w*)',
-            r'UPDATE\s+([a-zA-Z_]\w*)',
-            r'DELETE\s+FROM\s+([a-zA-Z_]\w*)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, sql_cleaned, re.IGNORECASE)
-            tables.extend(matches)
-        
-        # Remove duplicates and common keywords that might be matched
-        sql_keywords = {'SELECT', 'FROM', 'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 
-                       'OUTER', 'CROSS', 'ON', 'AS', 'BY', 'GROUP', 'ORDER', 'HAVING',
-                       'LIMIT', 'OFFSET', 'UNION', 'ALL', 'DISTINCT', 'VALUES', 'DUAL'}
-        
-        tables = [t for t in set(tables) if t.upper() not in sql_keywords]
-        
-        return tables
-    
-    def _is_cte_or_subquery(self, sql: str, table_name: str) -> bool:
-        """Check if a table name is defined as a CTE or subquery alias."""
-        sql_upper = sql.upper()
-        table_upper = table_name.upper()
-        
-        # Check if it's a CTE
-        cte_pattern = rf'WITH\s+.*?\b{table_upper}\s+AS\s*\('
-        if re.search(cte_pattern, sql_upper):
-            return True
-        
-        # Check if it's a subquery alias
-        subquery_pattern = rf'\)\s+(?:AS\s+)?{table_upper}\b'
-        if re.search(subquery_pattern, sql_upper):
-            return True
-        
-        return False
-    
     def get_resource_estimate(self, sql: str) -> Dict[str, Any]:
         """Estimate resource usage for the query."""
         sql_upper = sql.upper()
@@ -3,13 +3,25 @@
 import re
 from typing import Tuple
 
+from src.features.sql_workbench.utils.sql_ast import SqlParseError, parse_query
+
 def optimize_preview_query(user_sql: str, limit: int, offset: int) -> Tuple[str, bool]:
     """
     Optimize query for preview mode to avoid running expensive operations on full dataset.
     
+    The page limit is decided on the parsed query, so comments, string
+    literals and CTEs can't mislead it; the executor later pushes it below
+    joins where that is safe. SQL that doesn't parse gets the text
+    heuristics below and Postgres reports its error.
+    
     Returns:
         (optimized_sql, is_modified): The optimized query and whether it was modified
     """
+    try:
+        return parse_query(user_sql).with_limit(limit, offset), True
+    except SqlParseError:
+        pass
+    
     # Remove comments and normalize whitespace
     clean_sql = re.sub(r'--.*$', '', user_sql, flags=re.MULTILINE)
     clean_sql = re.sub(r'/\*.*?\*/', '', clean_sql, flags=re.DOTALL)
@@ -83,10 +95,8 @@ def create_approximate_preview_query(user_sql: str, sources: list[dict], limit:
         filtered_cte = f"""
         __{source['alias']}_filtered AS (
             SELECT logical_row_id, row_hash
-            FROM dsa_core.commit_rows
-            WHERE commit_id = '{source['commit_id']}'
-            AND logical_row_id LIKE '{source['table_key']}:%'
-            AND random() < {sample_ratio}  -- Sample BEFORE the join!
+            FROM dsa_core.commit_table_entries('{source['commit_id']}', '{source['table_key']}')
+            WHERE random() < {sample_ratio}  -- Sample BEFORE the join!
         )"""
         
         # Second CTE: Join only the sampled rows
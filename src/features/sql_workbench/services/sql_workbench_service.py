@@ -1,13 +1,24 @@
 """Consolidated service for all SQL workbench operations."""
+import contextlib
+import logging
 import time
+import uuid
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 
 from src.infrastructure.postgres.uow import PostgresUnitOfWork
 from src.core.permissions import PermissionService, PermissionCheck
-from src.features.sql_workbench.utils import SqlExecutor
+from src.features.sql_workbench.utils import SqlExecutor, DuckDBExecutor, DuckDBExecutionError
+from src.infrastructure.config import get_settings
 from .sql_validator import SqlValidator, ValidationLevel
+from .preview_cache import PreviewCache, get_preview_cache
+from .cost_model import QueryClass, QueryCost, get_query_cost_model
+from .admission import get_admission_controller
+from .preview_sessions import PreviewSession, get_preview_session_store
+from src.core.domain_exceptions import BusinessRuleViolation, DomainException
+from src.features.sql_workbench.utils.preview_control import PreviewLimits, get_preview_registry
+from src.infrastructure.postgres.database import DatabasePool
 from src.infrastructure.postgres.dataset_repo import PostgresDatasetRepository
 from src.infrastructure.postgres.job_repo import PostgresJobRepository
 from src.infrastructure.postgres.versioning_repo import PostgresCommitRepository
@@ -25,6 +36,9 @@ class OperationType(Enum):
     EXPORT = "export"
 
 
+logger = logging.getLogger(__name__)
+
+
 @dataclass
 class WorkbenchContext:
     """Context for workbench operations."""
@@ -46,7 +60,8 @@ class SqlWorkbenchService:
         sql_validator: Optional[SqlValidator] = None,
         job_repository: Optional[PostgresJobRepository] = None,
         dataset_repository: Optional[PostgresDatasetRepository] = None,
-        commit_repository: Optional[PostgresCommitRepository] = None
+        commit_repository: Optional[PostgresCommitRepository] = None,
+        preview_pool: Optional[DatabasePool] = None
     ):
         self._uow = uow
         self._permissions = permissions
@@ -55,6 +70,12 @@ class SqlWorkbenchService:
         self._job_repository = job_repository
         self._dataset_repository = dataset_repository
         self._commit_repository = commit_repository
+        self._preview_pool = preview_pool
+    
+    @property
+    def _query_pool(self) -> DatabasePool:
+        """Pool that runs workbench queries, kept apart from metadata traffic when configured."""
+        return self._preview_pool or self._uow._pool
     
     
     @with_transaction
@@ -108,12 +129,22 @@ class SqlWorkbenchService:
         if not validation.is_valid:
             raise ValueError(f"SQL transformation validation failed: {'; '.join(validation.errors)}")
         
+        # Estimate the full query; anything short of a rejection runs as a job
+        cost = await self._estimate_transform_cost(request)
+        if cost.classification == QueryClass.REJECT:
+            raise BusinessRuleViolation(
+                f"Query is too expensive to run ({'; '.join(cost.reasons)})",
+                rule="workbench_query_cost",
+                details=cost.to_dict()
+            )
+        
         # If dry run, return without creating job
         if request.dry_run:
             return SqlTransformResponse(
                 job_id="dry-run-no-job-created",
                 status="validated",
-                estimated_rows=None
+                estimated_rows=cost.estimated_rows,
+                cost=cost.to_dict()
             )
         
         # Get current commit ID for the target ref
@@ -134,6 +165,7 @@ class SqlWorkbenchService:
             "sources": [s.dict() for s in request.sources],
             "sql": request.sql,
             "target": request.target.dict(),
+            "engine": request.engine or get_settings().workbench_engine,
             "workbench_context": {
                 "operation_type": context.operation_type.value,
                 "user_id": user_id
@@ -149,13 +181,11 @@ class SqlWorkbenchService:
             run_parameters=job_parameters
         )
         
-        # Estimate rows if possible (simplified - would use EXPLAIN in production)
-        estimated_rows = await self._estimate_result_rows(request)
-        
         return SqlTransformResponse(
             job_id=str(job_id),
             status="pending",
-            estimated_rows=estimated_rows
+            estimated_rows=cost.estimated_rows,
+            cost=cost.to_dict()
         )
     
     async def _validate_preview_permissions(self, sources: List[SqlSource], user_id: int):
@@ -184,11 +214,19 @@ class SqlWorkbenchService:
             # In production, might have separate dataset creation permissions
             pass
     
-    async def _estimate_result_rows(self, request: SqlTransformRequest) -> int:
-        """Estimate the number of rows that will be produced by the transformation."""
-        # Simplified estimation - in production would use EXPLAIN ANALYZE
-        # For now, return None to indicate unknown
-        return None
+    async def _estimate_transform_cost(self, request: SqlTransformRequest) -> QueryCost:
+        """Plan-based cost of the transformation over the sources' current commits."""
+        sources = []
+        for source in request.sources:
+            ref = await self._uow.commits.get_ref(source.dataset_id, source.ref)
+            if not ref:
+                raise ValueError(f"Ref '{source.ref}' not found for dataset {source.dataset_id}")
+            sources.append({
+                'alias': source.alias,
+                'commit_id': ref['commit_id'],
+                'table_key': source.table_key
+            })
+        return await get_query_cost_model().estimate(request.sql, sources, self._query_pool)
     
     async def _handle_preview_mode(
         self,
@@ -206,6 +244,15 @@ class SqlWorkbenchService:
         # Validate read permissions only
         await self._validate_preview_permissions(request.sources, user_id)
         
+        # Previews get the same checks as transformations before either engine runs them
+        validation = await self._sql_validator.validate(
+            request.sql,
+            sources=[{'alias': s.alias} for s in request.sources],
+            level=ValidationLevel.ALL
+        )
+        if not validation.is_valid:
+            raise ValueError(f"SQL validation failed: {'; '.join(validation.errors)}")
+        
         # Build source information for SQL execution
         sources = []
         for source in request.sources:
@@ -222,62 +269,146 @@ class SqlWorkbenchService:
         
         # Execute query
         start = time.time()
+        has_more = None
+        total_row_count = None
+        session = None
+        engine = request.engine or get_settings().workbench_engine
         
-        if request.quick_preview:
-            # Use multi-CTE sampling for fast approximate results
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.info("Using quick preview with random sampling for approximate results")
-            
-            # Add pagination to the user query
-            paginated_sql = f"""
-            SELECT * FROM ({request.sql}) AS user_query
-            LIMIT {request.limit}
-            OFFSET {request.offset}
-            """
-            
-            try:
-                # Use the new sampled execution method
-                result = await self._sql_executor.execute_sql_with_sampled_sources(
-                    sql=paginated_sql,
-                    sources=sources,
-                    db_pool=self._uow._pool,
-                    sample_percent=request.sample_percent
-                )
-            except Exception as e:
-                # If sampling fails for any reason, fall back to regular query
-                logger.warning(f"Quick preview failed, falling back to regular query: {str(e)}")
-                
-                # Fall back to regular optimized query
-                from .sql_workbench_optimization import optimize_preview_query
-                paginated_sql, was_optimized = optimize_preview_query(
-                    request.sql, 
-                    request.limit, 
-                    request.offset
-                )
-                result = await self._sql_executor.execute_sql_with_sources(
-                    sql=paginated_sql,
-                    sources=sources,
-                    db_pool=self._uow._pool
-                )
+        from .sql_workbench_optimization import optimize_preview_query
+        if request.session:
+            # Sessions spool the exact result on Postgres, up to the session row cap
+            if request.quick_preview or request.engine == "duckdb":
+                raise ValueError("Preview sessions can't be combined with quick_preview or the duckdb engine")
+            engine = "postgres"
+            paginated_sql, _ = optimize_preview_query(
+                request.sql,
+                get_preview_session_store().max_rows + 1,
+                0
+            )
+            was_optimized = False
         else:
-            # Use exact results with optimization
-            from .sql_workbench_optimization import optimize_preview_query
             paginated_sql, was_optimized = optimize_preview_query(
                 request.sql, 
                 request.limit, 
                 request.offset
             )
+        # Queries that keep their own LIMIT can't be paged in blocks
+        cache = get_preview_cache() if was_optimized else None
+        cached = cache is not None and cache.covers(
+            cache.query_key(request.sql, sources, engine), request.offset, request.limit
+        )
+        
+        # Register the preview so it can be cancelled by token while it runs
+        preview_token = request.preview_token or uuid.uuid4().hex
+        limits = PreviewLimits.from_settings(request.timeout_ms)
+        with get_preview_registry().track(preview_token, user_id, limits):
+            # DuckDB runs exact previews fast enough that sampling isn't needed
+            sample = request.quick_preview and engine != "duckdb"
+            sample_percent = request.sample_percent
+            cost = None
+            if engine != "duckdb" and not sample and not cached:
+                cost = await get_query_cost_model().estimate(paginated_sql, sources, self._query_pool)
+                if cost.classification in (QueryClass.JOB, QueryClass.REJECT):
+                    action = "run it as a transform job" if cost.classification == QueryClass.JOB else "narrow the query"
+                    raise BusinessRuleViolation(
+                        f"Query is too expensive to preview ({'; '.join(cost.reasons)}); {action}",
+                        rule="workbench_query_cost",
+                        details=cost.to_dict()
+                    )
+                sample = cost.classification == QueryClass.SAMPLE and not request.session
+                if sample:
+                    # Sample just enough to bring the query near the exact-preview limit
+                    sample_percent = max(
+                        min(100.0 * get_query_cost_model().fast_max_cost / cost.total_cost, 100.0), 0.1
+                    )
             
-            result = await self._sql_executor.execute_sql_with_sources(
-                sql=paginated_sql,
-                sources=sources,
-                db_pool=self._uow._pool
-            )
+            if cached:
+                admission = contextlib.nullcontext()
+            else:
+                # A sampled query reads about sample_percent of what was estimated
+                admitted_cost = cost.total_cost if cost else 0.0
+                if sample and cost:
+                    admitted_cost *= sample_percent / 100.0
+                admission = get_admission_controller().admit(user_id, admitted_cost)
+            
+            async with admission:
+                if request.session:
+                    result, session = await self._create_preview_session(
+                        paginated_sql, sources, user_id, request.offset, request.limit
+                    )
+                    has_more = request.offset + len(result['rows']) < session.row_count
+                    total_row_count = None if session.truncated else session.row_count
+                elif sample:
+                    result, sample = await self._execute_sampled_preview(request, sources, sample_percent)
+                elif cache is not None:
+                    result, has_more, total_row_count = await self._execute_cached_preview(
+                        request, sources, cache, engine
+                    )
+                else:
+                    result = await self._execute_preview_query(paginated_sql, sources, engine)
         
         execution_time_ms = int((time.time() - start) * 1000)
+        data, columns = self._response_rows(result)
         
-        # Convert result format
+        # Check if there are more rows
+        if has_more is None:
+            has_more = len(data) == request.limit
+        
+        # Return preview response; the rows were just built, so skip re-validating them
+        return SqlTransformResponse.model_construct(
+            data=data,
+            row_count=len(data),
+            total_row_count=total_row_count,  # Known once the end of a cached result was read
+            execution_time_ms=execution_time_ms,
+            columns=columns,
+            has_more=has_more,
+            approximate=sample,
+            cost=cost.to_dict() if cost else None,
+            preview_token=preview_token,
+            session_token=session.token if session else None
+        )
+    
+    @with_error_handling
+    async def read_preview_session(
+        self,
+        session_token: str,
+        user_id: int,
+        offset: int,
+        limit: int
+    ) -> Optional[SqlTransformResponse]:
+        """
+        A page of one of the user's preview sessions.
+        
+        Returns:
+            None if the user has no live session under `session_token`
+        """
+        start = time.time()
+        store = get_preview_session_store()
+        session = await store.get(session_token, user_id, self._query_pool)
+        result = session and await store.fetch(session, offset, limit, self._query_pool)
+        if result is None:
+            return None
+        
+        data, columns = self._response_rows(result)
+        return SqlTransformResponse.model_construct(
+            data=data,
+            row_count=len(data),
+            total_row_count=None if session.truncated else session.row_count,
+            execution_time_ms=int((time.time() - start) * 1000),
+            columns=columns,
+            has_more=offset + len(data) < session.row_count,
+            approximate=False,
+            session_token=session.token
+        )
+    
+    @with_error_handling
+    async def close_preview_session(self, session_token: str, user_id: int) -> bool:
+        """Drop one of the user's preview sessions; False if it doesn't exist."""
+        return await get_preview_session_store().close(session_token, user_id, self._query_pool)
+    
+    @staticmethod
+    def _response_rows(result: Dict[str, Any]) -> tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """Rows and columns of a {'rows', 'columns'} result in response format."""
         data = []
         columns = []
         
@@ -289,16 +420,159 @@ class SqlWorkbenchService:
             for row in result['rows']:
                 row_dict = dict(zip(result['columns'], row))
                 data.append(row_dict)
+        return data, columns
+    
+    async def _create_preview_session(
+        self,
+        sql: str,
+        sources: List[Dict[str, Any]],
+        user_id: int,
+        offset: int,
+        limit: int
+    ) -> tuple[Dict[str, Any], PreviewSession]:
+        """
+        Spool the query into a new preview session of the user.
         
-        # Check if there are more rows
-        has_more = len(data) == request.limit
+        Returns:
+            The requested page as {'rows', 'columns'}, and the session
+        """
+        store = get_preview_session_store()
+        session = await store.create(user_id, self._sql_executor.build_query(sql, sources), self._query_pool)
+        result = await store.fetch(session, offset, limit, self._query_pool)
+        return result or {'rows': [], 'columns': []}, session
+    
+    async def _execute_sampled_preview(
+        self,
+        request: SqlTransformRequest,
+        sources: List[Dict[str, Any]],
+        sample_percent: float
+    ) -> tuple[Dict[str, Any], bool]:
+        """
+        Run the requested page over a random sample of each source.
         
-        # Return preview response
-        return SqlTransformResponse(
-            data=data,
-            row_count=len(data),
-            total_row_count=None,  # Would need a separate count query
-            execution_time_ms=execution_time_ms,
-            columns=columns,
-            has_more=has_more
-        )
\ No newline at end of file
+        Returns:
+            The page as {'rows', 'columns'} and whether it is approximate;
+            if sampling fails the exact query runs instead.
+        """
+        logger.info(f"Previewing over a {sample_percent:.2f}% random sample of the sources")
+        
+        # Add pagination to the user query
+        paginated_sql = f"""
+        SELECT * FROM ({request.sql}) AS user_query
+        LIMIT {request.limit}
+        OFFSET {request.offset}
+        """
+        
+        try:
+            result = await self._sql_executor.execute_sql_with_sampled_sources(
+                sql=paginated_sql,
+                sources=sources,
+                db_pool=self._query_pool,
+                sample_percent=sample_percent
+            )
+            return result, True
+        except DomainException:
+            # Cancellations and limits apply to the exact query as well
+            raise
+        except Exception as e:
+            # If sampling fails for any reason, fall back to regular query
+            logger.warning(f"Quick preview failed, falling back to regular query: {str(e)}")
+            
+            from .sql_workbench_optimization import optimize_preview_query
+            exact_sql, _ = optimize_preview_query(
+                request.sql, 
+                request.limit, 
+                request.offset
+            )
+            result = await self._sql_executor.execute_sql_with_sources(
+                sql=exact_sql,
+                sources=sources,
+                db_pool=self._query_pool
+            )
+            return result, False
+    
+    async def _execute_cached_preview(
+        self,
+        request: SqlTransformRequest,
+        sources: List[Dict[str, Any]],
+        cache: PreviewCache,
+        engine: str = "postgres"
+    ) -> tuple[Dict[str, Any], bool, Optional[int]]:
+        """
+        Read the requested page from cached result blocks.
+        
+        A page is only served from cache when all its blocks come from one
+        execution of the query: without a total ORDER BY, executions may
+        order rows differently, and mixing their blocks could repeat or
+        skip rows. Otherwise all the page's blocks are fetched with one
+        query and cached together, so the following pages of the result
+        are usually served without running the query again.
+        
+        Returns:
+            The page as {'rows', 'columns'}, whether more rows follow it, and
+            the total row count when the end of the result has been read.
+        """
+        from .sql_workbench_optimization import optimize_preview_query
+        key = cache.query_key(request.sql, sources, engine)
+        block_size = cache.block_rows
+        first = request.offset // block_size
+        last = (request.offset + request.limit - 1) // block_size
+        
+        columns: List[str] = []
+        rows: List[list] = []
+        end_reached = False
+        cached = cache.get_blocks(key, first, last)
+        if cached is not None:
+            for block_columns, block, end_reached in cached:
+                columns = columns or block_columns
+                rows.extend(block)
+        else:
+            window_sql, _ = optimize_preview_query(
+                request.sql,
+                (last - first + 1) * block_size,
+                first * block_size
+            )
+            result = await self._execute_preview_query(window_sql, sources, engine)
+            columns = result['columns']
+            fetched = result['rows']
+            execution = cache.new_execution()
+            for block_index in range(first, last + 1):
+                start = (block_index - first) * block_size
+                block = fetched[start:start + block_size]
+                end_reached = len(block) < block_size
+                cache.put_block(key, block_index, columns, block, end_reached, execution)
+                rows.extend(block)
+                if end_reached:
+                    break
+        
+        page_start = request.offset - first * block_size
+        page = rows[page_start:page_start + request.limit]
+        if end_reached:
+            total_row_count = first * block_size + len(rows)
+            has_more = request.offset + len(page) < total_row_count
+        else:
+            total_row_count = None
+            has_more = True
+        return {'rows': page, 'columns': columns if page else []}, has_more, total_row_count
+    
+    async def _execute_preview_query(
+        self,
+        sql: str,
+        sources: List[Dict[str, Any]],
+        engine: str
+    ) -> Dict[str, Any]:
+        """Run a paginated preview query, on DuckDB when requested and able."""
+        if engine == "duckdb":
+            try:
+                return await DuckDBExecutor().execute_sql_with_sources(
+                    sql=sql,
+                    sources=sources,
+                    db_pool=self._query_pool
+                )
+            except DuckDBExecutionError as e:
+                logger.warning(f"DuckDB could not run the preview, using Postgres: {e}")
+        return await self._sql_executor.execute_sql_with_sources(
+            sql=sql,
+            sources=sources,
+            db_pool=self._query_pool
+        )
@@ -0,0 +1,209 @@
+"""Streaming writer for the rows of a workbench transformation commit."""
+
+import asyncio
+import logging
+import time
+from decimal import Decimal
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+import xxhash
+
+logger = logging.getLogger(__name__)
+
+
+# Result rows in batches, as (column names, rows as dicts)
+ResultBatches = AsyncIterator[Tuple[List[str], List[Dict[str, Any]]]]
+
+_JSON_TYPES = ('json', 'jsonb')
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values the way row_to_json would for the types orjson lacks."""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _value_type(value: Any) -> str:
+    """Schema type of a value, named as the import path names them."""
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, (float, Decimal)):
+        return 'float'
+    return 'string'
+
+
+class SchemaInference:
+    """
+    Output schema built up batch by batch.
+
+    Values of a result column all decode to one Python type, so a column's
+    type is settled by its first non-null value and later batches only
+    look at columns that have been null so far.
+    """
+
+    def __init__(self):
+        self.columns: List[str] = []
+        self._types: Dict[str, Optional[str]] = {}
+
+    def observe(self, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+        for column in columns:
+            if column not in self._types:
+                self.columns.append(column)
+                self._types[column] = None
+            if self._types[column] is not None:
+                continue
+            value = next((row[column] for row in rows if row.get(column) is not None), None)
+            if value is not None:
+                self._types[column] = _value_type(value)
+
+    def schema(self, row_count: int) -> Dict[str, Any]:
+        return {
+            'columns': [
+                {'name': column, 'type': self._types[column] or 'string'}
+                for column in self.columns
+            ],
+            'row_count': row_count
+        }
+
+
+class TransformOutputWriter:
+    """
+    Write result batches into `rows` and stage their row keys for sealing.
+
+    Rows are numbered in result order and keyed '<table_key>:<row number>',
+    so the commit keeps the order of the result. Each row's data is
+    hashed with xxHash like imported rows; encoding and hashing run in a
+    thread while the next batch is fetched, and every batch is COPYed,
+    so memory stays bounded by one or two batches however large the result.
+    Row keys are staged in dsa_staging.import_row_keys; sealing the table
+    with dsa_core.seal_staged_table() moves them into manifest chunks.
+    """
+
+    def __init__(
+        self,
+        conn,
+        commit_id: str,
+        table_key: str = 'primary',
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+        progress_interval_seconds: float = 2.0
+    ):
+        self._conn = conn
+        self._commit_id = commit_id
+        self._table_key = table_key
+        self._on_progress = on_progress
+        self._progress_interval = progress_interval_seconds
+        self._last_progress = 0.0
+        self._staging_table = f"transform_rows_{commit_id[:16]}"
+        self.inference = SchemaInference()
+        self.rows_written = 0
+
+    async def write(self, batches: ResultBatches) -> int:
+        """Write every batch; returns the number of rows written."""
+        await self._conn.execute(
+            f"CREATE TEMPORARY TABLE {self._staging_table} (row_hash text, data jsonb) ON COMMIT DROP"
+        )
+        batch = await _next_batch(batches)
+        while batch is not None:
+            # Encode this batch while the next one is read
+            (manifest, rows), batch = await asyncio.gather(
+                asyncio.to_thread(self._encode, *batch),
+                _next_batch(batches)
+            )
+            await self._copy(manifest, rows)
+            await self._report_progress()
+        await self._report_progress(force=True)
+        return self.rows_written
+
+    def schema(self) -> Dict[str, Any]:
+        return self.inference.schema(self.rows_written)
+
+    def _encode(
+        self,
+        columns: List[str],
+        rows: List[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[str, str, str, str, int]], List[Tuple[str, str]]]:
+        """Manifest and row records for a batch, numbering rows after those already written."""
+        self.inference.observe(columns, rows)
+        manifest = []
+        encoded = []
+        row_number = self.rows_written
+        for row in rows:
+            row_number += 1
+            data = orjson.dumps(row, default=_json_default, option=orjson.OPT_SORT_KEYS)
+            # Only the data is hashed, so identical rows share one stored row
+            row_hash = xxhash.xxh64(data).hexdigest()
+            full_data = b''.join((
+                b'{"data":', data,
+                b',"row_number":', str(row_number).encode(),
+                b',"sheet_name":', orjson.dumps(self._table_key), b'}'
+            ))
+            manifest.append((self._commit_id, self._table_key, str(row_number), row_hash, row_number))
+            encoded.append((row_hash, full_data.decode('utf-8')))
+        self.rows_written = row_number
+        return manifest, encoded
+
+    async def _copy(self, manifest: List[Tuple[str, str, str, str, int]], rows: List[Tuple[str, str]]) -> None:
+        if not manifest:
+            return
+        raw = self._conn.raw_connection
+        await raw.execute(f"TRUNCATE {self._staging_table}")
+        await raw.copy_records_to_table(self._staging_table, records=rows, columns=['row_hash', 'data'])
+        await raw.execute(f"""
+            INSERT INTO dsa_core.rows (row_hash, data)
+            SELECT row_hash, data FROM {self._staging_table}
+            ON CONFLICT (row_hash) DO NOTHING
+        """)
+        await raw.copy_records_to_table(
+            'import_row_keys', schema_name='dsa_staging', records=manifest,
+            columns=['commit_id', 'table_key', 'row_key', 'row_hash', 'line_number']
+        )
+
+    async def _report_progress(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if self._on_progress is None or (not force and now - self._last_progress < self._progress_interval):
+            return
+        self._last_progress = now
+        try:
+            await self._on_progress(self.rows_written)
+        except Exception as e:
+            logger.warning(f"Failed to report transformation progress: {e}")
+
+
+async def _next_batch(batches: ResultBatches) -> Optional[Tuple[List[str], List[Dict[str, Any]]]]:
+    try:
+        return await batches.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def iter_query_batches(conn, sql: str, batch_rows: int) -> ResultBatches:
+    """
+    Rows of `sql` in batches through a server-side cursor.
+
+    Must run inside a transaction on `conn`. JSON columns, which asyncpg
+    returns as text, are decoded so they nest in the output rows like
+    row_to_json would nest them.
+    """
+    statement = await conn.raw_connection.prepare(sql)
+    attributes = statement.get_attributes()
+    columns = [attribute.name for attribute in attributes]
+    json_columns = [attribute.name for attribute in attributes if attribute.type.name in _JSON_TYPES]
+
+    def to_dicts(records) -> List[Dict[str, Any]]:
+        rows = [dict(record) for record in records]
+        for row in rows:
+            for column in json_columns:
+                if row[column] is not None:
+                    row[column] = orjson.loads(row[column])
+        return rows
+
+    cursor = await statement.cursor()
+    while True:
+        records = await cursor.fetch(batch_rows)
+        if not records:
+            return
+        yield columns, await asyncio.to_thread(to_dicts, records)
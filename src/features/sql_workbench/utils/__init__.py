@@ -1,4 +1,5 @@
 """SQL Workbench utilities."""
 from .sql_executor import SqlExecutor
+from .duckdb_executor import DuckDBExecutor, DuckDBExecutionError
 
-__all__ = ["SqlExecutor"]
\ No newline at end of file
+__all__ = ["SqlExecutor", "DuckDBExecutor", "DuckDBExecutionError"]
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""Workbench SQL execution in an embedded DuckDB over materialized source tables."""
+import asyncio
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import duckdb
+
+from src.infrastructure.config import get_settings
+from .table_materializer import MaterializedTable, TableMaterializer, get_table_materializer
+
+logger = logging.getLogger(__name__)
+
+
+# `data->>'col'` and `data->'data'->>'col'`, optionally qualified
+_QUALIFIER = r"(?:(\b[A-Za-z_][A-Za-z0-9_]*)\s*\.\s*)?"
+_FLAT_ACCESS = re.compile(_QUALIFIER + r"\bdata\s*->>\s*'((?:[^']|'')*)'", re.IGNORECASE)
+_NESTED_ACCESS = re.compile(_QUALIFIER + r"\bdata\s*->\s*'data'\s*->>\s*'((?:[^']|'')*)'", re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+# Postgres casts whose DuckDB spelling differs. Unqualified numeric is
+# arbitrary precision in Postgres but DECIMAL(18,3) in DuckDB.
+_CAST_REWRITES = [
+    (re.compile(r"::\s*(?:numeric|decimal)\b(?!\s*\()", re.IGNORECASE), "::DOUBLE"),
+    (re.compile(r"::\s*jsonb\b", re.IGNORECASE), "::JSON"),
+]
+
+
+class DuckDBExecutionError(Exception):
+    """DuckDB could not run a query; callers fall back to Postgres."""
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def to_duckdb_sql(sql: str, tables: Dict[str, MaterializedTable]) -> str:
+    """
+    Translate workbench SQL written for Postgres to run over DuckDB source views.
+
+    JSON lookups of a column that has an exact typed copy in every table
+    they could refer to are replaced with that column cast to text, which
+    reads back the same value without parsing the row JSON. Lookups that
+    can't be resolved that way stay on the view's `data` JSON column.
+    """
+    def candidates(qualifier: Optional[str]) -> List[MaterializedTable]:
+        if qualifier and qualifier in tables:
+            return [tables[qualifier]]
+        return list(tables.values())
+
+    def rewrite(nested: bool):
+        def replace(match: re.Match) -> str:
+            qualifier, column = match.group(1), match.group(2).replace("''", "'")
+            if all(t.nested == nested and column in t.exact_columns for t in candidates(qualifier)):
+                prefix = f"{qualifier}." if qualifier else ""
+                return f"CAST({prefix}{_quote(column)} AS VARCHAR)"
+            return match.group(0)
+        return replace
+
+    sql = _NESTED_ACCESS.sub(rewrite(True), sql)
+    sql = _FLAT_ACCESS.sub(rewrite(False), sql)
+
+    # Odd positions are string literals and stay untouched
+    parts = _STRING_LITERAL.split(sql)
+    for i in range(0, len(parts), 2):
+        for pattern, replacement in _CAST_REWRITES:
+            parts[i] = pattern.sub(replacement, parts[i])
+    return ''.join(parts)
+
+
+class DuckDBExecutor:
+    """
+    Executes workbench SQL in DuckDB with the same source alias model as Postgres.
+
+    Each alias is a view exposing `logical_row_id` and `data` (the stored row
+    JSON) like the Postgres source CTEs, plus a typed column per schema
+    column read from the materialized Parquet copy of the table.
+    """
+
+    def __init__(self, materializer: Optional[TableMaterializer] = None):
+        self._materializer = materializer or get_table_materializer()
+        settings = get_settings()
+        self._config = {
+            'threads': settings.duckdb_threads,
+            'memory_limit': settings.duckdb_memory_limit,
+        }
+
+    async def prepare_sources(self, sources: List[Dict[str, Any]], db_pool) -> Dict[str, MaterializedTable]:
+        """Materialize each source table, keyed by alias."""
+        tables = {}
+        for source in sources:
+            tables[source['alias']] = await self._materializer.get(
+                db_pool, source['commit_id'], source['table_key']
+            )
+        return tables
+
+    def _connect(self, tables: Dict[str, MaterializedTable]) -> duckdb.DuckDBPyConnection:
+        """
+        Connection with a view per source, sandboxed before any user SQL runs.
+
+        Only the sources' own Parquet files stay readable; other files,
+        URLs and environment variables are off, and the configuration is
+        locked so the query can't turn them back on.
+        """
+        con = duckdb.connect(database=':memory:', config=self._config)
+        try:
+            paths = ', '.join("'" + table.path.replace("'", "''") + "'" for table in tables.values())
+            if paths:
+                con.execute(f"SET allowed_paths = [{paths}]")
+            con.execute("SET enable_external_access = false")
+            for alias, table in tables.items():
+                typed = ''.join(f", {_quote(name)}" for name in table.columns)
+                path = table.path.replace("'", "''")
+                con.execute(
+                    f"CREATE VIEW {_quote(alias)} AS "
+                    f"SELECT logical_row_id, CAST(data AS JSON) AS data{typed} "
+                    f"FROM read_parquet('{path}')"
+                )
+            con.execute("SET lock_configuration = true")
+        except duckdb.Error as e:
+            con.close()
+            raise DuckDBExecutionError(str(e)) from e
+        return con
+
+    def _run(self, sql: str, tables: Dict[str, MaterializedTable]) -> Dict[str, Any]:
+        con = self._connect(tables)
+        try:
+            cursor = con.execute(sql)
+            columns = [column[0] for column in cursor.description]
+            rows = [list(row) for row in cursor.fetchall()]
+        except duckdb.Error as e:
+            raise DuckDBExecutionError(str(e)) from e
+        finally:
+            con.close()
+        return {'rows': rows, 'columns': columns if rows else []}
+
+    async def execute_sql_with_sources(
+        self,
+        sql: str,
+        sources: List[Dict[str, Any]],
+        db_pool
+    ) -> Dict[str, Any]:
+        """
+        Execute SQL over the given sources.
+
+        Args:
+            sql: The SQL query to execute, as written for Postgres
+            sources: Source tables with alias, commit_id and table_key
+            db_pool: Database pool used to materialize missing tables
+
+        Returns:
+            Dictionary with 'rows' and 'columns' keys
+        """
+        tables = await self.prepare_sources(sources, db_pool)
+        return await asyncio.to_thread(self._run, to_duckdb_sql(sql, tables), tables)
+
+    async def iter_batches(
+        self,
+        sql: str,
+        sources: List[Dict[str, Any]],
+        db_pool,
+        batch_rows: int = 50000
+    ) -> AsyncIterator[Tuple[List[str], List[Dict[str, Any]]]]:
+        """Yield (column names, rows as dicts) in batches as DuckDB produces them."""
+        tables = await self.prepare_sources(sources, db_pool)
+        duck_sql = to_duckdb_sql(sql, tables)
+
+        def start():
+            con = self._connect(tables)
+            try:
+                return con, con.execute(duck_sql).fetch_record_batch(batch_rows)
+            except duckdb.Error as e:
+                con.close()
+                raise DuckDBExecutionError(str(e)) from e
+
+        def next_batch(reader):
+            try:
+                return reader.read_next_batch()
+            except StopIteration:
+                return None
+            except duckdb.Error as e:
+                raise DuckDBExecutionError(str(e)) from e
+
+        con, reader = await asyncio.to_thread(start)
+        try:
+            columns = reader.schema.names
+            while True:
+                batch = await asyncio.to_thread(next_batch, reader)
+                if batch is None:
+                    return
+                yield columns, batch.to_pylist()
+        finally:
+            con.close()
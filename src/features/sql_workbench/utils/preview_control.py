@@ -0,0 +1,222 @@
+"""Limits, tracking and cancellation of interactive workbench previews."""
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import asyncpg
+
+from src.core.domain_exceptions import BusinessRuleViolation, ConflictException
+from src.infrastructure.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# Preview backends carry this application_name prefix while a query runs,
+# so any API process can find and cancel them through pg_stat_activity
+APPLICATION_NAME_PREFIX = "dsa-preview"
+
+# Client-chosen preview tokens; short enough to fit in application_name
+PREVIEW_TOKEN_PATTERN = r"^[A-Za-z0-9_-]{1,32}$"
+
+
+@dataclass
+class PreviewLimits:
+    """Per-query resource limits, applied with SET LOCAL semantics."""
+    statement_timeout_ms: int
+    work_mem: str
+    temp_file_limit: str
+
+    @classmethod
+    def from_settings(cls, timeout_ms: Optional[int] = None) -> 'PreviewLimits':
+        """Server limits, with the timeout lowered to `timeout_ms` if given."""
+        settings = get_settings()
+        limit = settings.preview_statement_timeout_ms
+        return cls(
+            statement_timeout_ms=min(timeout_ms, limit) if timeout_ms else limit,
+            work_mem=settings.preview_work_mem,
+            temp_file_limit=settings.preview_temp_file_limit
+        )
+
+
+class RunningPreview:
+    """A preview being executed by this process."""
+
+    __slots__ = ('token', 'user_id', 'limits', 'started_at', 'cancelled')
+
+    def __init__(self, token: str, user_id: int, limits: PreviewLimits):
+        self.token = token
+        self.user_id = user_id
+        self.limits = limits
+        self.started_at = time.time()
+        self.cancelled = False
+
+    @property
+    def application_name(self) -> str:
+        return application_name(self.user_id, self.token)
+
+
+def application_name(user_id: int, token: str) -> str:
+    return f"{APPLICATION_NAME_PREFIX}:{user_id}:{token}"
+
+
+_current_preview: ContextVar[Optional[RunningPreview]] = ContextVar('workbench_current_preview', default=None)
+
+# Whether this role may set temp_file_limit (superuser, or SET granted on
+# the parameter); found out on first use
+_temp_file_limit_allowed: Optional[bool] = None
+
+
+def current_preview() -> Optional[RunningPreview]:
+    return _current_preview.get()
+
+
+class PreviewRegistry:
+    """
+    Previews running in this process, by token.
+
+    Cancelling goes through pg_stat_activity rather than this registry's
+    own state, so a preview can be cancelled from any API process; the
+    registry only lets this process report the cancellation correctly
+    and stop previews that haven't reached the database yet.
+    """
+
+    def __init__(self):
+        self._running: Dict[str, RunningPreview] = {}
+
+    @contextmanager
+    def track(self, token: str, user_id: int, limits: PreviewLimits) -> Iterator[RunningPreview]:
+        """Register a preview for the duration of the block."""
+        if token in self._running:
+            raise ConflictException(f"A preview with token '{token}' is already running")
+        preview = RunningPreview(token, user_id, limits)
+        self._running[token] = preview
+        context_token = _current_preview.set(preview)
+        try:
+            yield preview
+        finally:
+            _current_preview.reset(context_token)
+            self._running.pop(token, None)
+
+    async def cancel(self, token: str, user_id: int, db_pool) -> bool:
+        """
+        Cancel a user's preview wherever it runs.
+
+        Returns:
+            False if the user has no preview running under `token`
+        """
+        preview = self._running.get(token)
+        found = preview is not None and preview.user_id == user_id
+        if found:
+            preview.cancelled = True
+
+        row = await db_pool.fetchrow(
+            """
+            SELECT count(*) FILTER (WHERE pg_cancel_backend(pid)) AS cancelled
+            FROM pg_stat_activity
+            WHERE application_name = $1 AND pid <> pg_backend_pid()
+            """,
+            application_name(user_id, token)
+        )
+        cancelled = row['cancelled'] if row else 0
+        if cancelled:
+            logger.info(f"Cancelled preview {token} of user {user_id} on {cancelled} backend(s)")
+        return found or cancelled > 0
+
+    @staticmethod
+    async def list_backends(user_id: int, db_pool) -> List[Dict[str, Any]]:
+        """A user's preview queries currently running on the database."""
+        rows = await db_pool.fetch(
+            """
+            SELECT application_name, pid, state, wait_event_type, wait_event, query_start
+            FROM pg_stat_activity
+            WHERE application_name LIKE $1
+            ORDER BY query_start
+            """,
+            application_name(user_id, '') + '%'
+        )
+        return [
+            {
+                'preview_token': row['application_name'].rsplit(':', 1)[-1],
+                'pid': row['pid'],
+                'state': row['state'],
+                'wait_event': row['wait_event'] and f"{row['wait_event_type']}:{row['wait_event']}",
+                'query_start': row['query_start'],
+            }
+            for row in rows
+        ]
+
+
+_preview_registry: Optional[PreviewRegistry] = None
+
+
+def get_preview_registry() -> PreviewRegistry:
+    """Get the process-wide registry of running previews."""
+    global _preview_registry
+    if _preview_registry is None:
+        _preview_registry = PreviewRegistry()
+    return _preview_registry
+
+
+@asynccontextmanager
+async def limited_transaction(conn) -> AsyncIterator[None]:
+    """
+    Run the block in a transaction with preview limits set locally.
+
+    Limits come from the current preview, or the server defaults outside
+    one. The settings end with the transaction, so the pooled connection
+    goes back unchanged.
+    """
+    global _temp_file_limit_allowed
+    preview = current_preview()
+    if preview is not None and preview.cancelled:
+        raise ConflictException(f"Preview '{preview.token}' was cancelled")
+    limits = preview.limits if preview is not None else PreviewLimits.from_settings()
+
+    raw = conn.raw_connection
+    async with raw.transaction():
+        await raw.execute(
+            "SELECT set_config('statement_timeout', $1, true), set_config('work_mem', $2, true)",
+            str(limits.statement_timeout_ms),
+            limits.work_mem
+        )
+        if _temp_file_limit_allowed is not False:
+            try:
+                # A savepoint, so a refusal doesn't abort the preview
+                async with raw.transaction():
+                    await raw.execute(
+                        "SELECT set_config('temp_file_limit', $1, true)", limits.temp_file_limit
+                    )
+                _temp_file_limit_allowed = True
+            except asyncpg.InsufficientPrivilegeError:
+                _temp_file_limit_allowed = False
+                logger.warning("Database role may not set temp_file_limit; previews run without it")
+        if preview is not None:
+            await raw.execute(
+                "SELECT set_config('application_name', $1, true)", preview.application_name
+            )
+        yield
+
+
+def interruption_error(error: Exception) -> Exception:
+    """Domain error for a preview query Postgres stopped; other errors pass through."""
+    preview = current_preview()
+    if isinstance(error, asyncpg.QueryCanceledError):
+        if 'statement timeout' in str(error):
+            timeout_ms = (preview.limits if preview else PreviewLimits.from_settings()).statement_timeout_ms
+            return BusinessRuleViolation(
+                f"Preview exceeded its {timeout_ms} ms time limit; narrow the query or run it as a transform job",
+                rule="workbench_statement_timeout",
+                details={'timeout_ms': timeout_ms}
+            )
+        token = preview.token if preview else None
+        return ConflictException(f"Preview '{token}' was cancelled" if token else "Preview was cancelled")
+    if isinstance(error, asyncpg.ConfigurationLimitExceededError):
+        return BusinessRuleViolation(
+            "Preview needs more temporary disk space than allowed; run it as a transform job",
+            rule="workbench_temp_file_limit",
+            details={'error': str(error)}
+        )
+    return error
@@ -0,0 +1,664 @@
+"""Parsed workbench SQL: validation with positions, source resolution and rewrites."""
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.errors import ParseError, SqlglotError, TokenError
+from sqlglot.optimizer.scope import Scope, traverse_scope
+from sqlglot.tokens import TokenType
+
+logger = logging.getLogger(__name__)
+
+
+DIALECT = "postgres"
+
+# Columns every source CTE exposes
+SOURCE_COLUMNS = ("data", "logical_row_id")
+
+# Operators reading a key or path out of a JSONB value
+_JSON_EXTRACTIONS = (exp.JSONExtract, exp.JSONExtractScalar, exp.JSONBExtract, exp.JSONBExtractScalar)
+
+# Statements that change data or schema, anywhere in the query
+_DISALLOWED_NODES = (
+    exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop, exp.Alter,
+    exp.TruncateTable, exp.Grant, exp.Copy, exp.Command
+)
+
+# Functions that reach outside the query's own data
+_SYSTEM_FUNCTION_PREFIXES = ("pg_", "lo_", "dblink")
+_SYSTEM_FUNCTIONS = {"set_config", "current_setting", "query_to_xml", "txid_current"}
+_SYSTEM_SCHEMAS = {"pg_catalog", "information_schema"}
+
+# Expressions that may not be moved to where they'd run a different number of times
+_VOLATILE_NODES = (exp.Rand, exp.Uuid)
+_VOLATILE_FUNCTIONS = {"random", "nextval", "setval", "clock_timestamp", "timeofday", "gen_random_uuid"}
+
+# Expressions that change how many rows a SELECT returns per input row
+_SET_RETURNING_NODES = (exp.Explode, exp.Unnest, exp.GenerateSeries)
+_SET_RETURNING_FUNCTIONS = {
+    "jsonb_array_elements", "jsonb_array_elements_text", "jsonb_each", "jsonb_each_text",
+    "jsonb_object_keys", "jsonb_path_query", "json_array_elements", "json_array_elements_text",
+    "json_each", "json_each_text", "json_object_keys", "regexp_matches", "regexp_split_to_table",
+    "string_to_table", "generate_subscripts"
+}
+
+# Functions a query may read rows from in FROM; any other table function,
+# such as DuckDB's file readers, reaches outside the sources
+_TABLE_FUNCTIONS = {"generate_series", "unnest"} | _SET_RETURNING_FUNCTIONS
+
+# Names Postgres gives an unaliased `expr::type` column, by type
+_CAST_COLUMN_NAMES = {
+    exp.DataType.Type.INT: "int4",
+    exp.DataType.Type.BIGINT: "int8",
+    exp.DataType.Type.SMALLINT: "int2",
+    exp.DataType.Type.DECIMAL: "numeric",
+    exp.DataType.Type.TEXT: "text",
+    exp.DataType.Type.BOOLEAN: "bool",
+    exp.DataType.Type.DATE: "date",
+    exp.DataType.Type.JSONB: "jsonb",
+    exp.DataType.Type.JSON: "json",
+    exp.DataType.Type.DOUBLE: "float8",
+    exp.DataType.Type.VARCHAR: "varchar",
+    exp.DataType.Type.TIMESTAMP: "timestamp",
+    exp.DataType.Type.TIMESTAMPTZ: "timestamptz",
+}
+
+
+class SqlParseError(ValueError):
+    """SQL the workbench can't parse, with the position of the problem."""
+
+    def __init__(self, message: str, line: Optional[int] = None, column: Optional[int] = None):
+        self.message = message
+        self.line = line
+        self.column = column
+        super().__init__(_at(message, line, column))
+
+
+@dataclass
+class QueryIssue:
+    """A validation error found in a parsed query."""
+    message: str
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+    def __str__(self) -> str:
+        return _at(self.message, self.line, self.column)
+
+
+@dataclass
+class SourceScan:
+    """
+    The CTE one reference to a source reads through.
+
+    `columns` lists (name, expression over `r.data`) pairs, or is None when
+    the reference needs the whole `data` value; `predicates` and `limit`
+    are applied while scanning, before the reference reaches any join.
+    """
+    source_alias: str
+    name: str
+    columns: Optional[List[Tuple[str, str]]] = None
+    predicates: List[str] = field(default_factory=list)
+    limit: Optional[int] = None
+
+
+@dataclass
+class SourceRewrite:
+    """A query rewritten to read its sources through per-reference CTEs."""
+    sql: str
+    scans: List[SourceScan]
+    ctes: List[str]  # The query's own CTE definitions, to follow the source CTEs
+    recursive: bool = False
+
+
+def _at(message: str, line: Optional[int], column: Optional[int]) -> str:
+    return f"{message} (line {line}, column {column})" if line else message
+
+
+def _normalized(identifier: exp.Expression) -> str:
+    """Name as Postgres resolves it: unquoted identifiers fold to lower case."""
+    if isinstance(identifier, exp.Identifier) and identifier.quoted:
+        return identifier.name
+    return identifier.name.lower()
+
+
+def _from_clause(select: exp.Expression) -> Optional[exp.From]:
+    return next((value for value in select.args.values() if isinstance(value, exp.From)), None)
+
+
+def _conjuncts(condition: exp.Expression) -> Iterator[exp.Expression]:
+    condition = condition.unnest()
+    if isinstance(condition, exp.And):
+        yield from _conjuncts(condition.this)
+        yield from _conjuncts(condition.expression)
+    else:
+        yield condition
+
+
+def _function_name(node: exp.Expression) -> Optional[str]:
+    if isinstance(node, exp.Anonymous):
+        return node.name.lower()
+    return None
+
+
+def _is_system_function(name: str) -> bool:
+    return name in _SYSTEM_FUNCTIONS or name.startswith(_SYSTEM_FUNCTION_PREFIXES)
+
+
+def _table_function_name(function: exp.Func) -> str:
+    if isinstance(function, exp.Anonymous):
+        return function.name.lower()
+    if isinstance(function, exp.GenerateSeries):
+        return "generate_series"
+    return function.sql_name().lower()
+
+
+def _is_volatile(node: exp.Expression) -> bool:
+    return any(
+        isinstance(n, _VOLATILE_NODES) or _function_name(n) in _VOLATILE_FUNCTIONS
+        for n in node.walk()
+    )
+
+
+def _returns_sets(node: exp.Expression) -> bool:
+    return any(
+        isinstance(n, _SET_RETURNING_NODES) or _function_name(n) in _SET_RETURNING_FUNCTIONS
+        for n in node.walk()
+    )
+
+
+@lru_cache(maxsize=512)
+def _parse(sql: str) -> Tuple[exp.Query, str]:
+    """The single query in `sql`, and its text without a trailing semicolon."""
+    dialect = Dialect.get_or_raise(DIALECT)
+    try:
+        tokens = dialect.tokenize(sql)
+        statements = dialect.parser().parse(tokens, sql)
+    except ParseError as e:
+        error = e.errors[0] if e.errors else {}
+        raise SqlParseError(error.get('description') or str(e), error.get('line'), error.get('col')) from e
+    except TokenError as e:
+        raise SqlParseError(str(e)) from e
+
+    statements = [s for s in statements if s is not None]
+    if not statements:
+        raise SqlParseError("SQL query cannot be empty")
+    if len(statements) > 1:
+        separators = [t for t in tokens if t.token_type == TokenType.SEMICOLON]
+        token = separators[0] if separators else None
+        raise SqlParseError(
+            "Only a single statement is allowed",
+            token.line if token else None,
+            token.col if token else None
+        )
+    statement = statements[0]
+    if not isinstance(statement, exp.Query):
+        first = tokens[0]
+        raise SqlParseError(
+            f"Only SELECT queries are allowed, not {first.text.upper()}", first.line, first.col
+        )
+
+    body = sql
+    if tokens[-1].token_type == TokenType.SEMICOLON:
+        body = sql[:tokens[-1].start] + sql[tokens[-1].end + 1:]
+    return statement, body.rstrip()
+
+
+class WorkbenchQuery:
+    """
+    A user query parsed once, with its references to workbench sources resolved.
+
+    Sources are the per-alias CTEs the executor puts in front of the query;
+    a table reference resolves to one unless it is schema-qualified or a
+    CTE of the query's own shadows the alias. The tree is parsed with the
+    Postgres dialect and is only regenerated for rewrites that change it,
+    so limit injection keeps the user's text as written.
+    """
+
+    def __init__(self, sql: str, source_aliases: Iterable[str] = ()):
+        tree, self.body = _parse(sql)
+        self.tree = tree.copy()
+        self.source_aliases = {alias.lower() for alias in source_aliases}
+        try:
+            self._scopes: Optional[List[Scope]] = traverse_scope(self.tree)
+        except SqlglotError as e:
+            # Scope analysis only feeds rewrites and alias checks
+            logger.debug(f"Could not analyze query scopes: {e}")
+            self._scopes = None
+
+    # ========== Resolution ==========
+
+    def _position(self, node: exp.Expression) -> Tuple[Optional[int], Optional[int]]:
+        """Line and column of the first identifier in `node`."""
+        for identifier in node.find_all(exp.Identifier):
+            start = identifier.meta.get('start')
+            if start is not None:
+                line_start = self.body.rfind('\n', 0, start) + 1
+                return self.body.count('\n', 0, start) + 1, start - line_start + 1
+        return None, None
+
+    def _issue(self, message: str, node: exp.Expression) -> QueryIssue:
+        return QueryIssue(message, *self._position(node))
+
+    def _is_source(self, node: exp.Expression) -> bool:
+        return (
+            isinstance(node, exp.Table)
+            and isinstance(node.this, exp.Identifier)
+            and not node.args.get('db')
+            and _normalized(node.this) in self.source_aliases
+        )
+
+    def _source_references(self) -> List[Tuple[Scope, exp.Table]]:
+        """Every table node reading a source, with the scope it is selected in."""
+        references = {}
+        for scope in self._scopes or []:
+            for _, node in scope.selected_sources.values():
+                # Lateral subqueries see their outer tables too; keep the first scope
+                if self._is_source(node) and id(node) not in references:
+                    references[id(node)] = (scope, node)
+        return list(references.values())
+
+    @staticmethod
+    def _lookup(scope: Scope, name: str) -> Optional[exp.Expression]:
+        """The table or subquery `name` refers to from `scope`, searching outward."""
+        while scope is not None:
+            if name in scope.sources:
+                return scope.sources[name]
+            scope = scope.parent
+        return None
+
+    def _owner(self, scope: Scope, column: exp.Column) -> Tuple[bool, Optional[exp.Table]]:
+        """
+        The source table a column reads from.
+
+        Returns:
+            (resolved, table): `resolved` is False when the column might
+            belong to a source but the query doesn't say which
+        """
+        if column.table:
+            node = self._lookup(scope, column.table)
+            return True, node if self._is_source(node) else None
+        if _normalized(column.this) not in SOURCE_COLUMNS:
+            return True, None
+        while scope is not None:
+            selected = list(scope.selected_sources.values())
+            if len(selected) == 1:
+                node = selected[0][1]
+                return True, node if self._is_source(node) else None
+            if len(selected) > 1:
+                return False, None
+            scope = scope.parent
+        return False, None
+
+    # ========== Validation ==========
+
+    def table_names(self) -> List[str]:
+        """Names of the tables the query reads, excluding its own CTEs."""
+        cte_names = {cte.alias_or_name for cte in self.tree.find_all(exp.CTE)}
+        return sorted({
+            table.name for table in self.tree.find_all(exp.Table)
+            if table.name and table.name not in cte_names
+        })
+
+    def security_issues(self) -> List[QueryIssue]:
+        """Statements, tables and functions a read-only transformation may not use."""
+        issues = []
+        for node in self.tree.find_all(*_DISALLOWED_NODES):
+            operation = node.key.upper() if not isinstance(node, exp.Command) else node.name.upper()
+            issues.append(self._issue(f"Disallowed operation '{operation}' not permitted in transformations", node))
+        for select in self.tree.find_all(exp.Select):
+            if select.args.get('into'):
+                issues.append(self._issue("SELECT INTO is not permitted in transformations", select.args['into']))
+            if select.args.get('locks'):
+                issues.append(self._issue("Row locking clauses are not permitted in transformations", select))
+        for table in self.tree.find_all(exp.Table):
+            schema = table.args.get('db')
+            if schema is not None:
+                qualified = '.'.join(part.name for part in table.parts)
+                issues.append(self._issue(f"Access to schema-qualified table '{qualified}' is not allowed", table))
+            elif table.name.lower().startswith("pg_") or table.name.lower() in _SYSTEM_SCHEMAS:
+                issues.append(self._issue(f"Access to system table '{table.name}' is not allowed", table))
+        for function in self.tree.find_all(exp.Anonymous):
+            name = function.name.lower()
+            if _is_system_function(name):
+                issues.append(self._issue(f"System function '{name}' is not allowed", function))
+        for node in self.tree.find_all(exp.Table, exp.Lateral):
+            if isinstance(node.this, exp.Func):
+                name = _table_function_name(node.this)
+                if name not in _TABLE_FUNCTIONS and not _is_system_function(name):
+                    issues.append(self._issue(f"Table function '{name}' is not allowed", node.this))
+        return issues
+
+    def semantic_issues(self) -> List[QueryIssue]:
+        """Tables, aliases and source columns the query uses but doesn't have."""
+        issues = []
+        cte_names = {cte.alias_or_name for cte in self.tree.find_all(exp.CTE)}
+        for table in self.tree.find_all(exp.Table):
+            if table.args.get('db') or not table.name or table.name in cte_names:
+                continue
+            if not self._is_source(table):
+                issues.append(self._issue(f"Table '{table.name}' not found in available sources", table))
+
+        for scope in self._scopes or []:
+            for column in scope.columns:
+                if not column.table:
+                    continue
+                node = self._lookup(scope, column.table)
+                if node is None:
+                    issues.append(self._issue(
+                        f"Table or alias '{column.table}' not found in query", column.args['table']
+                    ))
+                elif (
+                    self._is_source(node)
+                    and not isinstance(column.this, exp.Star)
+                    and _normalized(column.this) not in SOURCE_COLUMNS
+                ):
+                    issues.append(self._issue(
+                        f"Source '{column.table}' has no column '{column.name}'; "
+                        f"its values are read from {column.table}.data",
+                        column.this
+                    ))
+        return issues
+
+    # ========== Rewrites ==========
+
+    def with_limit(self, limit: int, offset: int = 0) -> str:
+        """The query limited to one page, as text; a query with its own limit is wrapped."""
+        page = f"LIMIT {limit}" + (f"\nOFFSET {offset}" if offset else "")
+        tree = self.tree
+        own_limit = any(tree.args.get(arg) for arg in ('limit', 'offset', 'fetch', 'locks'))
+        if isinstance(tree, exp.Select) and not own_limit:
+            # Comments and literals stay as written; the newline ends a trailing line comment
+            return f"{self.body}\n{page}"
+        return f"SELECT * FROM (\n{self.body}\n) AS preview_result\n{page}"
+
+    def rename_sources(self, names: Dict[str, str]) -> str:
+        """The query with source references renamed, keeping their aliases."""
+        changed = False
+        for table in list(self.tree.find_all(exp.Table)):
+            new_name = names.get(_normalized(table.this)) if self._is_source(table) else None
+            if new_name:
+                self._rename(table, new_name)
+                changed = True
+        return self.tree.sql(DIALECT) if changed else self.body
+
+    @staticmethod
+    def _rename(table: exp.Table, new_name: str) -> None:
+        if not table.alias:
+            table.set('alias', exp.TableAlias(this=exp.to_identifier(table.name)))
+        table.set('this', exp.to_identifier(new_name))
+
+    def push_down(self) -> Optional[SourceRewrite]:
+        """
+        Give each source reference its own CTE carrying what can run before joins.
+
+        Single-table WHERE conjuncts move into the reference's CTE when it
+        isn't on the nullable side of an outer join; JSON keys extracted
+        from `data` become CTE columns when `data` isn't used otherwise; a
+        page limit moves into the leftmost source of a query that only
+        left-joins to it. Postgres inlines each single-reference CTE, so
+        none of these change results, and a source joined to itself is no
+        longer materialized whole.
+
+        Returns:
+            None when the query reads no source in a way this changes
+        """
+        references = self._source_references()
+        if not references:
+            return None
+
+        scans: Dict[int, SourceScan] = {}
+        counts: Dict[str, int] = {}
+        for _, table in references:
+            alias = _normalized(table.this)
+            counts[alias] = counts.get(alias, 0) + 1
+            scans[id(table)] = SourceScan(source_alias=alias, name=f"__{alias}_{counts[alias]}")
+
+        self._push_predicates(scans)
+        self._push_projections(references, scans)
+        self._push_limit(scans)
+
+        tables = {id(table): table for _, table in references}
+        rewritten = [
+            scan for key, scan in scans.items()
+            if counts[scan.source_alias] > 1
+            or scan.columns is not None or scan.predicates or scan.limit is not None
+        ]
+        with_ = self.tree.args.get('with_')
+        if not rewritten and with_ is None:
+            return None
+        for key, scan in scans.items():
+            if scan in rewritten:
+                self._rename(tables[key], scan.name)
+
+        ctes, recursive = [], False
+        if with_ is not None:
+            recursive = bool(with_.args.get('recursive'))
+            ctes = [cte.sql(DIALECT) for cte in with_.expressions]
+            with_.pop()
+        return SourceRewrite(sql=self.tree.sql(DIALECT), scans=rewritten, ctes=ctes, recursive=recursive)
+
+    def _pushable_references(self, select: exp.Select) -> List[exp.Table]:
+        """Source tables of a SELECT whose rows may be filtered before its joins."""
+        from_clause = _from_clause(select)
+        if from_clause is None:
+            return []
+        joins = select.args.get('joins') or []
+        if any(join.args.get('using') or join.args.get('method') for join in joins):
+            return []
+        sides = {join.side for join in joins}
+        tables = []
+        if self._is_source(from_clause.this) and not sides & {'RIGHT', 'FULL'}:
+            tables.append(from_clause.this)
+        if not sides - {''}:
+            tables.extend(join.this for join in joins if self._is_source(join.this))
+        return tables
+
+    def _push_predicates(self, scans: Dict[int, SourceScan]) -> None:
+        for scope in self._scopes or []:
+            select = scope.expression
+            if not isinstance(select, exp.Select) or not select.args.get('where'):
+                continue
+            targets = {id(table) for table in self._pushable_references(select)}
+            if not targets:
+                continue
+
+            kept, moved = [], False
+            for condition in _conjuncts(select.args['where'].this):
+                table = self._predicate_target(scope, condition)
+                if table is not None and id(table) in targets:
+                    scans[id(table)].predicates.append(self._over_rows(condition).sql(DIALECT))
+                    moved = True
+                else:
+                    kept.append(condition)
+            if moved:
+                select.set('where', exp.Where(this=exp.and_(*kept, copy=False)) if kept else None)
+
+    def _predicate_target(self, scope: Scope, condition: exp.Expression) -> Optional[exp.Table]:
+        """The one source table a condition reads, if it can be evaluated on that table alone."""
+        if condition.find(exp.Subquery, exp.Select, exp.AggFunc, exp.Window, exp.Star) or _is_volatile(condition):
+            return None
+        owners = set()
+        tables = {}
+        for column in condition.find_all(exp.Column):
+            resolved, table = self._owner(scope, column)
+            if not resolved or table is None or _normalized(column.this) not in SOURCE_COLUMNS:
+                return None
+            owners.add(id(table))
+            tables[id(table)] = table
+        if len(owners) != 1:
+            return None
+        table = next(iter(tables.values()))
+        # Only a table selected in this scope; correlated references stay put
+        return table if any(node is table for node in scope.sources.values()) else None
+
+    @staticmethod
+    def _over_rows(condition: exp.Expression) -> exp.Expression:
+        """A condition rewritten against the rows a source CTE scans."""
+        condition = condition.copy()
+        for column in list(condition.find_all(exp.Column)):
+            name = _normalized(column.this)
+            column.replace(exp.column(name, table='r' if name == 'data' else 'cr'))
+        return condition
+
+    def _push_projections(
+        self,
+        references: List[Tuple[Scope, exp.Table]],
+        scans: Dict[int, SourceScan]
+    ) -> None:
+        extractions: Dict[int, List[exp.Expression]] = {id(table): [] for _, table in references}
+        whole: set = set()
+
+        # Columns of conditions moved into a CTE are no longer part of the query
+        attached = {id(column) for column in self.tree.find_all(exp.Column)}
+        for scope in self._scopes or []:
+            select = scope.expression
+            bare_star = isinstance(select, exp.Select) and any(
+                isinstance(projection, exp.Star) for projection in select.expressions
+            )
+            qualifiers = {star.table for star in scope.stars if isinstance(star, exp.Column)}
+            for name, (_, node) in scope.selected_sources.items():
+                if self._is_source(node) and (bare_star or name in qualifiers):
+                    whole.add(id(node))
+            for column in scope.columns:
+                if id(column) not in attached or isinstance(column.this, exp.Star):
+                    continue
+                resolved, table = self._owner(scope, column)
+                if not resolved:
+                    whole.update(extractions)
+                    continue
+                if table is None:
+                    if not column.table and column.name in scope.selected_sources:
+                        # A bare alias is a whole-row reference
+                        whole.add(id(scope.selected_sources[column.name][1]))
+                    continue
+                if _normalized(column.this) != 'data':
+                    continue
+                extraction = self._extraction_of(column)
+                if extraction is None:
+                    whole.add(id(table))
+                else:
+                    extractions[id(table)].append(extraction)
+
+        for key, nodes in extractions.items():
+            if key in whole or any(_output_name(node) is False for node in nodes):
+                continue
+            columns: Dict[str, str] = {}
+            for node in nodes:
+                over_rows = node.copy()
+                _root_column(over_rows).replace(exp.column('data', table='r'))
+                expression = over_rows.sql(DIALECT)
+                name = columns.setdefault(expression, f"__c{len(columns)}")
+                self._replace_extraction(node, exp.column(name, table=_root_column(node).table or None))
+            scans[key].columns = [(name, expression) for expression, name in columns.items()]
+
+    @staticmethod
+    def _extraction_of(column: exp.Column) -> Optional[exp.Expression]:
+        """The longest constant JSON key path read from a `data` column, if that's all it is used for."""
+        node: exp.Expression = column
+        while isinstance(node.parent, _JSON_EXTRACTIONS) and node.parent.this is node:
+            if node.parent.expression.find(exp.Column):
+                break
+            node = node.parent
+        return node if node is not column else None
+
+    @staticmethod
+    def _replace_extraction(node: exp.Expression, column: exp.Column) -> None:
+        """Replace an extraction, keeping the name Postgres gives an unaliased output column."""
+        name = _output_name(node)
+        top = _output_expression(node)
+        node.replace(column)
+        if name:
+            top = column if top is node else top
+            top.replace(exp.alias_(top.copy(), exp.to_identifier(name, quoted=True)))
+
+    def _push_limit(self, scans: Dict[int, SourceScan]) -> None:
+        """Limit the leftmost source when every output row comes from one of its first rows."""
+        select = self.tree
+        if not isinstance(select, exp.Select):
+            return
+        limit, offset = select.args.get('limit'), select.args.get('offset')
+        if limit is None or not isinstance(limit.expression, exp.Literal) or not limit.expression.is_int:
+            return
+        skip = 0
+        if offset is not None:
+            if not isinstance(offset.expression, exp.Literal) or not offset.expression.is_int:
+                return
+            skip = int(offset.expression.name)
+        if any(select.args.get(arg) for arg in ('where', 'group', 'having', 'distinct', 'order', 'qualify', 'fetch')):
+            return
+        joins = select.args.get('joins') or []
+        from_clause = _from_clause(select)
+        if not joins or from_clause is None or any(join.side != 'LEFT' for join in joins):
+            return
+        if any(
+            node.find(exp.AggFunc, exp.Window) or _returns_sets(node)
+            for node in select.expressions
+        ):
+            return
+        scan = scans.get(id(from_clause.this))
+        if scan is not None:
+            scan.limit = int(limit.expression.name) + skip
+
+
+def _output_expression(node: exp.Expression) -> exp.Expression:
+    """`node` with the parentheses and casts around it."""
+    while isinstance(node.parent, (exp.Paren, exp.Cast)) and node.parent.this is node:
+        node = node.parent
+    return node
+
+
+def _output_name(node: exp.Expression):
+    """
+    Name Postgres gives the output column `node` is the whole of, if unaliased.
+
+    Returns:
+        None when the name doesn't depend on `node`, or False when it
+        isn't known here
+    """
+    top = _output_expression(node)
+    if not (isinstance(top.parent, exp.Select) and top.arg_key == 'expressions'):
+        return None
+    # Operators are named ?column?, and casts of them after their type
+    if isinstance(top, exp.Cast):
+        return _CAST_COLUMN_NAMES.get(top.to.this, False)
+    return "?column?"
+
+
+def _root_column(node: exp.Expression) -> exp.Column:
+    while not isinstance(node, exp.Column):
+        node = node.this
+    return node
+
+
+def parse_query(sql: str, source_aliases: Iterable[str] = ()) -> WorkbenchQuery:
+    """Parse a single read-only query, raising SqlParseError with its position."""
+    return WorkbenchQuery(sql, source_aliases)
+
+
+def canonical_sql(sql: str) -> str:
+    """
+    The query regenerated from its parse tree, without comments.
+
+    Layout, comments and quoting styles of equal literals don't change it;
+    any difference in tokens does. Raises SqlParseError like parse_query.
+    """
+    return _parse(sql)[0].sql(DIALECT, comments=False)
+
+
+def rewrite_for_sources(sql: str, source_aliases: Iterable[str]) -> Optional[SourceRewrite]:
+    """
+    Push work into per-reference source CTEs, or None to run `sql` as written.
+
+    SQL that doesn't parse is left to Postgres, which reports its own error.
+    """
+    try:
+        return WorkbenchQuery(sql, source_aliases).push_down()
+    except SqlParseError as e:
+        logger.debug(f"Not rewriting unparsable workbench SQL: {e}")
+        return None
+    except SqlglotError as e:
+        logger.warning(f"Could not rewrite workbench SQL: {e}")
+        return None
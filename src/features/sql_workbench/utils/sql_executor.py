@@ -2,12 +2,83 @@
 from typing import List, Dict, Any, Optional
 import logging
 
+from src.core.domain_exceptions import DomainException
+from src.infrastructure.config import get_settings
+from .preview_control import interruption_error, limited_transaction
+from .sql_ast import SourceScan, rewrite_for_sources
+
 logger = logging.getLogger(__name__)
 
 
 class SqlExecutor:
     """Executes SQL queries with source table CTEs."""
     
+    @staticmethod
+    def source_cte_body(source: Dict[str, Any], scan: Optional[SourceScan] = None) -> str:
+        """
+        SELECT exposing `data` and `logical_row_id` of one source table.
+        
+        For a scan, `data` is replaced by the JSON keys it reads, and its
+        predicates and limit apply while the source is scanned.
+        """
+        if scan is None or scan.columns is None:
+            columns = ["r.data as data"]
+        else:
+            columns = [f"{expression} AS {name}" for name, expression in scan.columns]
+        select_list = ''.join(f"""
+                            {column},""" for column in columns)
+        conditions = ''.join(f"""
+                        AND ({predicate})""" for predicate in (scan.predicates if scan else []))
+        limit = f"""
+                        LIMIT {scan.limit}""" if scan is not None and scan.limit is not None else ""
+        # Without predicates a limit also bounds the manifest entries read
+        entries_limit = f", 0, {scan.limit}" if limit and not conditions else ""
+        return f"""
+                        SELECT {select_list}
+                            cr.logical_row_id
+                        FROM dsa_core.commit_table_entries('{source['commit_id']}', '{source['table_key']}'{entries_limit}) cr
+                        JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
+                        WHERE TRUE{conditions}{limit}"""
+    
+    @classmethod
+    def build_query(cls, sql: str, sources: List[Dict[str, Any]], pushdown: Optional[bool] = None) -> str:
+        """
+        The full query run for `sql`, with one CTE per source alias.
+        
+        With pushdown (the workbench_pushdown_enabled setting by default),
+        each reference to a source reads through a CTE of its own holding
+        the keys, predicates and limit it can apply before any join. SQL
+        that doesn't parse runs as written.
+        """
+        if pushdown is None:
+            pushdown = get_settings().workbench_pushdown_enabled
+        rewrite = rewrite_for_sources(sql, [source['alias'] for source in sources]) if pushdown else None
+        
+        cte_parts = [
+            f"""
+                    {source['alias']} AS ({cls.source_cte_body(source)}
+                    )"""
+            for source in sources
+        ]
+        recursive = ""
+        if rewrite is not None:
+            by_alias = {source['alias'].lower(): source for source in sources}
+            cte_parts.extend(
+                f"""
+                    {scan.name} AS ({cls.source_cte_body(by_alias[scan.source_alias], scan)}
+                    )"""
+                for scan in rewrite.scans
+            )
+            # The query's own CTEs join the same WITH list, after the sources they read
+            cte_parts.extend(f"""
+                    {cte}""" for cte in rewrite.ctes)
+            recursive = "RECURSIVE " if rewrite.recursive else ""
+            sql = rewrite.sql
+        return f"""
+                WITH {recursive}{','.join(cte_parts)}
+                {sql}
+                """
+    
     async def execute_sql_with_sources(
         self, 
         sql: str, 
@@ -32,31 +103,13 @@ class SqlExecutor:
         if not db_pool:
             raise ValueError("Database pool not available")
         
+        full_query = self.build_query(sql, sources)
+        
         async with db_pool.acquire() as conn:
             try:
-                # Build CTEs for each source table
-                cte_parts = []
-                for source in sources:
-                    cte_sql = f"""
-                    {source['alias']} AS (
-                        SELECT 
-                            r.data as data,
-                            cr.logical_row_id
-                        FROM dsa_core.commit_rows cr
-                        JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                        WHERE cr.commit_id = '{source['commit_id']}'
-                        AND cr.logical_row_id LIKE '{source['table_key']}:%'
-                    )"""
-                    cte_parts.append(cte_sql)
-                
-                # Build the full query with CTEs
-                full_query = f"""
-                WITH {','.join(cte_parts)}
-                {sql}
-                """
-                
                 # Execute the query
-                rows = await conn.fetch(full_query)
+                async with limited_transaction(conn):
+                    rows = await conn.fetch(full_query)
                 
                 # Convert to the expected format
                 if rows:
@@ -73,7 +126,12 @@ class SqlExecutor:
                         'rows': [],
                         'columns': []
                     }
+            except DomainException:
+                raise
             except Exception as e:
+                error = interruption_error(e)
+                if error is not e:
+                    raise error
                 raise ValueError(f"SQL execution failed: {str(e)}")
     
     async def execute_sql_with_sampled_sources(
@@ -117,10 +175,8 @@ class SqlExecutor:
                     filtered_cte = f"""
                     __{source['alias']}_filtered AS (
                         SELECT logical_row_id, row_hash
-                        FROM dsa_core.commit_rows
-                        WHERE commit_id = '{source['commit_id']}'
-                        AND logical_row_id LIKE '{source['table_key']}:%'
-                        AND random() < {sample_ratio}
+                        FROM dsa_core.commit_table_entries('{source['commit_id']}', '{source['table_key']}')
+                        WHERE random() < {sample_ratio}
                     )"""
                     
                     # Second CTE: Join only the sampled rows
@@ -146,7 +202,8 @@ class SqlExecutor:
                 logger.info(f"Executing quick preview with {sample_percent}% sampling")
                 
                 # Execute the query
-                rows = await conn.fetch(full_query)
+                async with limited_transaction(conn):
+                    rows = await conn.fetch(full_query)
                 
                 # Convert to the expected format
                 if rows:
@@ -162,5 +219,10 @@ class SqlExecutor:
                         'rows': [],
                         'columns': []
                     }
+            except DomainException:
+                raise
             except Exception as e:
+                error = interruption_error(e)
+                if error is not e:
+                    raise error
                 raise ValueError(f"SQL execution with sampling failed: {str(e)}")
\ No newline at end of file
@@ -45,12 +45,9 @@ class EnhancedSqlExecutor(SqlExecutor):
                     # First, sample the data to get field names
                     sample_row = await conn.fetchrow(f"""
                         SELECT r.data
-                        FROM dsa_core.commit_rows cr
+                        FROM dsa_core.commit_table_entries($1, $2, 0, 1) cr
                         JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                        WHERE cr.commit_id = $1
-                        AND cr.logical_row_id LIKE $2
-                        LIMIT 1
-                    """, source['commit_id'], f"{source['table_key']}:%")
+                    """, source['commit_id'], source['table_key'])
                     
                     if sample_row and sample_row['data']:
                         # Extract field names from JSONB
@@ -85,10 +82,8 @@ class EnhancedSqlExecutor(SqlExecutor):
                         {source['alias']} AS (
                             SELECT 
                                 {','.join(column_exprs)}
-                            FROM dsa_core.commit_rows cr
+                            FROM dsa_core.commit_table_entries('{source['commit_id']}', '{source['table_key']}') cr
                             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                            WHERE cr.commit_id = '{source['commit_id']}'
-                            AND cr.logical_row_id LIKE '{source['table_key']}:%'
                         )"""
                     else:
                         # Fallback to traditional mode if no sample data
@@ -97,10 +92,8 @@ class EnhancedSqlExecutor(SqlExecutor):
                             SELECT 
                                 cr.logical_row_id,
                                 r.data as data
-                            FROM dsa_core.commit_rows cr
+                            FROM dsa_core.commit_table_entries('{source['commit_id']}', '{source['table_key']}') cr
                             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                            WHERE cr.commit_id = '{source['commit_id']}'
-                            AND cr.logical_row_id LIKE '{source['table_key']}:%'
                         )"""
                     
                     cte_parts.append(cte_sql)
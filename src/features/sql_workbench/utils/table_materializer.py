@@ -0,0 +1,238 @@
+"""Local Parquet copies of commit tables for the DuckDB workbench engine."""
+
+import asyncio
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.table_reader import PostgresTableReader
+from src.infrastructure.postgres.versioning_repo import PostgresCommitRepository
+from src.features.versioning.services.arrow_stream_service import arrow_type_for, column_array
+
+logger = logging.getLogger(__name__)
+
+
+ROW_ID_COLUMN = "logical_row_id"
+DATA_COLUMN = "data"
+
+# Rows read from Postgres per Parquet row group
+_BATCH_ROWS = 50000
+
+# Python types a column's values must have for its typed copy to read
+# back exactly as `data->>'column'` does in Postgres
+_EXACT_TYPES = {
+    pa.int64(): (int,),
+    pa.float64(): (float,),
+    pa.bool_(): (bool,),
+    pa.string(): (str,),
+}
+
+
+def _is_exact(value: Any, arrow_type: pa.DataType) -> bool:
+    if value is None:
+        return True
+    if type(value) not in _EXACT_TYPES[arrow_type]:
+        return False
+    # Postgres prints jsonb numbers without exponents; DuckDB switches to
+    # exponent notation for very large and very small doubles
+    if arrow_type == pa.float64() and value != 0:
+        return 1e-4 <= abs(value) < 1e15
+    return True
+
+
+@dataclass
+class MaterializedTable:
+    """A commit table on local disk, with the typed columns it carries."""
+    path: str
+    # Column name -> DuckDB type of its typed copy
+    columns: Dict[str, str]
+    # Columns whose typed value reads back exactly like `data->>'column'`
+    exact_columns: List[str]
+    # Whether rows nest their values under a 'data' key (workbench output)
+    nested: bool
+
+
+def _duckdb_type(arrow_type: pa.DataType) -> str:
+    return {pa.int64(): 'BIGINT', pa.float64(): 'DOUBLE', pa.bool_(): 'BOOLEAN'}.get(arrow_type, 'VARCHAR')
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', value)
+
+
+class TableMaterializer:
+    """
+    Disk cache of commit tables as Parquet files.
+
+    Each file holds the row id, the stored JSON of each row and one typed
+    column per schema column. Commits are immutable, so a file never goes
+    stale; files are removed least recently used first once the cache
+    grows past its size limit.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    def _paths(self, commit_id: str, table_key: str) -> Tuple[str, str]:
+        base = os.path.join(self._root, commit_id[:2], f"{commit_id}-{_safe_name(table_key)}")
+        return f"{base}.parquet", f"{base}.json"
+
+    async def get(self, db_pool, commit_id: str, table_key: str) -> MaterializedTable:
+        """Return the local copy of a table, materializing it on first use."""
+        key = (commit_id, table_key)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            table = await asyncio.to_thread(self._load, commit_id, table_key)
+            if table is None:
+                table = await self._materialize(db_pool, commit_id, table_key)
+                await asyncio.to_thread(self._evict)
+        self._locks.pop(key, None)
+        return table
+
+    def _load(self, commit_id: str, table_key: str) -> Optional[MaterializedTable]:
+        data_path, meta_path = self._paths(commit_id, table_key)
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = orjson.loads(f.read())
+            # Touch both files so eviction sees them as recently used
+            os.utime(data_path)
+            os.utime(meta_path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return MaterializedTable(data_path, meta['columns'], meta['exact_columns'], meta['nested'])
+
+    async def _materialize(self, db_pool, commit_id: str, table_key: str) -> MaterializedTable:
+        data_path, meta_path = self._paths(commit_id, table_key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+
+        async with db_pool.acquire() as conn:
+            schema_def = await PostgresCommitRepository(conn).get_commit_schema(commit_id) or {}
+            declared = self._declared_columns(schema_def.get(table_key))
+            fields = [pa.field(ROW_ID_COLUMN, pa.string(), nullable=False), pa.field(DATA_COLUMN, pa.string())]
+            fields.extend(
+                pa.field(name, arrow_type_for(col_type))
+                for name, col_type in declared.items()
+                if name not in (ROW_ID_COLUMN, DATA_COLUMN)
+            )
+            schema = pa.schema(fields)
+            exact = {field.name for field in fields[2:]}
+            nested = None
+
+            writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+            try:
+                reader = PostgresTableReader(conn)
+                async for records in reader.get_table_records_stream(commit_id, table_key, _BATCH_ROWS):
+                    batch, inexact, batch_nested = await asyncio.to_thread(self._to_batch, records, schema)
+                    exact -= inexact
+                    nested = batch_nested if nested is None else nested
+                    await asyncio.to_thread(writer.write_batch, batch)
+            except BaseException:
+                writer.close()
+                os.remove(tmp_path)
+                raise
+            await asyncio.to_thread(writer.close)
+
+        table = MaterializedTable(
+            path=data_path,
+            columns={field.name: _duckdb_type(field.type) for field in fields[2:]},
+            exact_columns=sorted(exact),
+            nested=bool(nested)
+        )
+        os.replace(tmp_path, data_path)
+        with open(meta_path, 'wb') as f:
+            f.write(orjson.dumps({
+                'columns': table.columns,
+                'exact_columns': table.exact_columns,
+                'nested': table.nested
+            }))
+        logger.info(f"Materialized {commit_id}/{table_key} for DuckDB at {data_path}")
+        return table
+
+    @staticmethod
+    def _declared_columns(table_schema: Any) -> Dict[str, str]:
+        """Column name -> declared type; workbench outputs list bare names."""
+        if not isinstance(table_schema, dict):
+            return {}
+        declared = {}
+        for col in table_schema.get('columns', []):
+            if isinstance(col, dict):
+                declared[col['name']] = col.get('type', 'string')
+            else:
+                declared[str(col)] = 'string'
+        return declared
+
+    @staticmethod
+    def _to_batch(records: List[Any], schema: pa.Schema) -> Tuple[pa.RecordBatch, set, bool]:
+        """Build a record batch, noting columns whose typed values are not exact."""
+        raw = []
+        rows: List[Dict[str, Any]] = []
+        nested = False
+        for record in records:
+            data = record['data']
+            text = data if isinstance(data, str) else orjson.dumps(data).decode('utf-8')
+            row = orjson.loads(text) if isinstance(data, str) else data
+            if isinstance(row, dict) and isinstance(row.get('data'), dict):
+                row = row['data']
+                nested = True
+            raw.append(text)
+            rows.append(row if isinstance(row, dict) else {})
+
+        arrays = [
+            pa.array([record['logical_row_id'] for record in records], pa.string()),
+            pa.array(raw, pa.string())
+        ]
+        inexact = set()
+        for field in list(schema)[2:]:
+            values = [row.get(field.name) for row in rows]
+            if not all(_is_exact(v, field.type) for v in values):
+                inexact.add(field.name)
+            arrays.append(column_array(values, field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema), inexact, nested
+
+    def _evict(self) -> None:
+        """Remove least recently used tables until the cache fits its limit."""
+        files = []
+        for dirpath, _, filenames in os.walk(self._root):
+            for name in filenames:
+                if name.endswith('.parquet'):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self._max_bytes:
+                break
+            for victim in (path, path[:-len('.parquet')] + '.json'):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+_table_materializer: Optional[TableMaterializer] = None
+
+
+def get_table_materializer() -> TableMaterializer:
+    """Get the process-wide table materializer."""
+    global _table_materializer
+    if _table_materializer is None:
+        settings = get_settings()
+        _table_materializer = TableMaterializer(
+            settings.duckdb_cache_path,
+            settings.duckdb_cache_max_gb * 1024 ** 3
+        )
+    return _table_materializer
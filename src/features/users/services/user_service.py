@@ -8,7 +8,7 @@ from src.infrastructure.postgres.uow import PostgresUnitOfWork
 from src.infrastructure.postgres.user_repo import PostgresUserRepository
 from src.infrastructure.external.password_hasher import PasswordHasher
 from src.core.permissions import PermissionService
-from src.core.events.publisher import EventBus, DomainEvent
+from src.core.events.publisher import EventBus, DomainEvent, EventType
 from src.core.domain_exceptions import (
     ConflictException, 
     EntityNotFoundException, 
@@ -36,6 +36,12 @@ class UserCreatedEvent(DomainEvent):
     soeid: str
     role: str
     created_by: int
+    
+    def __post_init__(self):
+        super().__init__()
+        self.event_type = EventType.USER_CREATED
+        self.aggregate_type = "user"
+        self.aggregate_id = str(self.user_id)
 
 
 @dataclass
@@ -44,6 +50,12 @@ class UserUpdatedEvent(DomainEvent):
     user_id: int
     updated_fields: List[str]
     updated_by: int
+    
+    def __post_init__(self):
+        super().__init__()
+        self.event_type = EventType.USER_UPDATED
+        self.aggregate_type = "user"
+        self.aggregate_id = str(self.user_id)
 
 
 @dataclass
@@ -52,6 +64,12 @@ class UserDeletedEvent(DomainEvent):
     user_id: int
     deleted_by: int
     user_soeid: str
+    
+    def __post_init__(self):
+        super().__init__()
+        self.event_type = EventType.USER_DELETED
+        self.aggregate_type = "user"
+        self.aggregate_id = str(self.user_id)
 
 
 @dataclass
@@ -152,7 +170,8 @@ class UserService(PaginationMixin):
         access_token = create_access_token(
             subject=user.soeid,
             role_id=user.role.to_id(),
-            role_name=user.role.value
+            role_name=user.role.value,
+            user_id=user.id
         )
         
         refresh_token = create_refresh_token(
@@ -99,6 +99,8 @@ class QueueImportJobCommand:
     branch_name: str = "main"
     commit_message: Optional[str] = None
     append_mode: bool = False
+    import_mode: str = "full"
+    key_columns: Optional[List[str]] = None
     
     def __post_init__(self):
         if not self.commit_message:
@@ -1,8 +1,12 @@
 """Versioning services."""
 
 from .versioning_service import VersioningService, DeleteBranchResponse
+from .diff_service import CommitDiffService
+from .arrow_stream_service import ArrowStreamService
 
 __all__ = [
     'VersioningService',
-    'DeleteBranchResponse'
+    'DeleteBranchResponse',
+    'CommitDiffService',
+    'ArrowStreamService'
 ]
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""Service for streaming commit tables as Arrow IPC record batches."""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+import pyarrow as pa
+
+from src.core.domain_exceptions import EntityNotFoundException, ValidationException
+
+
+ROW_ID_COLUMN = "_logical_row_id"
+
+# Schema column types mapped to Arrow; anything else is sent as strings
+_ARROW_TYPES = {
+    'integer': pa.int64(),
+    'int': pa.int64(),
+    'bigint': pa.int64(),
+    'float': pa.float64(),
+    'double': pa.float64(),
+    'number': pa.float64(),
+    'numeric': pa.float64(),
+    'decimal': pa.float64(),
+    'boolean': pa.bool_(),
+    'bool': pa.bool_(),
+}
+
+
+def _coerce(value: Any, arrow_type: pa.DataType) -> Any:
+    """Convert one value to the column type, or None if it does not fit."""
+    if value is None:
+        return None
+    try:
+        if arrow_type == pa.int64():
+            return int(value) if not isinstance(value, float) or value.is_integer() else None
+        if arrow_type == pa.float64():
+            return float(value)
+        if arrow_type == pa.bool_():
+            return value if isinstance(value, bool) else None
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode('utf-8')
+    return value if isinstance(value, str) else str(value)
+
+
+def arrow_type_for(declared_type: Any) -> pa.DataType:
+    """Arrow type of a commit schema column type; unknown types map to strings."""
+    return _ARROW_TYPES.get(str(declared_type).lower(), pa.string())
+
+
+def column_array(values: List[Any], arrow_type: pa.DataType) -> pa.Array:
+    """Build a column of the given type, nulling values that do not fit it."""
+    try:
+        return pa.array(values, arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.array([_coerce(v, arrow_type) for v in values], arrow_type)
+
+
+class _ChunkSink:
+    """Write-only file object handing out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArrowStreamService:
+    """
+    Streams one table of a commit as an Arrow IPC stream.
+
+    Column types come from the commit schema, so clients get typed columns
+    without inferring them. Values that do not fit their declared type are
+    sent as nulls rather than failing the stream. Rows are read in batches
+    from the table reader and each batch becomes one record batch, so
+    memory use depends on the batch size rather than the table size.
+    """
+
+    def __init__(self, commit_repo, table_reader):
+        self._commit_repo = commit_repo
+        self._table_reader = table_reader
+
+    async def prepare(
+        self,
+        dataset_id: int,
+        ref_name: str,
+        table_key: str,
+        columns: Optional[List[str]] = None,
+        include_row_id: bool = False
+    ) -> Tuple[str, pa.Schema]:
+        """Resolve the ref and build the Arrow schema of the requested columns."""
+        ref = await self._commit_repo.get_ref(dataset_id, ref_name)
+        if not ref:
+            raise EntityNotFoundException("Ref", ref_name)
+        commit_id = ref['commit_id']
+        if not commit_id:
+            raise ValidationException(f"Ref '{ref_name}' has no commits", field="ref_name")
+
+        commit_schema = await self._commit_repo.get_commit_schema(commit_id) or {}
+        table_schema = commit_schema.get(table_key)
+        if not isinstance(table_schema, dict) or not table_schema.get('columns'):
+            raise EntityNotFoundException("Table", table_key)
+
+        declared = {col['name']: col.get('type', 'string') for col in table_schema['columns']}
+        if columns:
+            unknown = [name for name in columns if name not in declared]
+            if unknown:
+                raise ValidationException(f"Unknown columns: {', '.join(unknown)}", field="columns")
+            names = list(dict.fromkeys(columns))
+        else:
+            names = list(declared)
+
+        fields = [pa.field(ROW_ID_COLUMN, pa.string(), nullable=False)] if include_row_id else []
+        fields.extend(pa.field(name, arrow_type_for(declared[name])) for name in names)
+        return commit_id, pa.schema(fields)
+
+    def to_record_batch(self, records: List[Any], schema: pa.Schema) -> pa.RecordBatch:
+        """Turn (data, logical_row_id) records into a record batch of the schema."""
+        rows: List[Dict[str, Any]] = []
+        for record in records:
+            data = record['data']
+            rows.append(orjson.loads(data) if isinstance(data, str) else data)
+
+        arrays = []
+        for field in schema:
+            if field.name == ROW_ID_COLUMN:
+                arrays.append(pa.array([record['logical_row_id'] for record in records], pa.string()))
+                continue
+            arrays.append(column_array([row.get(field.name) for row in rows], field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    async def iter_ipc(
+        self,
+        commit_id: str,
+        table_key: str,
+        schema: pa.Schema,
+        filters: Optional[Any] = None,
+        batch_size: int = 50000
+    ) -> AsyncIterator[bytes]:
+        """Yield the Arrow IPC stream: the schema message, then one message per batch."""
+        sink = _ChunkSink()
+        writer = pa.ipc.new_stream(sink, schema)
+        yield sink.drain()
+
+        async for records in self._table_reader.get_table_records_stream(
+            commit_id, table_key, batch_size, filters
+        ):
+            writer.write_batch(self.to_record_batch(records, schema))
+            yield sink.drain()
+
+        writer.close()
+        yield sink.drain()
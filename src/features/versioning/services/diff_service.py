@@ -0,0 +1,248 @@
+"""Service for diffing the row manifests of two commits."""
+
+import base64
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+
+from src.core.domain_exceptions import EntityNotFoundException, ValidationException
+from src.api.models import CommitDiffResponse, TableDiffSummary, RowChange
+
+
+class CommitDiffService:
+    """
+    Computes added, removed and modified rows between two commits.
+
+    Manifest chunks shared by both commits are skipped without being read,
+    and the remaining entries are compared by row hash. They are walked in
+    logical_row_id order in windows of roughly `window_size` entries, each
+    joined in the database, so memory use depends on the window size rather
+    than the table size. Row JSON is only fetched when cell-level detail is
+    requested.
+    """
+
+    def __init__(self, commit_repo, table_reader, window_size: int = 5000):
+        self._commit_repo = commit_repo
+        self._table_reader = table_reader
+        self._window_size = window_size
+
+    # ========== Resolution ==========
+
+    async def resolve_commit(self, dataset_id: int, ref_or_commit: str) -> str:
+        """Resolve a ref name or commit id to a commit id of this dataset."""
+        ref = await self._commit_repo.get_ref(dataset_id, ref_or_commit)
+        if ref:
+            if not ref['commit_id']:
+                raise ValidationException(f"Ref '{ref_or_commit}' has no commits", field="ref")
+            return ref['commit_id']
+
+        commit = await self._commit_repo.get_commit_by_id(ref_or_commit)
+        if not commit or commit['dataset_id'] != dataset_id:
+            raise EntityNotFoundException("Commit", ref_or_commit)
+        return commit['commit_id']
+
+    @staticmethod
+    def encode_cursor(logical_row_id: str) -> str:
+        """Encode the last returned logical_row_id as an opaque cursor."""
+        return base64.urlsafe_b64encode(logical_row_id.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        """Decode a cursor produced by encode_cursor."""
+        try:
+            return base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        except (ValueError, UnicodeError):
+            raise ValidationException("Invalid diff cursor", field="cursor")
+
+    # ========== Summary ==========
+
+    async def summarize(
+        self,
+        from_commit_id: str,
+        to_commit_id: str,
+        table_key: Optional[str] = None,
+        include_column_counts: bool = False
+    ) -> List[TableDiffSummary]:
+        """Count changes per table, optionally with per-column change counts.
+        
+        Changes are counted a window at a time, over the same windows as
+        iter_changes, so no join spans more than about two windows of entries.
+        """
+        counts: Dict[str, Dict[str, int]] = {}
+        column_counts: Dict[str, Dict[str, int]] = {}
+        after = ''
+        while True:
+            upper = await self._next_window_bound(from_commit_id, to_commit_id, table_key, after)
+            if upper is None:
+                break
+
+            modified = 0
+            for row in await self._commit_repo.summarize_manifest_range(
+                from_commit_id, to_commit_id, table_key, after, upper
+            ):
+                table_counts = counts.setdefault(row['table_key'], {'added': 0, 'removed': 0, 'modified': 0})
+                for kind in table_counts:
+                    table_counts[kind] += row[kind]
+                modified += row['modified']
+
+            if include_column_counts and modified:
+                for row in await self._commit_repo.count_column_changes(
+                    from_commit_id, to_commit_id, table_key, after, upper
+                ):
+                    table_columns = column_counts.setdefault(row['table_key'], {})
+                    table_columns[row['column_name']] = table_columns.get(row['column_name'], 0) + row['changes']
+            after = upper
+
+        totals = {
+            row['table_key']: row['total']
+            for row in await self._commit_repo.get_table_row_counts(to_commit_id, table_key)
+        }
+        summaries = []
+        for key in sorted(counts.keys() | totals.keys()):
+            table_counts = counts.get(key, {'added': 0, 'removed': 0, 'modified': 0})
+            summaries.append(TableDiffSummary(
+                table_key=key,
+                added=table_counts['added'],
+                removed=table_counts['removed'],
+                modified=table_counts['modified'],
+                unchanged=totals.get(key, 0) - table_counts['added'] - table_counts['modified'],
+                column_changes=dict(sorted(column_counts.get(key, {}).items())) if include_column_counts else None
+            ))
+        return summaries
+
+    # ========== Row Changes ==========
+
+    async def iter_changes(
+        self,
+        from_commit_id: str,
+        to_commit_id: str,
+        table_key: Optional[str] = None,
+        after: str = '',
+        include_cells: bool = False
+    ) -> AsyncIterator[List[RowChange]]:
+        """Yield batches of row changes in logical_row_id order."""
+        while True:
+            upper = await self._next_window_bound(from_commit_id, to_commit_id, table_key, after)
+            if upper is None:
+                return
+
+            entries = await self._commit_repo.diff_manifest_range(
+                from_commit_id, to_commit_id, table_key, after, upper
+            )
+            after = upper
+            if entries:
+                yield await self._build_changes(entries, include_cells)
+
+    async def get_changes_page(
+        self,
+        from_commit_id: str,
+        to_commit_id: str,
+        table_key: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        include_cells: bool = False
+    ) -> Tuple[List[RowChange], Optional[str], bool]:
+        """Get one page of row changes plus the cursor for the next page."""
+        after = self.decode_cursor(cursor) if cursor else ''
+        changes: List[RowChange] = []
+
+        async for batch in self.iter_changes(from_commit_id, to_commit_id, table_key, after, include_cells):
+            changes.extend(batch)
+            if len(changes) > limit:
+                break
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        next_cursor = self.encode_cursor(changes[-1].logical_row_id) if has_more else None
+        return changes, next_cursor, has_more
+
+    async def get_diff(
+        self,
+        dataset_id: int,
+        from_ref: str,
+        to_ref: str,
+        table_key: Optional[str] = None,
+        summary_only: bool = False,
+        include_cells: bool = False,
+        include_column_counts: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> CommitDiffResponse:
+        """Diff two refs or commits of a dataset."""
+        from_commit_id = await self.resolve_commit(dataset_id, from_ref)
+        to_commit_id = await self.resolve_commit(dataset_id, to_ref)
+
+        tables = await self.summarize(from_commit_id, to_commit_id, table_key, include_column_counts)
+        response = CommitDiffResponse(
+            dataset_id=dataset_id,
+            from_commit_id=from_commit_id,
+            to_commit_id=to_commit_id,
+            tables=tables
+        )
+        if summary_only:
+            return response
+
+        changes, next_cursor, has_more = await self.get_changes_page(
+            from_commit_id, to_commit_id, table_key, cursor, limit, include_cells
+        )
+        response.changes = changes
+        response.next_cursor = next_cursor
+        response.has_more = has_more
+        return response
+
+    # ========== Helpers ==========
+
+    async def _next_window_bound(
+        self, from_commit_id: str, to_commit_id: str, table_key: Optional[str], after: str
+    ) -> Optional[str]:
+        """Pick the upper key of the next window, bounded on both sides."""
+        old_bound = await self._commit_repo.get_manifest_window_bound(
+            from_commit_id, to_commit_id, table_key, after, self._window_size
+        )
+        new_bound = await self._commit_repo.get_manifest_window_bound(
+            to_commit_id, from_commit_id, table_key, after, self._window_size
+        )
+        bounds = [b for b in (old_bound, new_bound) if b is not None]
+        return min(bounds) if bounds else None
+
+    async def _build_changes(self, entries: List[Dict[str, Any]], include_cells: bool) -> List[RowChange]:
+        """Turn manifest entries into RowChange models, reading row JSON if needed."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        if include_cells:
+            hashes = {h for e in entries for h in (e['old_hash'], e['new_hash']) if h}
+            rows = await self._table_reader.get_rows_by_hashes(list(hashes))
+
+        changes = []
+        for entry in entries:
+            old_hash, new_hash = entry['old_hash'], entry['new_hash']
+            if old_hash is None:
+                kind = 'added'
+            elif new_hash is None:
+                kind = 'removed'
+            else:
+                kind = 'modified'
+
+            change = RowChange(
+                table_key=entry['logical_row_id'].split(':', 1)[0],
+                logical_row_id=entry['logical_row_id'],
+                change=kind,
+                old_hash=old_hash,
+                new_hash=new_hash
+            )
+            if include_cells:
+                old_data = self._unwrap(rows.get(old_hash)) if old_hash else None
+                new_data = self._unwrap(rows.get(new_hash)) if new_hash else None
+                change.old_data = old_data
+                change.new_data = new_data
+                if kind == 'modified' and old_data is not None and new_data is not None:
+                    change.changed_columns = [
+                        key for key in dict.fromkeys([*old_data, *new_data])
+                        if old_data.get(key) != new_data.get(key)
+                    ]
+            changes.append(change)
+        return changes
+
+    @staticmethod
+    def _unwrap(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Standardized rows nest their values under a 'data' key."""
+        if isinstance(data, dict) and isinstance(data.get('data'), dict):
+            return data['data']
+        return data
@@ -1,7 +1,7 @@
 """Consolidated service for all versioning operations including refs."""
 
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional, get_args
 from dataclasses import dataclass
 
 from src.infrastructure.postgres.uow import PostgresUnitOfWork
@@ -12,6 +12,7 @@ from src.features.versioning.services.commit_preparation_service import CommitPr
 from src.features.table_analysis.services.table_analysis import TableAnalysisService, DataTypeInferenceService, ColumnStatisticsService
 from ...base_handler import with_transaction, with_error_handling
 from src.core.common.pagination import PaginationMixin
+from src.api.encoding import RawRows
 from src.api.models import (
     CreateCommitRequest, CreateCommitResponse,
     GetDataResponse,
@@ -23,6 +24,11 @@ from src.api.models import (
 )
 
 
+# Import modes understood by the import executor
+ImportMode = Literal["full", "append", "upsert", "replace_table"]
+IMPORT_MODES = get_args(ImportMode)
+
+
 @dataclass
 class DeleteBranchResponse:
     """Standardized delete response."""
@@ -103,8 +109,7 @@ class VersioningService(PaginationMixin):
         ):
             raise ValueError("Concurrent modification detected. Please retry.")
         
-        # Refresh search and publish event
-        await self._uow.search_repository.refresh_search_index()
+        # Publish event
         if self._event_bus:
             from src.core.events.publisher import CommitCreatedEvent
             await self._event_bus.publish(CommitCreatedEvent.from_commit(
@@ -268,29 +273,14 @@ class VersioningService(PaginationMixin):
         if not self._table_reader:
             raise ValueError("Table reader not available")
             
-        # Get data from the table
-        raw_rows = await self._table_reader.get_table_data(
+        # Row payloads are returned as stored, without parsing them
+        records = await self._table_reader.get_table_records(
             commit_id=commit_id,
             table_key=table_key,
             offset=offset,
             limit=limit
         )
-        
-        # Convert to DataRow objects
-        from src.api.models import DataRow
-        rows = []
-        for i, row in enumerate(raw_rows):
-            # Extract logical_row_id if present
-            logical_row_id = row.get('_logical_row_id') or row.get('logical_row_id') or f"{table_key}:{i}"
-            # Remove system columns
-            clean_row = {k: v for k, v in row.items() 
-                        if not k.startswith('_') and k != 'logical_row_id'}
-            data_row = DataRow(
-                sheet_name=table_key,
-                logical_row_id=logical_row_id,
-                data=clean_row
-            )
-            rows.append(data_row)
+        rows = RawRows(table_key, records)
         
         # Get total count
         total_count = await self._table_reader.count_table_rows(commit_id, table_key)
@@ -301,7 +291,7 @@ class VersioningService(PaginationMixin):
             schema = await self._table_reader.get_table_schema(commit_id, table_key)
         
         # For checkout, we don't have a ref_name, use "checkout" as placeholder
-        return GetDataResponse(
+        return GetDataResponse.model_construct(
             dataset_id=dataset_id,
             ref_name="checkout",
             commit_id=commit_id,
@@ -487,16 +477,49 @@ class VersioningService(PaginationMixin):
         # Validate pagination parameters
         offset, limit = self.validate_pagination(actual_offset, limit)
         
-        # Get filtered and sorted data using enhanced method
-        rows = await self._table_reader.get_table_data_enhanced(
-            commit_id=commit_id,
-            table_key=table_key,
-            offset=offset,
-            limit=limit,
-            sorting=query.sorting,
-            filters=query.filters,
-            select_columns=query.select_columns
-        )
+        if query.format != "flat" and not query.select_columns:
+            # Row payloads are returned as stored, without parsing them
+            records = await self._table_reader.get_table_records_enhanced(
+                commit_id=commit_id,
+                table_key=table_key,
+                offset=offset,
+                limit=limit,
+                sorting=query.sorting,
+                filters=query.filters
+            )
+            data_rows = RawRows(table_key, records)
+        else:
+            # Get filtered and sorted data using enhanced method
+            rows = await self._table_reader.get_table_data_enhanced(
+                commit_id=commit_id,
+                table_key=table_key,
+                offset=offset,
+                limit=limit,
+                sorting=query.sorting,
+                filters=query.filters,
+                select_columns=query.select_columns
+            )
+        
+            # Convert rows to DataRow objects
+            from src.api.models import DataRow
+            data_rows = []
+            for i, row in enumerate(rows):
+                # Extract logical_row_id if present
+                logical_row_id = row.get('_logical_row_id') or row.get('logical_row_id') or f"{table_key}:{offset + i}"
+            
+                # Remove internal fields
+                data = {k: v for k, v in row.items() if not k.startswith('_') and k != 'logical_row_id'}
+            
+                # Apply row flattening if requested
+                if query.format == "flat":
+                    # Flatten nested objects to dot notation
+                    data = self._flatten_row(data)
+            
+                data_rows.append(DataRow(
+                    sheet_name=table_key,
+                    logical_row_id=logical_row_id,
+                    data=data
+                ))
         
         # Get total count with filters applied
         total_rows = await self._table_reader.count_table_rows_enhanced(
@@ -505,29 +528,8 @@ class VersioningService(PaginationMixin):
             filters=query.filters
         )
         
-        # Convert rows to DataRow objects
-        from src.api.models import DataRow
-        data_rows = []
-        for i, row in enumerate(rows):
-            # Extract logical_row_id if present
-            logical_row_id = row.get('_logical_row_id') or row.get('logical_row_id') or f"{table_key}:{offset + i}"
-            
-            # Remove internal fields
-            data = {k: v for k, v in row.items() if not k.startswith('_') and k != 'logical_row_id'}
-            
-            # Apply row flattening if requested
-            if query.format == "flat":
-                # Flatten nested objects to dot notation
-                data = self._flatten_row(data)
-            
-            data_rows.append(DataRow(
-                sheet_name=table_key,
-                logical_row_id=logical_row_id,
-                data=data
-            ))
-        
         # Calculate has_more
-        has_more = (offset + len(rows)) < total_rows
+        has_more = (offset + len(data_rows)) < total_rows
         
         # Create next cursor if there are more results
         next_cursor = None
@@ -544,7 +546,7 @@ class VersioningService(PaginationMixin):
         if query.sorting:
             sort_applied = [{'column': s.column, 'order': 'desc' if s.desc else 'asc'} for s in query.sorting]
         
-        return GetDataResponse(
+        return GetDataResponse.model_construct(
             dataset_id=dataset_id,
             ref_name=ref_name,
             commit_id=commit_id,
@@ -914,12 +916,25 @@ class VersioningService(PaginationMixin):
         branch_name: str,
         user_id: int,
         append_mode: bool = False,
-        commit_message: Optional[str] = None
+        commit_message: Optional[str] = None,
+        import_mode: Optional[str] = None,
+        key_columns: Optional[List[str]] = None
     ) -> QueueImportResponse:
         """Queue an import job."""
         # Check write permission
         await self._permissions.require("dataset", dataset_id, user_id, "write")
         
+        import_mode = import_mode or ("append" if append_mode else "full")
+        if import_mode not in IMPORT_MODES:
+            raise ValidationException(
+                f"Invalid import mode '{import_mode}'. Must be one of: {', '.join(IMPORT_MODES)}",
+                field="import_mode"
+            )
+        if import_mode == "upsert" and not key_columns:
+            raise ValidationException("Upsert imports require at least one key column", field="key_columns")
+        if import_mode != "upsert" and key_columns:
+            raise ValidationException("Key columns are only used by upsert imports", field="key_columns")
+        
         # Get current commit for branch
         current_commit = await self._uow.commits.get_current_commit_for_ref(dataset_id, branch_name)
         
@@ -928,7 +943,9 @@ class VersioningService(PaginationMixin):
             'file_path': file_path,
             'file_name': file_name,
             'branch_name': branch_name,
-            'append_mode': append_mode,
+            'append_mode': import_mode == "append",
+            'import_mode': import_mode,
+            'key_columns': key_columns or [],
             'commit_message': commit_message or f"Import {file_name}"
         }
         
@@ -1,7 +1,7 @@
 """Application configuration implementation using Pydantic settings."""
 
 from functools import lru_cache
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic_settings import BaseSettings
 # Remove interface import
 
@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     # Database pool settings
     db_pool_min_size: int = 10
     db_pool_max_size: int = 20
+    # Per-connection asyncpg cache of ad-hoc statements; filter and sort
+    # builders emit a bounded set of shapes, so this rarely churns
+    db_statement_cache_size: int = 512
+    db_max_cached_statement_lifetime: int = 3600
     
     # PostgreSQL settings (required)
     POSTGRESQL_HOST: str
@@ -55,6 +59,108 @@ class Settings(BaseSettings):
     import_parallel_threshold_mb: int = 100  # Use parallel processing for files > 100MB
     import_progress_update_interval: int = 10
     
+    # Search index settings
+    search_index_max_batch_size: int = 100
+    search_cache_ttl_seconds: float = 60.0
+    
+    # Auth cache settings
+    principal_cache_ttl_seconds: float = 60.0  # Bounds how long other processes miss user changes, for tokens without a user id
+    principal_cache_max_entries: int = 10000
+    permission_cache_ttl_seconds: float = 60.0
+    permission_cache_max_entries: int = 50000
+    
+    # Response compression settings
+    compression_minimum_size: int = 1000
+    compression_zstd_level: int = 3
+    compression_brotli_quality: int = 4
+    compression_gzip_level: int = 6
+    
+    # Job artifact store settings
+    artifact_backend: str = "local"  # "local" or "s3"
+    artifact_local_path: str = "/tmp/dsa_artifacts"
+    artifact_s3_bucket: str = ""
+    artifact_s3_prefix: str = "artifacts"
+    artifact_s3_endpoint_url: Optional[str] = None
+    artifact_compression_level: int = 10
+    artifact_inline_max_bytes: int = 64 * 1024  # Larger job outputs are stored as artifacts
+    
+    # Metrics settings
+    metrics_enabled: bool = True
+    
+    # Workbench preview cache settings
+    preview_cache_enabled: bool = True
+    preview_cache_max_mb: int = 256  # Compressed size of all cached blocks
+    preview_cache_block_rows: int = 2000  # Rows per cached block; a multiple of the default page size
+    preview_cache_compression_level: int = 3
+    
+    # Workbench execution engine settings
+    workbench_engine: str = "postgres"  # Default engine for workbench queries: postgres or duckdb
+    duckdb_cache_path: str = "/tmp/dsa_duckdb_tables"
+    duckdb_cache_max_gb: int = 20
+    duckdb_threads: int = 4
+    duckdb_memory_limit: str = "4GB"
+    workbench_pushdown_enabled: bool = True  # Push source projections, filters and limits below joins
+    transform_batch_rows: int = 20000  # Result rows fetched, hashed and COPYed per batch when committing
+    transform_progress_interval_seconds: float = 2.0
+    
+    # Slow query profiler settings
+    slow_query_enabled: bool = False
+    slow_query_threshold_ms: int = 500
+    slow_query_top_n: int = 50
+    slow_query_explain_after: int = 3  # Slow occurrences before a plan is captured
+    slow_query_explain_interval_seconds: int = 600
+    slow_query_explain_timeout_ms: int = 30000
+    
+    # Workbench cost and admission settings (costs are Postgres planner units)
+    workbench_fast_max_cost: float = 250_000  # Above this, previews run over a sample
+    workbench_sample_max_cost: float = 5_000_000  # Above this, queries must run as a job
+    workbench_job_max_cost: float = 500_000_000  # Above this, queries are rejected
+    workbench_preview_max_result_mb: int = 64
+    workbench_max_concurrent_per_user: int = 2
+    workbench_max_concurrent: int = 8  # Leaves most of the pool to the rest of the API
+    workbench_cost_budget: float = 10_000_000  # Total cost of previews running at once
+    workbench_admission_wait_seconds: float = 10.0
+    
+    # Workbench preview execution settings
+    preview_pool_min_size: int = 1
+    preview_pool_max_size: int = 8  # At least workbench_max_concurrent
+    preview_statement_timeout_ms: int = 30000  # Default and upper bound of a preview's timeout_ms
+    preview_work_mem: str = "64MB"
+    preview_temp_file_limit: str = "1GB"  # Only applied if the database role may set it
+    
+    # Workbench preview session settings
+    preview_session_max_rows: int = 1_000_000  # Rows spooled per session; the rest are dropped
+    preview_sessions_per_user: int = 3
+    preview_session_idle_seconds: int = 900
+    preview_session_max_age_seconds: int = 14400
+    preview_session_reap_interval_seconds: float = 60.0
+    
+    # Job worker settings
+    api_worker_enabled: bool = True  # Run a worker inside the API process; disable when running src.run_worker
+    worker_concurrency: int = 4  # Jobs one worker process runs at once
+    worker_concurrency_per_type: Dict[str, int] = {"import": 2, "sampling": 2, "exploration": 2, "sql_transform": 2}
+    worker_poll_interval_seconds: float = 5.0
+    worker_heartbeat_interval_seconds: float = 15.0
+    worker_lease_seconds: float = 120.0  # Running jobs without a heartbeat this long are requeued
+    worker_drain_timeout_seconds: float = 300.0  # Jobs still running after this on shutdown are requeued
+    worker_pool_min_size: int = 2
+    worker_pool_max_size: int = 10
+    worker_health_port: int = 8081
+    
+    # Job scheduling settings
+    job_priority_by_type: Dict[str, float] = {"sampling": 30, "exploration": 30, "sql_transform": 20, "import": 10}
+    job_default_priority: float = 10
+    job_aging_seconds: float = 60.0  # Waiting this long raises a pending job's priority by one
+    job_user_share_weight: float = 5.0  # Priority a job loses per job its user is running
+    job_dataset_share_weight: float = 2.0  # Priority a job loses per job running on its dataset
+    job_max_running_per_user: int = 3  # Across all workers
+    job_claim_candidate_window: int = 1000  # Oldest eligible pending jobs scored per claim
+    
+    # Job progress settings
+    job_progress_max_updates_per_second: float = 2.0  # Per job; further reports are coalesced
+    job_progress_stream_keepalive_seconds: float = 15.0
+    job_progress_subscriber_queue_size: int = 100  # Events held for a slow streaming client
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
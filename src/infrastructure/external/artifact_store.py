@@ -0,0 +1,191 @@
+"""Content-addressed, zstd-compressed store for large job artifacts."""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, Optional
+
+import zstandard
+
+from ..config import get_settings
+
+
+# Bytes read from a backend per streamed chunk
+_READ_CHUNK_SIZE = 256 * 1024
+
+
+class LocalArtifactBackend:
+    """Stores artifact blobs as files under a root directory, fanned out by key prefix."""
+
+    def __init__(self, root: str):
+        self._root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._root, key[:2], key)
+
+    async def stored_size(self, key: str) -> Optional[int]:
+        try:
+            return await asyncio.to_thread(os.path.getsize, self._path(key))
+        except FileNotFoundError:
+            return None
+
+    async def write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+
+        def _write() -> None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial blob; each write
+            # gets its own temp file, as concurrent writers may share a process
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{key}.", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        await asyncio.to_thread(_write)
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(key), 'rb')
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, _READ_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            f.close()
+
+
+class S3ArtifactBackend:
+    """Stores artifact blobs as objects in an S3 bucket under a key prefix."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        import aioboto3
+        self._session = aioboto3.Session()
+        self._bucket = bucket
+        self._prefix = prefix.strip('/')
+        self._endpoint_url = endpoint_url
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}/{key}" if self._prefix else key
+
+    def _client(self):
+        return self._session.client('s3', endpoint_url=self._endpoint_url)
+
+    async def stored_size(self, key: str) -> Optional[int]:
+        async with self._client() as s3:
+            try:
+                response = await s3.head_object(Bucket=self._bucket, Key=self._key(key))
+            except s3.exceptions.ClientError:
+                return None
+            return response['ContentLength']
+
+    async def write(self, key: str, data: bytes) -> None:
+        async with self._client() as s3:
+            await s3.put_object(Bucket=self._bucket, Key=self._key(key), Body=data)
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        async with self._client() as s3:
+            response = await s3.get_object(Bucket=self._bucket, Key=self._key(key))
+            async with response['Body'] as body:
+                while True:
+                    chunk = await body.read(_READ_CHUNK_SIZE)
+                    if not chunk:
+                        return
+                    yield chunk
+
+
+class ArtifactStore:
+    """
+    Keeps large job outputs out of the database.
+
+    Artifacts are addressed by the SHA-256 of their content, so identical
+    outputs are stored once, and are compressed with zstd at rest. Callers
+    keep the reference returned by `put` (digest, sizes, content type) and
+    stream the content back either still compressed, for clients that
+    accept zstd, or decompressed, optionally from a byte offset.
+    """
+
+    ENCODING = "zstd"
+
+    def __init__(self, backend, compression_level: int = 10):
+        self._backend = backend
+        self._compression_level = compression_level
+
+    async def put(self, content: bytes, content_type: str) -> Dict[str, Any]:
+        """Store content and return its reference."""
+        digest = hashlib.sha256(content).hexdigest()
+        stored_size = await self._backend.stored_size(digest)
+        if stored_size is None:
+            compressed = await asyncio.to_thread(
+                zstandard.ZstdCompressor(level=self._compression_level, write_content_size=True).compress,
+                content
+            )
+            await self._backend.write(digest, compressed)
+            stored_size = len(compressed)
+
+        return {
+            'digest': digest,
+            'size': len(content),
+            'stored_size': stored_size,
+            'content_type': content_type,
+            'encoding': self.ENCODING
+        }
+
+    async def get(self, ref: Dict[str, Any]) -> bytes:
+        """Read a whole artifact, decompressed."""
+        return b''.join([chunk async for chunk in self.stream(ref)])
+
+    async def stream_compressed(self, ref: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """Stream an artifact as stored (zstd-compressed)."""
+        async for chunk in self._backend.read(ref['digest']):
+            yield chunk
+
+    async def stream(
+        self,
+        ref: Dict[str, Any],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream decompressed bytes `start..end` (inclusive) of an artifact."""
+        end = ref['size'] - 1 if end is None else min(end, ref['size'] - 1)
+        position = 0
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        async for compressed in self._backend.read(ref['digest']):
+            chunk = decompressor.decompress(compressed)
+            chunk_start, chunk_end = position, position + len(chunk)
+            position = chunk_end
+            if chunk_end <= start:
+                continue
+            yield chunk[max(start - chunk_start, 0):end + 1 - chunk_start]
+            if position > end:
+                return
+
+
+def is_artifact_ref(value: Any) -> bool:
+    """Check whether a value is a reference returned by ArtifactStore.put."""
+    return isinstance(value, dict) and 'digest' in value and value.get('encoding') == ArtifactStore.ENCODING
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the process-wide artifact store."""
+    global _artifact_store
+    if _artifact_store is None:
+        settings = get_settings()
+        if settings.artifact_backend == "s3":
+            backend = S3ArtifactBackend(
+                settings.artifact_s3_bucket,
+                settings.artifact_s3_prefix,
+                settings.artifact_s3_endpoint_url
+            )
+        else:
+            backend = LocalArtifactBackend(settings.artifact_local_path)
+        _artifact_store = ArtifactStore(backend, settings.artifact_compression_level)
+    return _artifact_store
@@ -0,0 +1,46 @@
+"""Process metrics exposed in the Prometheus text format at /metrics."""
+
+from .registry import Counter, Gauge, Histogram, MetricsRegistry
+from .instruments import (
+    REGISTRY,
+    metrics_enabled,
+    set_metrics_enabled,
+    render_metrics,
+    observe_request,
+    query_caller,
+    traced_queries,
+    observe_query,
+    observe_prepared_statement,
+    observe_statement_cache,
+    observe_pool_wait,
+    set_pool_connections,
+    JobTrace,
+    job_trace,
+    job_stage,
+    observe_job,
+    timed_stream,
+)
+
+__all__ = [
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+    'REGISTRY',
+    'metrics_enabled',
+    'set_metrics_enabled',
+    'render_metrics',
+    'observe_request',
+    'query_caller',
+    'traced_queries',
+    'observe_query',
+    'observe_prepared_statement',
+    'observe_statement_cache',
+    'observe_pool_wait',
+    'set_pool_connections',
+    'JobTrace',
+    'job_trace',
+    'job_stage',
+    'observe_job',
+    'timed_stream',
+]
@@ -0,0 +1,232 @@
+"""Platform metrics and the hooks that record them.
+
+Hooks check `metrics_enabled()` first and return immediately when metrics
+are turned off, so instrumented hot paths only pay for that check.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from ..config import get_settings
+from .registry import Counter, Gauge, Histogram, MetricsRegistry
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "dsa_http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "dsa_http_request_duration_seconds", "Time until response headers, by route template.",
+    ("method", "route")
+))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "dsa_db_pool_wait_seconds", "Time spent waiting for a pooled connection."
+))
+DB_POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "dsa_db_pool_connections", "Pool connections by state (open, idle, in_use, max).",
+    ("state",)
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "dsa_db_query_duration_seconds", "Query execution time by caller and statement.",
+    ("caller", "statement")
+))
+DB_PREPARED_STATEMENTS = REGISTRY.register(Counter(
+    "dsa_db_prepared_statements_total",
+    "Hot statement runs through the connection's prepared statement (hit) and statements invalidated by schema changes.",
+    ("statement", "outcome")
+))
+DB_STATEMENT_CACHE = REGISTRY.register(Counter(
+    "dsa_db_statement_cache_total", "Other queries by whether asyncpg's statement cache already held them.",
+    ("result",)
+))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "dsa_job_duration_seconds", "Job run time by type and final status.",
+    ("job_type", "status")
+))
+JOB_STAGE_DURATION = REGISTRY.register(Histogram(
+    "dsa_job_stage_duration_seconds", "Total time per job stage, observed once per job.",
+    ("job_type", "stage")
+))
+DOWNLOAD_BYTES = REGISTRY.register(Counter(
+    "dsa_download_bytes_total", "Bytes streamed by downloads, by format.",
+    ("format",)
+))
+DOWNLOAD_DURATION = REGISTRY.register(Histogram(
+    "dsa_download_duration_seconds", "Time to stream a download to completion, by format.",
+    ("format",)
+))
+
+
+_enabled: Optional[bool] = None
+
+
+def metrics_enabled() -> bool:
+    """Whether metrics are collected (the metrics_enabled setting, read once)."""
+    global _enabled
+    if _enabled is None:
+        _enabled = get_settings().metrics_enabled
+    return _enabled
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """Turn collection on or off at runtime."""
+    global _enabled
+    _enabled = enabled
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+# ========== HTTP ==========
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    if not metrics_enabled():
+        return
+    HTTP_REQUESTS.inc(method, route, str(status))
+    HTTP_REQUEST_DURATION.observe(seconds, method, route)
+
+
+# ========== Database ==========
+
+# Component issuing the current queries (reader, sampler, importer, ...)
+_query_caller: ContextVar[str] = ContextVar('metrics_query_caller', default='api')
+
+
+@contextmanager
+def query_caller(caller: str) -> Iterator[None]:
+    """Tag queries issued inside the block with `caller`."""
+    token = _query_caller.set(caller)
+    try:
+        yield
+    finally:
+        _query_caller.reset(token)
+
+
+def traced_queries(caller: str):
+    """Method decorator tagging the queries a coroutine issues with `caller`."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not metrics_enabled():
+                return await func(*args, **kwargs)
+            token = _query_caller.set(caller)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _query_caller.reset(token)
+        return wrapper
+    return decorator
+
+
+def observe_query(statement: str, seconds: float) -> None:
+    if not metrics_enabled():
+        return
+    DB_QUERY_DURATION.observe(seconds, _query_caller.get(), statement)
+
+
+def observe_prepared_statement(statement: str, outcome: str) -> None:
+    if not metrics_enabled():
+        return
+    DB_PREPARED_STATEMENTS.inc(statement, outcome)
+
+
+def observe_statement_cache(hit: bool) -> None:
+    if not metrics_enabled():
+        return
+    DB_STATEMENT_CACHE.inc('hit' if hit else 'miss')
+
+
+def observe_pool_wait(seconds: float) -> None:
+    if not metrics_enabled():
+        return
+    DB_POOL_WAIT.observe(seconds)
+
+
+def set_pool_connections(stats: Dict[str, int]) -> None:
+    for state, value in stats.items():
+        DB_POOL_CONNECTIONS.set(value, state)
+
+
+# ========== Jobs ==========
+
+class JobTrace:
+    """Accumulated stage durations of the job being processed."""
+
+    __slots__ = ('job_type', 'stages')
+
+    def __init__(self, job_type: str):
+        self.job_type = job_type
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def summary(self) -> Dict[str, float]:
+        return {stage: round(seconds, 3) for stage, seconds in self.stages.items()}
+
+
+_job_trace: ContextVar[Optional[JobTrace]] = ContextVar('metrics_job_trace', default=None)
+
+
+@contextmanager
+def job_trace(job_type: str) -> Iterator[Optional[JobTrace]]:
+    """
+    Trace one job run; stages recorded inside are summed per stage name.
+
+    Each stage's total is observed once when the job ends, so a stage that
+    runs per batch still yields one observation per job.
+    """
+    if not metrics_enabled():
+        yield None
+        return
+    trace = JobTrace(job_type)
+    token = _job_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _job_trace.reset(token)
+        for stage, seconds in trace.stages.items():
+            JOB_STAGE_DURATION.observe(seconds, job_type, stage)
+
+
+@contextmanager
+def job_stage(stage: str) -> Iterator[None]:
+    """Time a stage of the current job; a no-op outside a traced job."""
+    trace = _job_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - start)
+
+
+def observe_job(job_type: str, status: str, seconds: float) -> None:
+    if not metrics_enabled():
+        return
+    JOB_DURATION.observe(seconds, job_type, status)
+
+
+# ========== Downloads ==========
+
+async def timed_stream(chunks: AsyncIterator[Any], format: str) -> AsyncIterator[Any]:
+    """Pass a download body through, counting its bytes and total stream time."""
+    if not metrics_enabled():
+        async for chunk in chunks:
+            yield chunk
+        return
+    start = time.perf_counter()
+    try:
+        async for chunk in chunks:
+            DOWNLOAD_BYTES.inc(format, amount=len(chunk))
+            yield chunk
+    finally:
+        DOWNLOAD_DURATION.observe(time.perf_counter() - start, format)
@@ -2,8 +2,12 @@
 
 from typing import Any, Optional, Dict, List, AsyncContextManager
 from contextlib import asynccontextmanager
+import time
 import asyncpg
 # Remove interface imports
+from .statements import discard_statement, lookup_statement, statement_name
+from .query_profiler import get_query_profiler
+from ..metrics import metrics_enabled, observe_query, observe_statement_cache
 
 
 class AsyncpgConnectionAdapter:
@@ -14,25 +18,89 @@ class AsyncpgConnectionAdapter:
     
     async def execute(self, query: str, *args) -> str:
         """Execute a query without returning results."""
-        return await self._conn.execute(query, *args)
+        profiler = get_query_profiler()
+        if not metrics_enabled() and not profiler.enabled:
+            return await self._conn.execute(query, *args)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await self._conn.execute(query, *args)
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            observe_query(statement_name(query), elapsed)
+            profiler.record(query, args, elapsed, result)
     
     async def executemany(self, query: str, args: List[tuple]) -> None:
         """Execute a query multiple times with different arguments."""
-        await self._conn.executemany(query, args)
+        if not metrics_enabled():
+            await self._conn.executemany(query, args)
+            return
+        start = time.perf_counter()
+        try:
+            await self._conn.executemany(query, args)
+        finally:
+            observe_query(statement_name(query), time.perf_counter() - start)
     
     async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
         """Execute a query and return a single row as a dictionary."""
-        row = await self._conn.fetchrow(query, *args)
+        row = await self._run('fetchrow', query, args)
         return dict(row) if row else None
     
     async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
         """Execute a query and return all rows as list of dictionaries."""
-        rows = await self._conn.fetch(query, *args)
+        rows = await self._run('fetch', query, args)
         return [dict(row) for row in rows]
     
     async def fetchval(self, query: str, *args, column: int = 0) -> Any:
         """Execute a query and return a single value."""
-        return await self._conn.fetchval(query, *args, column=column)
+        return await self._run('fetchval', query, args, column=column)
+    
+    async def fetch_records(self, query: str, *args) -> List[asyncpg.Record]:
+        """Execute a query and return the asyncpg records without converting them."""
+        return await self._run('fetch', query, args)
+    
+    async def _run(self, method: str, query: str, args: tuple, **kwargs) -> Any:
+        """Run a query through its prepared statement if it has one, else as text."""
+        profiler = get_query_profiler()
+        if not metrics_enabled() and not profiler.enabled:
+            return await self._run_statement(method, query, args, **kwargs)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await self._run_statement(method, query, args, **kwargs)
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            observe_query(statement_name(query), elapsed)
+            profiler.record(query, args, elapsed, result)
+    
+    async def _run_statement(self, method: str, query: str, args: tuple, **kwargs) -> Any:
+        statement = await lookup_statement(self._conn, query)
+        if statement is None:
+            if metrics_enabled():
+                self._observe_statement_cache(query)
+            return await getattr(self._conn, method)(query, *args, **kwargs)
+        try:
+            return await getattr(statement, method)(*args, **kwargs)
+        except asyncpg.InvalidCachedStatementError:
+            # The schema changed under the statement, and the error aborted
+            # any open transaction: only a query outside one can be retried.
+            # The statement is prepared again on its next use either way
+            discard_statement(self._conn, query)
+            if self._conn.is_in_transaction():
+                raise
+            return await self._run_statement(method, query, args, **kwargs)
+    
+    def _observe_statement_cache(self, query: str) -> None:
+        # asyncpg keeps no hit counts, so peek at its cache before the query runs
+        cache = getattr(self._conn, '_stmt_cache', None)
+        if cache is not None:
+            observe_statement_cache(cache.has(query))
+    
+    def cursor(self, query: str, *args, prefetch: Optional[int] = None):
+        """Server-side cursor over a query's records, for use inside a transaction."""
+        return self._conn.cursor(query, *args, prefetch=prefetch)
     
     @asynccontextmanager
     async def transaction(self):
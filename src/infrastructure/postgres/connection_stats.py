@@ -0,0 +1,60 @@
+"""Per-request accounting of pool acquisitions and transactions."""
+
+from contextvars import ContextVar, Token
+from typing import Dict, Optional, Tuple
+
+
+class ConnectionStats:
+    """Counters for the connections and transactions used by one request."""
+
+    __slots__ = ('acquisitions', 'transactions')
+
+    def __init__(self):
+        self.acquisitions = 0
+        self.transactions = 0
+
+
+# Mutable stats object of the current request; tasks spawned while handling
+# the request copy the context and so update the same object.
+_current_stats: ContextVar[Optional[ConnectionStats]] = ContextVar('db_connection_stats', default=None)
+
+# Process-wide totals over tracked requests
+_totals: Dict[str, int] = {'requests': 0, 'acquisitions': 0, 'transactions': 0}
+
+
+def begin_request_stats() -> Tuple[ConnectionStats, Token]:
+    """Start counting for the current request."""
+    stats = ConnectionStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request_stats(stats: ConnectionStats, token: Token) -> None:
+    """Stop counting for the current request and add it to the totals."""
+    _current_stats.reset(token)
+    _totals['requests'] += 1
+    _totals['acquisitions'] += stats.acquisitions
+    _totals['transactions'] += stats.transactions
+
+
+def record_acquisition() -> None:
+    """Count a connection taken from the pool."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.acquisitions += 1
+
+
+def record_transaction() -> None:
+    """Count an explicit BEGIN issued by a unit of work."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.transactions += 1
+
+
+def get_connection_totals() -> Dict[str, float]:
+    """Totals and per-request averages since process start."""
+    requests = _totals['requests']
+    return {
+        **_totals,
+        'acquisitions_per_request': round(_totals['acquisitions'] / requests, 3) if requests else 0.0,
+        'transactions_per_request': round(_totals['transactions'] / requests, 3) if requests else 0.0
+    }
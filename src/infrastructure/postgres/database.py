@@ -1,6 +1,7 @@
 """Database connection pool and Unit of Work implementation."""
 
 import asyncio
+import time
 from contextlib import asynccontextmanager
 from typing import Optional, AsyncContextManager, Dict, Any, List
 import asyncpg
@@ -8,6 +9,11 @@ from asyncpg import Pool, Connection
 # Remove interface imports
 from .uow import PostgresUnitOfWork
 from .adapters import AsyncpgPoolAdapter, AsyncpgConnectionAdapter
+from .connection_stats import record_acquisition
+from .statements import DsaConnection, prepare_hot_statements
+from .query_profiler import get_query_profiler
+from ..metrics import metrics_enabled, observe_pool_wait
+from ..config import get_settings
 
 
 class DatabasePool:
@@ -17,26 +23,43 @@ class DatabasePool:
         self.dsn = dsn
         self._pool: Optional[Pool] = None
         self._adapter: Optional[AsyncpgPoolAdapter] = None
+        self._explains = False
     
-    async def initialize(self, min_size: int = 10, max_size: int = 20):
-        """Initialize the connection pool."""
+    async def initialize(
+        self,
+        min_size: int = 10,
+        max_size: int = 20,
+        command_timeout: Optional[float] = 60,
+        explain_slow_queries: bool = True
+    ):
+        """Initialize the connection pool; slow-query EXPLAINs run on it if `explain_slow_queries`."""
         if self._pool is None:
+            settings = get_settings()
             self._pool = await asyncpg.create_pool(
                 self.dsn,
                 min_size=min_size,
                 max_size=max_size,
-                command_timeout=60,
+                command_timeout=command_timeout,
+                connection_class=DsaConnection,
+                statement_cache_size=settings.db_statement_cache_size,
+                max_cached_statement_lifetime=settings.db_max_cached_statement_lifetime,
                 init=self._init_connection
             )
             self._adapter = AsyncpgPoolAdapter(self._pool)
+            self._explains = explain_slow_queries
+            if explain_slow_queries:
+                get_query_profiler().attach_pool(self._pool)
     
     async def _init_connection(self, conn):
-        """Initialize each connection with the proper search_path."""
+        """Initialize each connection with the proper search_path and hot statements."""
         await conn.execute("SET search_path TO dsa_core, dsa_jobs, dsa_auth, dsa_search, dsa_events, dsa_audit, dsa_staging")
+        await prepare_hot_statements(conn)
     
     async def close(self):
         """Close all connections in the pool."""
         if self._pool:
+            if self._explains:
+                get_query_profiler().detach_pool()
             await self._pool.close()
             self._pool = None
     
@@ -46,9 +69,21 @@ class DatabasePool:
         if not self._pool:
             raise RuntimeError("Database pool not initialized")
         
+        start = time.perf_counter() if metrics_enabled() else None
         async with self._pool.acquire() as connection:
+            if start is not None:
+                observe_pool_wait(time.perf_counter() - start)
+            record_acquisition()
             yield AsyncpgConnectionAdapter(connection)
     
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Current pool size and how many connections are idle or checked out."""
+        if not self._pool:
+            return {'open': 0, 'idle': 0, 'in_use': 0, 'max': 0}
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {'open': size, 'idle': idle, 'in_use': size - idle, 'max': self._pool.get_max_size()}
+    
     async def release(self, connection) -> None:
         """Release a connection back to the pool."""
         # Connection release is handled by context manager
@@ -58,12 +93,14 @@ class DatabasePool:
         """Execute a query without returning results."""
         if not self._pool:
             raise RuntimeError("Database pool not initialized")
+        record_acquisition()
         return await self._pool.execute(query, *args)
     
     async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
         """Execute a query and return a single row."""
         if not self._pool:
             raise RuntimeError("Database pool not initialized")
+        record_acquisition()
         row = await self._pool.fetchrow(query, *args)
         return dict(row) if row else None
     
@@ -71,6 +108,7 @@ class DatabasePool:
         """Execute a query and return all rows."""
         if not self._pool:
             raise RuntimeError("Database pool not initialized")
+        record_acquisition()
         rows = await self._pool.fetch(query, *args)
         return [dict(row) for row in rows]
 
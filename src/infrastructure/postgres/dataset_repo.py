@@ -2,6 +2,7 @@
 
 from typing import Optional, Dict, Any, List
 from asyncpg import Connection
+from .statements import CHECK_DATASET_PERMISSION
 # Remove interface import
 
 
@@ -71,13 +72,7 @@ class PostgresDatasetRepository:
         if not allowed_permissions:
             return False
         
-        query = """
-            SELECT EXISTS(
-                SELECT 1 FROM dsa_auth.dataset_permissions
-                WHERE dataset_id = $1 AND user_id = $2 AND permission_type = ANY($3::dsa_auth.dataset_permission[])
-            )
-        """
-        return await self._conn.fetchval(query, dataset_id, user_id, allowed_permissions)
+        return await self._conn.fetchval(CHECK_DATASET_PERMISSION, dataset_id, user_id, allowed_permissions)
     
     async def grant_permission(self, dataset_id: int, user_id: int, permission_type: str) -> None:
         """Grant permission to user on dataset."""
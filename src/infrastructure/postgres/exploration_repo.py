@@ -113,7 +113,7 @@ class PostgresExplorationRepository(BasePostgresRepository[UUID]):
                 ar.created_at,
                 ar.completed_at as updated_at,
                 ar.run_parameters,
-                ar.output_summary,
+                ar.output_summary IS NOT NULL as has_result,
                 d.name as dataset_name,
                 u.soeid as username
             FROM dsa_jobs.analysis_runs ar
@@ -154,7 +154,7 @@ class PostgresExplorationRepository(BasePostgresRepository[UUID]):
                 "created_at": row["created_at"].isoformat(),
                 "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
                 "run_parameters": json.loads(row["run_parameters"]) if isinstance(row["run_parameters"], str) else row["run_parameters"] or {},
-                "has_result": bool(row["output_summary"])
+                "has_result": row["has_result"]
             }
             for row in rows
         ]
@@ -5,6 +5,7 @@ from uuid import UUID, uuid4
 import json
 from datetime import datetime
 from asyncpg import Connection
+from .statements import GET_JOB_BY_ID
 # Remove interface import
 
 
@@ -51,7 +52,7 @@ class PostgresJobRepository:
         if job_type:
             query = """
                 UPDATE dsa_jobs.analysis_runs
-                SET status = 'running'::dsa_jobs.analysis_run_status
+                SET status = 'running'::dsa_jobs.analysis_run_status, heartbeat_at = now()
                 WHERE id = (
                     SELECT id
                     FROM dsa_jobs.analysis_runs
@@ -67,7 +68,7 @@ class PostgresJobRepository:
         else:
             query = """
                 UPDATE dsa_jobs.analysis_runs
-                SET status = 'running'::dsa_jobs.analysis_run_status
+                SET status = 'running'::dsa_jobs.analysis_run_status, heartbeat_at = now()
                 WHERE id = (
                     SELECT id
                     FROM dsa_jobs.analysis_runs
@@ -119,15 +120,7 @@ class PostgresJobRepository:
     
     async def get_job_by_id(self, job_id: UUID) -> Optional[Dict[str, Any]]:
         """Get job by ID."""
-        query = """
-            SELECT id, run_type::text, status::text, dataset_id, user_id,
-                   source_commit_id, run_parameters, output_summary,
-                   error_message, created_at, completed_at
-            FROM dsa_jobs.analysis_runs
-            WHERE id = $1
-        """
-        
-        row = await self._conn.fetchrow(query, job_id)
+        row = await self._conn.fetchrow(GET_JOB_BY_ID, job_id)
         if row:
             result = dict(row)
             # Rename id to run_id for compatibility
@@ -162,10 +155,12 @@ class PostgresJobRepository:
                     WHEN ar.completed_at IS NOT NULL 
                     THEN EXTRACT(EPOCH FROM (ar.completed_at - ar.created_at))
                     ELSE NULL 
-                END as duration_seconds
+                END as duration_seconds,
+                jp.progress
             FROM dsa_jobs.analysis_runs ar
             LEFT JOIN dsa_core.datasets d ON ar.dataset_id = d.id
             LEFT JOIN dsa_auth.users u ON ar.user_id = u.id
+            LEFT JOIN dsa_jobs.job_progress jp ON jp.job_id = ar.id
             WHERE ar.id = $1
         """
         
@@ -191,6 +186,11 @@ class PostgresJobRepository:
                 except json.JSONDecodeError:
                     output_summary = None
             
+            # Progress is kept in its own table; clients read it from the parameters
+            if row['progress'] is not None and isinstance(run_parameters, dict):
+                progress = row['progress']
+                run_parameters['progress'] = json.loads(progress) if isinstance(progress, str) else progress
+            
             job = {
                 "id": str(row['id']),
                 "run_type": row['run_type'],
@@ -488,8 +488,7 @@ class PostgresJobRepository:
                 u.soeid as user_soeid,
                 ar.created_at,
                 ar.completed_at,
-                ar.error_message,
-                ar.output_summary
+                ar.error_message
             FROM dsa_jobs.analysis_runs ar
             LEFT JOIN dsa_core.datasets d ON ar.dataset_id = d.id
             LEFT JOIN dsa_auth.users u ON ar.user_id = u.id
@@ -612,8 +611,7 @@ class PostgresJobRepository:
                 "created_at": row['created_at'].isoformat() if row['created_at'] else None,
                 "updated_at": row['created_at'].isoformat() if row['created_at'] else None,
                 "completed_at": row['completed_at'].isoformat() if row['completed_at'] else None,
-                "error_message": row['error_message'],
-                "output_summary": row['output_summary']
+                "error_message": row['error_message']
             }
             jobs.append(job)
         
@@ -0,0 +1,286 @@
+"""Opt-in capture of slow queries with sampled EXPLAIN plans."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from ..config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_WRITE_KEYWORD = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|CREATE|DROP|ALTER|COPY|CALL)\b", re.IGNORECASE)
+
+# Longest normalized text kept per entry
+_MAX_QUERY_TEXT = 4000
+
+# Distinct call sites remembered per entry
+_MAX_CALL_SITES = 5
+
+# Files whose frames are query plumbing rather than the code issuing the query
+_PLUMBING_FILES = tuple(
+    os.path.join('src', 'infrastructure', *parts)
+    for parts in (
+        ('postgres', 'adapters.py'),
+        ('postgres', 'uow.py'),
+        ('postgres', 'query_profiler.py'),
+        ('metrics', 'instruments.py'),
+    )
+)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and replace literals so variants of a query group together."""
+    text = _STRING_LITERAL.sub('?', query)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _IN_LIST.sub('(?, ...)', text)
+    return _WHITESPACE.sub(' ', text).strip()[:_MAX_QUERY_TEXT]
+
+
+def describe_params(args: tuple) -> List[str]:
+    """Describe query parameters by type and size only, never by value."""
+    described = []
+    for value in args:
+        if value is None:
+            described.append('NULL')
+        elif isinstance(value, (str, bytes)):
+            described.append(f'{type(value).__name__}[{len(value)}]')
+        elif isinstance(value, (list, tuple, set)):
+            described.append(f'{type(value).__name__}[{len(value)}]')
+        else:
+            described.append(type(value).__name__)
+    return described
+
+
+def row_count(result: Any) -> int:
+    """Rows returned or affected, from a fetch result or a command status tag."""
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, str):
+        # Status tags look like "SELECT 5" or "INSERT 0 5"
+        last = result.rsplit(' ', 1)[-1]
+        return int(last) if last.isdigit() else 0
+    return 1
+
+
+def _call_site() -> str:
+    """The innermost frame under src/ that is not query plumbing."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if f'{os.sep}src{os.sep}' in filename and not filename.endswith(_PLUMBING_FILES):
+            path = filename[filename.rindex(f'{os.sep}src{os.sep}') + 1:]
+            return f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _is_read_only(normalized: str) -> bool:
+    head = normalized.lstrip('( ').split(' ', 1)[0].upper()
+    return head in ('SELECT', 'WITH', 'VALUES', 'TABLE') and not _WRITE_KEYWORD.search(normalized)
+
+
+class SlowQuery:
+    """Rolling statistics for one normalized slow query."""
+
+    __slots__ = (
+        'fingerprint', 'query', 'count', 'total_ms', 'max_ms', 'last_ms', 'last_rows',
+        'last_params', 'call_sites', 'first_seen', 'last_seen',
+        'plan', 'plan_error', 'plan_captured_at', 'plan_pending'
+    )
+
+    def __init__(self, fingerprint: str, query: str):
+        self.fingerprint = fingerprint
+        self.query = query
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.last_rows = 0
+        self.last_params: List[str] = []
+        self.call_sites: List[str] = []
+        self.first_seen = datetime.now(timezone.utc)
+        self.last_seen = self.first_seen
+        self.plan: Optional[Any] = None
+        self.plan_error: Optional[str] = None
+        self.plan_captured_at: Optional[float] = None
+        self.plan_pending = False
+
+    def to_dict(self, include_plan: bool = True) -> Dict[str, Any]:
+        result = {
+            'fingerprint': self.fingerprint,
+            'query': self.query,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 1),
+            'mean_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 1),
+            'last_ms': round(self.last_ms, 1),
+            'last_rows': self.last_rows,
+            'last_params': self.last_params,
+            'call_sites': self.call_sites,
+            'first_seen': self.first_seen.isoformat(),
+            'last_seen': self.last_seen.isoformat(),
+            'plan_error': self.plan_error,
+        }
+        if include_plan:
+            result['plan'] = self.plan
+        return result
+
+
+class QueryProfiler:
+    """
+    Records queries slower than a threshold and keeps the worst N by total time.
+
+    Queries seen slow `explain_after` times get an EXPLAIN (ANALYZE, BUFFERS)
+    plan captured on a separate pool connection in the background. ANALYZE
+    runs the query again, so only read-only statements are explained, inside
+    a read-only transaction with a statement timeout, one at a time and at
+    most once per `explain_interval` seconds per query.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        threshold_ms: float,
+        top_n: int,
+        explain_after: int,
+        explain_interval: float,
+        explain_timeout_ms: int
+    ):
+        self.enabled = enabled
+        self.threshold_seconds = threshold_ms / 1000
+        self.top_n = top_n
+        self.explain_after = explain_after
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self._entries: Dict[str, SlowQuery] = {}
+        self._pool = None
+        self._explain_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def attach_pool(self, pool) -> None:
+        """Use `pool` (an asyncpg pool) for EXPLAIN side connections."""
+        self._pool = pool
+
+    def detach_pool(self) -> None:
+        self._pool = None
+        for task in self._tasks:
+            task.cancel()
+
+    def record(self, query: str, args: tuple, seconds: float, result: Any = None) -> None:
+        """Record a finished query; does nothing unless it exceeded the threshold."""
+        if not self.enabled or seconds < self.threshold_seconds:
+            return
+
+        normalized = normalize_query(query)
+        fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            entry = self._entries[fingerprint] = SlowQuery(fingerprint, normalized)
+            self._trim()
+
+        elapsed_ms = seconds * 1000
+        rows = row_count(result)
+        call_site = _call_site()
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        entry.max_ms = max(entry.max_ms, elapsed_ms)
+        entry.last_ms = elapsed_ms
+        entry.last_rows = rows
+        entry.last_params = describe_params(args)
+        entry.last_seen = datetime.now(timezone.utc)
+        if call_site not in entry.call_sites:
+            entry.call_sites = (entry.call_sites + [call_site])[-_MAX_CALL_SITES:]
+
+        logger.warning(
+            f"Slow query {fingerprint} ({elapsed_ms:.0f} ms, {rows} rows) at {call_site}: "
+            f"{normalized[:500]} params={entry.last_params}"
+        )
+
+        if self._should_explain(entry):
+            entry.plan_pending = True
+            task = asyncio.get_running_loop().create_task(self._explain(entry, query, args))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def top(self, limit: Optional[int] = None, include_plans: bool = True) -> List[Dict[str, Any]]:
+        """Slow queries ordered by total time spent in them."""
+        entries = sorted(self._entries.values(), key=lambda e: e.total_ms, reverse=True)
+        return [entry.to_dict(include_plans) for entry in entries[:limit or self.top_n]]
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(fingerprint)
+        return entry.to_dict() if entry else None
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+    def _trim(self) -> None:
+        # Keep some slack beyond top_n so new entries can accumulate time
+        # before being compared against long-standing ones
+        if len(self._entries) <= self.top_n * 2:
+            return
+        keep = sorted(self._entries.values(), key=lambda e: e.total_ms, reverse=True)[:self.top_n]
+        self._entries = {entry.fingerprint: entry for entry in keep}
+
+    def _should_explain(self, entry: SlowQuery) -> bool:
+        if self._pool is None or entry.plan_pending or entry.count < self.explain_after:
+            return False
+        if entry.plan_captured_at is not None and time.monotonic() - entry.plan_captured_at < self.explain_interval:
+            return False
+        return _is_read_only(entry.query)
+
+    async def _explain(self, entry: SlowQuery, query: str, args: tuple) -> None:
+        try:
+            async with self._explain_lock:
+                async with self._pool.acquire() as conn:
+                    async with conn.transaction(readonly=True):
+                        await conn.execute(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                        plan = await conn.fetchval(
+                            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args
+                        )
+            entry.plan = json.loads(plan) if isinstance(plan, str) else plan
+            entry.plan_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Temp tables and session state of the original connection are not
+            # visible here, so some queries cannot be explained
+            entry.plan_error = str(e)
+            logger.debug(f"Could not explain slow query {entry.fingerprint}: {e}")
+        finally:
+            entry.plan_pending = False
+            entry.plan_captured_at = time.monotonic()
+
+
+_query_profiler: Optional[QueryProfiler] = None
+
+
+def get_query_profiler() -> QueryProfiler:
+    """Get the process-wide query profiler."""
+    global _query_profiler
+    if _query_profiler is None:
+        settings = get_settings()
+        _query_profiler = QueryProfiler(
+            enabled=settings.slow_query_enabled,
+            threshold_ms=settings.slow_query_threshold_ms,
+            top_n=settings.slow_query_top_n,
+            explain_after=settings.slow_query_explain_after,
+            explain_interval=settings.slow_query_explain_interval_seconds,
+            explain_timeout_ms=settings.slow_query_explain_timeout_ms
+        )
+    return _query_profiler
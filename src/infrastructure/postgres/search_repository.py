@@ -34,9 +34,17 @@ class PostgresSearchRepository:
         sort_by: str = 'relevance',
         sort_order: str = 'desc',
         include_facets: bool = True,
-        facet_fields: Optional[List[str]] = None
+        facet_fields: Optional[List[str]] = None,
+        cursor_score: Optional[float] = None,
+        cursor_updated_at: Optional[datetime] = None,
+        cursor_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Execute a search query using the PostgreSQL search function."""
+        """Execute a search query using the PostgreSQL search function.
+        
+        When cursor_id is given the page continues after that row (keyset
+        pagination) and offset is ignored; pass cursor_score for relevance
+        ordering or cursor_updated_at for updated_at ordering.
+        """
         if facet_fields is None:
             facet_fields = ['tags', 'created_by']
             
@@ -45,7 +53,7 @@ class PostgresSearchRepository:
             """
             SELECT dsa_search.search(
                 $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, 
-                $11, $12, $13, $14, $15
+                $11, $12, $13, $14, $15, $16, $17, $18
             )
             """,
             user_id,
@@ -62,7 +70,10 @@ class PostgresSearchRepository:
             sort_by,
             sort_order,
             include_facets,
-            facet_fields
+            facet_fields,
+            cursor_score,
+            cursor_updated_at,
+            cursor_id
         )
         
         # The PostgreSQL function returns JSONB, parse if it's a string
@@ -89,15 +100,29 @@ class PostgresSearchRepository:
             return json.loads(result)
         return result
 
+    async def refresh_dataset_summaries(self, dataset_ids: List[int]) -> int:
+        """Recompute search index rows for the given datasets.
+        
+        Rows for datasets that no longer exist are removed. Returns the number
+        of summary rows touched.
+        """
+        if not dataset_ids:
+            return 0
+        result = await self._connection.fetchval(
+            "SELECT dsa_search.refresh_datasets_summary($1::int[])",
+            list(dataset_ids)
+        )
+        return result or 0
+
     async def refresh_search_index(self) -> bool:
-        """Refresh the search materialized view."""
+        """Rebuild the search index for all datasets."""
         try:
-            await self._connection.execute(
-                "REFRESH MATERIALIZED VIEW CONCURRENTLY dsa_search.datasets_summary"
+            count = await self._connection.fetchval(
+                "SELECT dsa_search.refresh_datasets_summary()"
             )
-            logger.info("Successfully refreshed search index materialized view")
+            logger.info(f"Successfully rebuilt search index ({count} rows)")
             return True
         except Exception as e:
             logger.error(f"Failed to refresh search index: {type(e).__name__}: {str(e)}")
             logger.exception("Full traceback:")
-            return False
\ No newline at end of file
+            return False
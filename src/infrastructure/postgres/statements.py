@@ -0,0 +1,244 @@
+"""Registry of hot-path statements prepared once per pooled connection."""
+
+import logging
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+from ..metrics import observe_prepared_statement
+
+
+logger = logging.getLogger(__name__)
+
+
+# ========== Hot Statements ==========
+# Repositories pass these constants as their query text; the connection
+# adapter matches the text against the statements prepared on the
+# connection, so the SQL lives in one place and each statement has a
+# stable metric label. Other queries go through asyncpg's statement cache.
+
+GET_REF = """
+            SELECT name, commit_id
+            FROM dsa_core.refs
+            WHERE dataset_id = $1 AND name = $2
+        """
+
+GET_COMMIT_BY_ID = """
+            SELECT commit_id, dataset_id, parent_commit_id, message,
+                   author_id, committed_at as created_at
+            FROM dsa_core.commits
+            WHERE commit_id = $1
+        """
+
+GET_TABLE_PAGE = """
+            SELECT r.data, cr.logical_row_id
+            FROM dsa_core.commit_table_entries($1, $2, $3, $4) cr
+            JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
+            ORDER BY cr.pos
+        """
+
+COUNT_TABLE_ROWS = "SELECT dsa_core.commit_table_row_count($1, $2)"
+
+GET_USER_BY_SOEID = """
+            SELECT u.id, u.soeid, u.role_id, r.role_name,
+                   u.created_at, u.updated_at
+            FROM dsa_auth.users u
+            LEFT JOIN dsa_auth.roles r ON u.role_id = r.id
+            WHERE u.soeid = $1
+        """
+
+CHECK_DATASET_PERMISSION = """
+            SELECT EXISTS(
+                SELECT 1 FROM dsa_auth.dataset_permissions
+                WHERE dataset_id = $1 AND user_id = $2 AND permission_type = ANY($3::dsa_auth.dataset_permission[])
+            )
+        """
+
+GET_JOB_BY_ID = """
+            SELECT id, run_type::text, status::text, dataset_id, user_id,
+                   source_commit_id, run_parameters, output_summary,
+                   error_message, created_at, completed_at
+            FROM dsa_jobs.analysis_runs
+            WHERE id = $1
+        """
+
+# Pick the best pending job of the given effective types ($1, with their
+# priorities in $2; sql_transform jobs are queued as 'import' with a
+# job_type parameter) and lock its row. A job scores its class priority,
+# plus one point per $4 seconds it has waited at time $3, minus $6 per job
+# its user is running and $7 per job running on its dataset; users already
+# running $5 jobs, and the users in $8, are skipped. Only the $9 oldest
+# eligible jobs are scored: they are read off the pending (status,
+# created_at) index, and aging moves every job into that window in turn.
+# Running counts come from the partial running indexes. The quota is only
+# enforced by CLAIM_SELECTED_JOB, under the user's claim lock.
+SELECT_PENDING_JOB = """
+                        WITH classes AS (
+                            SELECT job_type, priority
+                            FROM unnest($1::text[], $2::float8[]) AS c(job_type, priority)
+                        ),
+                        running_by_user AS (
+                            SELECT user_id, count(*) AS jobs
+                            FROM dsa_jobs.analysis_runs
+                            WHERE status = 'running' AND user_id IS NOT NULL
+                            GROUP BY user_id
+                        ),
+                        running_by_dataset AS (
+                            SELECT dataset_id, count(*) AS jobs
+                            FROM dsa_jobs.analysis_runs
+                            WHERE status = 'running'
+                            GROUP BY dataset_id
+                        ),
+                        window_jobs AS (
+                            SELECT j.id, j.user_id, j.dataset_id, j.created_at, c.priority,
+                                   coalesce(u.jobs, 0) AS user_jobs
+                            FROM dsa_jobs.analysis_runs j
+                            JOIN classes c ON c.job_type = coalesce(j.run_parameters->>'job_type', j.run_type::text)
+                            LEFT JOIN running_by_user u ON u.user_id = j.user_id
+                            WHERE j.status = 'pending'
+                            AND coalesce(u.jobs, 0) < $5::bigint
+                            AND NOT coalesce(j.user_id = ANY($8::int[]), false)
+                            ORDER BY j.created_at
+                            LIMIT $9
+                        )
+                        SELECT j.id, j.user_id
+                        FROM dsa_jobs.analysis_runs j
+                        JOIN window_jobs w ON w.id = j.id
+                        LEFT JOIN running_by_dataset d ON d.dataset_id = w.dataset_id
+                        WHERE j.status = 'pending'
+                        ORDER BY w.priority
+                                 + extract(epoch FROM $3::timestamptz - w.created_at) / $4::float8
+                                 - w.user_jobs * $6::float8
+                                 - coalesce(d.jobs, 0) * $7::float8 DESC,
+                                 w.created_at
+                        LIMIT 1
+                        FOR UPDATE OF j SKIP LOCKED
+                    """
+
+# Mark the job $1 selected by SELECT_PENDING_JOB as claimed by worker $2,
+# unless its user ($3) is already running $4 jobs. Run under the user's
+# claim lock so that concurrent claims for one user count each other.
+CLAIM_SELECTED_JOB = """
+                        UPDATE dsa_jobs.analysis_runs
+                        SET status = 'running', claimed_by = $2, heartbeat_at = now()
+                        WHERE id = $1
+                        AND ($3::int IS NULL OR (
+                            SELECT count(*)
+                            FROM dsa_jobs.analysis_runs r
+                            WHERE r.status = 'running' AND r.user_id = $3::int
+                        ) < $4::bigint)
+                        RETURNING id, run_type, dataset_id, source_commit_id,
+                                  user_id, run_parameters, created_at
+                    """
+
+HOT_STATEMENTS: Dict[str, str] = {
+    'get_ref': GET_REF,
+    'get_commit_by_id': GET_COMMIT_BY_ID,
+    'get_table_page': GET_TABLE_PAGE,
+    'count_table_rows': COUNT_TABLE_ROWS,
+    'get_user_by_soeid': GET_USER_BY_SOEID,
+    'check_dataset_permission': CHECK_DATASET_PERMISSION,
+    'get_job_by_id': GET_JOB_BY_ID,
+    'select_pending_job': SELECT_PENDING_JOB,
+    'claim_selected_job': CLAIM_SELECTED_JOB,
+}
+
+_NAMES_BY_SQL: Dict[str, str] = {sql: name for name, sql in HOT_STATEMENTS.items()}
+
+
+class DsaConnection(asyncpg.Connection):
+    """Pool connection that carries its prepared hot-path statements."""
+
+    __slots__ = ('_dsa_statements',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._dsa_statements: Dict[str, Optional[asyncpg.prepared_stmt.PreparedStatement]] = {}
+
+
+# ========== Stats ==========
+
+_stats: Dict[str, Any] = {
+    'prepared_connections': 0,
+    'hits': {name: 0 for name in HOT_STATEMENTS},
+    'invalidated': 0,
+    'adhoc': 0
+}
+
+
+def get_statement_stats() -> Dict[str, Any]:
+    """Prepared statement usage since process start."""
+    hits = sum(_stats['hits'].values())
+    total = hits + _stats['adhoc']
+    return {
+        'prepared_connections': _stats['prepared_connections'],
+        'hits': dict(_stats['hits']),
+        'invalidated': _stats['invalidated'],
+        'adhoc': _stats['adhoc'],
+        'prepared_ratio': round(hits / total, 3) if total else 0.0
+    }
+
+
+# ========== Preparation and Lookup ==========
+
+async def prepare_hot_statements(conn: asyncpg.Connection) -> None:
+    """Prepare every hot statement on a freshly opened connection."""
+    if getattr(conn, '_dsa_statements', None) is None:
+        return
+
+    for sql in HOT_STATEMENTS.values():
+        await prepare_statement(conn, sql)
+    _stats['prepared_connections'] += 1
+
+
+async def prepare_statement(
+    conn: asyncpg.Connection,
+    query: str
+) -> Optional[asyncpg.prepared_stmt.PreparedStatement]:
+    """Prepare a hot statement on `conn`, or None if it can't be prepared there."""
+    statements = getattr(conn, '_dsa_statements', None)
+    if statements is None or query not in _NAMES_BY_SQL:
+        return None
+    try:
+        statements[query] = await conn.prepare(query)
+    except asyncpg.PostgresError as e:
+        # A missing object (e.g. before migrations ran) only costs the fast path
+        logger.warning(f"Could not prepare statement '{_NAMES_BY_SQL[query]}': {e}")
+        statements.pop(query, None)
+        return None
+    return statements[query]
+
+
+async def lookup_statement(conn: Any, query: str) -> Optional[asyncpg.prepared_stmt.PreparedStatement]:
+    """
+    Return the statement prepared on `conn` for `query`, counting the outcome.
+
+    A statement discarded after a schema change is prepared again on its
+    next use outside a transaction, where preparing can't fail an aborted one.
+    """
+    name = _NAMES_BY_SQL.get(query)
+    statements = getattr(conn, '_dsa_statements', None) if name else None
+    statement = statements.get(query) if statements else None
+    if statement is None and statements and query in statements and not conn.is_in_transaction():
+        statement = await prepare_statement(conn, query)
+    if statement is None:
+        _stats['adhoc'] += 1
+        return None
+
+    _stats['hits'][name] += 1
+    observe_prepared_statement(name, 'hit')
+    return statement
+
+
+def discard_statement(conn: Any, query: str) -> None:
+    """Mark a statement the server no longer accepts (e.g. after DDL) for preparing again."""
+    statements = getattr(conn, '_dsa_statements', None)
+    if statements and statements.get(query) is not None:
+        statements[query] = None
+        _stats['invalidated'] += 1
+        observe_prepared_statement(_NAMES_BY_SQL[query], 'invalidated')
+
+
+def statement_name(query: str) -> str:
+    """Metric label for a query: its hot statement name, or 'adhoc'."""
+    return _NAMES_BY_SQL.get(query, 'adhoc')
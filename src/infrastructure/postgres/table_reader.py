@@ -3,13 +3,43 @@
 from typing import List, Dict, Any, Optional, AsyncGenerator
 import json
 import re
-from asyncpg import Connection
+import orjson
+from asyncpg import Connection, Record
+from .statements import GET_TABLE_PAGE, COUNT_TABLE_ROWS
+from ..metrics import traced_queries
+
+
+# The rows of a table in the order of GET_TABLE_PAGE, with optional filters.
+# Sealed tables are read chunk by chunk in chunk order, so the sort only
+# orders the rows within each chunk (an incremental sort over the primary
+# key) and a cursor gets its first rows without the whole table being
+# materialized; tables still staged in commit_rows are ordered by key.
+_TABLE_RECORDS = """
+    SELECT r.data, m.logical_row_id
+    FROM (
+        SELECT cc.chunk_index, e.ord, cc.table_key || ':' || e.row_key AS logical_row_id, e.row_hash
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) WITH ORDINALITY AS e(row_key, row_hash, ord)
+        WHERE cc.commit_id = $1 AND cc.table_key = $2
+        UNION ALL
+        SELECT -1, row_number() OVER (ORDER BY cr.logical_row_id COLLATE "C"), cr.logical_row_id, cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2 || ':%'
+    ) m
+    JOIN dsa_core.rows r ON r.row_hash = m.row_hash
+    WHERE TRUE{filters}
+    ORDER BY m.chunk_index, m.ord
+"""
+
+
 class PostgresTableReader:
     """PostgreSQL implementation for reading table data from commits."""
     
     def __init__(self, connection: Connection):
         self._conn = connection
     
+    @traced_queries('reader')
     async def list_table_keys(self, commit_id: str) -> List[str]:
         """List all available table keys for a given commit."""
         # First try to get table keys from schema
@@ -26,20 +56,16 @@ class PostgresTableReader:
                 schema_result = json.loads(schema_result)
             return list(schema_result.keys())
         
-        # Fallback: try to extract from logical_row_id
+        # Fallback: table keys of the commit's manifest chunks and staged rows
         query = """
-            SELECT DISTINCT 
-                CASE 
-                    WHEN logical_row_id LIKE '%:%' THEN SPLIT_PART(logical_row_id, ':', 1)
-                    ELSE REGEXP_REPLACE(logical_row_id, '_[0-9]+$', '')
-                END AS table_key
-            FROM dsa_core.commit_rows
-            WHERE commit_id = $1
+            SELECT table_key
+            FROM dsa_core.commit_table_keys($1) AS table_key
             ORDER BY table_key
         """
         rows = await self._conn.fetch(query, commit_id)
         return [row['table_key'] for row in rows if row['table_key']]
     
+    @traced_queries('reader')
     async def get_table_schema(self, commit_id: str, table_key: str) -> Optional[Dict[str, Any]]:
         """Get the schema for a specific table within a commit."""
         # First try to get by table_key directly (for newer schemas)
@@ -73,6 +99,7 @@ class PostgresTableReader:
                     
         return None
     
+    @traced_queries('reader')
     async def get_table_statistics(self, commit_id: str, table_key: str) -> Optional[Dict[str, Any]]:
         """Get statistics for a specific table within a commit."""
         query = """
@@ -83,6 +110,18 @@ class PostgresTableReader:
         result = await self._conn.fetchval(query, commit_id, table_key)
         return result if result else None
     
+    @traced_queries('reader')
+    async def get_table_records(
+        self,
+        commit_id: str,
+        table_key: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Record]:
+        """Get a page of (data, logical_row_id) records with data left as JSON text."""
+        return await self._conn.fetch_records(GET_TABLE_PAGE, commit_id, table_key, offset, limit)
+    
+    @traced_queries('reader')
     async def get_table_data(
         self,
         commit_id: str,
@@ -91,38 +130,15 @@ class PostgresTableReader:
         limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Get paginated data for a specific table."""
-        # Simple pattern matching for table_key
-        pattern = f"{table_key}_%"
-        
-        if limit is None:
-            query = """
-                SELECT r.data, cr.logical_row_id
-                FROM dsa_core.commit_rows cr
-                JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                WHERE cr.commit_id = $1 
-                AND cr.logical_row_id LIKE $2
-                ORDER BY cr.logical_row_id
-                OFFSET $3
-            """
-            rows = await self._conn.fetch(query, commit_id, pattern, offset)
-        else:
-            query = """
-                SELECT r.data, cr.logical_row_id
-                FROM dsa_core.commit_rows cr
-                JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                WHERE cr.commit_id = $1 
-                AND cr.logical_row_id LIKE $2
-                ORDER BY cr.logical_row_id
-                OFFSET $3 LIMIT $4
-            """
-            rows = await self._conn.fetch(query, commit_id, pattern, offset, limit)
+        # Chunk row offsets let the page skip everything before it
+        rows = await self.get_table_records(commit_id, table_key, offset, limit)
         
         # Parse data - expect only direct format
         result = []
         for row in rows:
             data = row['data']
             if isinstance(data, str):
-                data = json.loads(data)
+                data = orjson.loads(data)
             
             if not isinstance(data, dict):
                 raise ValueError(f"Invalid data format - expected dict but got {type(data)}")
@@ -141,31 +157,13 @@ class PostgresTableReader:
         batch_size: int = 1000
     ) -> AsyncGenerator[List[Dict[str, Any]], None]:
         """Stream data for a specific table in batches."""
-        pattern = f"{table_key}_%"
-        offset = 0
-        
-        while True:
-            # Fetch a batch of rows
-            query = """
-                SELECT r.data, cr.logical_row_id
-                FROM dsa_core.commit_rows cr
-                JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2
-                ORDER BY cr.logical_row_id
-                OFFSET $3 LIMIT $4
-            """
-            rows = await self._conn.fetch(query, commit_id, pattern, offset, batch_size)
-            
-            # If no more rows, stop
-            if not rows:
-                break
-            
+        async for rows in self.get_table_records_stream(commit_id, table_key, batch_size):
             # Process batch
             batch = []
             for row in rows:
                 data = row['data']
                 if isinstance(data, str):
-                    data = json.loads(data)
+                    data = orjson.loads(data)
                 
                 if not isinstance(data, dict):
                     raise ValueError(f"Invalid data format - expected dict but got {type(data)}")
@@ -176,26 +174,57 @@ class PostgresTableReader:
                 })
             
             yield batch
-            
-            # Move to next batch
-            offset += len(rows)
-            
-            # If we got less than batch_size, we're done
-            if len(rows) < batch_size:
-                break
     
-    async def count_table_rows(self, commit_id: str, table_key: str) -> int:
-        """Get the total row count for a specific table."""
-        pattern = f"{table_key}_%"
+    async def get_table_records_stream(
+        self,
+        commit_id: str,
+        table_key: str,
+        batch_size: int = 1000,
+        filters: Optional['DataFilters'] = None
+    ) -> AsyncGenerator[List[Record], None]:
+        """Stream (data, logical_row_id) records of a table in key order, data left as JSON text.
+        
+        Filtered or not, the rows come from one server-side cursor in the
+        order of get_table_records' pages, so each row is read once.
+        """
+        params: List[Any] = [commit_id, table_key]
+        query = _TABLE_RECORDS.format(filters=self._build_filters_sql(filters, params))
+        
+        async with self._conn.transaction():
+            batch = []
+            async for record in self._conn.cursor(query, *params, prefetch=batch_size):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+    
+    @traced_queries('reader')
+    async def get_rows_by_hashes(self, row_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get row data keyed by row hash."""
+        if not row_hashes:
+            return {}
         
         query = """
-            SELECT COUNT(*)
-            FROM dsa_core.commit_rows cr
-            JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 
-            AND cr.logical_row_id LIKE $2
+            SELECT row_hash, data
+            FROM dsa_core.rows
+            WHERE row_hash = ANY($1::char(64)[])
         """
-        count = await self._conn.fetchval(query, commit_id, pattern)
+        rows = await self._conn.fetch(query, list(row_hashes))
+        
+        result = {}
+        for row in rows:
+            data = row['data']
+            if isinstance(data, str):
+                data = orjson.loads(data)
+            result[row['row_hash']] = data
+        return result
+    
+    @traced_queries('reader')
+    async def count_table_rows(self, commit_id: str, table_key: str) -> int:
+        """Get the total row count for a specific table."""
+        count = await self._conn.fetchval(COUNT_TABLE_ROWS, commit_id, table_key)
         return count or 0
     
     
@@ -207,39 +236,31 @@ class PostgresTableReader:
         sample_params: Dict[str, Any]
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """Stream sampled data based on method."""
-        # Handle table key pattern
-        if ':' in table_key:
-            pattern = f"{table_key}:%"
-        else:
-            pattern = f"{table_key}_%"
-        
         # Build sampling query based on method
         if sample_method == 'random':
             if sample_params.get('seed'):
                 # Deterministic random sampling
                 query = """
                     SELECT r.data, cr.logical_row_id
-                    FROM dsa_core.commit_rows cr
+                    FROM dsa_core.commit_table_entries($1, $2) cr
                     JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                    WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2
                     ORDER BY md5(cr.logical_row_id || $3::text)
                     LIMIT $4
                 """
-                cursor_params = [commit_id, pattern, str(sample_params['seed']), sample_params['sample_size']]
+                cursor_params = [commit_id, table_key, str(sample_params['seed']), sample_params['sample_size']]
             else:
-                # True random sampling using TABLESAMPLE
+                # Bernoulli sampling over the manifest (views do not support TABLESAMPLE)
                 total_rows = await self.count_table_rows(commit_id, table_key)
-                sample_pct = min(100, (sample_params['sample_size'] / max(total_rows, 1)) * 100 * 1.5)
+                sample_fraction = min(1.0, (sample_params['sample_size'] / max(total_rows, 1)) * 1.5)
                 
                 query = f"""
                     SELECT r.data, cr.logical_row_id
-                    FROM dsa_core.commit_rows cr
-                    TABLESAMPLE SYSTEM({sample_pct})
+                    FROM dsa_core.commit_table_entries($1, $2) cr
                     JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                    WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2
+                    WHERE random() < {sample_fraction}
                     LIMIT $3
                 """
-                cursor_params = [commit_id, pattern, sample_params['sample_size']]
+                cursor_params = [commit_id, table_key, sample_params['sample_size']]
         
         elif sample_method == 'systematic':
             # Systematic sampling with interval
@@ -248,16 +269,15 @@ class PostgresTableReader:
                     SELECT 
                         r.data, cr.logical_row_id,
                         ROW_NUMBER() OVER (ORDER BY cr.logical_row_id) as rn
-                    FROM dsa_core.commit_rows cr
+                    FROM dsa_core.commit_table_entries($1, $2) cr
                     JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                    WHERE cr.commit_id = $1 AND cr.logical_row_id LIKE $2
                 )
                 SELECT data, logical_row_id
                 FROM numbered_data
                 WHERE MOD(rn + $3 - 1, $4) = 0
             """
             cursor_params = [
-                commit_id, pattern,
+                commit_id, table_key,
                 sample_params.get('start', 1),
                 sample_params['interval']
             ]
@@ -271,7 +291,7 @@ class PostgresTableReader:
                 # Parse JSON data if needed
                 data = row['data']
                 if isinstance(data, str):
-                    data = json.loads(data)
+                    data = orjson.loads(data)
                 
                 # Handle nested data structure
                 if 'data' in data and isinstance(data['data'], dict):
@@ -286,6 +306,7 @@ class PostgresTableReader:
                         **data
                     }
     
+    @traced_queries('reader')
     async def get_table_data_enhanced(
         self,
         commit_id: str,
@@ -299,60 +320,64 @@ class PostgresTableReader:
         """Enhanced data retrieval with multi-sort, array filters, and complex filter groups."""
         from src.api.models.requests import SortSpec, DataFilters, ColumnFilter
         
-        pattern = f"{table_key}_%"
+        if not sorting and not filters:
+            # Unfiltered pages in key order come straight from the chunk lists
+            rows = await self.get_table_data(commit_id, table_key, offset, limit)
+            if select_columns:
+                rows = [
+                    {'_logical_row_id': row['_logical_row_id'],
+                     **{k: v for k, v in row.items() if k in select_columns}}
+                    for row in rows
+                ]
+            return rows
+        
+        rows = await self.get_table_records_enhanced(commit_id, table_key, offset, limit, sorting, filters)
+        
+        # Parse and process data
+        result = []
+        for row in rows:
+            data = row['data']
+            if isinstance(data, str):
+                data = orjson.loads(data)
+            
+            if not isinstance(data, dict):
+                raise ValueError(f"Invalid data format - expected dict but got {type(data)}")
+            
+            # Apply column selection if specified
+            if select_columns:
+                data = {k: v for k, v in data.items() if k in select_columns}
+            
+            result.append({
+                '_logical_row_id': row['logical_row_id'],
+                **data
+            })
+        
+        return result
+    
+    @traced_queries('reader')
+    async def get_table_records_enhanced(
+        self,
+        commit_id: str,
+        table_key: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        sorting: Optional[List['SortSpec']] = None,
+        filters: Optional['DataFilters'] = None
+    ) -> List[Record]:
+        """Get a filtered, sorted page of (data, logical_row_id) records with data left as JSON text."""
+        if not sorting and not filters:
+            return await self.get_table_records(commit_id, table_key, offset, limit)
         
         # Build query
         query = """
             SELECT r.data, cr.logical_row_id
-            FROM dsa_core.commit_rows cr
+            FROM dsa_core.commit_table_entries($1, $2) cr
             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 
-            AND cr.logical_row_id LIKE $2
+            WHERE TRUE
         """
         
-        params = [commit_id, pattern]
-        param_count = 2
-        
-        # Add filters
-        if filters:
-            # Add column filters (AND logic by default)
-            if filters.columns:
-                for col_filter in filters.columns:
-                    if col_filter.operator not in ['is_null', 'is_not_null']:
-                        param_count += 1
-                        params.append(col_filter.value)
-                        query += self._build_filter_clause(col_filter, param_count)
-                    else:
-                        # No parameter needed for null checks
-                        query += self._build_filter_clause(col_filter, None)
-            
-            # Add filter groups (complex logic)
-            if filters.groups:
-                group_conditions = []
-                for group in filters.groups:
-                    group_clauses = []
-                    for col_filter in group.conditions:
-                        if col_filter.operator not in ['is_null', 'is_not_null']:
-                            param_count += 1
-                            params.append(col_filter.value)
-                            group_clauses.append(self._build_filter_clause(col_filter, param_count, standalone=False))
-                        else:
-                            # No parameter needed for null checks
-                            group_clauses.append(self._build_filter_clause(col_filter, None, standalone=False))
-                    
-                    if group_clauses:
-                        logic_op = ' OR ' if group.logic == 'OR' else ' AND '
-                        group_conditions.append(f"({logic_op.join(group_clauses)})")
-                
-                if group_conditions:
-                    # Groups are ORed together by default
-                    query += f" AND ({' OR '.join(group_conditions)})"
-            
-            # Add global filter
-            if filters.global_filter:
-                param_count += 1
-                params.append(f"%{filters.global_filter}%")
-                query += f" AND r.data::text ILIKE ${param_count}"
+        params = [commit_id, table_key]
+        query += self._build_filters_sql(filters, params)
         
         # Add multi-column sorting
         if sorting:
@@ -360,91 +385,102 @@ class PostgresTableReader:
             for sort_spec in sorting:
                 order = "DESC" if sort_spec.desc else "ASC"
                 column = sort_spec.column
+                params.append(column)
+                column_sql = f"r.data->>${len(params)}"
                 # Try to detect if column should be numeric based on common patterns
                 # or if the column contains numeric-like names
                 if any(keyword in column.lower() for keyword in ['price', 'amount', 'quantity', 'qty', 'total', 'sum', 'count', 'age', 'year', 'score', 'rating', 'level', 'stock']):
                     # Cast to numeric for numeric columns, handle nulls
-                    order_clauses.append(f"CAST(NULLIF(r.data->>'{column}', '') AS NUMERIC) {order} NULLS LAST")
+                    order_clauses.append(f"CAST(NULLIF({column_sql}, '') AS NUMERIC) {order} NULLS LAST")
                 else:
                     # Text sorting for other columns
-                    order_clauses.append(f"r.data->>'{column}' {order} NULLS LAST")
+                    order_clauses.append(f"{column_sql} {order} NULLS LAST")
             query += f" ORDER BY {', '.join(order_clauses)}, cr.logical_row_id"
         else:
             query += " ORDER BY cr.logical_row_id"
         
         # Add pagination
-        param_count += 1
         params.append(offset)
-        query += f" OFFSET ${param_count}"
+        query += f" OFFSET ${len(params)}"
         
         if limit is not None:
-            param_count += 1
             params.append(limit)
-            query += f" LIMIT ${param_count}"
-        
-        rows = await self._conn.fetch(query, *params)
+            query += f" LIMIT ${len(params)}"
         
-        # Parse and process data
-        result = []
-        for row in rows:
-            data = row['data']
-            if isinstance(data, str):
-                data = json.loads(data)
-            
-            if not isinstance(data, dict):
-                raise ValueError(f"Invalid data format - expected dict but got {type(data)}")
-            
-            # Apply column selection if specified
-            if select_columns:
-                data = {k: v for k, v in data.items() if k in select_columns}
+        return await self._conn.fetch_records(query, *params)
+    
+    # Filter templates by operator; anything unknown falls back to equality
+    _FILTER_TEMPLATES = {
+        'eq': "{column} = {value}",
+        'neq': "{column} != {value}",
+        'contains': "{column} ILIKE '%' || {value} || '%'",
+        'not_contains': "{column} NOT ILIKE '%' || {value} || '%'",
+        'starts_with': "{column} ILIKE {value} || '%'",
+        'ends_with': "{column} ILIKE '%' || {value}",
+        'gt': "({column})::numeric > {value}::numeric",
+        'gte': "({column})::numeric >= {value}::numeric",
+        'lt': "({column})::numeric < {value}::numeric",
+        'lte': "({column})::numeric <= {value}::numeric",
+        'in': "{column} = ANY({value}::text[])",
+        'not_in': "{column} != ALL({value}::text[])",
+    }
+    
+    def _build_filters_sql(self, filters: Optional['DataFilters'], params: List[Any]) -> str:
+        """Build the WHERE additions for enhanced filters, appending their parameters."""
+        if not filters:
+            return ""
+        
+        sql = ""
+        # Add column filters (AND logic by default)
+        if filters.columns:
+            for col_filter in filters.columns:
+                sql += self._build_filter_clause(col_filter, params)
+        
+        # Add filter groups (complex logic)
+        if filters.groups:
+            group_conditions = []
+            for group in filters.groups:
+                group_clauses = [
+                    self._build_filter_clause(col_filter, params, standalone=False)
+                    for col_filter in group.conditions
+                ]
+                if group_clauses:
+                    logic_op = ' OR ' if group.logic == 'OR' else ' AND '
+                    group_conditions.append(f"({logic_op.join(group_clauses)})")
             
-            result.append({
-                '_logical_row_id': row['logical_row_id'],
-                **data
-            })
+            if group_conditions:
+                # Groups are ORed together by default
+                sql += f" AND ({' OR '.join(group_conditions)})"
         
-        return result
+        # Add global filter
+        if filters.global_filter:
+            params.append(f"%{filters.global_filter}%")
+            sql += f" AND r.data::text ILIKE ${len(params)}"
+        
+        return sql
     
-    def _build_filter_clause(self, col_filter: 'ColumnFilter', param_num: Optional[int], standalone: bool = True) -> str:
-        """Build SQL filter clause for a single column filter."""
-        column = col_filter.column
-        operator = col_filter.operator
+    def _build_filter_clause(self, col_filter: 'ColumnFilter', params: List[Any], standalone: bool = True) -> str:
+        """Build SQL filter clause for a single column filter.
         
+        The column name is bound as a parameter like the value, so the query
+        text only depends on the operators used and the statement cache can
+        reuse it across columns.
+        """
         prefix = " AND " if standalone else ""
         
-        if operator == 'eq':
-            return f"{prefix}r.data->>'{column}' = ${param_num}"
-        elif operator == 'neq':
-            return f"{prefix}r.data->>'{column}' != ${param_num}"
-        elif operator == 'contains':
-            return f"{prefix}r.data->>'{column}' ILIKE '%' || ${param_num} || '%'"
-        elif operator == 'not_contains':
-            return f"{prefix}r.data->>'{column}' NOT ILIKE '%' || ${param_num} || '%'"
-        elif operator == 'starts_with':
-            return f"{prefix}r.data->>'{column}' ILIKE ${param_num} || '%'"
-        elif operator == 'ends_with':
-            return f"{prefix}r.data->>'{column}' ILIKE '%' || ${param_num}"
-        elif operator == 'gt':
-            return f"{prefix}(r.data->>'{column}')::numeric > ${param_num}::numeric"
-        elif operator == 'gte':
-            return f"{prefix}(r.data->>'{column}')::numeric >= ${param_num}::numeric"
-        elif operator == 'lt':
-            return f"{prefix}(r.data->>'{column}')::numeric < ${param_num}::numeric"
-        elif operator == 'lte':
-            return f"{prefix}(r.data->>'{column}')::numeric <= ${param_num}::numeric"
-        elif operator == 'in':
-            # Handle array values for IN operator
-            return f"{prefix}r.data->>'{column}' = ANY(${param_num}::text[])"
-        elif operator == 'not_in':
-            return f"{prefix}r.data->>'{column}' != ALL(${param_num}::text[])"
-        elif operator == 'is_null':
-            return f"{prefix}r.data->>'{column}' IS NULL"
-        elif operator == 'is_not_null':
-            return f"{prefix}r.data->>'{column}' IS NOT NULL"
-        else:
-            # Default to equality
-            return f"{prefix}r.data->>'{column}' = ${param_num}"
+        params.append(col_filter.column)
+        column = f"r.data->>${len(params)}"
+        
+        if col_filter.operator == 'is_null':
+            return f"{prefix}{column} IS NULL"
+        if col_filter.operator == 'is_not_null':
+            return f"{prefix}{column} IS NOT NULL"
+        
+        params.append(col_filter.value)
+        template = self._FILTER_TEMPLATES.get(col_filter.operator, self._FILTER_TEMPLATES['eq'])
+        return prefix + template.format(column=column, value=f"${len(params)}")
     
+    @traced_queries('reader')
     async def count_table_rows_enhanced(
         self,
         commit_id: str,
@@ -454,63 +490,23 @@ class PostgresTableReader:
         """Count rows with enhanced filters applied."""
         from src.api.models.requests import DataFilters
         
-        pattern = f"{table_key}_%"
+        if not filters:
+            return await self.count_table_rows(commit_id, table_key)
         
         query = """
             SELECT COUNT(*)
-            FROM dsa_core.commit_rows cr
+            FROM dsa_core.commit_table_entries($1, $2) cr
             JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-            WHERE cr.commit_id = $1 
-            AND cr.logical_row_id LIKE $2
+            WHERE TRUE
         """
         
-        params = [commit_id, pattern]
-        param_count = 2
-        
-        # Add filters (same logic as get_table_data_enhanced)
-        if filters:
-            # Add column filters
-            if filters.columns:
-                for col_filter in filters.columns:
-                    if col_filter.operator not in ['is_null', 'is_not_null']:
-                        param_count += 1
-                        params.append(col_filter.value)
-                        query += self._build_filter_clause(col_filter, param_count)
-                    else:
-                        # No parameter needed for null checks
-                        query += self._build_filter_clause(col_filter, None)
-            
-            # Add filter groups
-            if filters.groups:
-                group_conditions = []
-                for group in filters.groups:
-                    group_clauses = []
-                    for col_filter in group.conditions:
-                        if col_filter.operator not in ['is_null', 'is_not_null']:
-                            param_count += 1
-                            params.append(col_filter.value)
-                            group_clauses.append(self._build_filter_clause(col_filter, param_count, standalone=False))
-                        else:
-                            # No parameter needed for null checks
-                            group_clauses.append(self._build_filter_clause(col_filter, None, standalone=False))
-                    
-                    if group_clauses:
-                        logic_op = ' OR ' if group.logic == 'OR' else ' AND '
-                        group_conditions.append(f"({logic_op.join(group_clauses)})")
-                
-                if group_conditions:
-                    # Groups are ORed together by default
-                    query += f" AND ({' OR '.join(group_conditions)})"
-            
-            # Add global filter
-            if filters.global_filter:
-                param_count += 1
-                params.append(f"%{filters.global_filter}%")
-                query += f" AND r.data::text ILIKE ${param_count}"
+        params = [commit_id, table_key]
+        query += self._build_filters_sql(filters, params)
         
         count = await self._conn.fetchval(query, *params)
         return count or 0
     
+    @traced_queries('reader')
     async def batch_get_table_metadata(self, commit_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
         """Batch fetch table metadata for multiple commits in a single operation."""
         # First, get all schemas for the commits
@@ -525,17 +521,24 @@ class PostgresTableReader:
         
         schema_rows = await self._conn.fetch(schema_query, commit_ids)
         
-        # Then get row counts for each table
+        # Then get row counts for each table (chunk counts plus staged rows)
         count_query = """
-            SELECT 
-                commit_id,
-                CASE 
-                    WHEN logical_row_id LIKE '%:%' THEN SPLIT_PART(logical_row_id, ':', 1)
-                    ELSE REGEXP_REPLACE(logical_row_id, '_[0-9]+$', '')
-                END AS table_key,
-                COUNT(*) as row_count
-            FROM dsa_core.commit_rows
-            WHERE commit_id = ANY($1::text[])
+            SELECT commit_id, table_key, SUM(row_count) AS row_count
+            FROM (
+                SELECT commit_id, table_key, row_count
+                FROM dsa_core.commit_chunks
+                WHERE commit_id = ANY($1::text[])
+                UNION ALL
+                SELECT 
+                    commit_id,
+                    CASE 
+                        WHEN logical_row_id LIKE '%:%' THEN SPLIT_PART(logical_row_id, ':', 1)
+                        ELSE REGEXP_REPLACE(logical_row_id, '_[0-9]+$', '')
+                    END AS table_key,
+                    1 AS row_count
+                FROM dsa_core.commit_rows
+                WHERE commit_id = ANY($1::text[])
+            ) counts
             GROUP BY commit_id, table_key
         """
         
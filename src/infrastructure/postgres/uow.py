@@ -1,9 +1,15 @@
 """PostgreSQL Unit of Work implementation."""
 
-from typing import Optional, Union
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import logging
+import time
 import asyncpg
 
 from .adapters import AsyncpgConnectionAdapter
+from .connection_stats import record_acquisition, record_transaction
+from ..metrics import metrics_enabled, observe_pool_wait
 from .user_repo import PostgresUserRepository
 from .dataset_repo import PostgresDatasetRepository
 from .versioning_repo import PostgresCommitRepository
@@ -12,15 +18,103 @@ from .table_reader import PostgresTableReader
 from .search_repository import PostgresSearchRepository
 from .exploration_repo import PostgresExplorationRepository
 
+logger = logging.getLogger(__name__)
+
+
+# Write unit of work whose transaction the current task is in, so event
+# handlers can defer work that must see its changes until it commits
+_current_unit_of_work: ContextVar[Optional['PostgresUnitOfWork']] = ContextVar(
+    'postgres_unit_of_work', default=None
+)
+
+
+def current_unit_of_work() -> Optional['PostgresUnitOfWork']:
+    return _current_unit_of_work.get()
+
+
+class LazyConnection:
+    """Connection handle that takes a pool connection on first use.
+    
+    Repositories are created with this handle, so a unit of work that never
+    runs a query never touches the pool.
+    """
+    
+    def __init__(self, uow: 'PostgresUnitOfWork'):
+        self._uow = uow
+    
+    async def execute(self, query: str, *args) -> str:
+        """Execute a query without returning results."""
+        conn = await self._uow.ensure_connection()
+        return await conn.execute(query, *args)
+    
+    async def executemany(self, query: str, args: List[tuple]) -> None:
+        """Execute a query multiple times with different arguments."""
+        conn = await self._uow.ensure_connection()
+        await conn.executemany(query, args)
+    
+    async def fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        """Execute a query and return a single row as a dictionary."""
+        conn = await self._uow.ensure_connection()
+        return await conn.fetchrow(query, *args)
+    
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        """Execute a query and return all rows as list of dictionaries."""
+        conn = await self._uow.ensure_connection()
+        return await conn.fetch(query, *args)
+    
+    async def fetchval(self, query: str, *args, column: int = 0) -> Any:
+        """Execute a query and return a single value."""
+        conn = await self._uow.ensure_connection()
+        return await conn.fetchval(query, *args, column=column)
+    
+    async def fetch_records(self, query: str, *args) -> List[asyncpg.Record]:
+        """Execute a query and return the asyncpg records without converting them."""
+        conn = await self._uow.ensure_connection()
+        return await conn.fetch_records(query, *args)
+    
+    async def cursor(self, query: str, *args, prefetch: Optional[int] = None) -> AsyncIterator[asyncpg.Record]:
+        """Iterate a server-side cursor over a query's records.
+        
+        Cursors only live inside a transaction, which every unit of work
+        opens on its first query; see PostgresUnitOfWork.
+        """
+        conn = await self._uow.ensure_connection()
+        async for record in conn.cursor(query, *args, prefetch=prefetch):
+            yield record
+    
+    async def copy_records_to_table(self, table_name: str, **kwargs) -> str:
+        """Bulk insert with COPY on the underlying connection."""
+        conn = await self._uow.ensure_connection()
+        return await conn.raw_connection.copy_records_to_table(table_name, **kwargs)
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """Start a database transaction."""
+        conn = await self._uow.ensure_connection()
+        async with conn.transaction() as tx:
+            yield tx
+
 
 class PostgresUnitOfWork:
-    """PostgreSQL implementation of Unit of Work pattern."""
+    """PostgreSQL implementation of Unit of Work pattern.
+    
+    The pool connection is acquired on the first query, not on begin(), and
+    BEGIN is only sent once a query actually runs, so a unit of work that
+    never queries costs nothing. A read-only unit of work runs all its
+    queries in one REPEATABLE READ, READ ONLY transaction: a count and the
+    page it describes see the same snapshot, and a write fails instead of
+    committing.
+    """
     
-    def __init__(self, pool):
+    def __init__(self, pool, read_only: bool = False):
         self._pool = pool
-        self._connection: Optional[asyncpg.Connection] = None
-        self._is_adapted = False
+        self._read_only = read_only
+        self._connection: Optional[AsyncpgConnectionAdapter] = None
+        self._lazy_connection = LazyConnection(self)
         self._transaction = None
+        self._transaction_pending = False
+        self._context_token: Optional[Token] = None
+        self._after_commit: List[Callable[[], Awaitable[None]]] = []
         self._users = None
         self._datasets = None
         self._commits = None
@@ -36,19 +130,15 @@ class PostgresUnitOfWork:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Exit the context manager."""
-        if exc_type:
-            await self.rollback()
-        else:
-            await self.commit()
-        
-        if self._connection:
-            # Release based on connection type
-            if self._is_adapted and hasattr(self._connection, 'raw_connection'):
+        try:
+            if exc_type:
+                await self.rollback()
+            else:
+                await self.commit()
+        finally:
+            if self._connection:
                 await self._pool._pool.release(self._connection.raw_connection)
-            elif isinstance(self._connection, asyncpg.Connection):
-                await self._pool._pool.release(self._connection)
-            self._connection = None
-            self._is_adapted = False
+                self._connection = None
         
         # Reset repositories
         self._users = None
@@ -59,35 +149,103 @@ class PostgresUnitOfWork:
         self._search_repository = None
         self._explorations = None
     
-    async def begin(self):
-        """Begin a new transaction."""
+    @property
+    def read_only(self) -> bool:
+        """Whether this unit of work reads from one read-only snapshot."""
+        return self._read_only
+    
+    async def ensure_connection(self) -> AsyncpgConnectionAdapter:
+        """Acquire the pool connection, starting the pending transaction if any."""
         if self._connection is None:
+            start = time.perf_counter() if metrics_enabled() else None
             raw_conn = await self._pool._pool.acquire()
-            # Wrap in adapter for consistency
+            if start is not None:
+                observe_pool_wait(time.perf_counter() - start)
+            record_acquisition()
             self._connection = AsyncpgConnectionAdapter(raw_conn)
-            self._is_adapted = True
-            # Get transaction from raw connection
-            self._transaction = raw_conn.transaction()
+        if self._transaction_pending:
+            self._transaction_pending = False
+            if self._read_only:
+                self._transaction = self._connection.raw_connection.transaction(
+                    isolation='repeatable_read', readonly=True
+                )
+            else:
+                self._transaction = self._connection.raw_connection.transaction()
             await self._transaction.start()
+            record_transaction()
+        return self._connection
+    
+    async def begin(self):
+        """Begin a new transaction.
+        
+        The BEGIN is deferred to the first query.
+        """
+        if not self._read_only and _current_unit_of_work.get() is not self:
+            self._context_token = _current_unit_of_work.set(self)
+        if self._transaction is not None:
+            return
+        self._transaction_pending = True
+    
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run `callback` once the current transaction commits; it is dropped on rollback."""
+        self._after_commit.append(callback)
     
     async def commit(self):
-        """Commit the current transaction."""
+        """Commit the current transaction, then run its after-commit callbacks.
+        
+        A read-only unit of work reads on in a new snapshot, so that later
+        queries, cursors included, still run in a transaction.
+        """
+        self._transaction_pending = self._read_only
         if self._transaction:
             await self._transaction.commit()
             self._transaction = None
+        self._leave_context()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                # The transaction is committed either way
+                logger.error(f"After-commit callback {callback!r} failed: {e}", exc_info=True)
     
     async def rollback(self):
         """Rollback the current transaction."""
+        self._transaction_pending = self._read_only
+        self._after_commit = []
         if self._transaction:
             await self._transaction.rollback()
             self._transaction = None
+        self._leave_context()
+    
+    def _leave_context(self) -> None:
+        if self._context_token is None:
+            return
+        try:
+            _current_unit_of_work.reset(self._context_token)
+        except ValueError:
+            # Begun in another task's context, which this one can't restore
+            pass
+        self._context_token = None
+    
+    async def release(self):
+        """Commit and hand the connection back to the pool before the unit of work ends.
+        
+        For long-lived responses such as event streams, which would otherwise
+        hold a pool connection until they finish. A later query takes a
+        connection again, in a new transaction and so, for a read-only unit
+        of work, from a new snapshot.
+        """
+        await self.commit()
+        if self._connection:
+            await self._pool._pool.release(self._connection.raw_connection)
+            self._connection = None
+        await self.begin()
     
     @property
-    def connection(self):
-        """Get the current database connection."""
-        if not self._connection:
-            raise RuntimeError("No active connection in unit of work")
-        return self._connection
+    def connection(self) -> LazyConnection:
+        """Get the connection handle of this unit of work."""
+        return self._lazy_connection
     
     @property
     def users(self):
@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any, List
 from asyncpg import Connection
 # Remove interface import
 from .base_repository import BasePostgresRepository
+from .statements import GET_USER_BY_SOEID
 
 
 class PostgresUserRepository(BasePostgresRepository[int]):
@@ -32,14 +33,7 @@ class PostgresUserRepository(BasePostgresRepository[int]):
     
     async def get_by_soeid(self, soeid: str) -> Optional[Dict[str, Any]]:
         """Get user by SOEID."""
-        query = """
-            SELECT u.id, u.soeid, u.role_id, r.role_name, 
-                   u.created_at, u.updated_at
-            FROM dsa_auth.users u
-            LEFT JOIN dsa_auth.roles r ON u.role_id = r.id
-            WHERE u.soeid = $1
-        """
-        row = await self._conn.fetchrow(query, soeid)
+        row = await self._conn.fetchrow(GET_USER_BY_SOEID, soeid)
         return dict(row) if row else None
     
     async def create_user(self, soeid: str, password_hash: str, role_id: int) -> int:
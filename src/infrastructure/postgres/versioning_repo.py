@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any, List, Tuple, Set
 import json
 import hashlib
 from asyncpg import Connection
+from .statements import GET_REF, GET_COMMIT_BY_ID
 # Remove interface imports
 
 
@@ -82,20 +83,22 @@ class PostgresCommitRepository:
             author_id
         )
         
-        # Bulk insert manifest using COPY
-        # Insert manifest records
+        # Stage the manifest and seal each table into content-addressed chunks
         manifest_query = """
-            INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-            VALUES ($1, $2, $3)
+            INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+            VALUES ($1, $2, $3, $4, $5)
         """
         
-        manifest_records = [
-            (commit_id, logical_row_id, row_hash)
-            for logical_row_id, row_hash in manifest
-        ]
+        manifest_records = []
+        for line_number, (logical_row_id, row_hash) in enumerate(manifest):
+            table_key, _, row_key = logical_row_id.partition(':')
+            manifest_records.append((commit_id, table_key, row_key, row_hash, line_number))
         
         await self._conn.executemany(manifest_query, manifest_records)
         
+        for table_key in sorted({record[1] for record in manifest_records}):
+            await self._conn.execute("SELECT dsa_core.seal_staged_table($1, $2)", commit_id, table_key)
+        
         return commit_id
     
     async def update_ref_atomically(
@@ -133,12 +136,7 @@ class PostgresCommitRepository:
     
     async def get_ref(self, dataset_id: int, ref_name: str) -> Optional[Dict[str, Any]]:
         """Get ref details including commit_id."""
-        query = """
-            SELECT name, commit_id
-            FROM dsa_core.refs
-            WHERE dataset_id = $1 AND name = $2
-        """
-        row = await self._conn.fetchrow(query, dataset_id, ref_name)
+        row = await self._conn.fetchrow(GET_REF, dataset_id, ref_name)
         return dict(row) if row else None
     
     
@@ -186,8 +184,8 @@ class PostgresCommitRepository:
                 ch.author_id,
                 u.soeid as author_soeid,
                 ch.committed_at as created_at,
-                (SELECT COUNT(*) FROM dsa_core.commit_rows WHERE commit_id = ch.commit_id) as row_count,
-                (SELECT COUNT(DISTINCT split_part(logical_row_id, ':', 1)) FROM dsa_core.commit_rows WHERE commit_id = ch.commit_id) as table_count
+                dsa_core.commit_table_row_count(ch.commit_id) as row_count,
+                (SELECT COUNT(*) FROM dsa_core.commit_table_keys(ch.commit_id)) as table_count
             FROM commit_history ch
             LEFT JOIN dsa_auth.users u ON ch.author_id = u.id
             ORDER BY ch.committed_at DESC
@@ -207,13 +205,7 @@ class PostgresCommitRepository:
     
     async def get_commit_by_id(self, commit_id: str) -> Optional[Dict[str, Any]]:
         """Get commit details including author info."""
-        query = """
-            SELECT commit_id, dataset_id, parent_commit_id, message, 
-                   author_id, committed_at as created_at
-            FROM dsa_core.commits 
-            WHERE commit_id = $1
-        """
-        row = await self._conn.fetchrow(query, commit_id)
+        row = await self._conn.fetchrow(GET_COMMIT_BY_ID, commit_id)
         return dict(row) if row else None
     
     async def count_commits_for_dataset(self, dataset_id: int, ref_name: str = "main") -> int:
@@ -240,20 +232,34 @@ class PostgresCommitRepository:
     
     async def count_commit_rows(self, commit_id: str, table_key: Optional[str] = None) -> int:
         """Count rows in a commit, optionally filtered by table."""
-        if table_key:
-            query = """
-                SELECT COUNT(*) FROM dsa_core.commit_rows 
-                WHERE commit_id = $1 AND logical_row_id LIKE $2
-            """
-            result = await self._conn.fetchval(query, commit_id, f"{table_key}:%")
-        else:
-            query = """
-                SELECT COUNT(*) FROM dsa_core.commit_rows WHERE commit_id = $1
-            """
-            result = await self._conn.fetchval(query, commit_id)
+        query = "SELECT dsa_core.commit_table_row_count($1, $2)"
+        result = await self._conn.fetchval(query, commit_id, table_key)
         
         return result or 0
     
+    async def seal_commit_manifest(self, commit_id: str) -> int:
+        """Move a commit's flat commit_rows manifest into manifest chunks.
+        
+        Only commits written before manifests were chunked still have one;
+        new commits are sealed from staging with seal_staged_table().
+        Returns the number of chunks written; chunks already stored by
+        another commit are shared rather than written again.
+        """
+        return await self._conn.fetchval("SELECT dsa_core.seal_commit_manifest($1)", commit_id)
+    
+    async def derive_commit_table(
+        self,
+        commit_id: str,
+        source_commit_id: str,
+        source_table_key: str,
+        table_key: Optional[str] = None
+    ) -> None:
+        """Reuse a table of another commit by sharing its chunk list."""
+        await self._conn.execute(
+            "SELECT dsa_core.derive_commit_table($1, $2, $3, $4)",
+            commit_id, source_commit_id, source_table_key, table_key or source_table_key
+        )
+    
     async def list_refs(self, dataset_id: int) -> List[Dict[str, Any]]:
         """List all refs/branches for a dataset."""
         query = """
@@ -299,4 +305,130 @@ class PostgresCommitRepository:
     
     async def get_commit_table_row_count(self, commit_id: str, table_key: str) -> int:
         """Get row count for a specific table in a commit."""
-        return await self.count_commit_rows(commit_id, table_key)
\ No newline at end of file
+        return await self.count_commit_rows(commit_id, table_key)
+    
+    # ========== Manifest Diff ==========
+    
+    async def get_manifest_window_bound(
+        self, commit_id: str, other_commit_id: str, table_key: Optional[str], after: str, window: int
+    ) -> Optional[str]:
+        """Get the last key of the next window of entries not shared with the other commit.
+        
+        A window holds about `window` entries: whole chunks that the other
+        commit does not share, plus any staged (unsealed) rows. Returns None
+        when nothing is left past `after`.
+        """
+        query = """
+            SELECT max(w.k) FROM (
+                SELECT l.k, sum(l.n) OVER (ORDER BY l.k ROWS UNBOUNDED PRECEDING) - l.n AS rows_before
+                FROM (
+                    SELECT c.k, c.n FROM (
+                        SELECT (cc.table_key || ':' || mc.last_key) COLLATE "C" AS k, cc.row_count AS n
+                        FROM dsa_core.commit_chunks cc
+                        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+                        WHERE cc.commit_id = $1
+                          AND ($3::text IS NULL OR cc.table_key = $3::text)
+                          AND NOT EXISTS (
+                              SELECT 1 FROM dsa_core.commit_chunks oc
+                              WHERE oc.commit_id = $2
+                                AND oc.table_key = cc.table_key
+                                AND oc.chunk_hash = cc.chunk_hash
+                          )
+                        UNION ALL
+                        SELECT cr.logical_row_id COLLATE "C", 1
+                        FROM dsa_core.commit_rows cr
+                        WHERE cr.commit_id = $1
+                          AND ($3::text IS NULL OR cr.logical_row_id LIKE $3::text || ':%')
+                    ) c
+                    WHERE c.k > $4
+                    ORDER BY c.k
+                    LIMIT $5
+                ) l
+            ) w
+            WHERE w.rows_before < $5
+        """
+        return await self._conn.fetchval(query, commit_id, other_commit_id, table_key, after, window)
+    
+    async def diff_manifest_range(
+        self, old_commit_id: str, new_commit_id: str, table_key: Optional[str], after: str, upper: str
+    ) -> List[Dict[str, Any]]:
+        """Get changed manifest entries with after < logical_row_id <= upper.
+        
+        Chunks shared by both commits are skipped without being read; only
+        entries of unshared chunks are joined and compared by hash.
+        """
+        query = """
+            SELECT COALESCE(o.logical_row_id, n.logical_row_id) AS logical_row_id,
+                   o.row_hash AS old_hash,
+                   n.row_hash AS new_hash
+            FROM dsa_core.manifest_unshared_entries($1, $2, $3, $4, $5) o
+            FULL JOIN dsa_core.manifest_unshared_entries($2, $1, $3, $4, $5) n
+              ON o.logical_row_id = n.logical_row_id
+            WHERE o.row_hash IS DISTINCT FROM n.row_hash
+            ORDER BY 1 COLLATE "C"
+        """
+        rows = await self._conn.fetch(query, old_commit_id, new_commit_id, table_key, after, upper)
+        return [dict(row) for row in rows]
+    
+    async def summarize_manifest_range(
+        self, old_commit_id: str, new_commit_id: str, table_key: Optional[str], after: str, upper: str
+    ) -> List[Dict[str, Any]]:
+        """Count added, removed and modified rows per table with after < logical_row_id <= upper."""
+        query = """
+            SELECT split_part(COALESCE(o.logical_row_id, n.logical_row_id), ':', 1) AS table_key,
+                   COUNT(*) FILTER (WHERE o.row_hash IS NULL) AS added,
+                   COUNT(*) FILTER (WHERE n.row_hash IS NULL) AS removed,
+                   COUNT(*) FILTER (WHERE o.row_hash IS NOT NULL AND n.row_hash IS NOT NULL) AS modified
+            FROM dsa_core.manifest_unshared_entries($1, $2, $3, $4, $5) o
+            FULL JOIN dsa_core.manifest_unshared_entries($2, $1, $3, $4, $5) n
+              ON o.logical_row_id = n.logical_row_id
+            WHERE o.row_hash IS DISTINCT FROM n.row_hash
+            GROUP BY 1
+        """
+        rows = await self._conn.fetch(query, old_commit_id, new_commit_id, table_key, after, upper)
+        return [dict(row) for row in rows]
+    
+    async def get_table_row_counts(self, commit_id: str, table_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the row count of each of a commit's tables, or of one table."""
+        query = """
+            SELECT t AS table_key, dsa_core.commit_table_row_count($1, t) AS total
+            FROM dsa_core.commit_table_keys($1) AS t
+            WHERE $2::text IS NULL OR t = $2::text
+        """
+        rows = await self._conn.fetch(query, commit_id, table_key)
+        return [dict(row) for row in rows]
+    
+    async def count_column_changes(
+        self, old_commit_id: str, new_commit_id: str, table_key: Optional[str], after: str, upper: str
+    ) -> List[Dict[str, Any]]:
+        """Count, per table and column, the modified rows with after < logical_row_id <= upper where that column changed.
+        
+        Reads row JSON for modified rows only.
+        """
+        query = """
+            WITH modified AS (
+                SELECT o.logical_row_id, o.row_hash AS old_hash, n.row_hash AS new_hash
+                FROM dsa_core.manifest_unshared_entries($1, $2, $3, $4, $5) o
+                JOIN dsa_core.manifest_unshared_entries($2, $1, $3, $4, $5) n
+                  ON n.logical_row_id = o.logical_row_id
+                WHERE o.row_hash <> n.row_hash
+            )
+            SELECT split_part(m.logical_row_id, ':', 1) AS table_key,
+                   c.column_name,
+                   COUNT(*) AS changes
+            FROM modified m
+            JOIN dsa_core.rows ro ON ro.row_hash = m.old_hash
+            JOIN dsa_core.rows rn ON rn.row_hash = m.new_hash
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(oe.key, ne.key) AS column_name
+                FROM jsonb_each(CASE WHEN jsonb_typeof(ro.data->'data') = 'object'
+                                     THEN ro.data->'data' ELSE ro.data END) oe
+                FULL JOIN jsonb_each(CASE WHEN jsonb_typeof(rn.data->'data') = 'object'
+                                          THEN rn.data->'data' ELSE rn.data END) ne
+                  ON oe.key = ne.key
+                WHERE oe.value IS DISTINCT FROM ne.value
+            ) c
+            GROUP BY 1, 2
+        """
+        rows = await self._conn.fetch(query, old_commit_id, new_commit_id, table_key, after, upper)
+        return [dict(row) for row in rows]
@@ -1,40 +1,50 @@
 """Main FastAPI application with comprehensive error handling."""
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 import logging
 import asyncio
+import time
 from urllib.parse import quote_plus
 
 from .infrastructure.config import get_settings
 from .infrastructure.postgres.database import DatabasePool
+from .infrastructure.postgres.connection_stats import (
+    begin_request_stats, end_request_stats, get_connection_totals
+)
+from .infrastructure.postgres.statements import get_statement_stats
+from .infrastructure.metrics import (
+    metrics_enabled, observe_request, render_metrics, set_pool_connections
+)
 from .infrastructure.external.password_manager import get_password_manager
 from .api.dependencies import (
     set_database_pool,
+    set_preview_pool,
     set_event_bus
 )
 
 # Import new error handling
 from .api.error_handlers import register_error_handlers
+from .api.compression import CompressionMiddleware
+from .api.encoding import ORJSONResponse
 
 # Import API routers
-from .api import users, datasets, versioning, jobs, search, sampling, exploration, workbench, downloads
+from .api import users, datasets, versioning, jobs, search, sampling, exploration, workbench, downloads, admin
 
 # Import workers
 from .workers.job_worker import JobWorker
-from .workers.import_executor import ImportJobExecutor
-from .workers.sampling_executor import SamplingJobExecutor
-from .workers.exploration_executor import ExplorationExecutor
-from .workers.sql_transform_executor import SqlTransformExecutor
+from .workers.registry import register_executors
+from .features.sql_workbench.services.preview_sessions import get_preview_session_store
+from .features.jobs.services.progress import get_job_progress_listener
 
 # Import event system
 from .core.events import EventHandlerRegistry, InMemoryEventBus
 from .infrastructure.postgres.event_store import PostgresEventStore
 from .features.search.event_handlers import SearchIndexEventHandler
 from .features.common.event_handlers import (
-    CacheInvalidationHandler, AuditLogHandler, NotificationHandler
+    CacheInvalidationHandler, AuditLogHandler, NotificationHandler, AuthCacheInvalidationHandler
 )
 
 # Configure logging
@@ -44,6 +54,7 @@ logger = logging.getLogger(__name__)
 # Global references for health check
 app_state = {
     "db_pool": None,
+    "preview_pool": None,
     "worker_task": None,
     "event_bus": None,
     "event_registry": None
@@ -87,8 +98,21 @@ async def lifespan(app: FastAPI):
     await db_pool.initialize()
     logger.info("Database pool initialized")
     
+    # Workbench previews get their own bounded pool so long queries can't
+    # take the connections metadata requests need
+    preview_pool = DatabasePool(dsn)
+    await preview_pool.initialize(
+        min_size=settings.preview_pool_min_size,
+        max_size=settings.preview_pool_max_size,
+        command_timeout=settings.preview_statement_timeout_ms / 1000 + 5,
+        explain_slow_queries=False
+    )
+    set_preview_pool(preview_pool)
+    logger.info("Preview pool initialized")
+    
     # Store in app_state for health check
     app_state["db_pool"] = db_pool
+    app_state["preview_pool"] = preview_pool
     
     # Initialize global dependencies
     set_database_pool(db_pool)
@@ -103,9 +127,11 @@ async def lifespan(app: FastAPI):
     event_registry = EventHandlerRegistry()
     
     # Register handlers
-    event_registry.register_handler(SearchIndexEventHandler(db_pool))
+    search_index_handler = SearchIndexEventHandler(db_pool)
+    event_registry.register_handler(search_index_handler)
     event_registry.register_handler(AuditLogHandler(db_pool))
     event_registry.register_handler(CacheInvalidationHandler())  # No cache configured yet
+    event_registry.register_handler(AuthCacheInvalidationHandler())
     event_registry.register_handler(NotificationHandler())  # No notification service yet
     
     # Wire handlers to event bus
@@ -120,38 +146,69 @@ async def lifespan(app: FastAPI):
     
     logger.info(f"Event system initialized with {len(event_registry.get_all_handlers())} handlers")
     
-    # Initialize and start job worker
-    worker = JobWorker(db_pool)
-    worker.register_executor('import', ImportJobExecutor())
-    worker.register_executor('sampling', SamplingJobExecutor())
-    worker.register_executor('exploration', ExplorationExecutor(db_pool))
-    worker.register_executor('sql_transform', SqlTransformExecutor())
+    # Initialize and start the in-process job worker, on a pool of its own
+    # so jobs don't take the connections requests need; deployments with
+    # dedicated workers (src/run_worker.py) disable it
+    worker_pool = None
+    if settings.api_worker_enabled:
+        worker_pool = DatabasePool(dsn)
+        await worker_pool.initialize(
+            min_size=settings.worker_pool_min_size,
+            max_size=settings.worker_pool_max_size,
+            command_timeout=None,
+            explain_slow_queries=False
+        )
+        worker = register_executors(JobWorker(worker_pool))
+        worker_task = asyncio.create_task(worker.start())
+        app_state["worker_task"] = worker_task
+        logger.info("Job worker started")
+    else:
+        logger.info("Job worker disabled in the API process")
     
-    worker_task = asyncio.create_task(worker.start())
-    app_state["worker_task"] = worker_task
-    logger.info("Job worker started")
+    # Drop idle preview sessions and their spooled rows
+    session_reaper_task = asyncio.create_task(
+        get_preview_session_store().run_reaper(preview_pool, settings.preview_session_reap_interval_seconds)
+    )
+    
+    # Relay job progress notifications to streaming clients
+    progress_listener_task = asyncio.create_task(get_job_progress_listener().run(dsn))
     
     yield
     
     # Cleanup
     logger.info("Shutting down DSA Platform...")
     
-    # Stop worker
+    # Stop claiming jobs and let running ones finish or go back in the queue
     if worker:
         await worker.stop()
+        await worker.drain(settings.worker_drain_timeout_seconds)
     if worker_task:
         worker_task.cancel()
         try:
             await worker_task
         except asyncio.CancelledError:
             pass
+    for task in (session_reaper_task, progress_listener_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    # Flush queued search index updates
+    await search_index_handler.close()
     
-    # Close database pool
+    # Close database pools
+    set_preview_pool(None)
+    await preview_pool.close()
+    if worker_pool:
+        await worker_pool.close()
     if db_pool:
         await db_pool.close()
     
     # Clear app state
     app_state["db_pool"] = None
+    app_state["preview_pool"] = None
     app_state["worker_task"] = None
     
     logger.info("Shutdown complete")
@@ -162,7 +219,8 @@ app = FastAPI(
     title="DSA Platform API",
     description="Data Storage and Analytics Platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -174,10 +232,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add GZIP compression middleware
-# This will automatically compress responses when client sends "Accept-Encoding: gzip"
-# minimum_size=1000 means responses smaller than 1KB won't be compressed (overhead not worth it)
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Add compression middleware
+# Compresses with zstd, brotli or gzip, whichever the client's Accept-Encoding allows (in that order);
+# levels and the minimum size worth compressing come from the compression_* settings
+app.add_middleware(CompressionMiddleware)
 
 # Register error handlers - NEW!
 register_error_handlers(app)
@@ -192,6 +250,7 @@ app.include_router(sampling.router, prefix="/api")
 app.include_router(exploration.router, prefix="/api")
 app.include_router(workbench.router, prefix="/api")
 app.include_router(downloads.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 
 @app.get("/")
@@ -209,10 +268,26 @@ async def health():
     return {
         "status": "healthy",
         "database": "connected" if db_pool and db_pool._pool is not None else "disconnected",
-        "worker": "running" if worker_task and not worker_task.done() else "stopped"
+        "worker": (
+            "disabled" if not get_settings().api_worker_enabled
+            else "running" if worker_task and not worker_task.done() else "stopped"
+        ),
+        "connections": get_connection_totals(),
+        "statements": get_statement_stats()
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format."""
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    db_pool = app_state.get("db_pool")
+    if db_pool:
+        set_pool_connections(db_pool.get_pool_stats())
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Request ID middleware for tracing
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
@@ -221,8 +296,26 @@ async def add_request_id(request: Request, call_next):
     request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
     request.state.request_id = request_id
     
-    response = await call_next(request)
+    stats, token = begin_request_stats()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        end_request_stats(stats, token)
+        # Label by route template so path parameters don't explode cardinality
+        route = request.scope.get("route")
+        observe_request(
+            request.method, getattr(route, "path", "unmatched"),
+            status_code, time.perf_counter() - start
+        )
     response.headers["X-Request-ID"] = request_id
+    response.headers["X-DB-Acquisitions"] = str(stats.acquisitions)
+    logger.debug(
+        f"{request.method} {request.url.path}: {stats.acquisitions} connection acquisitions, "
+        f"{stats.transactions} transactions"
+    )
     return response
 
 
@@ -1,10 +1,17 @@
-"""Run the job worker."""
+"""Run a standalone job worker service.
+
+Any number of these processes can share the job queue. Run the API with
+API_WORKER_ENABLED=false when jobs should only run here. On SIGTERM or
+SIGINT the worker stops claiming jobs, reports not ready, and waits up
+to worker_drain_timeout_seconds for running jobs before requeueing them.
+"""
 
 import asyncio
 import logging
+import signal
 import sys
 from pathlib import Path
-from urllib.parse import quote_plus, urlparse, urlunparse
+from urllib.parse import quote_plus
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -13,9 +20,8 @@ from src.infrastructure.config import get_settings
 from src.infrastructure.postgres.database import DatabasePool
 from src.infrastructure.external.password_manager import get_password_manager
 from src.workers.job_worker import JobWorker
-from src.workers.import_executor import ImportJobExecutor
-from src.workers.sampling_executor import SamplingJobExecutor
-from src.workers.exploration_executor import ExplorationExecutor
+from src.workers.registry import register_executors
+from src.workers.health import WorkerHealthServer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,56 +31,59 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main():
-    """Main function to run the worker."""
+def _dsn() -> str:
+    """Database DSN, with the password from the secret manager if configured."""
     settings = get_settings()
-    
-    # Initialize database pool with dynamic password if configured
-    dsn = f"postgresql://{settings.POSTGRESQL_USER}:{settings.POSTGRESQL_PASSWORD}@{settings.POSTGRESQL_HOST}:{settings.POSTGRESQL_PORT}/{settings.POSTGRESQL_DATABASE}"
-    if settings.POSTGRESQL_PASSWORD_SECRET_NAME:
+    password = settings.POSTGRESQL_PASSWORD
+    if settings.POSTGRESQL_PASSWORD_SECRET_NAME and settings.POSTGRESQL_PASSWORD_SECRET_NAME.lower() != "none":
         try:
-            password_manager = get_password_manager()
-            password = password_manager.postgresql_fetch()
-            if password:
-                # Parse and rebuild DSN with new password
-                parsed = urlparse(dsn)
-                netloc = f"{parsed.username}:{quote_plus(password)}@{parsed.hostname}:{parsed.port}"
-                dsn = urlunparse((
-                    parsed.scheme,
-                    netloc,
-                    parsed.path,
-                    parsed.params,
-                    parsed.query,
-                    parsed.fragment
-                ))
-                logger.info("Using dynamic password from secret manager")
+            password = get_password_manager().postgresql_fetch() or password
+            logger.info("Using dynamic password from secret manager")
         except Exception as e:
             logger.error(f"Failed to fetch dynamic password: {e}")
             logger.info("Falling back to environment variable password")
-    
-    db_pool = DatabasePool(dsn)
-    await db_pool.initialize()
+    return f"postgresql://{settings.POSTGRESQL_USER}:{quote_plus(password)}@{settings.POSTGRESQL_HOST}:{settings.POSTGRESQL_PORT}/{settings.POSTGRESQL_DATABASE}"
+
+
+async def main():
+    """Run the worker until it is signalled to stop, then drain it."""
+    settings = get_settings()
+
+    db_pool = DatabasePool(_dsn())
+    await db_pool.initialize(
+        min_size=settings.worker_pool_min_size,
+        max_size=settings.worker_pool_max_size,
+        command_timeout=None  # Jobs run long statements
+    )
     logger.info("Database pool initialized")
-    
-    # Create worker
-    worker = JobWorker(db_pool)
-    
-    # Register executors
-    worker.register_executor('import', ImportJobExecutor())
-    worker.register_executor('sampling', SamplingJobExecutor())
-    worker.register_executor('exploration', ExplorationExecutor(db_pool))
-    
-    # Start worker
+
+    worker = register_executors(JobWorker(db_pool))
+    health = WorkerHealthServer(ready=lambda: worker.ready, status=worker.status)
+    await health.start("0.0.0.0", settings.worker_health_port)
+
+    stop_requested = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_requested.set)
+
+    worker_task = asyncio.create_task(worker.start())
     try:
-        logger.info("Starting job worker...")
-        await worker.start()
-    except KeyboardInterrupt:
-        logger.info("Received interrupt signal")
+        # Also return if the worker loop dies, so the process exits and is restarted
+        await asyncio.wait(
+            [worker_task, asyncio.create_task(stop_requested.wait())],
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        logger.info("Received stop signal" if stop_requested.is_set() else "Worker loop exited")
     finally:
         await worker.stop()
+        await worker.drain(settings.worker_drain_timeout_seconds)
+        if not worker_task.done():
+            worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+        await health.close()
         await db_pool.close()
         logger.info("Worker stopped")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -11,6 +11,7 @@ from concurrent.futures import ThreadPoolExecutor
 from ..infrastructure.postgres.database import DatabasePool
 from ..infrastructure.postgres.table_reader import PostgresTableReader
 from ..infrastructure.postgres.event_store import PostgresEventStore
+from ..infrastructure.metrics import job_stage
 from ..core.events.registry import InMemoryEventBus
 from .job_worker import JobExecutor
 from src.core.domain_exceptions import EntityNotFoundException
@@ -75,7 +76,8 @@ class ExplorationExecutor(JobExecutor):
                 async with PostgresUnitOfWork(db_pool) as uow:
                     table_reader = PostgresTableReader(uow.connection)
                     # Get table data as list of dicts
-                    table_data = await table_reader.get_table_data(source_commit_id, table_key)
+                    with job_stage('load'):
+                        table_data = await table_reader.get_table_data(source_commit_id, table_key)
                     
                     # Convert to DataFrame
                     if not table_data:
@@ -133,12 +135,13 @@ class ExplorationExecutor(JobExecutor):
             
             # Run profiling in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
-            profile_html, profile_json = await loop.run_in_executor(
-                self.executor,
-                self._generate_profile,
-                df,
-                profile_config
-            )
+            with job_stage('profile'):
+                profile_html, profile_json = await loop.run_in_executor(
+                    self.executor,
+                    self._generate_profile,
+                    df,
+                    profile_config
+                )
             
             # Return results
             result = {
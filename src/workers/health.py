@@ -0,0 +1,70 @@
+"""Liveness and readiness endpoints of a standalone worker process."""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerHealthServer:
+    """
+    Minimal HTTP server answering health probes for a worker.
+
+    GET /health/live is 200 while the process's event loop is serving,
+    GET /health/ready is 200 while the worker is claiming jobs (503 once
+    it starts draining), and GET /health returns the worker's status.
+    The worker has no API of its own, so this avoids running an ASGI
+    server next to it.
+    """
+
+    def __init__(self, ready: Callable[[], bool], status: Callable[[], Dict[str, Any]]):
+        self._ready = ready
+        self._status = status
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info(f"Worker health endpoints listening on {host}:{port}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _respond(self, path: str) -> Tuple[int, Dict[str, Any]]:
+        if path == '/health/live':
+            return 200, {'status': 'alive'}
+        if path == '/health/ready':
+            ready = self._ready()
+            return (200 if ready else 503), {'status': 'ready' if ready else 'not ready'}
+        if path == '/health':
+            return 200, self._status()
+        return 404, {'detail': 'Not Found'}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Headers are read and ignored
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                status, body = 405, {'detail': 'Method Not Allowed'}
+            else:
+                status, body = self._respond(parts[1].split('?', 1)[0])
+            payload = json.dumps(body, default=str).encode()
+            reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed', 503: 'Service Unavailable'}[status]
+            writer.write(
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
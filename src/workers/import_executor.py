@@ -24,6 +24,16 @@ from src.infrastructure.postgres.event_store import PostgresEventStore
 from src.core.events.publisher import JobStartedEvent, JobCompletedEvent, JobFailedEvent
 from src.core.events.registry import InMemoryEventBus
 from src.infrastructure.config import get_settings
+from src.infrastructure.metrics import job_stage
+from src.features.jobs.services.progress import get_job_progress_publisher
+
+
+# Line numbers of re-keyed parent rows, below the file's lines (which start at 2)
+_REKEYED_FIRST_LINE = -(1 << 62)
+
+# Version of the upsert row key encoding, recorded with a table's row_key_columns;
+# tables keyed with another version are re-keyed on their next upsert
+ROW_KEY_FORMAT = 'json-array'
 
 
 class ImportJobExecutor(JobExecutor):
@@ -79,8 +89,14 @@ class ImportJobExecutor(JobExecutor):
             dataset_id = parameters.get('dataset_id', job['dataset_id'])
             user_id = parameters.get('user_id', job['user_id'])
         
+        import_mode = parameters.get('import_mode') or ('append' if parameters.get('append_mode') else 'full')
+        key_columns = parameters.get('key_columns') or []
+        target_ref = parameters.get('target_ref', parameters.get('branch_name', 'main'))
+        
         # Create temporary directory for conversion
         temp_dir = tempfile.mkdtemp(prefix='dsa_import_')
+        commit_id = None
+        ref_updated = False
         
         try:
             # Publish job started event
@@ -99,11 +115,12 @@ class ImportJobExecutor(JobExecutor):
             
             # Phase 1: Convert file to Parquet
             logger.info(f"Import job {job_id} - Converting {filename} to Parquet")
-            converted_files, conversion_metadata = await self.file_converter.convert_to_parquet(
-                source_path=temp_file_path,
-                output_dir=temp_dir,
-                original_filename=filename
-            )
+            with job_stage('convert'):
+                converted_files, conversion_metadata = await self.file_converter.convert_to_parquet(
+                    source_path=temp_file_path,
+                    output_dir=temp_dir,
+                    original_filename=filename
+                )
             
             logger.info(f"Import job {job_id} - Conversion complete. Created {len(converted_files)} Parquet files")
             
@@ -149,8 +166,15 @@ class ImportJobExecutor(JobExecutor):
                 parameters.get('commit_message', f"Import {filename}")
             )
             
+            # Incremental modes start from the parent commit: untouched tables
+            # share its manifest chunks and only changed rows are written
+            imported_tables = [table_key for table_key, _ in converted_files]
+            if import_mode != 'full' and parent_commit_id:
+                await self._carry_over_parent_tables(commit_id, parent_commit_id, imported_tables, db_pool)
+            
             # Phase 2: Import all Parquet files
             total_rows_processed = 0
+            total_rows_written = 0
             
             for idx, (table_key, parquet_path) in enumerate(converted_files):
                 table_progress = 20 + (idx * 70 // len(converted_files))
@@ -165,24 +189,35 @@ class ImportJobExecutor(JobExecutor):
                 
                 logger.info(f"Import job {job_id} - Importing table '{table_key}' from {parquet_path}")
                 
+                plan = _DeltaPlan(import_mode)
+                if import_mode != 'full':
+                    plan = await self._prepare_table_delta(
+                        commit_id, parent_commit_id, table_key,
+                        import_mode, key_columns, db_pool
+                    )
+                
                 # Process this Parquet file
                 rows_processed = await self._process_parquet_file(
                     commit_id=commit_id,
                     file_path=parquet_path,
                     table_key=table_key,
                     job_id=job_id,
-                    db_pool=db_pool
+                    db_pool=db_pool,
+                    plan=plan
                 )
+                with job_stage('seal'):
+                    rows_written = await self._seal_table(commit_id, table_key, import_mode, db_pool)
                 
                 total_rows_processed += rows_processed
-                logger.info(f"Import job {job_id} - Table '{table_key}' imported {rows_processed:,} rows")
+                total_rows_written += rows_written
+                logger.info(
+                    f"Import job {job_id} - Table '{table_key}' imported {rows_processed:,} rows "
+                    f"({rows_written:,} written, mode={import_mode})"
+                )
             
             # Update ref
-            await self._update_ref(
-                db_pool, dataset_id, 
-                parameters.get('target_ref', 'main'), 
-                commit_id
-            )
+            await self._update_ref(db_pool, dataset_id, target_ref, commit_id)
+            ref_updated = True
             
             # Run post-import maintenance
             await self._update_job_progress(job_id, {
@@ -190,13 +225,18 @@ class ImportJobExecutor(JobExecutor):
                 "percentage": 95
             }, db_pool)
             
-            await self._run_post_import_maintenance(commit_id, job_id, db_pool)
+            await self._run_post_import_maintenance(
+                commit_id, dataset_id, job_id, db_pool,
+                table_keys=imported_tables,
+                row_key_columns=key_columns if import_mode == 'upsert' else None
+            )
             
             # Final update
             await self._update_job_progress(job_id, {
                 "status": "Completed",
                 "percentage": 100,
                 "rows_processed": total_rows_processed,
+                "rows_written": total_rows_written,
                 "tables_imported": len(converted_files)
             }, db_pool)
             
@@ -208,6 +248,8 @@ class ImportJobExecutor(JobExecutor):
                 result={
                     "commit_id": commit_id,
                     "rows_imported": total_rows_processed,
+                    "rows_written": total_rows_written,
+                    "import_mode": import_mode,
                     "tables_imported": len(converted_files),
                     "conversion_metadata": conversion_metadata
                 }
@@ -216,6 +258,8 @@ class ImportJobExecutor(JobExecutor):
             return {
                 "commit_id": commit_id,
                 "rows_imported": total_rows_processed,
+                "rows_written": total_rows_written,
+                "import_mode": import_mode,
                 "tables_imported": len(converted_files),
                 "message": f"Successfully imported {total_rows_processed:,} rows from {len(converted_files)} table(s)"
             }
@@ -235,6 +279,16 @@ class ImportJobExecutor(JobExecutor):
                     "UPDATE dsa_jobs.analysis_runs SET status = 'failed', error_message = $2 WHERE id = $1",
                     UUID(job_id), str(e)
                 )
+                if commit_id:
+                    await conn.execute(
+                        "DELETE FROM dsa_staging.import_row_keys WHERE commit_id = $1", commit_id
+                    )
+                    # A commit no ref points to yet is unreachable; its
+                    # chunk list and schema go with it
+                    if not ref_updated:
+                        await conn.execute(
+                            "DELETE FROM dsa_core.commits WHERE commit_id = $1", commit_id
+                        )
             raise
             
         finally:
@@ -275,18 +329,19 @@ class ImportJobExecutor(JobExecutor):
         file_path: str,
         table_key: str,
         job_id: str,
-        db_pool: DatabasePool
+        db_pool: DatabasePool,
+        plan: '_DeltaPlan'
     ) -> int:
         """Process a single Parquet file, using parallel processing for large files."""
         file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
         
         if file_size_mb > self.parallel_threshold_mb and self.parallel_workers > 1:
             return await self._process_parquet_parallel(
-                commit_id, file_path, table_key, job_id, db_pool
+                commit_id, file_path, table_key, job_id, db_pool, plan
             )
         else:
             return await self._process_parquet_sequential(
-                commit_id, file_path, table_key, job_id, db_pool
+                commit_id, file_path, table_key, job_id, db_pool, plan
             )
     
     async def _process_parquet_sequential(
@@ -295,7 +350,8 @@ class ImportJobExecutor(JobExecutor):
         file_path: str,
         table_key: str,
         job_id: str,
-        db_pool: DatabasePool
+        db_pool: DatabasePool,
+        plan: '_DeltaPlan'
     ) -> int:
         """Process Parquet file sequentially for smaller files."""
         # Run blocking reader in thread pool
@@ -317,7 +373,7 @@ class ImportJobExecutor(JobExecutor):
             ]
             
             # Commit batch
-            await self._commit_batch(batch_rows, table_key, commit_id, db_pool)
+            await self._commit_batch(batch_rows, table_key, commit_id, db_pool, plan)
             total_rows += len(batch_rows)
             
             # Update progress periodically
@@ -345,7 +401,8 @@ class ImportJobExecutor(JobExecutor):
         file_path: str,
         table_key: str,
         job_id: str,
-        db_pool: DatabasePool
+        db_pool: DatabasePool,
+        plan: '_DeltaPlan'
     ) -> int:
         """Process large Parquet files in parallel."""
         import logging
@@ -396,7 +453,8 @@ class ImportJobExecutor(JobExecutor):
         listener_task = asyncio.create_task(progress_listener())
         
         try:
-            with ProcessPoolExecutor(max_workers=len(worker_assignments)) as executor:
+            # Workers hash and COPY in their own processes, so this is one stage
+            with job_stage('parallel_hash_copy'), ProcessPoolExecutor(max_workers=len(worker_assignments)) as executor:
                 futures = []
                 
                 for worker_id, (start_group, end_group) in enumerate(worker_assignments):
@@ -405,7 +463,7 @@ class ImportJobExecutor(JobExecutor):
                         file_path, table_key, start_group, end_group,
                         commit_id, self.db_url, self.batch_size,
                         self.use_xxhash, self.xxhash_seed,
-                        progress_queue, worker_id
+                        progress_queue, worker_id, plan
                     )
                     futures.append(future)
                 
@@ -428,53 +486,38 @@ class ImportJobExecutor(JobExecutor):
         batch: List[Tuple[int, Dict]],
         table_key: str,
         commit_id: str,
-        db_pool: DatabasePool
+        db_pool: DatabasePool,
+        plan: '_DeltaPlan'
     ) -> None:
-        """Commit a batch using efficient CTE query."""
+        """Store a batch's rows and stage their row keys and hashes for sealing."""
         if not batch:
             return
         
-        # Check parameter limit (PostgreSQL max is 32767)
-        if len(batch) * 3 > 32000:  # Leave some buffer
-            # Split into smaller batches if needed
-            mid = len(batch) // 2
-            await self._commit_batch(batch[:mid], table_key, commit_id, db_pool)
-            await self._commit_batch(batch[mid:], table_key, commit_id, db_pool)
-            return
-        
-        # Prepare parameters
-        params = []
-        for line_number, row_data in batch:
-            # Convert datetime objects to ISO format strings
-            row_data = self._convert_datetimes(row_data)
-            data_json = json.dumps(row_data, sort_keys=True, separators=(',', ':'))
-            data_hash = self._calculate_hash(data_json.encode('utf-8'))
-            logical_row_id = f"{table_key}:{line_number}"
-            params.extend([logical_row_id, data_hash, data_json])
-        
-        # Build VALUES clause
-        values_template = ", ".join(
-            f"(${i*3 + 1}, ${i*3 + 2}, ${i*3 + 3}::jsonb)"
-            for i in range(len(batch))
-        )
-        
-        # Single CTE query for atomic insertion
-        query = f"""
-            WITH new_data (logical_row_id, row_hash, data) AS (
-                VALUES {values_template}
-            ),
-            inserted_rows AS (
-                INSERT INTO dsa_core.rows (row_hash, data)
-                SELECT row_hash, data FROM new_data
-                ON CONFLICT (row_hash) DO NOTHING
-            )
-            INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-            SELECT ${len(params) + 1}, logical_row_id, row_hash FROM new_data
-        """
+        row_keys, row_hashes, data, line_numbers = [], [], [], []
+        with job_stage('hash'):
+            for line_number, row_data in batch:
+                row_data = self._convert_datetimes(row_data)
+                data_json = json.dumps(row_data, sort_keys=True, separators=(',', ':'))
+                row_keys.append(plan.row_key(line_number, row_data))
+                row_hashes.append(self._calculate_hash(data_json.encode('utf-8')))
+                data.append(data_json)
+                line_numbers.append(line_number)
         
-        # Execute with all parameters
-        async with db_pool.acquire() as conn:
-            await conn.execute(query, *params, commit_id)
+        # Unchanged rows are already stored, so they only cost a conflict check
+        with job_stage('copy'):
+            async with db_pool.acquire() as conn:
+                await conn.execute("""
+                    WITH new_data (row_key, row_hash, data, line_number) AS (
+                        SELECT * FROM unnest($3::text[], $4::text[], $5::text[], $6::bigint[])
+                    ),
+                    inserted_rows AS (
+                        INSERT INTO dsa_core.rows (row_hash, data)
+                        SELECT row_hash, data::jsonb FROM new_data
+                        ON CONFLICT (row_hash) DO NOTHING
+                    )
+                    INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+                    SELECT $1, $2, row_key, row_hash, line_number FROM new_data
+                """, commit_id, table_key, row_keys, row_hashes, data, line_numbers)
     
     async def _create_commit(
         self, db_pool: DatabasePool, dataset_id: int, 
@@ -519,17 +562,156 @@ class ImportJobExecutor(JobExecutor):
                 DO UPDATE SET commit_id = $3
             """, dataset_id, ref_name, commit_id)
     
-    async def _update_job_progress(
-        self, job_id: str, progress_info: Dict[str, Any], db_pool: DatabasePool
+    async def _carry_over_parent_tables(
+        self, commit_id: str, parent_commit_id: str, imported_tables: List[str], db_pool: DatabasePool
     ) -> None:
-        """Update job progress."""
+        """Share the parent's tables not in the file, with their schemas and analyses."""
+        async with db_pool.acquire() as conn:
+            parent_tables = await conn.fetch(
+                "SELECT dsa_core.commit_table_keys($1) AS table_key", parent_commit_id
+            )
+            for record in parent_tables:
+                if record['table_key'] not in imported_tables:
+                    await conn.execute(
+                        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3)",
+                        commit_id, parent_commit_id, record['table_key']
+                    )
+            
+            await conn.execute("""
+                INSERT INTO dsa_core.commit_schemas (commit_id, schema_definition)
+                SELECT $1, schema_definition
+                FROM dsa_core.commit_schemas
+                WHERE commit_id = $2
+                ON CONFLICT (commit_id) DO NOTHING
+            """, commit_id, parent_commit_id)
+            
+            await conn.execute("""
+                INSERT INTO dsa_core.table_analysis (commit_id, table_key, analysis)
+                SELECT $1, table_key, analysis
+                FROM dsa_core.table_analysis
+                WHERE commit_id = $2 AND NOT (table_key = ANY($3::text[]))
+                ON CONFLICT (commit_id, table_key) DO NOTHING
+            """, commit_id, parent_commit_id, imported_tables)
+    
+    async def _prepare_table_delta(
+        self,
+        commit_id: str,
+        parent_commit_id: Optional[str],
+        table_key: str,
+        import_mode: str,
+        key_columns: List[str],
+        db_pool: DatabasePool
+    ) -> '_DeltaPlan':
+        """Start an imported table from its parent state and plan where rows go.
+        
+        The parent table's chunks are shared with the new commit, so only the
+        imported rows that differ from them are written once the file is
+        staged (see _seal_table), which also drops the parent rows a
+        replace-table file no longer has. The first upsert on a table that is
+        not yet keyed by `key_columns` re-keys the parent rows once.
+        """
+        if not parent_commit_id:
+            return _DeltaPlan(import_mode, key_columns)
+        
         async with db_pool.acquire() as conn:
+            parent_tables = await conn.fetch(
+                "SELECT dsa_core.commit_table_keys($1) AS table_key", parent_commit_id
+            )
+            if table_key not in {record['table_key'] for record in parent_tables}:
+                return _DeltaPlan(import_mode, key_columns)
+            
+            if import_mode == 'upsert':
+                parent_schema = await conn.fetchval("""
+                    SELECT schema_definition -> $2
+                    FROM dsa_core.commit_schemas
+                    WHERE commit_id = $1
+                """, parent_commit_id, table_key)
+                if isinstance(parent_schema, str):
+                    parent_schema = json.loads(parent_schema)
+                parent_schema = parent_schema or {}
+                if (parent_schema.get('row_key_columns') != key_columns
+                        or parent_schema.get('row_key_format') != ROW_KEY_FORMAT):
+                    await self._rekey_parent_table(
+                        conn, commit_id, parent_commit_id, table_key, key_columns
+                    )
+                    return _DeltaPlan(import_mode, key_columns)
+            
+            line_offset = 0
+            if import_mode == 'append':
+                last_line = await conn.fetchval("""
+                    SELECT max(k.row_key::numeric)::bigint
+                    FROM (
+                        SELECT substr(logical_row_id, length($2) + 2) AS row_key
+                        FROM dsa_core.commit_table_entries($1, $2)
+                    ) k
+                    WHERE k.row_key ~ '^[0-9]+$'
+                """, parent_commit_id, table_key)
+                line_offset = (last_line or 1) - 1
+            
             await conn.execute(
-                "UPDATE dsa_jobs.analysis_runs "
-                "SET run_parameters = jsonb_set(run_parameters, '{progress}', $1::jsonb, true) "
-                "WHERE id = $2",
-                json.dumps(progress_info), UUID(job_id)
+                "SELECT dsa_core.derive_commit_table($1, $2, $3, $3)",
+                commit_id, parent_commit_id, table_key
             )
+        
+        return _DeltaPlan(import_mode, key_columns, line_offset)
+    
+    async def _rekey_parent_table(
+        self, conn, commit_id: str, parent_commit_id: str, table_key: str, key_columns: List[str]
+    ) -> None:
+        """Stage the parent table's rows under key-column row keys, a page at a time."""
+        offset = 0
+        while True:
+            rows = await conn.fetch("""
+                SELECT e.row_hash, r.data
+                FROM dsa_core.commit_table_entries($1, $2, $3, $4) e
+                JOIN dsa_core.rows r ON r.row_hash = e.row_hash
+            """, parent_commit_id, table_key, offset, self.batch_size)
+            if not rows:
+                break
+            
+            row_keys, row_hashes = [], []
+            for row in rows:
+                data = row['data']
+                if isinstance(data, str):
+                    data = json.loads(data)
+                if isinstance(data, dict) and isinstance(data.get('data'), dict):
+                    data = data['data']
+                row_keys.append(_encode_row_key(data, key_columns))
+                row_hashes.append(row['row_hash'].rstrip())
+            
+            # Later parent rows win a repeated key, and the file's rows win over all of them
+            line_numbers = list(range(_REKEYED_FIRST_LINE + offset, _REKEYED_FIRST_LINE + offset + len(rows)))
+            offset += len(rows)
+            
+            await conn.execute("""
+                INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+                SELECT $1, $2, u.row_key, u.row_hash, u.line_number
+                FROM unnest($3::text[], $4::text[], $5::bigint[]) AS u(row_key, row_hash, line_number)
+            """, commit_id, table_key, row_keys, row_hashes, line_numbers)
+    
+    async def _seal_table(
+        self, commit_id: str, table_key: str, import_mode: str, db_pool: DatabasePool
+    ) -> int:
+        """Apply a table's staged rows to the commit's manifest chunks.
+        
+        Staged rows go straight into chunks, never through commit_rows. A
+        staged row is skipped when the table already holds the same hash
+        under the same row key; when a key repeats, its last row wins. For
+        replace_table, keys the table holds that were not staged are
+        deleted in the same pass. Returns the number of rows written.
+        """
+        async with db_pool.acquire() as conn:
+            async with conn.transaction():
+                return await conn.fetchval(
+                    "SELECT dsa_core.seal_staged_table($1, $2, p_replace => $3)",
+                    commit_id, table_key, import_mode == 'replace_table'
+                )
+    
+    async def _update_job_progress(
+        self, job_id: str, progress_info: Dict[str, Any], db_pool: DatabasePool
+    ) -> None:
+        """Update job progress; reports are coalesced, so this may be called per batch."""
+        await get_job_progress_publisher().report(db_pool, job_id, progress_info)
     
     async def _store_conversion_metadata(
         self, job_id: str, metadata: Dict[str, Any], db_pool: DatabasePool
@@ -543,27 +725,29 @@ class ImportJobExecutor(JobExecutor):
                 json.dumps(metadata), UUID(job_id)
             )
     
-    async def _analyze_imported_tables(self, commit_id: str, db_pool: DatabasePool) -> None:
+    async def _analyze_imported_tables(
+        self,
+        commit_id: str,
+        db_pool: DatabasePool,
+        table_keys: Optional[List[str]] = None,
+        row_key_columns: Optional[List[str]] = None
+    ) -> None:
         """Analyze imported tables and store schema/statistics."""
         async with db_pool.acquire() as conn:
             # Get unique table keys
-            table_keys = await conn.fetch("""
-                SELECT DISTINCT split_part(logical_row_id, ':', 1) as table_key
-                FROM dsa_core.commit_rows
-                WHERE commit_id = $1
-            """, commit_id)
-            
-            for record in table_keys:
-                table_key = record['table_key']
+            if table_keys is None:
+                records = await conn.fetch(
+                    "SELECT dsa_core.commit_table_keys($1) as table_key", commit_id
+                )
+                table_keys = [record['table_key'] for record in records]
+            
+            for table_key in table_keys:
                 
                 # Get sample rows
                 sample_rows = await conn.fetch("""
                     SELECT r.data
-                    FROM dsa_core.commit_rows cr
+                    FROM dsa_core.commit_table_entries($1, $2, 0, 1000) cr
                     JOIN dsa_core.rows r ON cr.row_hash = r.row_hash
-                    WHERE cr.commit_id = $1 
-                    AND cr.logical_row_id LIKE $2 || ':%'
-                    LIMIT 1000
                 """, commit_id, table_key)
                 
                 if not sample_rows:
@@ -613,11 +797,10 @@ class ImportJobExecutor(JobExecutor):
                                 column_types[col] = 'string'
                 
                 # Get row count
-                count_result = await conn.fetchrow("""
-                    SELECT COUNT(*) as total
-                    FROM dsa_core.commit_rows
-                    WHERE commit_id = $1 AND logical_row_id LIKE $2 || ':%'
-                """, commit_id, table_key)
+                count_result = await conn.fetchrow(
+                    "SELECT dsa_core.commit_table_row_count($1, $2) as total",
+                    commit_id, table_key
+                )
                 total_rows = count_result['total']
                 
                 # Validate that we found columns
@@ -660,6 +843,9 @@ class ImportJobExecutor(JobExecutor):
                         "row_count": total_rows
                     }
                 }
+                if row_key_columns:
+                    schema_data[table_key]["row_key_columns"] = row_key_columns
+                    schema_data[table_key]["row_key_format"] = ROW_KEY_FORMAT
                 
                 # Use JSONB operators to merge schemas atomically
                 await conn.execute("""
@@ -669,23 +855,74 @@ class ImportJobExecutor(JobExecutor):
                     SET schema_definition = dsa_core.commit_schemas.schema_definition || $2::jsonb
                 """, commit_id, json.dumps(schema_data))
     
-    async def _run_post_import_maintenance(self, commit_id: str, job_id: str, db_pool: DatabasePool) -> None:
+    async def _run_post_import_maintenance(
+        self,
+        commit_id: str,
+        dataset_id: int,
+        job_id: str,
+        db_pool: DatabasePool,
+        table_keys: Optional[List[str]] = None,
+        row_key_columns: Optional[List[str]] = None
+    ) -> None:
         """Run post-import maintenance tasks."""
         import logging
         logger = logging.getLogger(__name__)
         
         logger.info(f"Import job {job_id} - Analyzing imported tables")
-        await self._analyze_imported_tables(commit_id, db_pool)
+        with job_stage('analyze'):
+            await self._analyze_imported_tables(commit_id, db_pool, table_keys, row_key_columns)
         
         logger.info(f"Import job {job_id} - Running VACUUM ANALYZE")
-        async with db_pool.acquire() as conn:
-            await conn.execute("SET statement_timeout = '30min';")
-            await conn.execute("VACUUM (VERBOSE, ANALYZE) dsa_core.rows;")
-            await conn.execute("VACUUM (VERBOSE, ANALYZE) dsa_core.commit_rows;")
+        with job_stage('vacuum'):
+            async with db_pool.acquire() as conn:
+                await conn.execute("SET statement_timeout = '30min';")
+                await conn.execute("VACUUM (VERBOSE, ANALYZE) dsa_core.rows;")
+                await conn.execute("VACUUM (VERBOSE, ANALYZE) dsa_staging.import_row_keys;")
+                await conn.execute("VACUUM (VERBOSE, ANALYZE) dsa_core.manifest_chunks;")
         
-        logger.info(f"Import job {job_id} - Refreshing search index")
-        async with db_pool.acquire() as conn:
-            await conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY dsa_search.datasets_summary;")
+        logger.info(f"Import job {job_id} - Updating search index for dataset {dataset_id}")
+        with job_stage('search_index'):
+            async with db_pool.acquire() as conn:
+                await conn.execute(
+                    "SELECT dsa_search.refresh_datasets_summary($1::int[])", [dataset_id]
+                )
+
+
+def _encode_row_key(row: Dict[str, Any], key_columns: List[str]) -> str:
+    """Build the row key of an upserted row from its key column values.
+    
+    Always a JSON array of the typed values, so "1" and 1 get different keys.
+    """
+    values = []
+    for column in key_columns:
+        value = row.get(column)
+        if value is None:
+            raise ValueError(f"Row has no value for key column '{column}'")
+        values.append(value)
+    
+    return json.dumps(values, separators=(',', ':'), default=str)
+
+
+class _DeltaPlan:
+    """Places the imported rows of a table.
+    
+    Rows are placed by line number, after the parent's last line for
+    appends, or by key columns for upserts. Imported rows are staged with
+    their keys and hashes, and _seal_table writes those that differ from
+    the table the commit started from. Small and picklable, so
+    parallel workers can apply the same plan.
+    """
+    
+    def __init__(self, mode: str, key_columns: Optional[List[str]] = None, line_offset: int = 0):
+        self.mode = mode
+        self.key_columns = key_columns or []
+        self.line_offset = line_offset
+    
+    def row_key(self, line_number: int, row: Dict[str, Any]) -> str:
+        """Row key (the part after 'table:') of an imported row."""
+        if self.mode == 'upsert':
+            return _encode_row_key(row, self.key_columns)
+        return str(line_number + self.line_offset)
 
 
 # Worker function for parallel processing
@@ -693,7 +930,8 @@ def _process_parquet_worker(
     file_path: str, table_key: str, start_group: int, end_group: int,
     commit_id: str, db_url: str, batch_size: int,
     use_xxhash: bool, xxhash_seed: int,
-    progress_queue: mp.Queue, worker_id: int
+    progress_queue: mp.Queue, worker_id: int,
+    plan: '_DeltaPlan'
 ) -> int:
     """Process specific row groups from a Parquet file."""
     import polars as pl
@@ -743,9 +981,10 @@ def _process_parquet_worker(
                 cur.execute("SET synchronous_commit = OFF;")
                 cur.execute("""
                     CREATE TEMP TABLE import_batch (
-                        logical_row_id TEXT, 
+                        row_key TEXT, 
                         row_hash TEXT, 
-                        data JSONB
+                        data JSONB,
+                        line_number BIGINT
                     ) ON COMMIT DROP
                 """)
             
@@ -757,27 +996,29 @@ def _process_parquet_worker(
                 df_batch = pl.from_arrow(row_group)
                 
                 batch_data = []
+                batch_rows_read = 0
                 for row in df_batch.iter_rows(named=True):
-                    logical_row_id = f"{table_key}:{current_line}"
                     # Convert datetime objects to strings
                     row = convert_datetimes_worker(row)
                     data_json = json.dumps(row, sort_keys=True, separators=(',', ':'))
                     data_hash = calculate_hash(data_json.encode('utf-8'))
-                    
-                    batch_data.append((logical_row_id, data_hash, data_json))
+                    row_key = plan.row_key(current_line, row)
+                    batch_data.append((row_key, data_hash, data_json, current_line))
                     current_line += 1
+                    batch_rows_read += 1
                     
-                    if len(batch_data) >= batch_size:
-                        _commit_batch_worker(conn, batch_data, commit_id)
-                        progress_queue.put(len(batch_data))
-                        total_rows += len(batch_data)
+                    if batch_rows_read >= batch_size:
+                        _commit_batch_worker(conn, batch_data, commit_id, table_key)
+                        progress_queue.put(batch_rows_read)
+                        total_rows += batch_rows_read
                         batch_data = []
+                        batch_rows_read = 0
                 
                 # Commit remaining batch
-                if batch_data:
-                    _commit_batch_worker(conn, batch_data, commit_id)
-                    progress_queue.put(len(batch_data))
-                    total_rows += len(batch_data)
+                if batch_rows_read:
+                    _commit_batch_worker(conn, batch_data, commit_id, table_key)
+                    progress_queue.put(batch_rows_read)
+                    total_rows += batch_rows_read
         
         logger.info(f"Worker {worker_id} completed. Processed {total_rows} rows")
         return total_rows
@@ -787,16 +1028,22 @@ def _process_parquet_worker(
         raise
 
 
-def _commit_batch_worker(conn, batch: List[Tuple[str, str, str]], commit_id: str):
-    """Commit batch using efficient COPY."""
+def _copy_text(value: str) -> str:
+    """Escape a value for COPY's text format."""
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _commit_batch_worker(
+    conn, batch: List[Tuple[str, str, str, int]], commit_id: str, table_key: str
+):
+    """Commit batch using efficient COPY, staging its row keys for sealing."""
     if not batch:
         return
     
     buffer = io.StringIO()
-    for logical_row_id, row_hash, data_json in batch:
-        # Escape tabs and newlines in JSON to avoid COPY issues
-        data_json = data_json.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
-        buffer.write(f"{logical_row_id}\t{row_hash}\t{data_json}\n")
+    for row_key, row_hash, data_json, line_number in batch:
+        # Escape tabs and newlines to avoid COPY issues
+        buffer.write(f"{_copy_text(row_key)}\t{row_hash}\t{_copy_text(data_json)}\t{line_number}\n")
     
     buffer.seek(0)
     
@@ -804,14 +1051,15 @@ def _commit_batch_worker(conn, batch: List[Tuple[str, str, str]], commit_id: str
         # Create temp table if it doesn't exist
         cur.execute("""
             CREATE TEMP TABLE IF NOT EXISTS import_batch (
-                logical_row_id TEXT, 
+                row_key TEXT, 
                 row_hash TEXT, 
-                data JSONB
+                data JSONB,
+                line_number BIGINT
             ) ON COMMIT DROP
         """)
         cur.execute("TRUNCATE import_batch;")
         
-        with cur.copy("COPY import_batch (logical_row_id, row_hash, data) FROM STDIN") as copy:
+        with cur.copy("COPY import_batch (row_key, row_hash, data, line_number) FROM STDIN") as copy:
             copy.write(buffer.read())
         
         with conn.transaction():
@@ -821,6 +1069,6 @@ def _commit_batch_worker(conn, batch: List[Tuple[str, str, str]], commit_id: str
                 ON CONFLICT (row_hash) DO NOTHING
             """)
             cur.execute("""
-                INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash) 
-                SELECT %s, logical_row_id, row_hash FROM import_batch
-            """, (commit_id,))
\ No newline at end of file
+                INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+                SELECT %s, %s, row_key, row_hash, line_number FROM import_batch
+            """, (commit_id, table_key))
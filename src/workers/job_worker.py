@@ -3,15 +3,32 @@
 import asyncio
 import logging
 import json
+import os
+import socket
+import time
+import uuid
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from abc import ABC, abstractmethod
 
 from src.infrastructure.postgres.database import DatabasePool
 from src.infrastructure.config import get_settings
+from src.infrastructure.external.artifact_store import get_artifact_store
+from src.infrastructure.metrics import job_trace, observe_job, query_caller
+from src.features.jobs.services.progress import get_job_progress_publisher
+from .scheduler import SchedulingPolicy, claim_next_job
 
 logger = logging.getLogger(__name__)
 
+# Caller tag on the queries each job type issues
+_QUERY_CALLERS = {
+    'import': 'importer',
+    'sampling': 'sampler',
+    'sql_transform': 'workbench',
+    'exploration': 'exploration',
+}
+
 
 class JobExecutor(ABC):
     """Base class for job executors."""
@@ -22,14 +39,49 @@ class JobExecutor(ABC):
         pass
 
 
+def _artifact_content_type(name: str) -> str:
+    """Content type of an output stored as an artifact, from its key suffix."""
+    if name.endswith('_html'):
+        return "text/html; charset=utf-8"
+    if name.endswith('_json'):
+        return "application/json"
+    return "text/plain; charset=utf-8"
+
+
 class JobWorker:
-    """Worker that polls database for pending jobs and executes them."""
+    """
+    Worker that claims pending jobs from the database and executes them.
+    
+    Jobs are claimed atomically with FOR UPDATE SKIP LOCKED, in the order
+    the scheduling policy ranks them, and stamped with this worker's id,
+    so any number of worker processes can share the queue. Up to `concurrency` jobs run at once, and at most
+    `concurrency_per_type[job_type]` of each type. Running jobs are kept
+    alive by a heartbeat; jobs whose worker stopped heartbeating for
+    worker_lease_seconds are put back in the queue by any live worker.
+    """
     
-    def __init__(self, db_pool: DatabasePool):
+    def __init__(
+        self,
+        db_pool: DatabasePool,
+        concurrency: Optional[int] = None,
+        concurrency_per_type: Optional[Dict[str, int]] = None,
+        worker_id: Optional[str] = None,
+        policy: Optional[SchedulingPolicy] = None
+    ):
+        settings = get_settings()
         self.db_pool = db_pool
         self.executors: Dict[str, JobExecutor] = {}
         self.running = False
-        self.poll_interval = 5  # seconds
+        self.poll_interval = settings.worker_poll_interval_seconds
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.concurrency_per_type = dict(
+            settings.worker_concurrency_per_type if concurrency_per_type is None else concurrency_per_type
+        )
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.policy = policy or SchedulingPolicy.from_settings()
+        self._in_flight: Dict[str, Tuple[str, asyncio.Task]] = {}  # Job id -> (job type, task)
+        self._wake = asyncio.Event()
+        self._heartbeat_task: Optional[asyncio.Task] = None
         
     def register_executor(self, job_type: str, executor: JobExecutor):
         """Register an executor for a job type."""
@@ -44,53 +96,77 @@ class JobWorker:
         logger.info(f"Processing job {job_id} of type {job_type}")
         
         # Update status to running
-        await self._update_job_status(job_id, 'running')
+        if not await self._update_job_status(job_id, 'running'):
+            logger.warning(f"Job {job_id} is no longer claimed by this worker; not running it")
+            return
         
-        try:
-            # Get parameters first
-            parameters = job.get('run_parameters', {})
-            
-            # Parse JSON if it's a string
-            if isinstance(parameters, str):
-                try:
-                    parameters = json.loads(parameters)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse run_parameters JSON: {parameters}")
-                    parameters = {}
-            
-            # Get executor - check if parameters specify a different job_type
-            actual_job_type = job_type
-            if isinstance(parameters, dict) and 'job_type' in parameters:
-                actual_job_type = parameters['job_type']
-                logger.info(f"Using job_type from parameters: {actual_job_type}")
+        started = time.perf_counter()
+        status = 'failed'
+        with job_trace(job_type) as trace, query_caller(_QUERY_CALLERS.get(job_type, job_type)):
+            try:
+                parameters, actual_job_type = _job_parameters(job)
+                if actual_job_type != job_type:
+                    logger.info(f"Using job_type from parameters: {actual_job_type}")
             
-            executor = self.executors.get(actual_job_type)
-            if not executor:
-                raise ValueError(f"No executor registered for job type: {actual_job_type}")
+                executor = self.executors.get(actual_job_type)
+                if not executor:
+                    raise ValueError(f"No executor registered for job type: {actual_job_type}")
             
-            logger.info(f"Job parameters type: {type(parameters)}, value: {parameters}")
-            result = await executor.execute(job_id, parameters, self.db_pool)
+                logger.info(f"Job parameters type: {type(parameters)}, value: {parameters}")
+                result = await executor.execute(job_id, parameters, self.db_pool)
+                if trace is not None and isinstance(result, dict):
+                    result['stage_seconds'] = trace.summary()
+                result = await self._externalize_artifacts(result)
             
-            # Update job as completed
-            await self._update_job_status(
-                job_id, 
-                'completed',
-                output_summary=result,
-                completed_at=datetime.utcnow()
-            )
+                # Update job as completed
+                if await self._update_job_status(
+                    job_id, 
+                    'completed',
+                    output_summary=result,
+                    completed_at=datetime.utcnow()
+                ):
+                    status = 'completed'
+                    logger.info(f"Job {job_id} completed successfully")
+                else:
+                    status = 'lost'
+                    logger.warning(f"Job {job_id} finished after its lease was lost; result discarded")
             
-            logger.info(f"Job {job_id} completed successfully")
-            
-        except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            logger.error(f"Job {job_id} failed: {str(e)}\n{error_details}")
-            await self._update_job_status(
-                job_id,
-                'failed',
-                error_message=str(e),
-                completed_at=datetime.utcnow()
-            )
+            except Exception as e:
+                import traceback
+                error_details = traceback.format_exc()
+                logger.error(f"Job {job_id} failed: {str(e)}\n{error_details}")
+                if not await self._update_job_status(
+                    job_id,
+                    'failed',
+                    error_message=str(e),
+                    completed_at=datetime.utcnow()
+                ):
+                    status = 'lost'
+    
+        observe_job(job_type, status, time.perf_counter() - started)
+    
+    async def _externalize_artifacts(self, output_summary: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Move large string outputs to the artifact store, keeping references under 'artifacts'."""
+        if not isinstance(output_summary, dict):
+            return output_summary
+        
+        inline_max_bytes = get_settings().artifact_inline_max_bytes
+        store = get_artifact_store()
+        artifacts = dict(output_summary.get('artifacts') or {})
+        summary = {}
+        for name, value in output_summary.items():
+            if name == 'artifacts':
+                continue
+            if isinstance(value, str) and len(value) > inline_max_bytes // 4:
+                content = value.encode('utf-8')
+                if len(content) > inline_max_bytes:
+                    artifacts[name] = await store.put(content, _artifact_content_type(name))
+                    continue
+            summary[name] = value
+        
+        if artifacts:
+            summary['artifacts'] = artifacts
+        return summary
     
     async def _update_job_status(
         self, 
@@ -99,8 +175,14 @@ class JobWorker:
         output_summary: Optional[Dict[str, Any]] = None,
         error_message: Optional[str] = None,
         completed_at: Optional[datetime] = None
-    ):
-        """Update job status in database."""
+    ) -> bool:
+        """
+        Update job status in database.
+        
+        Only applies while this worker still holds the job's claim; returns
+        False when the lease expired and the job was requeued or claimed
+        by another worker, whose results then stand.
+        """
         async with self.db_pool.acquire() as conn:
             query = """
                 UPDATE dsa_jobs.analysis_runs
@@ -108,55 +190,216 @@ class JobWorker:
                     output_summary = $2,
                     error_message = $3,
                     completed_at = $4
-                WHERE id = $5
+                WHERE id = $5 AND claimed_by = $6
+                RETURNING id
             """
             
             output_json = json.dumps(output_summary) if output_summary else None
             
-            await conn.execute(
+            updated = await conn.fetchrow(
                 query,
                 status,
                 output_json,
                 error_message,
                 completed_at,
-                job_id
+                job_id,
+                self.worker_id
             )
+        if updated is None:
+            return False
+        await get_job_progress_publisher().status_changed(self.db_pool, job_id, status)
+        return True
+    
+    def _claimable_types(self) -> List[str]:
+        """Job types this worker has free slots for."""
+        if len(self._in_flight) >= self.concurrency:
+            return []
+        running = Counter(job_type for job_type, _ in self._in_flight.values())
+        return [
+            job_type for job_type in self.executors
+            if running[job_type] < self.concurrency_per_type.get(job_type, self.concurrency)
+        ]
+    
+    async def _claim_job(self, job_types: List[str]) -> Optional[Dict[str, Any]]:
+        """Claim the pending job of the given types the scheduling policy ranks first, if any."""
+        async with self.db_pool.acquire() as conn:
+            return await claim_next_job(conn, self.policy, job_types, self.worker_id)
+    
+    def _start_job(self, job: Dict[str, Any]) -> None:
+        job_id = str(job['id'])
+        _, job_type = _job_parameters(job)
+        task = asyncio.create_task(self._run_claimed_job(job_id, job))
+        self._in_flight[job_id] = (job_type, task)
+    
+    async def _run_claimed_job(self, job_id: str, job: Dict[str, Any]) -> None:
+        try:
+            await self.process_job(job)
+        finally:
+            self._in_flight.pop(job_id, None)
+            # A slot is free; look for more work right away
+            self._wake.set()
     
     async def poll_for_jobs(self):
-        """Poll database for pending jobs."""
+        """Claim and start pending jobs while there are free slots, until stopped."""
         while self.running:
+            self._wake.clear()
+            job_types = self._claimable_types()
+            job = None
+            if job_types:
+                try:
+                    job = await self._claim_job(job_types)
+                except Exception as e:
+                    logger.error(f"Error polling for jobs: {str(e)}")
+            
+            if job:
+                self._start_job(job)
+                continue
+            
+            # No free slot or no pending job: wait for a job to finish or the next poll
             try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _heartbeat(self) -> None:
+        """
+        Keep this worker's running jobs leased, and requeue jobs of workers that went away.
+        
+        Jobs whose claim this worker lost (its lease expired and the job was
+        requeued, perhaps to another worker) are cancelled here, so two
+        workers never run the same job to the end.
+        """
+        settings = get_settings()
+        while True:
+            await asyncio.sleep(settings.worker_heartbeat_interval_seconds)
+            try:
+                lost = []
                 async with self.db_pool.acquire() as conn:
-                    # Get pending jobs
-                    query = """
-                        SELECT id, run_type, dataset_id, source_commit_id, 
-                               user_id, run_parameters
-                        FROM dsa_jobs.analysis_runs
-                        WHERE status = 'pending'
-                        ORDER BY created_at
-                        LIMIT 1
-                        FOR UPDATE SKIP LOCKED
-                    """
-                    
-                    job = await conn.fetchrow(query)
-                    
-                    if job:
-                        await self.process_job(dict(job))
-                    else:
-                        # No jobs, wait before polling again
-                        await asyncio.sleep(self.poll_interval)
-                        
+                    if self._in_flight:
+                        lost = await conn.fetch(
+                            """
+                            WITH beat AS (
+                                UPDATE dsa_jobs.analysis_runs SET heartbeat_at = now()
+                                WHERE id = ANY($1::uuid[]) AND claimed_by = $2 AND status = 'running'
+                            )
+                            SELECT ids.id
+                            FROM unnest($1::uuid[]) AS ids(id)
+                            WHERE NOT EXISTS (
+                                SELECT 1 FROM dsa_jobs.analysis_runs r
+                                WHERE r.id = ids.id AND r.claimed_by = $2
+                            )
+                            """,
+                            list(self._in_flight), self.worker_id
+                        )
+                    # Running jobs without a heartbeat were claimed before leases existed
+                    expired = await conn.fetch(
+                        """
+                        UPDATE dsa_jobs.analysis_runs
+                        SET status = 'pending', claimed_by = NULL, heartbeat_at = NULL
+                        WHERE status = 'running'
+                        AND (heartbeat_at IS NULL OR heartbeat_at < now() - make_interval(secs => $1))
+                        RETURNING id
+                        """,
+                        float(settings.worker_lease_seconds)
+                    )
+                for row in lost:
+                    job_id = str(row['id'])
+                    in_flight = self._in_flight.get(job_id)
+                    if in_flight is not None:
+                        logger.warning(f"Lost the lease on job {job_id}; cancelling it here")
+                        in_flight[1].cancel()
+                        get_job_progress_publisher().forget(job_id)
+                for row in expired:
+                    logger.warning(f"Requeued job {row['id']}; its worker stopped heartbeating")
             except Exception as e:
-                logger.error(f"Error polling for jobs: {str(e)}")
-                await asyncio.sleep(self.poll_interval)
+                logger.warning(f"Job heartbeat failed: {e}")
+    
+    async def _requeue(self, job_ids: List[str]) -> None:
+        """Put jobs this worker claimed back in the queue."""
+        async with self.db_pool.acquire() as conn:
+            await conn.execute(
+                """
+                UPDATE dsa_jobs.analysis_runs
+                SET status = 'pending', claimed_by = NULL, heartbeat_at = NULL
+                WHERE id = ANY($1::uuid[]) AND claimed_by = $2 AND status = 'running'
+                """,
+                job_ids, self.worker_id
+            )
+        publisher = get_job_progress_publisher()
+        for job_id in job_ids:
+            publisher.forget(job_id)
+        logger.info(f"Requeued {len(job_ids)} unfinished job(s): {', '.join(job_ids)}")
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the worker is claiming jobs."""
+        return self.running and self.db_pool._pool is not None
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            'worker_id': self.worker_id,
+            'running': self.running,
+            'in_flight': dict(Counter(job_type for job_type, _ in self._in_flight.values())),
+            'concurrency': self.concurrency,
+            'concurrency_per_type': self.concurrency_per_type,
+        }
     
     async def start(self):
-        """Start the worker."""
-        logger.info("Starting job worker...")
+        """Start the worker; returns once it has been stopped."""
+        logger.info(f"Starting job worker {self.worker_id}...")
         self.running = True
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
         await self.poll_for_jobs()
     
     async def stop(self):
-        """Stop the worker."""
+        """Stop claiming new jobs; running jobs continue until drained."""
         logger.info("Stopping job worker...")
-        self.running = False
\ No newline at end of file
+        self.running = False
+        self._wake.set()
+    
+    async def drain(self, timeout: float) -> None:
+        """
+        Wait up to `timeout` seconds for running jobs to finish.
+        
+        Jobs still running then are cancelled, which rolls back their
+        transactions, and put back in the queue for another worker.
+        """
+        tasks = {job_id: task for job_id, (_, task) in self._in_flight.items()}
+        if tasks:
+            logger.info(f"Draining {len(tasks)} running job(s)")
+            _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+            if pending:
+                unfinished = [job_id for job_id, task in tasks.items() if task in pending]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                try:
+                    await self._requeue(unfinished)
+                except Exception as e:
+                    logger.error(f"Failed to requeue jobs {unfinished}: {e}")
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+
+def _job_parameters(job: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """A job's parsed run_parameters and the job type that selects its executor."""
+    parameters = job.get('run_parameters', {})
+    
+    # Parse JSON if it's a string
+    if isinstance(parameters, str):
+        try:
+            parameters = json.loads(parameters)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse run_parameters JSON: {parameters}")
+            parameters = {}
+    
+    # Parameters may specify a different job_type than the run type
+    job_type = job['run_type']
+    if isinstance(parameters, dict) and 'job_type' in parameters:
+        job_type = parameters['job_type']
+    return parameters, job_type
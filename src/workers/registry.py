@@ -0,0 +1,27 @@
+"""The executors every job worker runs, in one place."""
+
+from typing import Callable, Dict
+
+from src.infrastructure.postgres.database import DatabasePool
+from .job_worker import JobExecutor, JobWorker
+from .import_executor import ImportJobExecutor
+from .sampling_executor import SamplingJobExecutor
+from .exploration_executor import ExplorationExecutor
+from .sql_transform_executor import SqlTransformExecutor
+
+
+# Executor factory by job type; sql_transform jobs are queued as 'import'
+# runs and routed by their job_type parameter
+EXECUTOR_FACTORIES: Dict[str, Callable[[DatabasePool], JobExecutor]] = {
+    'import': lambda db_pool: ImportJobExecutor(),
+    'sampling': lambda db_pool: SamplingJobExecutor(),
+    'exploration': lambda db_pool: ExplorationExecutor(db_pool),
+    'sql_transform': lambda db_pool: SqlTransformExecutor(),
+}
+
+
+def register_executors(worker: JobWorker) -> JobWorker:
+    """Register an executor for every job type on the worker."""
+    for job_type, factory in EXECUTOR_FACTORIES.items():
+        worker.register_executor(job_type, factory(worker.db_pool))
+    return worker
@@ -14,6 +14,7 @@ from src.infrastructure.postgres.event_store import PostgresEventStore
 from src.core.events.publisher import JobStartedEvent, JobCompletedEvent, JobFailedEvent
 from src.core.events.registry import InMemoryEventBus
 from src.features.sampling.services.filter_parser import FilterExpressionParser
+from src.infrastructure.metrics import job_stage
 from .job_worker import JobExecutor
 
 logger = logging.getLogger(__name__)
@@ -52,9 +53,8 @@ class SamplingJobExecutor(JobExecutor):
                            WHEN r.data ? 'sheet_name' AND r.data ? 'data' THEN r.data
                            ELSE jsonb_build_object('sheet_name', 'primary', 'row_number', 1, 'data', r.data)
                        END as row_data_json
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
                 ORDER BY RANDOM()
             )
             SELECT * FROM source_data LIMIT $3
@@ -66,11 +66,8 @@ class SamplingJobExecutor(JobExecutor):
                 SELECT 
                     $3::bigint as desired_samples,
                     $4::text as seed,
-                    -- Get fast row count estimate
-                    COALESCE(
-                        (SELECT reltuples::bigint FROM pg_class WHERE oid = 'dsa_core.commit_rows'::regclass),
-                        1000000
-                    ) as estimated_rows
+                    -- Row count from the manifest chunk headers
+                    dsa_core.commit_table_row_count($1, $2) as estimated_rows
             ),
             source_data AS (
                 SELECT m.logical_row_id, m.row_hash, 
@@ -78,12 +75,11 @@ class SamplingJobExecutor(JobExecutor):
                            WHEN r.data ? 'sheet_name' AND r.data ? 'data' THEN r.data
                            ELSE jsonb_build_object('sheet_name', 'primary', 'row_number', 1, 'data', r.data)
                        END as row_data_json
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
                 CROSS JOIN sample_params sp
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
                 -- Hash filtering - scales to billions of rows
-                AND ('x' || substr(md5(m.logical_row_id || sp.seed), 1, 16))::bit(64)::bigint 
+                WHERE ('x' || substr(md5(m.logical_row_id || sp.seed), 1, 16))::bit(64)::bigint 
                     < ((sp.desired_samples::float * $5 / NULLIF(sp.estimated_rows, 0)) * x'7fffffffffffffff'::bigint)::bigint
                 AND NOT EXISTS (
                     SELECT 1 FROM temp_sampling_exclusions e 
@@ -104,10 +100,9 @@ class SamplingJobExecutor(JobExecutor):
                            ELSE jsonb_build_object('sheet_name', 'primary', 'row_number', 1, 'data', r.data)
                        END as row_data_json,
                        md5(logical_row_id || $4::text) as seeded_random
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
-                AND NOT EXISTS (
+                WHERE NOT EXISTS (
                     SELECT 1 FROM temp_sampling_exclusions e 
                     WHERE e.row_id = m.logical_row_id
                 )
@@ -127,10 +122,9 @@ class SamplingJobExecutor(JobExecutor):
                         ELSE jsonb_build_object('sheet_name', 'primary', 'row_number', 1, 'data', r.data)
                     END as row_data_json,
                     ROW_NUMBER() OVER (ORDER BY m.logical_row_id) as rn
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
-                AND NOT EXISTS (
+                WHERE NOT EXISTS (
                     SELECT 1 FROM temp_sampling_exclusions e 
                     WHERE e.row_id = m.logical_row_id
                 )
@@ -154,9 +148,8 @@ class SamplingJobExecutor(JobExecutor):
                         ELSE r.data->>$5
                     END as cluster_id,
                     ('x' || substr(md5(m.logical_row_id || $6::text), 1, 16))::bit(64)::bigint as hash_value
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
             ),
             selected_clusters AS (
                 SELECT DISTINCT cluster_id
@@ -191,9 +184,8 @@ class SamplingJobExecutor(JobExecutor):
                         ELSE r.data->>$5
                     END as cluster_id,
                     ('x' || substr(md5(m.logical_row_id || $6::text), 1, 16))::bit(64)::bigint as hash_value
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
             ),
             selected_clusters AS (
                 SELECT DISTINCT cluster_id
@@ -228,10 +220,9 @@ class SamplingJobExecutor(JobExecutor):
                         PARTITION BY {strata_grouping_sql}
                         ORDER BY md5(m.logical_row_id || $4::text) -- Seeded random order
                     ) as rn
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
-                AND NOT EXISTS (
+                WHERE NOT EXISTS (
                     SELECT 1 FROM temp_sampling_exclusions e
                     WHERE e.row_id = m.logical_row_id
                 )
@@ -275,9 +266,8 @@ class SamplingJobExecutor(JobExecutor):
                 SELECT 
                     {', '.join(col_extracts)},
                     COUNT(*) as stratum_size
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
                 GROUP BY {col_names}
             ),
             strata_allocation AS (
@@ -297,9 +287,8 @@ class SamplingJobExecutor(JobExecutor):
                     {data_expr} as row_data_json,
                     {', '.join(col_extracts)},
                     ('x' || substr(md5(m.logical_row_id || $5::text), 1, 16))::bit(64)::bigint as hash_value
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
             ),
             stratified_sample AS (
                 SELECT 
@@ -455,13 +444,14 @@ class SamplingJobExecutor(JobExecutor):
                         if not isinstance(round_config, dict):
                             raise TypeError(f"Expected round_config to be dict, got {type(round_config).__name__}")
                         
-                        count, round_summary = await self._execute_sampling_round(
-                            conn, 
-                            parameters['source_commit_id'].strip(),  # Remove any trailing spaces
-                            parameters.get('table_key', 'primary'),
-                            round_config,
-                            round_idx + 1
-                        )
+                        with job_stage('sample_round'):
+                            count, round_summary = await self._execute_sampling_round(
+                                conn, 
+                                parameters['source_commit_id'].strip(),  # Remove any trailing spaces
+                                parameters.get('table_key', 'primary'),
+                                round_config,
+                                round_idx + 1
+                            )
                         
                         total_sampled += count
                         round_results.append(round_summary)
@@ -469,18 +459,19 @@ class SamplingJobExecutor(JobExecutor):
                         logger.info(f"Round {round_idx + 1} sampled {count} rows")
                     
                     # Create output commit with both sample and residual data
-                    output_commit_id, residual_count = await self._create_output_commit_with_residual(
-                        conn,
-                        parameters['dataset_id'],
-                        parameters['source_commit_id'].strip(),
-                        parameters.get('table_key', 'primary'),
-                        parameters.get('user_id'),
-                        parameters.get('commit_message', f'Sampled {total_sampled} rows'),
-                        round_results,
-                        parameters.get('output_name', 'sampling_output'),
-                        parameters.get('export_residual', False),
-                        parameters
-                    )
+                    with job_stage('output_commit'):
+                        output_commit_id, residual_count = await self._create_output_commit_with_residual(
+                            conn,
+                            parameters['dataset_id'],
+                            parameters['source_commit_id'].strip(),
+                            parameters.get('table_key', 'primary'),
+                            parameters.get('user_id'),
+                            parameters.get('commit_message', f'Sampled {total_sampled} rows'),
+                            round_results,
+                            parameters.get('output_name', 'sampling_output'),
+                            parameters.get('export_residual', False),
+                            parameters
+                        )
                     
                     logger.info(f"Created output commit: {output_commit_id}")
                     if residual_count > 0:
@@ -649,8 +640,8 @@ class SamplingJobExecutor(JobExecutor):
             # Note: we need to apply filters to the JSONB data structure
             # The data is stored as r.data -> 'data' -> column_name
             query = query.replace(
-                "WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')",
-                f"WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%'){where_clause}"
+                "JOIN dsa_core.rows r ON m.row_hash = r.row_hash",
+                f"JOIN dsa_core.rows r ON m.row_hash = r.row_hash{where_clause}"
             )
             query_params.extend(where_params)
         
@@ -732,12 +723,11 @@ class SamplingJobExecutor(JobExecutor):
             # Use scalable hash filtering for large tables
             total_rows = params.get('total_rows')
             if not total_rows:
-                # Get estimate from pg_class
-                total_rows = await conn.fetchval("""
-                    SELECT COALESCE(reltuples::bigint, 1000000) 
-                    FROM pg_class 
-                    WHERE oid = 'dsa_core.commit_rows'::regclass
-                """)
+                # Chunk headers carry row counts, so this does not scan the table
+                total_rows = await conn.fetchval(
+                    "SELECT dsa_core.commit_table_row_count($1, $2)",
+                    source_commit_id, table_key
+                )
             
             if total_rows > 100_000_000:
                 query = self.SAMPLING_QUERIES['random_seeded_scalable']
@@ -873,9 +863,8 @@ class SamplingJobExecutor(JobExecutor):
             # Fallback: sample data to get columns
             sample_row = await conn.fetchrow("""
                 SELECT r.data
-                FROM dsa_core.commit_rows m
+                FROM dsa_core.commit_table_entries($1, $2) m
                 JOIN dsa_core.rows r ON m.row_hash = r.row_hash
-                WHERE m.commit_id = $1 AND m.logical_row_id LIKE ($2 || ':%')
                 LIMIT 1
             """, commit_id, table_key)
             
@@ -957,7 +946,7 @@ class SamplingJobExecutor(JobExecutor):
             round_table = f"temp_round_{round_idx + 1}_samples"
             union_parts.append(f"""
                 SELECT 
-                    'sample:' || substr(logical_row_id, position(':' in logical_row_id) + 1) as logical_row_id,
+                    substr(logical_row_id, position(':' in logical_row_id) + 1) as row_key,
                     row_hash 
                 FROM {round_table}
             """)
@@ -965,45 +954,31 @@ class SamplingJobExecutor(JobExecutor):
         union_query = " UNION ".join(union_parts)
         
         await conn.execute(f"""
-            INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-            SELECT $1, logical_row_id, row_hash
+            INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+            SELECT $1, 'sample', row_key, row_hash, 0
             FROM ({union_query}) AS all_samples
         """, commit_id)
         
+        await conn.execute("SELECT dsa_core.seal_staged_table($1, 'sample')", commit_id)
+        
         # 2. Export residual data if requested
         residual_count = 0
         if export_residual:
-            # Create temporary table for residual data
-            residual_table = "temp_residual_data"
-            
-            await conn.execute(f"""
-                CREATE TEMP TABLE {residual_table} AS
-                WITH sampled_ids AS (
-                    SELECT row_id FROM temp_sampling_exclusions
-                )
-                SELECT m.logical_row_id, m.row_hash
-                FROM dsa_core.commit_rows m
-                LEFT JOIN sampled_ids si ON m.logical_row_id = si.row_id
-                WHERE m.commit_id = $1 
-                AND m.logical_row_id LIKE ($2 || ':%')
-                AND si.row_id IS NULL
-            """, parent_commit_id, source_table_key)
-            
-            # Get count
-            residual_count = await conn.fetchval(f"SELECT COUNT(*) FROM {residual_table}")
-            
-            if residual_count > 0:
-                # Copy residual rows with 'residual' as table key
-                await conn.execute(f"""
-                    INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
-                    SELECT $1, 
-                           'residual:' || substr(logical_row_id, position(':' in logical_row_id) + 1) as logical_row_id,
-                           row_hash
-                    FROM {residual_table}
-                """, commit_id)
+            # The residual shares the source table's chunks; only chunks that
+            # contained sampled rows are rewritten
+            excluded_row_keys = await conn.fetchval("""
+                SELECT array_agg(substr(row_id, length($1) + 2))
+                FROM temp_sampling_exclusions
+                WHERE row_id LIKE ($1 || ':%')
+            """, source_table_key)
             
-            # Drop temp table
-            await conn.execute(f"DROP TABLE IF EXISTS {residual_table}")
+            await conn.execute(
+                "SELECT dsa_core.derive_commit_table($1, $2, $3, 'residual', $4::text[])",
+                commit_id, parent_commit_id, source_table_key, excluded_row_keys
+            )
+            residual_count = await conn.fetchval(
+                "SELECT dsa_core.commit_table_row_count($1, 'residual')", commit_id
+            )
         
         # 3. Copy schema from parent and create schemas for both tables
         parent_schema = await conn.fetchval("""
@@ -0,0 +1,101 @@
+"""Which pending job a worker claims next."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.statements import CLAIM_SELECTED_JOB, SELECT_PENDING_JOB
+
+# Class of the per-user advisory locks held while a claim checks the
+# user's quota, so that concurrent claims for one user see each other;
+# claims for different users never wait on each other
+CLAIM_LOCK_CLASS = 0x64736a62  # 'dsjb'
+
+
+@dataclass
+class SchedulingPolicy:
+    """
+    Priority classes, fair share, per-user quotas and aging for job claims.
+
+    A pending job scores its type's priority, plus one point for every
+    `aging_seconds` it has waited, minus `user_share_weight` for each job
+    its user is running and `dataset_share_weight` for each job running on
+    its dataset; the highest score is claimed first. Jobs of users already
+    running `max_running_per_user` jobs wait, so one user's bulk imports
+    can never hold every slot, and aging lets low-priority jobs overtake
+    a steady stream of interactive ones eventually. Each claim scores only
+    the `candidate_window` oldest eligible jobs.
+    """
+
+    priorities: Dict[str, float] = field(default_factory=dict)
+    default_priority: float = 0.0
+    aging_seconds: float = 60.0
+    user_share_weight: float = 0.0
+    dataset_share_weight: float = 0.0
+    max_running_per_user: int = 2 ** 31 - 1
+    candidate_window: int = 1000
+
+    @classmethod
+    def from_settings(cls) -> 'SchedulingPolicy':
+        settings = get_settings()
+        return cls(
+            priorities=dict(settings.job_priority_by_type),
+            default_priority=settings.job_default_priority,
+            aging_seconds=settings.job_aging_seconds,
+            user_share_weight=settings.job_user_share_weight,
+            dataset_share_weight=settings.job_dataset_share_weight,
+            max_running_per_user=settings.job_max_running_per_user,
+            candidate_window=settings.job_claim_candidate_window
+        )
+
+    def priority(self, job_type: str) -> float:
+        return self.priorities.get(job_type, self.default_priority)
+
+    def select_args(self, job_types: List[str], now: datetime, skipped_users: List[int]) -> tuple:
+        """Arguments of SELECT_PENDING_JOB for a claim at `now`."""
+        return (
+            job_types,
+            [float(self.priority(job_type)) for job_type in job_types],
+            now,
+            self.aging_seconds,
+            self.max_running_per_user,
+            self.user_share_weight,
+            self.dataset_share_weight,
+            skipped_users,
+            self.candidate_window
+        )
+
+
+async def claim_next_job(
+    conn,
+    policy: SchedulingPolicy,
+    job_types: List[str],
+    worker_id: str,
+    now: Optional[datetime] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Claim the highest-scoring pending job of the given types, if any.
+
+    `now` is the time waits are measured up to; it defaults to the
+    current time and is only passed to replay a queue on another clock.
+    """
+    now = now or datetime.now(timezone.utc)
+    skipped_users: List[int] = []
+    while True:
+        async with conn.transaction():
+            candidate = await conn.fetchrow(
+                SELECT_PENDING_JOB, *policy.select_args(job_types, now, skipped_users)
+            )
+            if candidate is None:
+                return None
+            user_id = candidate['user_id']
+            if user_id is not None:
+                await conn.execute("SELECT pg_advisory_xact_lock($1, $2)", CLAIM_LOCK_CLASS, user_id)
+            job = await conn.fetchrow(
+                CLAIM_SELECTED_JOB, candidate['id'], worker_id, user_id, policy.max_running_per_user
+            )
+        if job is not None:
+            return dict(job)
+        # Another worker filled the user's quota since the candidate was picked
+        skipped_users.append(user_id)
@@ -7,6 +7,7 @@ from uuid import UUID
 from .job_worker import JobExecutor
 from ..infrastructure.postgres.database import DatabasePool
 from ..infrastructure.postgres.event_store import PostgresEventStore
+from ..infrastructure.metrics import job_stage
 from ..core.events.registry import InMemoryEventBus
 from src.features.sql_workbench.services.sql_execution import (
     SqlValidationService, SqlExecutionService,
@@ -82,20 +83,23 @@ class SqlTransformExecutor(JobExecutor):
             ))
             
             # Create execution plan
-            plan = await execution_service.create_execution_plan(
-                sources=sources,
-                sql=parameters['sql'],
-                target=target
-            )
+            with job_stage('plan'):
+                plan = await execution_service.create_execution_plan(
+                    sources=sources,
+                    sql=parameters['sql'],
+                    target=target,
+                    engine=parameters.get('engine', 'postgres')
+                )
             
             logger.info(f"Created execution plan with estimated {plan.estimated_rows} rows")
             
             # Execute transformation
-            result = await execution_service.execute_transformation(
-                plan=plan,
-                job_id=job_id,
-                user_id=user_id
-            )
+            with job_stage('execute'):
+                result = await execution_service.execute_transformation(
+                    plan=plan,
+                    job_id=job_id,
+                    user_id=user_id
+                )
             
             logger.info(f"SQL transform job {job_id} completed successfully")
             
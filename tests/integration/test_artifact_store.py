@@ -0,0 +1,148 @@
+"""Integration tests for the artifact store and artifact responses with byte ranges."""
+import os
+import random
+from typing import Any, Dict
+
+import httpx
+import pytest
+import pytest_asyncio
+import zstandard
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from src.api.artifacts import artifact_response
+from src.api.compression import CompressionMiddleware
+from src.infrastructure.external import artifact_store as artifact_store_module
+from src.infrastructure.external.artifact_store import ArtifactStore, LocalArtifactBackend, is_artifact_ref
+
+
+def _content() -> bytes:
+    """About 800 KB of partly compressible bytes, so the blob spans several read chunks."""
+    rng = random.Random(7)
+    return b"".join(
+        rng.randbytes(512) + b"artifact line %d\n" % n * 8 for n in range(1200)
+    )
+
+
+CONTENT = _content()
+
+
+@pytest.fixture
+def store(tmp_path) -> ArtifactStore:
+    return ArtifactStore(LocalArtifactBackend(str(tmp_path)), compression_level=3)
+
+
+@pytest_asyncio.fixture
+async def ref(store: ArtifactStore) -> Dict[str, Any]:
+    return await store.put(CONTENT, "application/octet-stream")
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once(store: ArtifactStore, ref: Dict[str, Any], tmp_path):
+    again = await store.put(CONTENT, "application/octet-stream")
+
+    assert again == ref
+    assert is_artifact_ref(ref)
+    assert ref["size"] == len(CONTENT)
+    assert ref["stored_size"] < ref["size"]
+    blobs = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert blobs == [ref["digest"]]
+    assert await store.get(ref) == CONTENT
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("start, end", [
+    (0, 0),
+    (len(CONTENT) - 1, None),
+    (256 * 1024 - 3, 256 * 1024 + 3),
+    (1000, 700_000),
+    (12345, len(CONTENT) + 100),
+])
+async def test_streamed_ranges_match_the_content(store: ArtifactStore, ref: Dict[str, Any], start: int, end: int):
+    streamed = b"".join([chunk async for chunk in store.stream(ref, start, end)])
+    expected_end = len(CONTENT) if end is None else end + 1
+    assert streamed == CONTENT[start:expected_end]
+
+
+@pytest.fixture
+def artifact_client(store: ArtifactStore, ref: Dict[str, Any], monkeypatch) -> httpx.AsyncClient:
+    """A client for an app serving `ref` behind the compression middleware."""
+    monkeypatch.setattr(artifact_store_module, "_artifact_store", store)
+
+    async def serve(request):
+        return artifact_response(ref, request, filename="result.bin")
+
+    app = Starlette(routes=[Route("/artifact", serve)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1000, zstd_level=3, brotli_quality=4, gzip_level=6)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _get(client: httpx.AsyncClient, **headers: str):
+    """The response and its body as sent, without httpx decoding it."""
+    headers = {name.replace("_", "-"): value for name, value in headers.items()}
+    async with client.stream("GET", "/artifact", headers=headers) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("range_header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=262000-263000", 262000, 263000),
+    ("bytes=-500", len(CONTENT) - 500, len(CONTENT) - 1),
+    (f"bytes=700000-{len(CONTENT) * 2}", 700000, len(CONTENT) - 1),
+])
+async def test_ranges_get_partial_uncompressed_content(
+    artifact_client: httpx.AsyncClient,
+    range_header: str,
+    start: int,
+    end: int
+):
+    """Ranges index the decompressed content and are never re-encoded on the way out."""
+    async with artifact_client as client:
+        response, body = await _get(client, Range=range_header, Accept_Encoding="zstd, gzip")
+
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert int(response.headers["content-length"]) == end - start + 1
+    assert body == CONTENT[start:end + 1]
+
+
+@pytest.mark.asyncio
+async def test_unsatisfiable_range_is_refused(artifact_client: httpx.AsyncClient):
+    async with artifact_client as client:
+        response, _ = await _get(client, Range=f"bytes={len(CONTENT)}-")
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+@pytest.mark.asyncio
+async def test_stale_if_range_gets_the_whole_artifact(artifact_client: httpx.AsyncClient, ref: Dict[str, Any]):
+    async with artifact_client as client:
+        response, body = await _get(client, Range="bytes=0-99", If_Range='"other"', Accept_Encoding="identity")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{ref["digest"]}"'
+    assert body == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_is_not_modified(artifact_client: httpx.AsyncClient, ref: Dict[str, Any]):
+    async with artifact_client as client:
+        response, body = await _get(client, If_None_Match=f'"x", "{ref["digest"]}"')
+
+    assert response.status_code == 304
+    assert body == b""
+
+
+@pytest.mark.asyncio
+async def test_zstd_clients_get_the_stored_blob(artifact_client: httpx.AsyncClient, ref: Dict[str, Any]):
+    async with artifact_client as client:
+        response, body = await _get(client, Accept_Encoding="gzip, zstd")
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "zstd"
+    assert len(body) == ref["stored_size"] == int(response.headers["content-length"])
+    assert zstandard.ZstdDecompressor().decompress(body) == CONTENT
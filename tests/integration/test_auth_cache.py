@@ -0,0 +1,132 @@
+"""Integration tests for the principal and permission caches and their invalidation."""
+import os
+import time
+import uuid
+from typing import Any, Dict, Tuple
+from urllib.parse import quote_plus
+
+import pytest
+import pytest_asyncio
+
+from src.core.auth_cache import get_permission_cache, get_principal_cache
+from src.core.domain_exceptions import PermissionDeniedError
+from src.core.events.publisher import DatasetDeletedEvent, PermissionGrantedEvent, PermissionRevokedEvent
+from src.core.permissions import PermissionService
+from src.features.common.event_handlers import AuthCacheInvalidationHandler
+from src.features.users.services.user_service import UserDeletedEvent, UserUpdatedEvent
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.uow import PostgresUnitOfWork
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    get_principal_cache().clear()
+    get_permission_cache().clear()
+    yield
+    get_principal_cache().clear()
+    get_permission_cache().clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("event", [
+    UserUpdatedEvent(user_id=7, updated_fields=["role_id"], updated_by=1),
+    UserDeletedEvent(user_id=7, deleted_by=1, user_soeid="USER7"),
+])
+async def test_user_events_drop_the_users_entries(event):
+    """A user change forgets that user's principal and permissions and distrusts their older tokens."""
+    principals, permissions = get_principal_cache(), get_permission_cache()
+    principals.put("USER7", 7)
+    principals.put("USER8", 8)
+    permissions.put(7, "dataset", 1, "read", True)
+    permissions.put(8, "dataset", 1, "read", True)
+    issued_before = time.time() - 1
+
+    await AuthCacheInvalidationHandler().handle(event)
+
+    assert principals.get("USER7") is None
+    assert principals.get("USER8") == 8
+    assert permissions.get(7, "dataset", 1, "read") is None
+    assert permissions.get(8, "dataset", 1, "read") is True
+    assert not principals.is_current(7, issued_before)
+    assert principals.is_current(7, time.time() + 1)
+    assert principals.is_current(8, issued_before)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("event", [
+    PermissionGrantedEvent(dataset_id=1, user_id=1, target_user_id=8, permission_type="write"),
+    PermissionRevokedEvent(dataset_id=1, user_id=1, target_user_id=8, permission_type="write"),
+    DatasetDeletedEvent(dataset_id=1, user_id=1, name="gone"),
+])
+async def test_dataset_events_drop_every_users_entries_for_the_dataset(event):
+    permissions = get_permission_cache()
+    permissions.put(7, "dataset", 1, "read", True)
+    permissions.put(8, "dataset", 1, "write", False)
+    permissions.put(8, "dataset", 2, "write", True)
+
+    await AuthCacheInvalidationHandler().handle(event)
+
+    assert permissions.get(7, "dataset", 1, "read") is None
+    assert permissions.get(8, "dataset", 1, "write") is None
+    assert permissions.get(8, "dataset", 2, "write") is True
+
+
+@pytest_asyncio.fixture(scope="function")
+async def auth_db():
+    """Database pool for permission checks through a unit of work."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def outsider(auth_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """A temporary user with no permission on the test dataset."""
+    user = await auth_db.fetchrow(
+        """
+        INSERT INTO dsa_auth.users (soeid, password_hash, role_id)
+        SELECT $1, 'x', role_id FROM dsa_auth.users WHERE id = (
+            SELECT created_by FROM dsa_core.datasets WHERE id = $2
+        )
+        RETURNING id
+        """,
+        f"AUTH{uuid.uuid4().hex[:12]}", created_dataset["dataset_id"]
+    )
+    yield user["id"]
+    await auth_db.execute("DELETE FROM dsa_auth.users WHERE id = $1", user["id"])
+
+
+async def _can_write(pool: DatabasePool, dataset_id: int, user_id: int) -> bool:
+    async with PostgresUnitOfWork(pool) as uow:
+        return await PermissionService(uow).has_permission("dataset", dataset_id, user_id, "write")
+
+
+@pytest.mark.asyncio
+async def test_permission_service_sees_a_grant_once_its_event_is_handled(
+    auth_db: DatabasePool,
+    created_dataset: Dict[str, Any],
+    outsider: int
+):
+    """Checks are served from the shared cache until the grant's event drops the entry."""
+    dataset_id = created_dataset["dataset_id"]
+    assert not await _can_write(auth_db, dataset_id, outsider)
+
+    await auth_db.execute(
+        "INSERT INTO dsa_auth.dataset_permissions (dataset_id, user_id, permission_type) VALUES ($1, $2, 'write')",
+        dataset_id, outsider
+    )
+    assert not await _can_write(auth_db, dataset_id, outsider)
+
+    await AuthCacheInvalidationHandler().handle(PermissionGrantedEvent(
+        dataset_id=dataset_id, user_id=0, target_user_id=outsider, permission_type="write"
+    ))
+    assert await _can_write(auth_db, dataset_id, outsider)
+
+    with pytest.raises(PermissionDeniedError):
+        async with PostgresUnitOfWork(auth_db) as uow:
+            await PermissionService(uow).require("dataset", dataset_id, outsider, "admin")
@@ -0,0 +1,234 @@
+"""Integration tests for the commit diff service and endpoints."""
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote_plus
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.features.versioning.services import CommitDiffService
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.table_reader import PostgresTableReader
+from src.infrastructure.postgres.versioning_repo import PostgresCommitRepository
+
+
+TABLE = "primary"
+ROWS = 300
+CHUNK_SIZE = 16
+
+MODIFIED = ["10", "150"]
+REMOVED = ["20", "21"]
+ADDED = [str(n) for n in range(ROWS, ROWS + 5)]
+
+
+@pytest_asyncio.fixture(scope="function")
+async def diff_db():
+    """Database pool for building commits and running the diff service directly."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+
+
+def _row(n: int, version: int = 0) -> Tuple[str, str]:
+    return str(n), json.dumps({"n": n, "version": version})
+
+
+async def _create_commit(pool: DatabasePool, dataset_id: int, parent: str = None) -> str:
+    commit_id = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+    await pool.execute(
+        "INSERT INTO dsa_core.commits (commit_id, dataset_id, parent_commit_id, message) VALUES ($1, $2, $3, $4)",
+        commit_id, dataset_id, parent, "commit diff test"
+    )
+    return commit_id
+
+
+async def _stage(pool: DatabasePool, commit_id: str, rows: List[Tuple[str, str]]) -> None:
+    """Store rows and seal them into the commit's table."""
+    hashes = [hashlib.sha256(data.encode()).hexdigest() for _, data in rows]
+    await pool.execute(
+        """
+        INSERT INTO dsa_core.rows (row_hash, data)
+        SELECT h, d::jsonb FROM unnest($1::char(64)[], $2::text[]) AS t(h, d)
+        ON CONFLICT (row_hash) DO NOTHING
+        """,
+        hashes, [data for _, data in rows]
+    )
+    await pool.execute(
+        """
+        INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+        SELECT $1, $2, k, h, 0 FROM unnest($3::text[], $4::char(64)[]) AS t(k, h)
+        """,
+        commit_id, TABLE, [key for key, _ in rows], hashes
+    )
+    await pool.execute("SELECT dsa_core.seal_staged_table($1, $2, $3)", commit_id, TABLE, CHUNK_SIZE)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def diff_commits(diff_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """A parent commit and a child that modifies, removes and adds a few rows."""
+    dataset_id = created_dataset["dataset_id"]
+    parent = await _create_commit(diff_db, dataset_id)
+    await _stage(diff_db, parent, [_row(n) for n in range(ROWS)])
+
+    child = await _create_commit(diff_db, dataset_id, parent)
+    await diff_db.execute(
+        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3, $4::text[], $5)",
+        child, parent, TABLE, REMOVED, CHUNK_SIZE
+    )
+    await _stage(diff_db, child, [_row(int(key), version=1) for key in MODIFIED] + [_row(int(key)) for key in ADDED])
+
+    yield dataset_id, parent, child
+    await diff_db.execute(
+        "DELETE FROM dsa_core.commits WHERE commit_id = ANY($1::char(64)[])", [child, parent]
+    )
+
+
+def _expected_changes() -> List[Tuple[str, str]]:
+    """(logical_row_id, change) of the child against its parent, in key order."""
+    changes = [(key, "modified") for key in MODIFIED]
+    changes += [(key, "removed") for key in REMOVED]
+    changes += [(key, "added") for key in ADDED]
+    return sorted((f"{TABLE}:{key}", change) for key, change in changes)
+
+
+@pytest.mark.asyncio
+async def test_diff_reports_added_removed_and_modified_rows(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    diff_commits: Tuple[int, str, str]
+):
+    dataset_id, parent, child = diff_commits
+    response = await async_client.get(
+        f"/api/datasets/{dataset_id}/diff",
+        headers=auth_headers,
+        params={"from": parent, "to": child, "include_cells": "true", "include_column_counts": "true"}
+    )
+    assert response.status_code == 200, response.text
+    diff = response.json()
+
+    assert diff["tables"] == [{
+        "table_key": TABLE,
+        "added": len(ADDED),
+        "removed": len(REMOVED),
+        "modified": len(MODIFIED),
+        "unchanged": ROWS - len(REMOVED) - len(MODIFIED),
+        "column_changes": {"version": len(MODIFIED)}
+    }]
+    assert [(c["logical_row_id"], c["change"]) for c in diff["changes"]] == _expected_changes()
+    assert not diff["has_more"]
+
+    modified = next(c for c in diff["changes"] if c["logical_row_id"] == f"{TABLE}:{MODIFIED[0]}")
+    assert modified["old_data"] == {"n": int(MODIFIED[0]), "version": 0}
+    assert modified["new_data"] == {"n": int(MODIFIED[0]), "version": 1}
+    assert modified["changed_columns"] == ["version"]
+
+
+@pytest.mark.asyncio
+async def test_diff_pages_follow_the_cursor(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    diff_commits: Tuple[int, str, str]
+):
+    dataset_id, parent, child = diff_commits
+    seen: List[Tuple[str, str]] = []
+    cursor = None
+    while True:
+        params = {"from": parent, "to": child, "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = await async_client.get(f"/api/datasets/{dataset_id}/diff", headers=auth_headers, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["changes"]) <= 3
+        seen += [(c["logical_row_id"], c["change"]) for c in page["changes"]]
+        if not page["has_more"]:
+            break
+        cursor = page["next_cursor"]
+
+    assert seen == _expected_changes()
+
+
+@pytest.mark.asyncio
+async def test_diff_of_commit_from_another_dataset_is_not_found(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    diff_db: DatabasePool,
+    diff_commits: Tuple[int, str, str]
+):
+    """Commit ids only resolve within the dataset in the path."""
+    dataset_id, parent, _ = diff_commits
+    response = await async_client.post(
+        "/api/datasets",
+        headers=auth_headers,
+        json={"name": f"pytest_diff_other_{int(time.time() * 1000000)}", "description": "Other dataset for diff tests"}
+    )
+    assert response.status_code in [200, 201], response.text
+    other_dataset_id = response.json()["dataset_id"]
+    other = await _create_commit(diff_db, other_dataset_id)
+    try:
+        response = await async_client.get(
+            f"/api/datasets/{dataset_id}/diff", headers=auth_headers, params={"from": parent, "to": other}
+        )
+        assert response.status_code == 404, response.text
+
+        response = await async_client.get(
+            f"/api/datasets/{dataset_id}/diff/stream", headers=auth_headers, params={"from": other, "to": parent}
+        )
+        assert response.status_code == 404, response.text
+    finally:
+        await diff_db.execute("DELETE FROM dsa_core.commits WHERE commit_id = $1", other)
+        await async_client.delete(f"/api/datasets/{other_dataset_id}", headers=auth_headers)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window_size", [1, CHUNK_SIZE, 5000])
+async def test_window_size_does_not_change_the_diff(
+    diff_db: DatabasePool,
+    diff_commits: Tuple[int, str, str],
+    window_size: int
+):
+    """Windows of any size cover every change exactly once and add up to the same summary."""
+    _, parent, child = diff_commits
+    async with diff_db.acquire() as conn:
+        service = CommitDiffService(PostgresCommitRepository(conn), PostgresTableReader(conn), window_size=window_size)
+        changes = [
+            (change.logical_row_id, change.change)
+            async for batch in service.iter_changes(parent, child)
+            for change in batch
+        ]
+        tables = await service.summarize(parent, child, include_column_counts=True)
+
+    assert changes == _expected_changes()
+    assert [(t.table_key, t.added, t.removed, t.modified, t.unchanged, t.column_changes) for t in tables] == [
+        (TABLE, len(ADDED), len(REMOVED), len(MODIFIED), ROWS - len(REMOVED) - len(MODIFIED), {"version": len(MODIFIED)})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_diff_stream_is_ndjson_ending_in_the_summary(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    diff_commits: Tuple[int, str, str]
+):
+    dataset_id, parent, child = diff_commits
+    response = await async_client.get(
+        f"/api/datasets/{dataset_id}/diff/stream", headers=auth_headers, params={"from": parent, "to": child}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["logical_row_id"], line["change"]) for line in lines[:-1]] == _expected_changes()
+    summary = lines[-1]["summary"]
+    assert (summary["from_commit_id"], summary["to_commit_id"]) == (parent, child)
+    assert summary["tables"][0]["modified"] == len(MODIFIED)
@@ -0,0 +1,151 @@
+"""Integration tests for keyset search pages and the per-user facet cache."""
+import os
+import uuid
+from typing import Any, AsyncGenerator, Dict, List
+from urllib.parse import quote_plus
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.core.domain_exceptions import ValidationException
+from src.core.events.publisher import DatasetUpdatedEvent, PermissionGrantedEvent
+from src.features.search import SearchService, get_search_cache
+from src.features.search.event_handlers import SearchIndexEventHandler
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.uow import PostgresUnitOfWork
+
+
+DATASETS = 5
+
+
+@pytest_asyncio.fixture(scope="function")
+async def tagged_datasets(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str]
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Datasets sharing a tag no other test uses."""
+    tag = f"pytest-search-{uuid.uuid4().hex[:12]}"
+    ids: List[int] = []
+    try:
+        for n in range(DATASETS):
+            response = await async_client.post(
+                "/api/datasets",
+                headers=auth_headers,
+                json={"name": f"{tag}-{n}", "description": "Keyset search test dataset", "tags": [tag]}
+            )
+            assert response.status_code in [200, 201], response.text
+            ids.append(response.json()["dataset_id"])
+        yield {"tag": tag, "dataset_ids": ids}
+    finally:
+        for dataset_id in ids:
+            await async_client.delete(f"/api/datasets/{dataset_id}", headers=auth_headers)
+
+
+async def _search(client: httpx.AsyncClient, headers: Dict[str, str], **params: Any) -> Dict[str, Any]:
+    response = await client.get("/api/datasets/search/", headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_by", ["updated_at", "relevance"])
+async def test_keyset_pages_return_every_result_once_in_order(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    tagged_datasets: Dict[str, Any],
+    sort_by: str
+):
+    tag = tagged_datasets["tag"]
+    everything = await _search(async_client, auth_headers, tags=tag, sort_by=sort_by, limit=100)
+    assert sorted(r["id"] for r in everything["results"]) == sorted(tagged_datasets["dataset_ids"])
+    assert everything["total"] == DATASETS
+
+    seen: List[int] = []
+    params: Dict[str, Any] = {"tags": tag, "sort_by": sort_by, "limit": 2, "include_facets": "false"}
+    page = await _search(async_client, auth_headers, **params)
+    assert page["total"] == DATASETS
+    while True:
+        assert len(page["results"]) <= 2
+        seen += [r["id"] for r in page["results"]]
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        page = await _search(async_client, auth_headers, **params, cursor=page["next_cursor"])
+        # Later keyset pages skip the count
+        assert page["total"] is None
+
+    assert seen == [r["id"] for r in everything["results"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {"sort_by": "name", "cursor": "eyJrIjogInNjb3JlIiwgInYiOiAxLCAiaWQiOiAxfQ=="},
+    {"sort_by": "relevance", "cursor": "not-a-cursor"},
+])
+async def test_unusable_cursors_are_rejected(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    params: Dict[str, str]
+):
+    response = await async_client.get("/api/datasets/search/", headers=auth_headers, params=params)
+    assert response.status_code == 400, response.text
+
+
+@pytest_asyncio.fixture(scope="function")
+async def search_db():
+    """Database pool for running the search service in process."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    get_search_cache().invalidate_all()
+    yield pool
+    get_search_cache().invalidate_all()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_facets_are_cached_per_filter_set_until_invalidated(
+    search_db: DatabasePool,
+    tagged_datasets: Dict[str, Any]
+):
+    """Paging and re-sorting reuse the facets; a dataset change drops them, another user's grant doesn't."""
+    tag, dataset_ids = tagged_datasets["tag"], tagged_datasets["dataset_ids"]
+    owner = (await search_db.fetchrow(
+        "SELECT created_by FROM dsa_core.datasets WHERE id = $1", dataset_ids[0]
+    ))["created_by"]
+    cache = get_search_cache()
+
+    async def search(**kwargs: Any):
+        return await SearchService(PostgresUnitOfWork(search_db), cache=cache).search_datasets(
+            user_id=owner, tags=[tag], **kwargs
+        )
+
+    first = await search(limit=2)
+    assert first.facets.tags[tag] == DATASETS
+    misses = cache.stats["facet_misses"]
+
+    hits = cache.stats["facet_hits"]
+    assert (await search(limit=2, offset=2)).facets == first.facets
+    assert (await search(sort_by="name", sort_order="asc")).facets == first.facets
+    assert cache.stats["facet_hits"] == hits + 2
+    assert cache.stats["facet_misses"] == misses
+
+    handler = SearchIndexEventHandler(search_db)
+    await handler.handle(PermissionGrantedEvent(
+        dataset_id=dataset_ids[0], user_id=owner, target_user_id=owner + 1, permission_type="read"
+    ))
+    await search(limit=2)
+    assert cache.stats["facet_misses"] == misses
+
+    await handler.handle(DatasetUpdatedEvent(
+        dataset_id=dataset_ids[0], user_id=owner, changes={"tags": {"old": [tag], "new": [tag]}}
+    ))
+    assert (await search(limit=2)).facets == first.facets
+    assert cache.stats["facet_misses"] == misses + 1
+
+    with pytest.raises(ValidationException):
+        await search(sort_by="name", cursor=first.next_cursor)
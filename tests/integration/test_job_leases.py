@@ -0,0 +1,209 @@
+"""Integration tests for job leases: fenced status writes and cancelling jobs whose lease was lost."""
+import asyncio
+import json
+import os
+import uuid
+from typing import Any, Dict, Optional
+from urllib.parse import quote_plus
+
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.config import get_settings
+from src.infrastructure.postgres.database import DatabasePool
+from src.workers.job_worker import JobExecutor, JobWorker
+from src.workers.scheduler import SchedulingPolicy
+
+
+# No real worker has an executor for this type, so only the test's worker claims these jobs
+LEASE_TEST = "lease_test"
+
+
+class _BlockingExecutor(JobExecutor):
+    """Runs until released, recording whether it was cancelled on the way."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.cancelled = asyncio.Event()
+
+    async def execute(self, job_id: str, parameters: Dict[str, Any], db_pool: DatabasePool) -> Dict[str, Any]:
+        self.started.set()
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+        return {"finished": job_id}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def lease_db():
+    """Database pool shared by the worker under test and the checks on its jobs."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=4)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def lease_jobs(lease_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """Creates tagged jobs on the dataset; removes them afterwards."""
+    tag = uuid.uuid4().hex
+    owner = await lease_db.fetchrow(
+        "SELECT created_by FROM dsa_core.datasets WHERE id = $1", created_dataset["dataset_id"]
+    )
+
+    async def create(status: str = "pending", claimed_by: Optional[str] = None, heartbeat_age: Optional[float] = None) -> str:
+        row = await lease_db.fetchrow(
+            """
+            INSERT INTO dsa_jobs.analysis_runs (run_type, dataset_id, user_id, run_parameters, status, claimed_by, heartbeat_at)
+            VALUES (
+                'sampling', $1, $2, $3::jsonb, $4::dsa_jobs.analysis_run_status, $5,
+                now() - make_interval(secs => $6::float8)
+            )
+            RETURNING id
+            """,
+            created_dataset["dataset_id"], owner["created_by"],
+            json.dumps({"job_type": LEASE_TEST, "lease_test": tag}), status, claimed_by, heartbeat_age
+        )
+        return str(row["id"])
+
+    yield create
+    await lease_db.execute("DELETE FROM dsa_jobs.analysis_runs WHERE run_parameters->>'lease_test' = $1", tag)
+
+
+@pytest.fixture
+def executor() -> _BlockingExecutor:
+    return _BlockingExecutor()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def worker(lease_db: DatabasePool, executor: _BlockingExecutor, monkeypatch):
+    """A worker that runs LEASE_TEST jobs and heartbeats every 0.1s once its heartbeat is started."""
+    monkeypatch.setattr(get_settings(), "worker_heartbeat_interval_seconds", 0.1)
+    worker = JobWorker(
+        lease_db, concurrency=1, concurrency_per_type={},
+        worker_id=f"lease-test-{uuid.uuid4().hex[:8]}", policy=SchedulingPolicy()
+    )
+    worker.register_executor(LEASE_TEST, executor)
+    yield worker
+    executor.release.set()
+    await worker.drain(timeout=5.0)
+
+
+async def _run(worker: JobWorker, executor: _BlockingExecutor, job_id: str) -> asyncio.Task:
+    """Claim `job_id` with the worker's real claim query and start it."""
+    job = await worker._claim_job([LEASE_TEST])
+    assert job is not None and str(job["id"]) == job_id
+    worker._start_job(job)
+    await asyncio.wait_for(executor.started.wait(), timeout=5.0)
+    return worker._in_flight[job_id][1]
+
+
+async def _job(pool: DatabasePool, job_id: str):
+    return await pool.fetchrow(
+        """
+        SELECT status::text AS status, claimed_by, heartbeat_at, output_summary, completed_at
+        FROM dsa_jobs.analysis_runs WHERE id = $1::uuid
+        """,
+        job_id
+    )
+
+
+async def _steal(pool: DatabasePool, job_id: str) -> None:
+    """What a lost lease looks like: the job was requeued and another worker claimed it."""
+    await pool.execute(
+        "UPDATE dsa_jobs.analysis_runs SET claimed_by = 'another-worker', heartbeat_at = now() WHERE id = $1::uuid",
+        job_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_the_lease_and_the_job_completes(
+    lease_db: DatabasePool,
+    lease_jobs,
+    worker: JobWorker,
+    executor: _BlockingExecutor
+):
+    job_id = await lease_jobs()
+    task = await _run(worker, executor, job_id)
+    claimed = await _job(lease_db, job_id)
+    assert (claimed["status"], claimed["claimed_by"]) == ("running", worker.worker_id)
+
+    worker._heartbeat_task = asyncio.create_task(worker._heartbeat())
+    await asyncio.sleep(0.4)
+    assert (await _job(lease_db, job_id))["heartbeat_at"] > claimed["heartbeat_at"]
+
+    executor.release.set()
+    await asyncio.wait_for(task, timeout=5.0)
+    finished = await _job(lease_db, job_id)
+    summary = finished["output_summary"]
+    if isinstance(summary, str):
+        summary = json.loads(summary)
+    assert finished["status"] == "completed"
+    assert summary["finished"] == job_id
+    assert not executor.cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_cancels_the_job_on_the_next_heartbeat(
+    lease_db: DatabasePool,
+    lease_jobs,
+    worker: JobWorker,
+    executor: _BlockingExecutor
+):
+    job_id = await lease_jobs()
+    task = await _run(worker, executor, job_id)
+    await _steal(lease_db, job_id)
+
+    worker._heartbeat_task = asyncio.create_task(worker._heartbeat())
+    await asyncio.wait_for(executor.cancelled.wait(), timeout=5.0)
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert job_id not in worker._in_flight
+    # The new owner's claim is untouched; this worker wrote nothing
+    job = await _job(lease_db, job_id)
+    assert (job["status"], job["claimed_by"]) == ("running", "another-worker")
+    assert job["output_summary"] is None and job["completed_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_result_of_a_job_whose_lease_was_lost_is_discarded(
+    lease_db: DatabasePool,
+    lease_jobs,
+    worker: JobWorker,
+    executor: _BlockingExecutor
+):
+    """A job that finishes before its heartbeat notices the lost lease can't overwrite the new owner's row."""
+    job_id = await lease_jobs()
+    task = await _run(worker, executor, job_id)
+    await _steal(lease_db, job_id)
+
+    executor.release.set()
+    await asyncio.wait_for(task, timeout=5.0)
+
+    job = await _job(lease_db, job_id)
+    assert (job["status"], job["claimed_by"]) == ("running", "another-worker")
+    assert job["output_summary"] is None and job["completed_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_silent_workers_are_requeued(lease_db: DatabasePool, lease_jobs, worker: JobWorker):
+    lease = get_settings().worker_lease_seconds
+    stale = await lease_jobs("running", "gone-worker", heartbeat_age=lease + 60)
+    unleased = await lease_jobs("running", "old-worker", heartbeat_age=None)
+    alive = await lease_jobs("running", "busy-worker", heartbeat_age=0)
+
+    worker._heartbeat_task = asyncio.create_task(worker._heartbeat())
+    await asyncio.sleep(0.4)
+
+    for job_id in (stale, unleased):
+        job = await _job(lease_db, job_id)
+        assert (job["status"], job["claimed_by"], job["heartbeat_at"]) == ("pending", None, None)
+    job = await _job(lease_db, alive)
+    assert (job["status"], job["claimed_by"]) == ("running", "busy-worker")
@@ -0,0 +1,250 @@
+"""Integration tests for coalesced job progress and its Server-Sent Event streams."""
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from urllib.parse import quote_plus
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.features.jobs.services.progress import (
+    JOB_PROGRESS_CHANNEL, JobProgressListener, JobProgressPublisher, announce_job_status, get_job_snapshot
+)
+from src.infrastructure.postgres.database import DatabasePool
+
+
+# No worker has an executor for this type, so the test's jobs stay as the test leaves them
+PROGRESS_TEST = "progress_test"
+
+DSN = (
+    f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+    f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def progress_db():
+    """Database pool the test's publisher writes progress through."""
+    pool = DatabasePool(DSN)
+    await pool.initialize(min_size=1, max_size=4)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def job_id(progress_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """A pending job of the dataset's owner; removed with its progress afterwards."""
+    row = await progress_db.fetchrow(
+        """
+        INSERT INTO dsa_jobs.analysis_runs (run_type, dataset_id, user_id, run_parameters)
+        SELECT 'sampling', id, created_by, $2::jsonb FROM dsa_core.datasets WHERE id = $1
+        RETURNING id
+        """,
+        created_dataset["dataset_id"], json.dumps({"job_type": PROGRESS_TEST})
+    )
+    yield str(row["id"])
+    await progress_db.execute("DELETE FROM dsa_jobs.analysis_runs WHERE id = $1", row["id"])
+
+
+@pytest.fixture
+def publisher() -> JobProgressPublisher:
+    return JobProgressPublisher(max_updates_per_second=5)
+
+
+async def _finish(pool: DatabasePool, publisher: JobProgressPublisher, job_id: str) -> None:
+    """Mark the job completed the way the worker does."""
+    await pool.execute("UPDATE dsa_jobs.analysis_runs SET status = 'completed' WHERE id = $1::uuid", job_id)
+    await publisher.status_changed(pool, job_id, "completed")
+
+
+def _drain(queue: asyncio.Queue) -> List[Dict[str, Any]]:
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+async def _snapshot(pool: DatabasePool, job_id: str) -> Dict[str, Any]:
+    async with pool.acquire() as conn:
+        return await get_job_snapshot(conn, job_id)
+
+
+# ========== Publisher and listener ==========
+
+@pytest_asyncio.fixture(scope="function")
+async def job_events(progress_db: DatabasePool, job_id: str):
+    """Queue of the job's notifications from a listener of its own, once it is listening."""
+    listener = JobProgressListener(queue_size=100)
+    task = asyncio.create_task(listener.run(DSN, reconnect_seconds=0.1))
+    async with listener.subscribe(job_id=job_id) as queue:
+        # Announce until one arrives, then drop the announcements
+        for _ in range(50):
+            async with progress_db.acquire() as conn:
+                await announce_job_status(conn, job_id)
+            try:
+                await asyncio.wait_for(queue.get(), timeout=0.2)
+                break
+            except asyncio.TimeoutError:
+                continue
+        else:
+            pytest.fail("The progress listener never started listening")
+        await asyncio.sleep(0.2)
+        _drain(queue)
+        yield queue
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_frequent_reports_are_coalesced_to_the_latest(
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str,
+    job_events: asyncio.Queue
+):
+    """A burst within one interval writes the first report at once and only the last one later."""
+    for done in range(50):
+        await publisher.report(progress_db, job_id, {"done": done})
+    await asyncio.sleep(0.5)
+
+    events = _drain(job_events)
+    assert [event["progress"] for event in events] == [{"done": 0}, {"done": 49}]
+    assert all(event["job_id"] == job_id and "status" not in event for event in events)
+    assert (await _snapshot(progress_db, job_id))["progress"] == {"done": 49}
+
+
+@pytest.mark.asyncio
+async def test_finishing_writes_the_pending_progress_before_the_status(
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str,
+    job_events: asyncio.Queue
+):
+    await publisher.report(progress_db, job_id, {"done": 1})
+    await publisher.report(progress_db, job_id, {"done": 2})
+    await _finish(progress_db, publisher, job_id)
+    await asyncio.sleep(0.3)
+
+    events = _drain(job_events)
+    assert [event.get("progress") for event in events[:2]] == [{"done": 1}, {"done": 2}]
+    assert [event.get("status") for event in events[2:]] == ["completed"]
+
+    snapshot = await _snapshot(progress_db, job_id)
+    assert (snapshot["status"], snapshot["progress"]) == ("completed", {"done": 2})
+
+
+@pytest.mark.asyncio
+async def test_large_progress_is_announced_without_its_body(
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str,
+    job_events: asyncio.Queue
+):
+    progress = {"log": "x" * 8000}
+    await publisher.report(progress_db, job_id, progress)
+    event = await asyncio.wait_for(job_events.get(), timeout=5.0)
+
+    assert event["job_id"] == job_id and event["progress"] is None
+    assert (await _snapshot(progress_db, job_id))["progress"] == progress
+
+
+@pytest.mark.asyncio
+async def test_slow_subscribers_keep_the_newest_events():
+    listener = JobProgressListener(queue_size=2)
+    async with listener.subscribe(user_id=7) as mine, listener.subscribe(job_id="other") as other:
+        for done in range(5):
+            payload = json.dumps({"job_id": "job", "user_id": 7, "progress": {"done": done}})
+            listener._dispatch(None, 0, JOB_PROGRESS_CHANNEL, payload)
+        listener._dispatch(None, 0, JOB_PROGRESS_CHANNEL, "not json")
+
+        assert [event["progress"]["done"] for event in _drain(mine)] == [3, 4]
+        assert other.empty()
+
+
+# ========== Streams ==========
+
+async def _sse_events(response: httpx.Response) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """(event name, data) of a Server-Sent Event stream, skipping keepalive comments."""
+    name = None
+    async for line in response.aiter_lines():
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield name, json.loads(line[len("data: "):])
+
+
+@pytest.mark.asyncio
+async def test_job_stream_opens_with_a_snapshot_and_ends_when_the_job_finishes(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str
+):
+    await publisher.report(progress_db, job_id, {"done": 1})
+
+    received: List[Tuple[str, Dict[str, Any]]] = []
+    async with async_client.stream("GET", f"/api/jobs/{job_id}/progress/stream", headers=auth_headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "content-encoding" not in response.headers
+
+        async def read() -> None:
+            async for event in _sse_events(response):
+                received.append(event)
+                if len(received) == 1:
+                    # The server subscribed before sending the snapshot, so nothing after it is missed
+                    await asyncio.sleep(0.25)
+                    await publisher.report(progress_db, job_id, {"done": 2})
+                    await _finish(progress_db, publisher, job_id)
+
+        await asyncio.wait_for(read(), timeout=10.0)
+
+    user_id = received[0][1]["user_id"]
+    assert received == [
+        ("status", {"job_id": job_id, "user_id": user_id, "status": "pending", "progress": {"done": 1}}),
+        ("progress", {"job_id": job_id, "user_id": user_id, "progress": {"done": 2}}),
+        ("status", {"job_id": job_id, "user_id": user_id, "status": "completed"}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_finished_job_stream_sends_only_the_snapshot(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str
+):
+    await publisher.report(progress_db, job_id, {"done": 3})
+    await _finish(progress_db, publisher, job_id)
+
+    response = await async_client.get(f"/api/jobs/{job_id}/progress/stream", headers=auth_headers)
+    assert response.status_code == 200
+    events = [line for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [json.loads(line[len("data: "):])["status"] for line in events] == ["completed"]
+
+
+@pytest.mark.asyncio
+async def test_user_stream_opens_with_the_active_jobs(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    progress_db: DatabasePool,
+    publisher: JobProgressPublisher,
+    job_id: str
+):
+    await publisher.report(progress_db, job_id, {"done": 4})
+
+    async with async_client.stream("GET", "/api/jobs/progress/stream", headers=auth_headers) as response:
+        assert response.status_code == 200
+
+        async def find_job() -> Dict[str, Any]:
+            async for _, event in _sse_events(response):
+                if event["job_id"] == job_id:
+                    return event
+
+        event = await asyncio.wait_for(find_job(), timeout=10.0)
+
+    assert (event["status"], event["progress"]) == ("pending", {"done": 4})
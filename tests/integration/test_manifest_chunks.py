@@ -0,0 +1,225 @@
+"""Integration tests for chunked commit manifests: sealing, sharing and rechunking."""
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote_plus
+
+import pyarrow as pa
+import pytest
+import pytest_asyncio
+
+from src.features.versioning.services.arrow_stream_service import ArrowStreamService, ROW_ID_COLUMN
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.table_reader import PostgresTableReader
+from src.infrastructure.postgres.versioning_repo import PostgresCommitRepository
+
+
+TABLE = "primary"
+ROWS = 2000
+# A small target size gives a table of this size about a hundred chunks
+CHUNK_SIZE = 16
+
+
+@pytest_asyncio.fixture(scope="function")
+async def manifest_db():
+    """Database pool for calling the manifest functions directly."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def commit_factory(manifest_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """Creates bare commits on the test dataset and deletes them afterwards."""
+    dataset_id = created_dataset["dataset_id"]
+    created: List[str] = []
+
+    async def create(parent: str = None) -> str:
+        commit_id = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+        await manifest_db.execute(
+            "INSERT INTO dsa_core.commits (commit_id, dataset_id, parent_commit_id, message) VALUES ($1, $2, $3, $4)",
+            commit_id, dataset_id, parent, "manifest chunk test"
+        )
+        created.append(commit_id)
+        return commit_id
+
+    yield create
+    await manifest_db.execute(
+        "DELETE FROM dsa_core.commits WHERE commit_id = ANY($1::char(64)[])", created
+    )
+
+
+async def _value(pool: DatabasePool, query: str, *args) -> Any:
+    row = await pool.fetchrow(query, *args)
+    return next(iter(row.values()))
+
+
+def _row(n: int, version: int = 0) -> Tuple[str, str]:
+    """Row key and JSON data of test row n."""
+    return str(n), json.dumps({"n": n, "version": version})
+
+
+async def _store_rows(pool: DatabasePool, rows: List[Tuple[str, str]]) -> List[str]:
+    """Insert row data and return the row hashes, in order."""
+    hashes = [hashlib.sha256(data.encode()).hexdigest() for _, data in rows]
+    await pool.execute(
+        """
+        INSERT INTO dsa_core.rows (row_hash, data)
+        SELECT h, d::jsonb FROM unnest($1::char(64)[], $2::text[]) AS t(h, d)
+        ON CONFLICT (row_hash) DO NOTHING
+        """,
+        hashes, [data for _, data in rows]
+    )
+    return hashes
+
+
+async def _flat_commit(pool: DatabasePool, commit_id: str, rows: List[Tuple[str, str]]) -> None:
+    """Give a commit a flat manifest in commit_rows, as commits written before chunking have."""
+    hashes = await _store_rows(pool, rows)
+    await pool.execute(
+        """
+        INSERT INTO dsa_core.commit_rows (commit_id, logical_row_id, row_hash)
+        SELECT $1, $2 || ':' || k, h FROM unnest($3::text[], $4::char(64)[]) AS t(k, h)
+        """,
+        commit_id, TABLE, [key for key, _ in rows], hashes
+    )
+
+
+async def _stage(pool: DatabasePool, commit_id: str, rows: List[Tuple[str, str]]) -> int:
+    """Stage rows for a commit's table and seal them into its chunks."""
+    hashes = await _store_rows(pool, rows)
+    await pool.execute(
+        """
+        INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+        SELECT $1, $2, k, h, 0 FROM unnest($3::text[], $4::char(64)[]) AS t(k, h)
+        """,
+        commit_id, TABLE, [key for key, _ in rows], hashes
+    )
+    return await _value(pool, "SELECT dsa_core.seal_staged_table($1, $2, $3)", commit_id, TABLE, CHUNK_SIZE)
+
+
+async def _chunks(pool: DatabasePool, commit_id: str) -> List[str]:
+    rows = await pool.fetch(
+        "SELECT chunk_hash FROM dsa_core.commit_chunks WHERE commit_id = $1 AND table_key = $2 ORDER BY chunk_index",
+        commit_id, TABLE
+    )
+    return [row["chunk_hash"] for row in rows]
+
+
+async def _entries(pool: DatabasePool, commit_id: str, offset: int = 0, limit: int = None) -> List[Tuple[str, str, int]]:
+    rows = await pool.fetch(
+        "SELECT logical_row_id, row_hash, pos FROM dsa_core.commit_table_entries($1, $2, $3, $4) ORDER BY pos",
+        commit_id, TABLE, offset, limit
+    )
+    return [(row["logical_row_id"], row["row_hash"], row["pos"]) for row in rows]
+
+
+async def _unshared(pool: DatabasePool, commit_id: str, other_commit_id: str) -> List[str]:
+    rows = await pool.fetch(
+        "SELECT logical_row_id FROM dsa_core.manifest_unshared_entries($1, $2, $3)",
+        commit_id, other_commit_id, TABLE
+    )
+    return sorted(row["logical_row_id"] for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_entries_keep_the_flat_manifest_order_once_sealed(manifest_db: DatabasePool, commit_factory):
+    """A sealed table reads back the same rows, positions and pages as its flat manifest."""
+    commit_id = await commit_factory()
+    await _flat_commit(manifest_db, commit_id, [_row(n) for n in range(ROWS)])
+
+    flat = await _entries(manifest_db, commit_id)
+    flat_page = await _entries(manifest_db, commit_id, 1000, 50)
+
+    chunks_written = await _value(manifest_db, "SELECT dsa_core.seal_commit_manifest($1, $2)", commit_id, CHUNK_SIZE)
+    assert chunks_written > ROWS // (4 * CHUNK_SIZE)
+    assert await _value(
+        manifest_db, "SELECT count(*) FROM dsa_core.commit_rows WHERE commit_id = $1", commit_id
+    ) == 0
+
+    # Keys are ordered bytewise, so 'primary:10' comes before 'primary:2'
+    expected_keys = sorted(f"{TABLE}:{n}" for n in range(ROWS))
+    assert [key for key, _, _ in flat] == expected_keys
+    assert [pos for _, _, pos in flat] == list(range(1, ROWS + 1))
+    assert await _entries(manifest_db, commit_id) == flat
+    assert await _entries(manifest_db, commit_id, 1000, 50) == flat_page == flat[1000:1050]
+    assert await _value(
+        manifest_db, "SELECT dsa_core.commit_table_row_count($1, $2)", commit_id, TABLE
+    ) == ROWS
+
+
+@pytest.mark.asyncio
+async def test_unchanged_table_shares_every_chunk(manifest_db: DatabasePool, commit_factory):
+    """Deriving a table, and restaging rows it already holds, keeps the parent's chunk list."""
+    parent = await commit_factory()
+    rows = [_row(n) for n in range(ROWS)]
+    assert await _stage(manifest_db, parent, rows) == ROWS
+
+    child = await commit_factory(parent)
+    await manifest_db.execute(
+        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3, NULL, $4)", child, parent, TABLE, CHUNK_SIZE
+    )
+    assert await _stage(manifest_db, child, rows[:100]) == 0
+
+    assert await _chunks(manifest_db, child) == await _chunks(manifest_db, parent)
+    assert await _unshared(manifest_db, child, parent) == []
+    assert await _entries(manifest_db, child) == await _entries(manifest_db, parent)
+
+
+@pytest.mark.asyncio
+async def test_edits_rewrite_only_neighbouring_chunks(manifest_db: DatabasePool, commit_factory):
+    """Changing or deleting one row rewrites only the chunk that holds it."""
+    parent = await commit_factory()
+    await _stage(manifest_db, parent, [_row(n) for n in range(ROWS)])
+    parent_chunks = await _chunks(manifest_db, parent)
+
+    # Boundaries depend on keys only, so a changed value replaces exactly one chunk
+    edited = await commit_factory(parent)
+    await manifest_db.execute(
+        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3, NULL, $4)", edited, parent, TABLE, CHUNK_SIZE
+    )
+    assert await _stage(manifest_db, edited, [_row(1234, version=1)]) == 1
+    edited_chunks = await _chunks(manifest_db, edited)
+    assert len(edited_chunks) == len(parent_chunks)
+    assert sum(a != b for a, b in zip(edited_chunks, parent_chunks)) == 1
+    assert f"{TABLE}:1234" in await _unshared(manifest_db, edited, parent)
+
+    # Dropping a key rewrites only the chunk that held it
+    deleted = await commit_factory(parent)
+    await manifest_db.execute(
+        "SELECT dsa_core.derive_commit_table($1, $2, $3, $3, $4::text[], $5)",
+        deleted, parent, TABLE, ["1234"], CHUNK_SIZE
+    )
+    deleted_chunks = await _chunks(manifest_db, deleted)
+    assert len(set(deleted_chunks) - set(parent_chunks)) <= 1
+    assert len(set(parent_chunks) - set(deleted_chunks)) == 1
+
+    entries = await _entries(manifest_db, deleted)
+    assert len(entries) == ROWS - 1
+    assert f"{TABLE}:1234" not in {key for key, _, _ in entries}
+    assert [pos for _, _, pos in entries] == list(range(1, ROWS))
+
+
+@pytest.mark.asyncio
+async def test_arrow_stream_returns_every_row_in_entry_order(manifest_db: DatabasePool, commit_factory):
+    """A chunked table streams all its rows, across record batches, in the order of its entries."""
+    commit_id = await commit_factory()
+    await _stage(manifest_db, commit_id, [_row(n) for n in range(ROWS)])
+    assert len(await _chunks(manifest_db, commit_id)) > 1
+
+    schema = pa.schema([pa.field(ROW_ID_COLUMN, pa.string(), nullable=False), pa.field("n", pa.int64())])
+    async with manifest_db.acquire() as conn:
+        service = ArrowStreamService(PostgresCommitRepository(conn), PostgresTableReader(conn))
+        stream = b"".join([chunk async for chunk in service.iter_ipc(commit_id, TABLE, schema, batch_size=300)])
+    table = pa.ipc.open_stream(stream).read_all()
+
+    entries = await _entries(manifest_db, commit_id)
+    assert table.column(ROW_ID_COLUMN).to_pylist() == [key for key, _, _ in entries]
+    assert table.column("n").to_pylist() == [int(key.split(":", 1)[1]) for key, _, _ in entries]
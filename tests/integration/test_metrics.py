@@ -0,0 +1,114 @@
+"""Integration tests for the Prometheus metrics endpoint."""
+import re
+from typing import Any, Dict, Tuple
+
+import httpx
+import pytest
+
+from src.infrastructure.metrics.registry import Counter, Histogram, MetricsRegistry
+
+
+# name{labels} value
+_SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+Samples = Dict[Tuple[str, frozenset], float]
+
+
+def _parse(text: str) -> Samples:
+    """Samples of a text exposition by (name, labels)."""
+    samples: Samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"Malformed sample line: {line!r}"
+        labels = frozenset(_LABEL.findall(match["labels"] or ""))
+        samples[(match["name"], labels)] = float(match["value"])
+    return samples
+
+
+async def _scrape(client: httpx.AsyncClient) -> Samples:
+    response = await client.get("/metrics")
+    if response.status_code == 404:
+        pytest.skip("Metrics are disabled on the server")
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    return _parse(response.text)
+
+
+def _value(samples: Samples, name: str, **labels: str) -> float:
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_by_route_template(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    created_dataset: Dict[str, Any]
+):
+    """Requests for different datasets share one series, labelled with the route template."""
+    route = {"method": "GET", "route": "/api/datasets/{dataset_id}"}
+    before = await _scrape(async_client)
+
+    for dataset_id in (created_dataset["dataset_id"], 99999999):
+        await async_client.get(f"/api/datasets/{dataset_id}", headers=auth_headers)
+    after = await _scrape(async_client)
+
+    assert _value(after, "dsa_http_requests_total", **route, status="200") >= (
+        _value(before, "dsa_http_requests_total", **route, status="200") + 1
+    )
+    assert _value(after, "dsa_http_request_duration_seconds_count", **route) >= (
+        _value(before, "dsa_http_request_duration_seconds_count", **route) + 2
+    )
+    assert not any(
+        name == "dsa_http_requests_total" and str(created_dataset["dataset_id"]) in dict(labels)["route"]
+        for name, labels in after
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_and_query_metrics_are_exposed(async_client: httpx.AsyncClient, auth_headers: Dict[str, str]):
+    await async_client.get("/api/datasets", headers=auth_headers)
+    samples = await _scrape(async_client)
+
+    pool = {dict(labels)["state"]: value for (name, labels), value in samples.items() if name == "dsa_db_pool_connections"}
+    assert {"open", "idle", "in_use", "max"} <= set(pool)
+    assert pool["idle"] + pool["in_use"] == pool["open"] <= pool["max"]
+
+    api_queries = [
+        value for (name, labels), value in samples.items()
+        if name == "dsa_db_query_duration_seconds_count" and dict(labels).get("caller") == "api"
+    ]
+    assert sum(api_queries) > 0
+
+
+@pytest.mark.asyncio
+async def test_histogram_buckets_are_cumulative(async_client: httpx.AsyncClient):
+    """Every histogram series counts up through its buckets to +Inf, which equals its _count."""
+    samples = await _scrape(async_client)
+    series: Dict[Tuple[str, frozenset], Dict[str, float]] = {}
+    for (name, labels), value in samples.items():
+        if name.endswith("_bucket"):
+            rest = frozenset(label for label in labels if label[0] != "le")
+            series.setdefault((name[:-len("_bucket")], rest), {})[dict(labels)["le"]] = value
+
+    assert series
+    for (name, labels), buckets in series.items():
+        counts = [buckets[le] for le in sorted(buckets, key=lambda le: float(le.replace("+Inf", "inf")))]
+        assert counts == sorted(counts), name
+        assert buckets["+Inf"] == samples[(f"{name}_count", labels)], name
+
+
+def test_exposition_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("t_total", "Test counter.", ("path",)))
+    histogram = registry.register(Histogram("t_seconds", "Test histogram.", buckets=(0.1, 1.0)))
+    counter.inc('a"b\\c\nd')
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    samples = _parse(registry.render())
+    assert samples[("t_total", frozenset({("path", 'a\\"b\\\\c\\nd')}))] == 1
+    assert [samples[("t_seconds_bucket", frozenset({("le", le)}))] for le in ("0.1", "1.0", "+Inf")] == [1, 2, 3]
+    assert samples[("t_seconds_sum", frozenset())] == pytest.approx(5.55)
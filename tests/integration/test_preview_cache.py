@@ -0,0 +1,151 @@
+"""Tests for the workbench preview result cache."""
+import hashlib
+import re
+from typing import Any, Dict, List
+
+import pytest
+
+from src.features.sql_workbench.models import SqlSource, SqlTransformRequest
+from src.features.sql_workbench.services.preview_cache import PreviewCache
+from src.features.sql_workbench.services.sql_workbench_service import SqlWorkbenchService
+
+
+SOURCES = [{"alias": "src", "commit_id": "c" * 64, "table_key": "primary"}]
+BLOCK_ROWS = 10
+TOTAL_ROWS = 35
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SELECT 1 -- note\n, 2 FROM t", "SELECT 1 -- note , 2 FROM t"),
+    ('SELECT "a  b" FROM t', 'SELECT "a b" FROM t'),
+    ("SELECT $$a  b$$ FROM t", "SELECT $$a b$$ FROM t"),
+    ("SELECT E'a\\tb' FROM t", "SELECT 'a\\tb' FROM t"),
+    ("SELECT 1 /* , 2 */ FROM t", "SELECT 1 , 2 FROM t"),
+])
+def test_different_queries_get_different_keys(first: str, second: str):
+    """Comments, quoted identifiers and other literal forms can't make two queries share a key."""
+    assert PreviewCache.query_key(first, SOURCES) != PreviewCache.query_key(second, SOURCES)
+
+
+def test_layout_and_comments_share_a_key():
+    """Reformatting a query or commenting it keeps its key."""
+    assert PreviewCache.query_key("SELECT a,  b\nFROM t;", SOURCES) == PreviewCache.query_key(
+        "select a, b -- columns\nfrom t", SOURCES
+    )
+
+
+def test_unparsable_queries_key_on_their_text():
+    """SQL the parser rejects only shares a key with the exact same text."""
+    assert PreviewCache.query_key("SELEC 1", SOURCES) == PreviewCache.query_key("SELEC 1", SOURCES)
+    assert PreviewCache.query_key("SELEC 1", SOURCES) != PreviewCache.query_key("SELEC  1", SOURCES)
+
+
+def test_sources_and_engine_are_part_of_the_key():
+    """The same text over another commit or engine is another result."""
+    other_commit = [{**SOURCES[0], "commit_id": "d" * 64}]
+    key = PreviewCache.query_key("SELECT 1 FROM t", SOURCES)
+    assert key != PreviewCache.query_key("SELECT 1 FROM t", other_commit)
+    assert key != PreviewCache.query_key("SELECT 1 FROM t", SOURCES, engine="duckdb")
+
+
+def _incompressible_rows(seed: int) -> List[list]:
+    """A block of rows of hash digests, which zstd can barely shrink."""
+    return [
+        ["".join(hashlib.sha256(f"{seed}:{i}:{j}".encode()).hexdigest() for j in range(8))]
+        for i in range(BLOCK_ROWS)
+    ]
+
+
+def test_least_recently_used_blocks_are_evicted_by_size():
+    """Once the compressed blocks outgrow the budget, the least recently read go first."""
+    cache = PreviewCache(max_bytes=64 * 1024, block_rows=BLOCK_ROWS)
+    execution = cache.new_execution()
+    cache.put_block("a", 0, ["v"], _incompressible_rows(0), False, execution)
+    cache.put_block("b", 0, ["v"], _incompressible_rows(1), False, execution)
+
+    # Reading "a" makes "b" the least recently used
+    assert cache.get_blocks("a", 0, 0) is not None
+    index = 0
+    while cache.stats()["evictions"] == 0:
+        index += 1
+        cache.put_block("c", index, ["v"], _incompressible_rows(index + 1), False, execution)
+
+    assert index > 2
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.get_blocks("b", 0, 0) is None
+    assert cache.get_blocks("a", 0, 0) == [(["v"], _incompressible_rows(0), False)]
+    assert cache.get_blocks("c", index, index) is not None
+
+
+def test_blocks_larger_than_an_eighth_of_the_budget_are_not_kept():
+    cache = PreviewCache(max_bytes=1024, block_rows=BLOCK_ROWS)
+    cache.put_block("a", 0, ["v"], _incompressible_rows(0), True, cache.new_execution())
+
+    assert cache.stats()["blocks"] == 0
+
+
+def test_pages_never_mix_blocks_of_different_executions():
+    """A page spanning blocks cached by two executions isn't served from cache."""
+    cache = PreviewCache(max_bytes=1024 * 1024, block_rows=BLOCK_ROWS)
+    first, second = cache.new_execution(), cache.new_execution()
+    cache.put_block("q", 0, ["v"], [[i] for i in range(10)], False, first)
+    cache.put_block("q", 1, ["v"], [[i] for i in range(10, 20)], False, second)
+
+    assert cache.covers("q", 0, BLOCK_ROWS)
+    assert not cache.covers("q", 5, BLOCK_ROWS)
+    assert cache.get_blocks("q", 0, 1) is None
+
+
+class _UnorderedWorkbench(SqlWorkbenchService):
+    """Runs previews against rows whose order changes with every execution, like a query without ORDER BY."""
+
+    def __init__(self):
+        super().__init__(uow=None, permissions=None)
+        self.executions = 0
+
+    def rows_of(self, execution: int) -> List[list]:
+        values = list(range(TOTAL_ROWS))
+        return [[v] for v in values[execution:] + values[:execution]]
+
+    async def _execute_preview_query(self, sql: str, sources: List[Dict[str, Any]], engine: str) -> Dict[str, Any]:
+        self.executions += 1
+        limit = int(re.search(r"LIMIT (\d+)", sql).group(1))
+        offset = re.search(r"OFFSET (\d+)", sql)
+        offset = int(offset.group(1)) if offset else 0
+        return {"columns": ["n"], "rows": self.rows_of(self.executions)[offset:offset + limit]}
+
+
+def _page(offset: int, limit: int) -> SqlTransformRequest:
+    return SqlTransformRequest(
+        sources=[SqlSource(alias="src", dataset_id=1, ref="main", table_key="primary")],
+        sql="SELECT n FROM src",
+        offset=offset,
+        limit=limit
+    )
+
+
+@pytest.mark.asyncio
+async def test_next_page_is_served_from_one_execution():
+    """Paging on reads cached blocks of one execution and refetches pages that would mix two."""
+    service = _UnorderedWorkbench()
+    cache = PreviewCache(max_bytes=1024 * 1024, block_rows=BLOCK_ROWS)
+
+    result, has_more, total = await service._execute_cached_preview(_page(0, BLOCK_ROWS), SOURCES, cache)
+    assert result["rows"] == service.rows_of(1)[:BLOCK_ROWS]
+    assert has_more and total is None
+
+    # Block 0 is cached from the first execution but block 1 isn't: both come from the second
+    result, _, _ = await service._execute_cached_preview(_page(5, BLOCK_ROWS), SOURCES, cache)
+    assert service.executions == 2
+    assert result["rows"] == service.rows_of(2)[5:5 + BLOCK_ROWS]
+
+    # The next page falls inside the second execution's blocks and runs no query
+    result, has_more, _ = await service._execute_cached_preview(_page(BLOCK_ROWS, BLOCK_ROWS), SOURCES, cache)
+    assert service.executions == 2
+    assert result["rows"] == service.rows_of(2)[BLOCK_ROWS:2 * BLOCK_ROWS]
+    assert has_more
+
+    # The last page reads past the end of the result and reports its size
+    result, has_more, total = await service._execute_cached_preview(_page(30, BLOCK_ROWS), SOURCES, cache)
+    assert result["rows"] == service.rows_of(3)[30:]
+    assert not has_more and total == TOTAL_ROWS
@@ -0,0 +1,93 @@
+"""Integration tests for spooled workbench preview sessions."""
+import asyncio
+import os
+import random
+from urllib.parse import quote_plus
+
+import pytest
+import pytest_asyncio
+
+from src.core.domain_exceptions import ResourceExhaustedException
+from src.features.sql_workbench.services.preview_sessions import PreviewSessionStore
+from src.infrastructure.postgres.database import DatabasePool
+
+
+MAX_ROWS = 12000
+MAX_PER_USER = 2
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session_db():
+    """Database pool for opening preview sessions directly."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=6)
+    yield pool
+    await pool.close()
+
+
+@pytest.fixture
+def user_id() -> int:
+    """A user id no other test opens sessions for."""
+    return -random.randint(1, 2 ** 30)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def store(session_db: DatabasePool, user_id: int):
+    """A store with small limits; the user's sessions are closed afterwards."""
+    store = PreviewSessionStore(
+        max_rows=MAX_ROWS, max_per_user=MAX_PER_USER, idle_seconds=900, max_age_seconds=3600
+    )
+    yield store
+    rows = await session_db.fetch(
+        "SELECT session_token FROM dsa_staging.preview_sessions WHERE user_id = $1", user_id
+    )
+    for row in rows:
+        await store.close(row["session_token"], user_id, session_db)
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_the_query_order(session_db: DatabasePool, store: PreviewSessionStore, user_id: int):
+    """Rows are numbered in the query's ORDER BY, across spool batches, and cut at the row cap."""
+    session = await store.create(
+        user_id,
+        f"SELECT n, md5(n::text) AS h FROM generate_series(1, {MAX_ROWS + 10}) AS n ORDER BY h COLLATE \"C\"",
+        session_db
+    )
+    assert session.columns == ["n", "h"]
+    assert (session.row_count, session.truncated) == (MAX_ROWS, True)
+
+    expected = sorted(
+        (row["h"], row["n"]) for row in await session_db.fetch(
+            f"SELECT n, md5(n::text) AS h FROM generate_series(1, {MAX_ROWS + 10}) AS n"
+        )
+    )[:MAX_ROWS]
+    pages = []
+    for offset in range(0, MAX_ROWS, 5000):
+        page = await store.fetch(session, offset, 5000, session_db)
+        pages += [(h, n) for n, h in page["rows"]]
+    assert pages == expected
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_respect_the_session_limit(
+    session_db: DatabasePool,
+    store: PreviewSessionStore,
+    user_id: int
+):
+    """Creates racing for the user's last slots open no more sessions than the limit."""
+    results = await asyncio.gather(
+        *[store.create(user_id, "SELECT 1 AS n FROM pg_sleep(0.2)", session_db) for _ in range(5)],
+        return_exceptions=True
+    )
+
+    opened = [r for r in results if not isinstance(r, Exception)]
+    refused = [r for r in results if isinstance(r, ResourceExhaustedException)]
+    assert (len(opened), len(refused)) == (MAX_PER_USER, 5 - MAX_PER_USER)
+    rows = await session_db.fetch(
+        "SELECT session_token FROM dsa_staging.preview_sessions WHERE user_id = $1", user_id
+    )
+    assert len(rows) == MAX_PER_USER
@@ -0,0 +1,158 @@
+"""Integration tests for row format negotiation and response compression."""
+import gzip
+import json
+from typing import Any, Dict, List
+
+import brotli
+import httpx
+import pyarrow as pa
+import pytest
+import zstandard
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from src.api.compression import CompressionMiddleware
+
+
+CHUNKS = [json.dumps({"n": n, "text": "row " * 50}).encode() + b"\n" for n in range(200)]
+
+_DECOMPRESS = {
+    "zstd": lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body),
+    "br": brotli.decompress,
+    "gzip": gzip.decompress,
+}
+
+
+async def _stream(request):
+    async def chunks():
+        for chunk in CHUNKS:
+            yield chunk
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+async def _events(request):
+    async def events():
+        yield b"data: one\n\n"
+        yield b"data: two\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def _small(request):
+    return Response(b"ok", media_type="text/plain")
+
+
+async def _partial(request):
+    return Response(
+        b"x" * 5000, status_code=206, media_type="application/octet-stream",
+        headers={"Content-Range": "bytes 0-4999/10000"}
+    )
+
+
+def _client() -> httpx.AsyncClient:
+    app = Starlette(routes=[
+        Route("/stream", _stream), Route("/events", _events), Route("/small", _small), Route("/partial", _partial)
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1000, zstd_level=3, brotli_quality=4, gzip_level=6)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def _raw(client: httpx.AsyncClient, path: str, accept_encoding: str):
+    """The response and its body as sent, without httpx decoding it."""
+    async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip, br, zstd", "zstd"),
+    ("gzip, br", "br"),
+    ("gzip;q=0.5, zstd;q=0", "gzip"),
+])
+async def test_streamed_bodies_use_the_preferred_accepted_encoding(accept_encoding: str, encoding: str):
+    async with _client() as client:
+        response, body = await _raw(client, "/stream", accept_encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert "content-length" not in response.headers
+    assert len(body) < len(b"".join(CHUNKS)) / 4
+    assert _DECOMPRESS[encoding](body) == b"".join(CHUNKS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/events", "/small", "/partial"])
+async def test_events_small_bodies_and_ranges_are_sent_as_is(path: str):
+    async with _client() as client:
+        response, body = await _raw(client, path, "zstd, br, gzip")
+        plain, plain_body = await _raw(client, path, "identity")
+
+    assert "content-encoding" not in response.headers
+    assert body == plain_body
+    assert response.status_code == plain.status_code
+
+
+@pytest.mark.asyncio
+async def test_no_accepted_encoding_leaves_the_body_alone():
+    async with _client() as client:
+        response, body = await _raw(client, "/stream", "identity, zstd;q=0")
+
+    assert "content-encoding" not in response.headers
+    assert body == b"".join(CHUNKS)
+
+
+# ========== Row formats on the data endpoint ==========
+
+def _data_url(dataset: Dict[str, Any]) -> str:
+    return f"/api/datasets/{dataset['dataset_id']}/refs/main/tables/primary/data"
+
+
+async def _json_page(client: httpx.AsyncClient, headers: Dict[str, str], dataset: Dict[str, Any]) -> Dict[str, Any]:
+    response = await client.post(_data_url(dataset), headers=headers, json={"pagination": {"limit": 25}})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/json")
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rows_match_the_json_page(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    dataset_with_data: Dict[str, Any]
+):
+    page = await _json_page(async_client, auth_headers, dataset_with_data)
+
+    response = await async_client.post(
+        _data_url(dataset_with_data),
+        headers={**auth_headers, "Accept": "application/x-ndjson"},
+        json={"pagination": {"limit": 25}}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == page["rows"]
+    assert int(response.headers["x-total-rows"]) == page["total_rows"]
+    assert response.headers["x-has-more"] == ("true" if page["has_more"] else "false")
+
+
+@pytest.mark.asyncio
+async def test_arrow_rows_match_the_json_page(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    dataset_with_data: Dict[str, Any]
+):
+    page = await _json_page(async_client, auth_headers, dataset_with_data)
+
+    # Arrow outranks JSON here only by quality
+    response = await async_client.post(
+        _data_url(dataset_with_data),
+        headers={**auth_headers, "Accept": "application/json;q=0.5, application/vnd.apache.arrow.stream"},
+        json={"pagination": {"limit": 25}}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/vnd.apache.arrow.stream")
+    table = pa.ipc.open_stream(response.content).read_all()
+
+    rows: List[Dict[str, Any]] = page["rows"]
+    assert table.num_rows == len(rows)
+    assert table.column("_logical_row_id").to_pylist() == [row["logical_row_id"] for row in rows]
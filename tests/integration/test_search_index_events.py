@@ -0,0 +1,73 @@
+"""Integration tests for keeping the search index in step with committed dataset changes."""
+import os
+import uuid
+from typing import Any, Dict, Optional
+from urllib.parse import quote_plus
+
+import pytest
+import pytest_asyncio
+
+from src.core.events.publisher import DatasetUpdatedEvent
+from src.features.search.event_handlers import SearchIndexEventHandler
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.uow import PostgresUnitOfWork, current_unit_of_work
+
+
+@pytest_asyncio.fixture(scope="function")
+async def search_db():
+    """Database pool for the handler and the units of work publishing to it."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=3)
+    yield pool
+    await pool.close()
+
+
+async def _indexed_name(pool: DatabasePool, dataset_id: int) -> Optional[str]:
+    row = await pool.fetchrow("SELECT name FROM dsa_search.datasets_summary WHERE dataset_id = $1", dataset_id)
+    return row["name"] if row else None
+
+
+async def _rename(uow: PostgresUnitOfWork, handler: SearchIndexEventHandler, dataset_id: int, name: str) -> None:
+    """Rename a dataset in the unit of work's transaction and publish the change to the handler."""
+    await uow.connection.execute("UPDATE dsa_core.datasets SET name = $1 WHERE id = $2", name, dataset_id)
+    await handler.handle(DatasetUpdatedEvent(dataset_id=dataset_id, user_id=0, changes={"name": {"new": name}}))
+
+
+@pytest.mark.asyncio
+async def test_index_is_refreshed_once_the_publishing_transaction_commits(
+    search_db: DatabasePool,
+    created_dataset: Dict[str, Any]
+):
+    dataset_id = created_dataset["dataset_id"]
+    handler = SearchIndexEventHandler(search_db)
+    name = f"pytest_search_{uuid.uuid4().hex[:12]}"
+
+    async with PostgresUnitOfWork(search_db) as uow:
+        assert current_unit_of_work() is uow
+        await _rename(uow, handler, dataset_id, name)
+        assert await _indexed_name(search_db, dataset_id) != name
+
+    assert current_unit_of_work() is None
+    assert await _indexed_name(search_db, dataset_id) == name
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_changes_are_never_flushed(
+    search_db: DatabasePool,
+    created_dataset: Dict[str, Any]
+):
+    dataset_id = created_dataset["dataset_id"]
+    handler = SearchIndexEventHandler(search_db)
+    before = await _indexed_name(search_db, dataset_id)
+
+    with pytest.raises(RuntimeError):
+        async with PostgresUnitOfWork(search_db) as uow:
+            await _rename(uow, handler, dataset_id, f"pytest_search_{uuid.uuid4().hex[:12]}")
+            raise RuntimeError("abandon the rename")
+
+    await handler.flush()
+    assert await _indexed_name(search_db, dataset_id) == before
@@ -0,0 +1,103 @@
+"""Integration tests for slow query capture and sampled EXPLAIN plans."""
+import asyncio
+import os
+from urllib.parse import quote_plus
+
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.postgres import query_profiler as query_profiler_module
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.query_profiler import QueryProfiler
+
+
+SLOW_SQL = "SELECT pg_sleep(0.06), '{label}' AS label, $1::int AS n"
+
+
+@pytest_asyncio.fixture(scope="function")
+async def profiled_db(monkeypatch):
+    """A pool whose queries go through a profiler with a low threshold, which explains on its pool."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    profiler = QueryProfiler(
+        enabled=True, threshold_ms=50, top_n=5, explain_after=2, explain_interval=600, explain_timeout_ms=5000
+    )
+    monkeypatch.setattr(query_profiler_module, "_query_profiler", profiler)
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    profiler.attach_pool(pool._pool)
+    yield pool, profiler
+    profiler.detach_pool()
+    await pool.close()
+
+
+async def _plans_captured(profiler: QueryProfiler) -> None:
+    await asyncio.gather(*list(profiler._tasks))
+
+
+@pytest.mark.asyncio
+async def test_repeated_slow_query_gets_one_plan(profiled_db):
+    """Literal variants group under one entry, and its second slow run captures an EXPLAIN ANALYZE plan."""
+    pool, profiler = profiled_db
+    async with pool.acquire() as conn:
+        await conn.fetchrow(SLOW_SQL.format(label="first"), 1)
+        await conn.fetchrow("SELECT 1")
+        assert [entry["plan"] for entry in profiler.top()] == [None]
+
+        await conn.fetchrow(SLOW_SQL.format(label="second"), 2)
+    await _plans_captured(profiler)
+
+    [entry] = profiler.top()
+    assert entry["count"] == 2
+    assert "'first'" not in entry["query"] and "? AS label" in entry["query"]
+    assert entry["last_params"] == ["int"]
+    assert entry["last_rows"] == 1
+    assert entry["max_ms"] >= 50
+    assert entry["plan_error"] is None
+    plan = entry["plan"][0]
+    assert "Execution Time" in plan and plan["Plan"]["Actual Loops"] == 1
+    assert profiler.get(entry["fingerprint"])["plan"] == entry["plan"]
+
+    # A third run within the interval reuses the captured plan
+    async with pool.acquire() as conn:
+        await conn.fetchrow(SLOW_SQL.format(label="third"), 3)
+    assert not profiler._tasks
+    assert profiler.top()[0]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_statements_that_write_are_never_explained(profiled_db):
+    pool, profiler = profiled_db
+    write_sql = (
+        "WITH gone AS (DELETE FROM dsa_staging.preview_sessions WHERE false RETURNING 1) "
+        "SELECT pg_sleep(0.06), (SELECT count(*) FROM gone) AS deleted"
+    )
+    async with pool.acquire() as conn:
+        for _ in range(3):
+            await conn.fetchrow(write_sql)
+    await _plans_captured(profiler)
+
+    [entry] = profiler.top()
+    assert entry["count"] == 3
+    assert entry["plan"] is None and entry["plan_error"] is None
+
+
+@pytest.mark.asyncio
+async def test_profiler_keeps_the_queries_with_most_total_time(profiled_db):
+    pool, profiler = profiled_db
+    profiler.explain_after = 100
+    async with pool.acquire() as conn:
+        for n in range(12):
+            await conn.fetchrow(f"SELECT pg_sleep(0.055) AS slept_{n}")
+        for _ in range(2):
+            await conn.fetchrow("SELECT pg_sleep(0.06) AS slept_twice")
+
+    top = profiler.top()
+    assert len(top) == profiler.top_n
+    assert "slept_twice" in top[0]["query"]
+    assert [entry["total_ms"] for entry in top] == sorted((entry["total_ms"] for entry in top), reverse=True)
+
+    profiler.reset()
+    assert profiler.top() == []
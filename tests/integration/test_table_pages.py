@@ -0,0 +1,137 @@
+"""Integration tests for table pages returned from the stored JSONB text."""
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote_plus
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.postgres.database import DatabasePool
+
+
+TABLE = "primary"
+ROWS = 40
+
+
+@pytest_asyncio.fixture(scope="function")
+async def pages_db():
+    """Database pool for building the commit the pages are read from."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+
+
+def _data(n: int) -> Dict[str, Any]:
+    """Row data with the values a re-encoding could change: escapes, non-ASCII text, nesting and nulls."""
+    return {
+        "n": n,
+        "label": f"Zoë \"{n}\" \\ naïve\n✓",
+        "ratio": n / 8,
+        "nested": {"list": [n, None, True], "empty": {}},
+        "missing": None
+    }
+
+
+@pytest_asyncio.fixture(scope="function")
+async def raw_commit(pages_db: DatabasePool, created_dataset: Dict[str, Any]):
+    """A sealed commit of ROWS rows that the dataset's main ref points at."""
+    dataset_id = created_dataset["dataset_id"]
+    commit_id = hashlib.sha256(uuid.uuid4().bytes).hexdigest()
+    main = await pages_db.fetchrow(
+        "SELECT commit_id FROM dsa_core.refs WHERE dataset_id = $1 AND name = 'main'", dataset_id
+    )
+    await pages_db.execute(
+        "INSERT INTO dsa_core.commits (commit_id, dataset_id, parent_commit_id, message) VALUES ($1, $2, $3, $4)",
+        commit_id, dataset_id, main["commit_id"], "raw page test"
+    )
+    rows: List[Tuple[str, str]] = [(f"{n:03d}", json.dumps(_data(n), ensure_ascii=False)) for n in range(ROWS)]
+    hashes = [hashlib.sha256(data.encode()).hexdigest() for _, data in rows]
+    await pages_db.execute(
+        """
+        INSERT INTO dsa_core.rows (row_hash, data)
+        SELECT h, d::jsonb FROM unnest($1::char(64)[], $2::text[]) AS t(h, d)
+        ON CONFLICT (row_hash) DO NOTHING
+        """,
+        hashes, [data for _, data in rows]
+    )
+    await pages_db.execute(
+        """
+        INSERT INTO dsa_staging.import_row_keys (commit_id, table_key, row_key, row_hash, line_number)
+        SELECT $1, $2, k, h, 0 FROM unnest($3::text[], $4::char(64)[]) AS t(k, h)
+        """,
+        commit_id, TABLE, [key for key, _ in rows], hashes
+    )
+    await pages_db.execute("SELECT dsa_core.seal_staged_table($1, $2)", commit_id, TABLE)
+    await pages_db.execute(
+        "UPDATE dsa_core.refs SET commit_id = $1 WHERE dataset_id = $2 AND name = 'main'", commit_id, dataset_id
+    )
+
+    yield dataset_id, commit_id
+    await pages_db.execute(
+        "UPDATE dsa_core.refs SET commit_id = $1 WHERE dataset_id = $2 AND name = 'main'",
+        main["commit_id"], dataset_id
+    )
+    await pages_db.execute("DELETE FROM dsa_core.commits WHERE commit_id = $1", commit_id)
+
+
+def _expected_rows(offset: int, limit: int) -> List[Dict[str, Any]]:
+    return [
+        {"sheet_name": TABLE, "logical_row_id": f"{TABLE}:{n:03d}", "data": _data(n)}
+        for n in range(offset, min(offset + limit, ROWS))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_commit_page_returns_the_stored_rows(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    raw_commit: Tuple[int, str]
+):
+    dataset_id, commit_id = raw_commit
+    response = await async_client.get(
+        f"/api/datasets/{dataset_id}/commits/{commit_id}/data",
+        headers=auth_headers,
+        params={"table_key": TABLE, "offset": 15, "limit": 10}
+    )
+    assert response.status_code == 200, response.text
+    page = response.json()
+
+    assert page["rows"] == _expected_rows(15, 10)
+    assert (page["commit_id"], page["total_rows"], page["offset"], page["limit"]) == (commit_id, ROWS, 15, 10)
+
+
+@pytest.mark.asyncio
+async def test_raw_and_parsed_pages_hold_the_same_data(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    raw_commit: Tuple[int, str]
+):
+    """A page spliced from the stored text matches the page built from parsed rows."""
+    dataset_id, _ = raw_commit
+    url = f"/api/datasets/{dataset_id}/refs/main/tables/{TABLE}/data"
+    body = {"pagination": {"offset": 30, "limit": 20}}
+
+    response = await async_client.post(url, headers=auth_headers, json=body)
+    assert response.status_code == 200, response.text
+    raw = response.json()
+    assert raw["rows"] == _expected_rows(30, 20)
+    assert raw["has_more"] is False
+
+    response = await async_client.post(
+        url, headers=auth_headers, json={**body, "select_columns": list(_data(0))}
+    )
+    assert response.status_code == 200, response.text
+    parsed = response.json()
+    assert [(r["logical_row_id"], r["data"]) for r in parsed["rows"]] == [
+        (r["logical_row_id"], r["data"]) for r in raw["rows"]
+    ]
+    assert parsed["total_rows"] == raw["total_rows"] == ROWS
@@ -0,0 +1,77 @@
+"""Integration tests for the unit of work's lazy connection and read-only snapshots."""
+import os
+import uuid
+from urllib.parse import quote_plus
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from src.infrastructure.postgres.connection_stats import begin_request_stats, end_request_stats
+from src.infrastructure.postgres.database import DatabasePool
+from src.infrastructure.postgres.uow import PostgresUnitOfWork
+
+
+@pytest_asyncio.fixture(scope="function")
+async def uow_db():
+    """Database pool for opening units of work directly."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=3)
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_is_taken_on_first_query_only(uow_db: DatabasePool):
+    """A unit of work that never queries takes no connection; one that does takes exactly one."""
+    stats, token = begin_request_stats()
+    try:
+        async with PostgresUnitOfWork(uow_db) as uow:
+            _ = uow.users, uow.commits
+        assert (stats.acquisitions, stats.transactions) == (0, 0)
+
+        async with PostgresUnitOfWork(uow_db, read_only=True) as uow:
+            await uow.connection.fetchval("SELECT 1")
+            await uow.connection.fetchval("SELECT 2")
+            await uow.users.get_by_soeid("no-such-user")
+        assert (stats.acquisitions, stats.transactions) == (1, 1)
+    finally:
+        end_request_stats(stats, token)
+
+
+@pytest.mark.asyncio
+async def test_read_only_queries_share_one_snapshot(uow_db: DatabasePool):
+    """Rows committed between two reads of a read-only unit of work are not seen by the second."""
+    soeid = f"UOW{uuid.uuid4().hex[:12]}"
+    count_query = "SELECT count(*) FROM dsa_auth.users WHERE soeid = $1"
+    try:
+        async with PostgresUnitOfWork(uow_db, read_only=True) as uow:
+            assert await uow.connection.fetchval(count_query, soeid) == 0
+            await uow_db.execute(
+                """
+                INSERT INTO dsa_auth.users (soeid, password_hash, role_id)
+                SELECT $1, 'x', role_id FROM dsa_auth.users LIMIT 1
+                """,
+                soeid
+            )
+            assert await uow.connection.fetchval(count_query, soeid) == 0
+
+            # A cursor runs in the same transaction
+            assert [r["n"] async for r in uow.connection.cursor("SELECT generate_series(1, 3) AS n")] == [1, 2, 3]
+
+            # Once released, the next query reads from a new snapshot
+            await uow.release()
+            assert await uow.connection.fetchval(count_query, soeid) == 1
+    finally:
+        await uow_db.execute("DELETE FROM dsa_auth.users WHERE soeid = $1", soeid)
+
+
+@pytest.mark.asyncio
+async def test_read_only_unit_of_work_refuses_writes(uow_db: DatabasePool):
+    with pytest.raises(asyncpg.ReadOnlySQLTransactionError):
+        async with PostgresUnitOfWork(uow_db, read_only=True) as uow:
+            await uow.connection.execute("CREATE TEMP TABLE uow_read_only_probe (id int)")
@@ -0,0 +1,206 @@
+"""Integration tests for workbench cost estimates and admission control."""
+import asyncio
+import os
+from typing import Any, Dict, List
+from urllib.parse import quote_plus
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from src.core.domain_exceptions import ResourceExhaustedException
+from src.features.sql_workbench.services.admission import AdmissionController
+from src.features.sql_workbench.services.cost_model import QueryClass, QueryCost, QueryCostModel
+from src.infrastructure.postgres.database import DatabasePool
+
+
+def _model(fast: float = 100.0, sample: float = 1000.0, job: float = 10000.0, max_bytes: int = 1024 * 1024):
+    return QueryCostModel(fast_max_cost=fast, sample_max_cost=sample, job_max_cost=job, max_result_bytes=max_bytes)
+
+
+def _cost(total_cost: float, estimated_rows: int = 10, width: int = 32) -> QueryCost:
+    return QueryCost(
+        estimated_rows=estimated_rows, total_cost=total_cost, width=width, source_rows=0,
+        classification=QueryClass.FAST
+    )
+
+
+@pytest.mark.parametrize("cost, classification", [
+    (_cost(50), QueryClass.FAST),
+    (_cost(100), QueryClass.FAST),
+    (_cost(500), QueryClass.SAMPLE),
+    (_cost(5000), QueryClass.JOB),
+    (_cost(50, estimated_rows=100_000, width=64), QueryClass.JOB),
+    (_cost(20000), QueryClass.REJECT),
+])
+def test_costs_are_classified_by_the_limits(cost: QueryCost, classification: QueryClass):
+    _model()._classify(cost)
+
+    assert cost.classification == classification
+    assert bool(cost.reasons) == (classification != QueryClass.FAST)
+    assert cost.to_dict()["classification"] == classification.value
+
+
+# ========== Estimates against a commit ==========
+
+@pytest_asyncio.fixture(scope="function")
+async def cost_db():
+    """Database pool the cost model plans queries on."""
+    dsn = (
+        f"postgresql://{os.getenv('DB_USER', 'dsa_user')}:{quote_plus(os.getenv('DB_PASSWORD', 'dsa_password'))}"
+        f"@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'dsa_db')}"
+    )
+    pool = DatabasePool(dsn)
+    await pool.initialize(min_size=1, max_size=2)
+    yield pool
+    await pool.close()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def sources(cost_db: DatabasePool, dataset_with_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The dataset's primary table at its main commit, as the workbench resolves it."""
+    ref = await cost_db.fetchrow(
+        "SELECT commit_id FROM dsa_core.refs WHERE dataset_id = $1 AND name = 'main'",
+        dataset_with_data["dataset_id"]
+    )
+    return [{"alias": "src", "commit_id": ref["commit_id"], "table_key": "primary"}]
+
+
+@pytest.mark.asyncio
+async def test_estimate_uses_the_exact_source_row_count(cost_db: DatabasePool, sources: List[Dict[str, Any]]):
+    model = _model(fast=1e9, sample=1e10, job=1e11, max_bytes=1 << 40)
+    cost = await model.estimate("SELECT * FROM src", sources, cost_db)
+
+    exact = await cost_db.fetchrow(
+        "SELECT dsa_core.commit_table_row_count($1, $2) AS n", sources[0]["commit_id"], "primary"
+    )
+    assert exact["n"] > 0
+    assert cost.source_rows == exact["n"]
+    assert cost.estimated_rows >= exact["n"]
+    assert cost.total_cost > 0 and cost.width > 0
+    assert cost.classification == QueryClass.FAST
+
+    # Commits are immutable, so a source's counts are planned once
+    assert list(model._source_stats) == [(sources[0]["commit_id"], "primary")]
+    again = await model.estimate("SELECT * FROM src", sources, cost_db)
+    assert again.to_dict() == cost.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_cross_joins_are_sent_away_from_previews(cost_db: DatabasePool, sources: List[Dict[str, Any]]):
+    single = await _model(fast=1e9, sample=1e10, job=1e11).estimate("SELECT * FROM src", sources, cost_db)
+    sql = "SELECT a.logical_row_id FROM src a, src b, src c"
+    model = _model(fast=single.total_cost, sample=single.total_cost * 2, job=1e12, max_bytes=1 << 40)
+
+    joined = await model.estimate(sql, sources, cost_db)
+    assert joined.total_cost > single.total_cost * 2
+    assert joined.classification == QueryClass.JOB
+
+    model.job_max_cost = single.total_cost * 2
+    rejected = await model.estimate(sql, sources, cost_db)
+    assert rejected.classification == QueryClass.REJECT
+    assert "exceeds the limit" in rejected.reasons[-1]
+
+
+@pytest.mark.asyncio
+async def test_unplannable_sql_is_a_value_error(cost_db: DatabasePool, sources: List[Dict[str, Any]]):
+    with pytest.raises(ValueError, match="SQL planning failed"):
+        await _model().estimate("SELECT no_such_column FROM src", sources, cost_db)
+
+
+# ========== Admission ==========
+
+async def _hold(controller: AdmissionController, user_id: int, cost: float, release: asyncio.Event) -> None:
+    async with controller.admit(user_id, cost):
+        await release.wait()
+
+
+async def _settle() -> None:
+    """Let started tasks reach their admission or their wait."""
+    await asyncio.sleep(0.05)
+
+
+@pytest.mark.asyncio
+async def test_user_at_their_limit_is_refused_at_once():
+    controller = AdmissionController(per_user_limit=1, max_concurrent=4, cost_budget=100.0, wait_seconds=5.0)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, 1, 10.0, release))
+    await _settle()
+
+    with pytest.raises(ResourceExhaustedException) as exc_info:
+        async with controller.admit(1, 10.0):
+            pass
+    assert exc_info.value.resource_type == "workbench_user_queries"
+
+    # Other users still get in
+    async with controller.admit(2, 10.0):
+        assert controller.stats()["running"] == 2
+
+    release.set()
+    await holder
+    assert controller.stats() == {
+        'running': 0, 'max_concurrent': 4, 'cost_in_use': 0.0, 'cost_budget': 100.0,
+        'users': 0, 'per_user_limit': 1, 'rejected': 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_queries_wait_for_a_free_slot_or_are_refused():
+    controller = AdmissionController(per_user_limit=2, max_concurrent=1, cost_budget=100.0, wait_seconds=0.2)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, 1, 0.0, release))
+    await _settle()
+
+    with pytest.raises(ResourceExhaustedException) as exc_info:
+        async with controller.admit(2):
+            pass
+    assert exc_info.value.resource_type == "workbench_capacity"
+
+    # A waiter is admitted as soon as the slot is released
+    waiter = asyncio.create_task(_hold(controller, 2, 0.0, asyncio.Event()))
+    await _settle()
+    assert not waiter.done() and controller.stats()["running"] == 1
+    release.set()
+    await holder
+    await _settle()
+    assert controller.stats()["running"] == 1 and not waiter.done()
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert controller.stats()["running"] == 0 and controller.stats()["users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cost_budget_limits_heavy_queries():
+    controller = AdmissionController(per_user_limit=4, max_concurrent=4, cost_budget=100.0, wait_seconds=0.2)
+    release = asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, 1, 70.0, release))
+    await _settle()
+
+    # Light queries fit beside the heavy one; another heavy one doesn't
+    async with controller.admit(2, 30.0):
+        assert controller.stats()["cost_in_use"] == 100.0
+    with pytest.raises(ResourceExhaustedException) as exc_info:
+        async with controller.admit(2, 40.0):
+            pass
+    assert exc_info.value.details["cost"] == 40.0
+
+    release.set()
+    await holder
+
+    # A query costing more than the whole budget runs alone
+    async with controller.admit(2, 1e6):
+        assert controller.stats()["cost_in_use"] == 100.0
+        with pytest.raises(ResourceExhaustedException):
+            async with controller.admit(3, 1.0):
+                pass
+    assert controller.stats()["cost_in_use"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_admission_stats_endpoint(async_client: httpx.AsyncClient, auth_headers: Dict[str, str]):
+    response = await async_client.get("/api/admin/workbench-admission", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    stats = response.json()
+
+    assert {"running", "max_concurrent", "cost_in_use", "cost_budget", "per_user_limit", "rejected"} <= set(stats)
+    assert 0 <= stats["running"] <= stats["max_concurrent"]
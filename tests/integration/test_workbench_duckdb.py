@@ -0,0 +1,59 @@
+"""Integration tests for the DuckDB workbench engine's sandbox."""
+from typing import Any, Dict
+
+import httpx
+import pytest
+from fastapi import status
+
+from src.features.sql_workbench.utils import DuckDBExecutor, DuckDBExecutionError
+
+
+FILE_READS = [
+    "SELECT * FROM read_text('/proc/self/environ')",
+    "SELECT * FROM read_csv('/etc/passwd')",
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql", FILE_READS)
+async def test_duckdb_connection_cannot_read_server_files(sql: str):
+    """Even SQL that skips validation can't read files outside the sources."""
+    with pytest.raises(DuckDBExecutionError):
+        await DuckDBExecutor().execute_sql_with_sources(sql, sources=[], db_pool=None)
+
+
+@pytest.mark.asyncio
+async def test_duckdb_connection_configuration_is_locked():
+    """A query can't switch external access back on."""
+    with pytest.raises(DuckDBExecutionError):
+        await DuckDBExecutor().execute_sql_with_sources(
+            "SET enable_external_access = true", sources=[], db_pool=None
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM src, read_text('/proc/self/environ')",
+    "SELECT * FROM src, read_csv('/etc/passwd') r",
+])
+async def test_duckdb_preview_of_server_files_is_rejected(
+    async_client: httpx.AsyncClient,
+    dataset_with_data: Dict[str, Any],
+    auth_headers: Dict[str, str],
+    sql: str
+):
+    """A DuckDB preview that reads server files is rejected by validation."""
+    response = await async_client.post(
+        "/api/workbench/sql-transform",
+        headers=auth_headers,
+        json={
+            "sources": [{"alias": "src", "dataset_id": dataset_with_data["dataset_id"], "ref": "main", "table_key": "primary"}],
+            "sql": sql,
+            "save": False,
+            "limit": 10,
+            "engine": "duckdb"
+        }
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Table function" in response.json()["message"]
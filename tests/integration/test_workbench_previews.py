@@ -0,0 +1,126 @@
+"""Integration tests for workbench preview cancellation and limits."""
+import asyncio
+import uuid
+from typing import Any, Dict
+
+import httpx
+import pytest
+from fastapi import status
+
+
+SLEEP_SQL = "SELECT pg_sleep({seconds}) AS slept FROM src LIMIT 1"
+
+
+def _preview_request(dataset_id: int, sql: str, **extra: Any) -> Dict[str, Any]:
+    return {
+        "sources": [{"alias": "src", "dataset_id": dataset_id, "ref": "main", "table_key": "primary"}],
+        "sql": sql,
+        "save": False,
+        "limit": 1,
+        **extra
+    }
+
+
+async def _wait_for_backend(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    token: str,
+    running: bool,
+    timeout: float = 10.0
+) -> bool:
+    """Poll the running previews until `token` is (or is no longer) on a backend."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        response = await client.get("/api/workbench/previews", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        tokens = {p["preview_token"] for p in response.json()["previews"]}
+        if (token in tokens) == running:
+            return True
+        await asyncio.sleep(0.2)
+    return False
+
+
+@pytest.mark.asyncio
+async def test_cancel_sleeping_preview_frees_backend(
+    async_client: httpx.AsyncClient,
+    dataset_with_data: Dict[str, Any],
+    auth_headers: Dict[str, str]
+):
+    """Cancelling a pg_sleep preview by token ends its query and frees the backend."""
+    token = f"pytest-{uuid.uuid4().hex[:16]}"
+    preview = asyncio.create_task(async_client.post(
+        "/api/workbench/sql-transform",
+        headers=auth_headers,
+        json=_preview_request(dataset_with_data["dataset_id"], SLEEP_SQL.format(seconds=25), preview_token=token)
+    ))
+
+    try:
+        assert await _wait_for_backend(async_client, auth_headers, token, running=True), "Preview never started"
+
+        response = await async_client.post(f"/api/workbench/previews/{token}/cancel", headers=auth_headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        # The preview returns well before its sleep would have finished
+        result = await asyncio.wait_for(preview, timeout=10)
+        assert result.status_code == status.HTTP_409_CONFLICT
+        assert token in result.json()["message"]
+
+        assert await _wait_for_backend(async_client, auth_headers, token, running=False), "Backend still busy"
+    finally:
+        if not preview.done():
+            preview.cancel()
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_preview(
+    async_client: httpx.AsyncClient,
+    dataset_with_data: Dict[str, Any],
+    auth_headers: Dict[str, str]
+):
+    """A client that gives up on a pg_sleep preview gets its backend cancelled."""
+    token = f"pytest-{uuid.uuid4().hex[:16]}"
+    async with httpx.AsyncClient(base_url=async_client.base_url, timeout=4.0) as impatient_client:
+        preview = asyncio.create_task(impatient_client.post(
+            "/api/workbench/sql-transform",
+            headers=auth_headers,
+            json=_preview_request(dataset_with_data["dataset_id"], SLEEP_SQL.format(seconds=25), preview_token=token)
+        ))
+        assert await _wait_for_backend(async_client, auth_headers, token, running=True), "Preview never started"
+
+        # The client times out and closes the connection
+        with pytest.raises(httpx.ReadTimeout):
+            await preview
+
+    assert await _wait_for_backend(async_client, auth_headers, token, running=False), "Backend still busy"
+
+
+@pytest.mark.asyncio
+async def test_preview_statement_timeout(
+    async_client: httpx.AsyncClient,
+    dataset_with_data: Dict[str, Any],
+    auth_headers: Dict[str, str]
+):
+    """A preview running past its timeout_ms is stopped by Postgres."""
+    token = f"pytest-{uuid.uuid4().hex[:16]}"
+    response = await async_client.post(
+        "/api/workbench/sql-transform",
+        headers=auth_headers,
+        json=_preview_request(
+            dataset_with_data["dataset_id"], SLEEP_SQL.format(seconds=20), preview_token=token, timeout_ms=500
+        )
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["details"]["rule"] == "workbench_statement_timeout"
+    assert await _wait_for_backend(async_client, auth_headers, token, running=False)
+
+
+@pytest.mark.asyncio
+async def test_cancel_unknown_preview(async_client: httpx.AsyncClient, auth_headers: Dict[str, str]):
+    """Cancelling a token with no running preview is a 404."""
+    response = await async_client.post(
+        f"/api/workbench/previews/pytest-{uuid.uuid4().hex[:16]}/cancel",
+        headers=auth_headers
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,57 @@
+"""Tests for the security checks of workbench SQL validation."""
+import pytest
+
+from src.features.sql_workbench.services.sql_validator import SqlValidator, ValidationLevel
+
+
+SOURCES = [{"alias": "src"}]
+
+
+async def _errors(sql: str):
+    result = await SqlValidator().validate(sql, sources=SOURCES, level=ValidationLevel.ALL)
+    return result.errors
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM read_text('/etc/passwd')",
+    "SELECT * FROM src, read_parquet('/tmp/x.parquet')",
+    "SELECT * FROM src JOIN read_csv('/etc/hosts') r ON true",
+    "SELECT * FROM src, LATERAL read_text('/proc/self/environ') r",
+    "SELECT * FROM ROWS FROM (generate_series(1, 2), read_text('/etc/passwd')) r",
+    "SELECT * FROM src, read_json_auto('/tmp/x.json') j",
+])
+async def test_file_reading_table_functions_are_rejected(sql: str):
+    """Table functions outside the allowlist can't be used as row sources."""
+    errors = await _errors(sql)
+
+    assert any("Table function" in error for error in errors), errors
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM pg_read_file('/etc/passwd')",
+    "SELECT pg_read_file('/etc/passwd') FROM src",
+    "SELECT current_setting('data_directory') FROM src",
+    "SELECT * FROM pg_catalog.pg_authid",
+    "SELECT * FROM pg_shadow",
+    "DELETE FROM src",
+    "SELECT * INTO stolen FROM src",
+])
+async def test_system_access_and_writes_are_rejected(sql: str):
+    """System functions and tables, and statements that write, are rejected."""
+    assert await _errors(sql)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM src",
+    "SELECT g FROM src, generate_series(1, 3) g",
+    "SELECT u FROM src, unnest(ARRAY[1, 2]) u",
+    "SELECT e FROM src, jsonb_array_elements(src.data->'items') e",
+    "SELECT kv.key FROM src CROSS JOIN LATERAL jsonb_each(src.data) kv",
+    "SELECT s.x FROM src JOIN LATERAL (SELECT 1 AS x) s ON true",
+])
+async def test_allowed_table_functions_pass(sql: str):
+    """Allowlisted set-returning functions and lateral subqueries validate cleanly."""
+    assert await _errors(sql) == []
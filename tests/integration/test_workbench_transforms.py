@@ -0,0 +1,97 @@
+"""Integration tests for saving workbench transformations as commits."""
+import asyncio
+import uuid
+from typing import Any, Dict
+
+import httpx
+import pytest
+
+
+# Twelve rows in descending order; pages come back in row key order, where
+# 'primary:10' sorts before 'primary:2', so the order is checked by row number
+TRANSFORM_SQL = """
+    SELECT g AS n, g * 1.5 AS half, 'row ' || g AS label, g % 2 = 0 AS even, NULL::text AS empty
+    FROM generate_series(1, 12) g
+    WHERE EXISTS (SELECT 1 FROM src)
+    ORDER BY g DESC
+"""
+
+
+async def _run_transform(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    dataset_id: int,
+    branch_name: str
+) -> Dict[str, Any]:
+    """Save TRANSFORM_SQL as a commit and wait for the job to finish."""
+    response = await async_client.post(
+        "/api/workbench/sql-transform",
+        headers=auth_headers,
+        json={
+            "sources": [{"alias": "src", "dataset_id": dataset_id, "ref": "main", "table_key": "primary"}],
+            "sql": TRANSFORM_SQL,
+            "save": True,
+            "target": {
+                "dataset_id": dataset_id,
+                "ref": "main",
+                "table_key": "primary",
+                "message": "Transform from test",
+                "output_branch_name": branch_name
+            }
+        }
+    )
+    assert response.status_code == 200, response.text
+    job_id = response.json()["job_id"]
+
+    for _ in range(30):
+        job = (await async_client.get(f"/api/jobs/{job_id}", headers=auth_headers)).json()
+        if job["status"] == "completed":
+            return job
+        assert job["status"] != "failed", job.get("error_message")
+        await asyncio.sleep(1)
+    pytest.fail(f"Transform job {job_id} did not finish")
+
+
+@pytest.mark.asyncio
+async def test_transform_commit_keeps_result_rows_and_schema(
+    async_client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    dataset_with_uploaded_file: Dict[str, Any]
+):
+    """A saved transformation numbers rows in result order and records their types and count."""
+    dataset_id = dataset_with_uploaded_file["dataset_id"]
+    branch = f"wkbh-pytest-{uuid.uuid4().hex[:12]}"
+    await _run_transform(async_client, auth_headers, dataset_id, branch[len("wkbh-"):])
+
+    response = await async_client.post(
+        f"/api/datasets/{dataset_id}/refs/{branch}/tables/primary/data",
+        headers=auth_headers,
+        json={"pagination": {"limit": 100}}
+    )
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert page["total_rows"] == 12
+
+    rows = {row["logical_row_id"]: row["data"] for row in page["rows"]}
+    assert set(rows) == {f"primary:{n}" for n in range(1, 13)}
+    for logical_row_id, stored in rows.items():
+        row_number = int(logical_row_id.split(":")[1])
+        assert stored["row_number"] == row_number
+        # Row n of the result is the (13 - n)th value of the descending series
+        assert stored["data"]["n"] == 13 - row_number
+        assert stored["data"]["label"] == f"row {13 - row_number}"
+
+    response = await async_client.get(
+        f"/api/datasets/{dataset_id}/refs/{branch}/tables/primary/schema",
+        headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+    schema = response.json()["schema"]
+    assert schema["row_count"] == 12
+    assert [(column["name"], column["type"]) for column in schema["columns"]] == [
+        ("n", "integer"),
+        ("half", "float"),
+        ("label", "string"),
+        ("even", "boolean"),
+        ("empty", "string"),
+    ]
@@ -120,9 +120,45 @@ CREATE TABLE dsa_core.commit_rows (
     row_hash CHAR(64) NOT NULL REFERENCES dsa_core.rows(row_hash),
     PRIMARY KEY (commit_id, logical_row_id)
 );
-COMMENT ON TABLE dsa_core.commit_rows IS 'The manifest linking a commit to its constituent rows.';
+COMMENT ON TABLE dsa_core.commit_rows IS 'Staged manifest entries of a commit; sealed into commit_chunks once the commit is written.';
 CREATE INDEX idx_commit_rows_row_hash ON dsa_core.commit_rows(row_hash);
 
+-- Content-addressed manifest chunks (shared between commits)
+CREATE TABLE dsa_core.manifest_chunks (
+    chunk_hash CHAR(64) PRIMARY KEY,
+    row_count INT NOT NULL,
+    first_key TEXT COLLATE "C" NOT NULL,
+    last_key TEXT COLLATE "C" NOT NULL,
+    row_keys TEXT[] NOT NULL,
+    row_hashes CHAR(64)[] NOT NULL
+);
+COMMENT ON TABLE dsa_core.manifest_chunks IS 'Content-addressed runs of sorted (row key, row hash) pointers, keyed relative to the table.';
+
+-- Per-commit chunk lists
+CREATE TABLE dsa_core.commit_chunks (
+    commit_id CHAR(64) NOT NULL REFERENCES dsa_core.commits(commit_id) ON DELETE CASCADE,
+    table_key TEXT NOT NULL,
+    chunk_index INT NOT NULL,
+    chunk_hash CHAR(64) NOT NULL REFERENCES dsa_core.manifest_chunks(chunk_hash),
+    row_offset BIGINT NOT NULL,
+    row_count INT NOT NULL,
+    PRIMARY KEY (commit_id, table_key, chunk_index)
+);
+COMMENT ON TABLE dsa_core.commit_chunks IS 'Ordered list of manifest chunks making up each table of a commit. Unchanged chunks are shared with the parent.';
+CREATE INDEX idx_commit_chunks_offset ON dsa_core.commit_chunks(commit_id, table_key, row_offset);
+CREATE INDEX idx_commit_chunks_shared ON dsa_core.commit_chunks(commit_id, table_key, chunk_hash);
+
+-- Read view over staged and sealed manifests
+CREATE VIEW dsa_core.commit_manifest AS
+SELECT cr.commit_id, cr.logical_row_id, cr.row_hash
+FROM dsa_core.commit_rows cr
+UNION ALL
+SELECT cc.commit_id, cc.table_key || ':' || e.row_key AS logical_row_id, e.row_hash
+FROM dsa_core.commit_chunks cc
+JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS e(row_key, row_hash);
+COMMENT ON VIEW dsa_core.commit_manifest IS 'Every (commit, logical row, row hash) entry, whether staged in commit_rows or sealed into chunks.';
+
 -- Refs table (branches/tags)
 CREATE TABLE dsa_core.refs (
     id SERIAL PRIMARY KEY,
@@ -168,6 +204,464 @@ COMMENT ON TABLE dsa_core.table_analysis IS 'Stores comprehensive table-level an
 CREATE INDEX idx_table_analysis_commit_id ON dsa_core.table_analysis(commit_id);
 CREATE INDEX idx_table_analysis_table_key ON dsa_core.table_analysis(table_key);
 
+-- -----------------------------------------------------------------------------
+-- Manifest chunk functions
+-- -----------------------------------------------------------------------------
+
+-- commit_table_entries
+CREATE FUNCTION dsa_core.commit_table_entries(p_commit_id character, p_table_key text, p_offset bigint DEFAULT 0, p_limit bigint DEFAULT NULL::bigint) RETURNS TABLE(logical_row_id text, row_hash character, pos bigint)
+    LANGUAGE sql STABLE
+    AS $$
+    -- A single SQL query, so the planner inlines it into the caller and
+    -- rows stream out instead of being collected first. pos numbers the
+    -- table's rows from 1 in key order; readers order by it.
+
+    -- Not sealed yet: page through the flat manifest
+    SELECT f.logical_row_id, f.row_hash, p_offset + row_number() OVER (ORDER BY f.logical_row_id COLLATE "C")
+    FROM (
+        SELECT m.logical_row_id, m.row_hash
+        FROM dsa_core.commit_manifest m
+        WHERE m.commit_id = p_commit_id
+          AND m.logical_row_id LIKE p_table_key || ':%'
+          AND EXISTS (
+              SELECT 1 FROM dsa_core.commit_rows cr
+              WHERE cr.commit_id = p_commit_id AND cr.logical_row_id LIKE p_table_key || ':%'
+          )
+        ORDER BY m.logical_row_id COLLATE "C"
+        OFFSET p_offset LIMIT p_limit
+    ) f
+    UNION ALL
+    -- Sealed: whole chunks outside the window are skipped using their row offsets
+    SELECT p_table_key || ':' || e.row_key, e.row_hash, cc.row_offset + e.ord
+    FROM dsa_core.commit_chunks cc
+    JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+    CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) WITH ORDINALITY AS e(row_key, row_hash, ord)
+    WHERE cc.commit_id = p_commit_id
+      AND cc.table_key = p_table_key
+      AND cc.row_offset + cc.row_count > p_offset
+      AND (p_limit IS NULL OR cc.row_offset < p_offset + p_limit)
+      AND cc.row_offset + e.ord > p_offset
+      AND (p_limit IS NULL OR cc.row_offset + e.ord <= p_offset + p_limit)
+      AND NOT EXISTS (
+          SELECT 1 FROM dsa_core.commit_rows cr
+          WHERE cr.commit_id = p_commit_id AND cr.logical_row_id LIKE p_table_key || ':%'
+      )
+$$;
+
+
+-- commit_table_keys
+CREATE FUNCTION dsa_core.commit_table_keys(p_commit_id character) RETURNS SETOF text
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT cc.table_key
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id
+    UNION
+    SELECT split_part(cr.logical_row_id, ':', 1)
+    FROM dsa_core.commit_rows cr
+    WHERE cr.commit_id = p_commit_id AND position(':' in cr.logical_row_id) > 0
+$$;
+
+
+-- commit_table_row_count
+CREATE FUNCTION dsa_core.commit_table_row_count(p_commit_id character, p_table_key text DEFAULT NULL::text) RETURNS bigint
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT COALESCE((
+        SELECT sum(cc.row_count)
+        FROM dsa_core.commit_chunks cc
+        WHERE cc.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cc.table_key = p_table_key)
+    ), 0)::bigint + (
+        SELECT count(*)
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cr.logical_row_id LIKE p_table_key || ':%')
+    )
+$$;
+
+
+-- derive_commit_table
+CREATE FUNCTION dsa_core.derive_commit_table(p_commit_id character, p_source_commit_id character, p_source_table_key text, p_table_key text, p_excluded_row_keys text[] DEFAULT NULL::text[], p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    -- Commits written before chunking keep a flat manifest; seal it so its chunks can be shared
+    IF EXISTS (
+        SELECT 1 FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_source_commit_id
+          AND cr.logical_row_id LIKE p_source_table_key || ':%'
+    ) THEN
+        PERFORM dsa_core.seal_commit_manifest(p_source_commit_id, p_chunk_size);
+    END IF;
+
+    -- Share every chunk of the source table
+    INSERT INTO dsa_core.commit_chunks (commit_id, table_key, chunk_index, chunk_hash, row_offset, row_count)
+    SELECT p_commit_id, p_table_key, cc.chunk_index, cc.chunk_hash, cc.row_offset, cc.row_count
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_source_commit_id AND cc.table_key = p_source_table_key;
+
+    IF COALESCE(cardinality(p_excluded_row_keys), 0) = 0 THEN
+        RETURN 0;
+    END IF;
+
+    -- Drop the excluded keys; only the chunks holding them are rewritten
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_edits;
+
+    INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+    SELECT DISTINCT k, NULL::character(64)
+    FROM unnest(p_excluded_row_keys) AS k;
+
+    RETURN dsa_core.rebuild_commit_table_chunks(p_commit_id, p_table_key, p_chunk_size);
+END;
+$$;
+
+
+-- manifest_key_is_boundary
+CREATE FUNCTION dsa_core.manifest_key_is_boundary(p_row_key text, p_chunk_size integer) RETURNS boolean
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$
+    SELECT ('x' || substr(md5(p_row_key), 1, 7))::bit(28)::integer % p_chunk_size = 0
+$$;
+
+
+-- manifest_unshared_entries
+CREATE FUNCTION dsa_core.manifest_unshared_entries(p_commit_id character, p_other_commit_id character, p_table_key text DEFAULT NULL::text, p_after text DEFAULT ''::text, p_upper text DEFAULT NULL::text) RETURNS TABLE(logical_row_id text, row_hash character)
+    LANGUAGE sql STABLE
+    AS $$
+    SELECT e.logical_row_id, e.row_hash
+    FROM (
+        SELECT cc.table_key || ':' || u.row_key AS logical_row_id, u.row_hash
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS u(row_key, row_hash)
+        WHERE cc.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cc.table_key = p_table_key)
+          AND (cc.table_key || ':' || mc.last_key) COLLATE "C" > p_after
+          AND (p_upper IS NULL OR (cc.table_key || ':' || mc.first_key) COLLATE "C" <= p_upper)
+          AND NOT EXISTS (
+              SELECT 1 FROM dsa_core.commit_chunks oc
+              WHERE oc.commit_id = p_other_commit_id
+                AND oc.table_key = cc.table_key
+                AND oc.chunk_hash = cc.chunk_hash
+          )
+        UNION ALL
+        SELECT cr.logical_row_id, cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND (p_table_key IS NULL OR cr.logical_row_id LIKE p_table_key || ':%')
+    ) e
+    WHERE e.logical_row_id COLLATE "C" > p_after
+      AND (p_upper IS NULL OR e.logical_row_id COLLATE "C" <= p_upper)
+$$;
+
+
+-- rebuild_commit_table_chunks
+CREATE FUNCTION dsa_core.rebuild_commit_table_chunks(p_commit_id character, p_table_key text, p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_last_index INTEGER;
+    v_written INTEGER;
+BEGIN
+    -- Applies pg_temp.manifest_edits (row_key, row_hash) to the table's chunk
+    -- list; a NULL row_hash deletes the key. Only chunks holding an edited key
+    -- are rewritten, every other chunk pointer is kept as is.
+    SELECT max(cc.chunk_index) INTO v_last_index
+    FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key;
+
+    -- An edit belongs to the first chunk whose last key is >= the edited key,
+    -- or to the last chunk when it sorts past the end of the table
+    CREATE TEMP TABLE IF NOT EXISTS manifest_placed (
+        row_key text COLLATE "C",
+        row_hash character(64),
+        chunk_index integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_placed;
+
+    INSERT INTO pg_temp.manifest_placed (row_key, row_hash, chunk_index)
+    SELECT m.row_key, m.row_hash, LEAST(m.chunks_before, v_last_index)
+    FROM (
+        SELECT k.row_key, k.row_hash, k.is_edit,
+               (count(*) FILTER (WHERE NOT k.is_edit) OVER (
+                   ORDER BY k.row_key, k.is_edit DESC ROWS UNBOUNDED PRECEDING
+               ))::integer AS chunks_before
+        FROM (
+            SELECT e.row_key, e.row_hash, true AS is_edit
+            FROM pg_temp.manifest_edits e
+            UNION ALL
+            SELECT mc.last_key, NULL::character(64), false
+            FROM dsa_core.commit_chunks cc
+            JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+            WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key
+        ) k
+    ) m
+    WHERE m.is_edit;
+
+    -- Adjacent touched chunks form a run and are re-chunked together
+    CREATE TEMP TABLE IF NOT EXISTS manifest_touched (
+        chunk_index integer,
+        run_id integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_touched;
+
+    INSERT INTO pg_temp.manifest_touched (chunk_index, run_id)
+    SELECT t.chunk_index, t.chunk_index - (row_number() OVER (ORDER BY t.chunk_index))::integer
+    FROM (SELECT DISTINCT p.chunk_index FROM pg_temp.manifest_placed p) t;
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_rechunk (
+        run_id integer,
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_rechunk;
+
+    INSERT INTO pg_temp.manifest_rechunk (run_id, row_key, row_hash)
+    SELECT DISTINCT ON (u.row_key) u.run_id, u.row_key, u.row_hash
+    FROM (
+        -- Edits take precedence over the entries they replace
+        SELECT t.run_id, p.row_key, p.row_hash, 0 AS precedence
+        FROM pg_temp.manifest_placed p
+        JOIN pg_temp.manifest_touched t ON t.chunk_index = p.chunk_index
+        UNION ALL
+        SELECT t.run_id, e.row_key COLLATE "C", e.row_hash, 1
+        FROM pg_temp.manifest_touched t
+        JOIN dsa_core.commit_chunks cc
+          ON cc.commit_id = p_commit_id AND cc.table_key = p_table_key AND cc.chunk_index = t.chunk_index
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS e(row_key, row_hash)
+    ) u
+    ORDER BY u.row_key, u.precedence;
+
+    DELETE FROM pg_temp.manifest_rechunk WHERE row_hash IS NULL;
+
+    -- Content-defined boundaries: a chunk ends after a key whose hash hits the
+    -- boundary condition, so edits leave neighbouring chunks unchanged. Chunks
+    -- are capped at four times the target size.
+    CREATE TEMP TABLE IF NOT EXISTS manifest_new_chunks (
+        chunk_hash character(64),
+        row_count integer,
+        first_key text COLLATE "C",
+        last_key text COLLATE "C",
+        row_keys text[],
+        row_hashes character(64)[]
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_new_chunks;
+
+    INSERT INTO pg_temp.manifest_new_chunks (chunk_hash, row_count, first_key, last_key, row_keys, row_hashes)
+    SELECT encode(sha256(convert_to(string_agg(c.row_key || '=' || c.row_hash, E'\n' ORDER BY c.row_key), 'UTF8')), 'hex'),
+           count(*),
+           min(c.row_key),
+           max(c.row_key),
+           array_agg(c.row_key ORDER BY c.row_key),
+           array_agg(c.row_hash ORDER BY c.row_key)
+    FROM (
+        SELECT b.run_id, b.row_key, b.row_hash, b.chunk_no,
+               (row_number() OVER (PARTITION BY b.run_id, b.chunk_no ORDER BY b.row_key) - 1) / (p_chunk_size * 4) AS part_no
+        FROM (
+            SELECT r.run_id, r.row_key, r.row_hash,
+                   COALESCE(sum(dsa_core.manifest_key_is_boundary(r.row_key, p_chunk_size)::integer) OVER (
+                       PARTITION BY r.run_id ORDER BY r.row_key
+                       ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                   ), 0) AS chunk_no
+            FROM pg_temp.manifest_rechunk r
+        ) b
+    ) c
+    GROUP BY c.run_id, c.chunk_no, c.part_no;
+    GET DIAGNOSTICS v_written = ROW_COUNT;
+
+    INSERT INTO dsa_core.manifest_chunks (chunk_hash, row_count, first_key, last_key, row_keys, row_hashes)
+    SELECT n.chunk_hash, n.row_count, n.first_key, n.last_key, n.row_keys, n.row_hashes
+    FROM pg_temp.manifest_new_chunks n
+    ON CONFLICT (chunk_hash) DO NOTHING;
+
+    -- Rebuild the pointer list: untouched chunks plus the new ones, in key order
+    CREATE TEMP TABLE IF NOT EXISTS manifest_chunk_list (
+        chunk_hash character(64),
+        first_key text COLLATE "C",
+        row_count integer
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_chunk_list;
+
+    INSERT INTO pg_temp.manifest_chunk_list (chunk_hash, first_key, row_count)
+    SELECT mc.chunk_hash, mc.first_key, mc.row_count
+    FROM dsa_core.commit_chunks cc
+    JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+    WHERE cc.commit_id = p_commit_id
+      AND cc.table_key = p_table_key
+      AND cc.chunk_index NOT IN (SELECT t.chunk_index FROM pg_temp.manifest_touched t)
+    UNION ALL
+    SELECT n.chunk_hash, n.first_key, n.row_count
+    FROM pg_temp.manifest_new_chunks n;
+
+    DELETE FROM dsa_core.commit_chunks cc
+    WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key;
+
+    INSERT INTO dsa_core.commit_chunks (commit_id, table_key, chunk_index, chunk_hash, row_offset, row_count)
+    SELECT p_commit_id,
+           p_table_key,
+           (row_number() OVER w - 1)::integer,
+           l.chunk_hash,
+           sum(l.row_count) OVER w - l.row_count,
+           l.row_count
+    FROM pg_temp.manifest_chunk_list l
+    WINDOW w AS (ORDER BY l.first_key ROWS UNBOUNDED PRECEDING);
+
+    RETURN v_written;
+END;
+$$;
+
+
+-- seal_commit_manifest
+CREATE FUNCTION dsa_core.seal_commit_manifest(p_commit_id character, p_chunk_size integer DEFAULT 1024) RETURNS integer
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_table_key TEXT;
+    v_written INTEGER := 0;
+BEGIN
+    -- Moves the commit's staged commit_rows entries into its chunk lists.
+    -- Entries of a table that already has chunks (e.g. derived from the
+    -- parent) are applied as upserts on top of them.
+    PERFORM pg_advisory_xact_lock(hashtext('dsa_core.seal_commit_manifest'), hashtext(p_commit_id::text));
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+
+    FOR v_table_key IN
+        SELECT DISTINCT split_part(cr.logical_row_id, ':', 1)
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id AND position(':' in cr.logical_row_id) > 0
+    LOOP
+        TRUNCATE pg_temp.manifest_edits;
+
+        INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+        SELECT substr(cr.logical_row_id, length(v_table_key) + 2), cr.row_hash
+        FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND position(':' in cr.logical_row_id) > 0
+          AND split_part(cr.logical_row_id, ':', 1) = v_table_key;
+
+        v_written := v_written + dsa_core.rebuild_commit_table_chunks(p_commit_id, v_table_key, p_chunk_size);
+
+        DELETE FROM dsa_core.commit_rows cr
+        WHERE cr.commit_id = p_commit_id
+          AND position(':' in cr.logical_row_id) > 0
+          AND split_part(cr.logical_row_id, ':', 1) = v_table_key;
+    END LOOP;
+
+    RETURN v_written;
+END;
+$$;
+
+
+-- seal_staged_table
+CREATE FUNCTION dsa_core.seal_staged_table(p_commit_id character, p_table_key text, p_chunk_size integer DEFAULT 1024, p_replace boolean DEFAULT false) RETURNS bigint
+    LANGUAGE plpgsql
+    AS $$
+DECLARE
+    v_written BIGINT;
+    v_held BIGINT;
+    v_deleted BIGINT;
+BEGIN
+    -- Applies a table's rows staged in dsa_staging.import_row_keys straight
+    -- to the commit's chunk list and clears them, so staged rows are never
+    -- written to commit_rows. When a key is staged more than once its
+    -- highest line number wins; keys the table already holds with the same
+    -- hash are left alone. With p_replace the staged rows are the whole
+    -- table and the keys it holds that were not staged are deleted.
+    -- Returns the number of row keys written or deleted.
+    PERFORM pg_advisory_xact_lock(hashtext('dsa_core.seal_commit_manifest'), hashtext(p_commit_id::text));
+
+    CREATE TEMP TABLE IF NOT EXISTS manifest_edits (
+        row_key text COLLATE "C",
+        row_hash character(64)
+    ) ON COMMIT DROP;
+    TRUNCATE pg_temp.manifest_edits;
+
+    INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+    SELECT DISTINCT ON (ik.row_key) ik.row_key, ik.row_hash
+    FROM dsa_staging.import_row_keys ik
+    WHERE ik.commit_id = p_commit_id AND ik.table_key = p_table_key
+    ORDER BY ik.row_key, ik.line_number DESC;
+    GET DIAGNOSTICS v_written = ROW_COUNT;
+
+    IF v_written > 0 AND EXISTS (
+        SELECT 1 FROM dsa_core.commit_chunks cc
+        WHERE cc.commit_id = p_commit_id AND cc.table_key = p_table_key
+    ) THEN
+        -- Drop edits the table already holds. Each staged key can only be in
+        -- the first chunk whose last key is >= it, so only those chunks are
+        -- unnested and sealing costs what was staged, not the table's size.
+        DELETE FROM pg_temp.manifest_edits ed
+        USING dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys, mc.row_hashes) AS e(row_key, row_hash)
+        WHERE cc.commit_id = p_commit_id
+          AND cc.table_key = p_table_key
+          AND cc.chunk_index IN (
+              SELECT DISTINCT m.chunks_before
+              FROM (
+                  SELECT k.is_edit,
+                         (count(*) FILTER (WHERE NOT k.is_edit) OVER (
+                             ORDER BY k.row_key, k.is_edit DESC ROWS UNBOUNDED PRECEDING
+                         ))::integer AS chunks_before
+                  FROM (
+                      SELECT x.row_key, true AS is_edit
+                      FROM pg_temp.manifest_edits x
+                      UNION ALL
+                      SELECT lc.last_key, false
+                      FROM dsa_core.commit_chunks lcc
+                      JOIN dsa_core.manifest_chunks lc ON lc.chunk_hash = lcc.chunk_hash
+                      WHERE lcc.commit_id = p_commit_id AND lcc.table_key = p_table_key
+                  ) k
+              ) m
+              WHERE m.is_edit
+          )
+          AND e.row_key COLLATE "C" = ed.row_key
+          AND e.row_hash = ed.row_hash;
+        GET DIAGNOSTICS v_held = ROW_COUNT;
+        v_written := v_written - v_held;
+    END IF;
+
+    IF p_replace THEN
+        -- Every held key is read once here; keys that were staged are kept
+        -- by the anti-join on the staging index, whatever their hash
+        INSERT INTO pg_temp.manifest_edits (row_key, row_hash)
+        SELECT e.row_key, NULL
+        FROM dsa_core.commit_chunks cc
+        JOIN dsa_core.manifest_chunks mc ON mc.chunk_hash = cc.chunk_hash
+        CROSS JOIN LATERAL unnest(mc.row_keys) AS e(row_key)
+        WHERE cc.commit_id = p_commit_id
+          AND cc.table_key = p_table_key
+          AND NOT EXISTS (
+              SELECT 1 FROM dsa_staging.import_row_keys ik
+              WHERE ik.commit_id = p_commit_id
+                AND ik.table_key = p_table_key
+                AND ik.row_key = e.row_key
+          );
+        GET DIAGNOSTICS v_deleted = ROW_COUNT;
+        v_written := v_written + v_deleted;
+    END IF;
+
+    IF v_written > 0 THEN
+        PERFORM dsa_core.rebuild_commit_table_chunks(p_commit_id, p_table_key, p_chunk_size);
+    END IF;
+
+    DELETE FROM dsa_staging.import_row_keys ik
+    WHERE ik.commit_id = p_commit_id AND ik.table_key = p_table_key;
+
+    RETURN v_written;
+END;
+$$;
+
 -- =============================================================================
 -- 3. CROSS-SCHEMA TABLES
 -- =============================================================================
@@ -214,11 +708,26 @@ CREATE TABLE dsa_jobs.analysis_runs (
     output_summary JSONB,
     error_message TEXT,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    completed_at TIMESTAMPTZ
+    completed_at TIMESTAMPTZ,
+    claimed_by TEXT,
+    heartbeat_at TIMESTAMPTZ
 );
 COMMENT ON TABLE dsa_jobs.analysis_runs IS 'The master job queue for all asynchronous operations.';
 CREATE INDEX idx_analysis_runs_pending_jobs ON dsa_jobs.analysis_runs(status, run_type) WHERE status = 'pending';
+CREATE INDEX idx_analysis_runs_pending_created ON dsa_jobs.analysis_runs(status, created_at) WHERE status = 'pending';
 CREATE INDEX idx_analysis_runs_dataset_id ON dsa_jobs.analysis_runs(dataset_id);
+CREATE INDEX idx_analysis_runs_running_heartbeat ON dsa_jobs.analysis_runs(heartbeat_at) WHERE status = 'running';
+CREATE INDEX idx_analysis_runs_running_user ON dsa_jobs.analysis_runs(user_id) WHERE status = 'running';
+CREATE INDEX idx_analysis_runs_running_dataset ON dsa_jobs.analysis_runs(dataset_id) WHERE status = 'running';
+
+-- Job progress, kept apart from analysis_runs so frequent updates stay small HOT updates
+CREATE TABLE dsa_jobs.job_progress (
+    job_id UUID PRIMARY KEY REFERENCES dsa_jobs.analysis_runs(id) ON DELETE CASCADE,
+    user_id INT,
+    progress JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+) WITH (fillfactor = 50);
+COMMENT ON TABLE dsa_jobs.job_progress IS 'Latest progress of each job, kept apart from analysis_runs so frequent updates stay small HOT updates.';
 
 -- =============================================================================
 -- 5. EVENT SOURCING SCHEMA (dsa_events)
@@ -302,6 +811,17 @@ CREATE UNLOGGED TABLE dsa_staging.import_data (
 COMMENT ON TABLE dsa_staging.import_data IS 'Structured staging for all file types with JSONB row data';
 CREATE INDEX idx_import_row_num ON dsa_staging.import_data(row_num);
 
+-- Row keys and hashes staged until they are sealed into manifest chunks
+CREATE UNLOGGED TABLE dsa_staging.import_row_keys (
+    commit_id CHAR(64) NOT NULL,
+    table_key TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    row_hash CHAR(64) NOT NULL,
+    line_number BIGINT NOT NULL
+);
+COMMENT ON TABLE dsa_staging.import_row_keys IS 'Row keys and hashes written by imports, transformations and sampling, until seal_staged_table() applies them to the commit''s manifest chunks';
+CREATE INDEX idx_import_row_keys_commit_table ON dsa_staging.import_row_keys(commit_id, table_key);
+
 -- Commit manifest staging table
 CREATE UNLOGGED TABLE dsa_staging.commit_manifest (
     logical_row_id TEXT PRIMARY KEY,
@@ -311,6 +831,19 @@ CREATE UNLOGGED TABLE dsa_staging.commit_manifest (
 COMMENT ON TABLE dsa_staging.commit_manifest IS 'Maps logical row IDs to content hashes for commit assembly';
 CREATE INDEX idx_manifest_hash ON dsa_staging.commit_manifest(row_hash);
 
+-- Workbench preview sessions
+CREATE UNLOGGED TABLE dsa_staging.preview_sessions (
+    session_token TEXT PRIMARY KEY,
+    user_id INT NOT NULL,
+    columns TEXT[] NOT NULL,
+    row_count BIGINT NOT NULL,
+    truncated BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_accessed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+COMMENT ON TABLE dsa_staging.preview_sessions IS 'Workbench preview sessions; each spools its result into dsa_staging.preview_session_<token>';
+CREATE INDEX idx_preview_sessions_user_id ON dsa_staging.preview_sessions(user_id);
+
 -- =============================================================================
 -- 8. SEARCH SCHEMA (dsa_search)
 -- =============================================================================
@@ -329,36 +862,80 @@ CREATE TYPE dsa_search.search_result AS (
     user_permission dsa_auth.dataset_permission
 );
 
--- Create materialized view for search
-CREATE MATERIALIZED VIEW dsa_search.datasets_summary AS
-WITH dataset_tags_agg AS (
-    SELECT
-        dt.dataset_id,
-        array_agg(t.tag_name ORDER BY t.tag_name) AS tags
-    FROM dsa_core.dataset_tags dt
-    JOIN dsa_core.tags t ON dt.tag_id = t.id
-    GROUP BY dt.dataset_id
-)
-SELECT
-    d.id AS dataset_id,
-    d.name,
-    d.description,
-    d.created_by AS created_by_id,
-    u.soeid AS created_by_name,
-    d.created_at,
-    d.updated_at,
-    COALESCE(dta.tags, ARRAY[]::VARCHAR[]) AS tags,
+-- Search index table, maintained incrementally per dataset
+CREATE TABLE dsa_search.datasets_summary (
+    dataset_id INTEGER NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    created_by_id INTEGER,
+    created_by_name VARCHAR(20),
+    created_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE,
+    tags VARCHAR[] NOT NULL DEFAULT ARRAY[]::VARCHAR[],
     -- Concatenated text for trigram (fuzzy) search
-    (d.name::TEXT || ' '::TEXT || COALESCE(d.description, ''::TEXT) || ' '::TEXT || 
-     array_to_string(COALESCE(dta.tags, ARRAY[]::VARCHAR[]), ' '::TEXT)) AS search_text,
+    search_text TEXT NOT NULL,
     -- TSVector for optimized full-text search
-    (to_tsvector('english'::regconfig, d.name::TEXT) ||
-     to_tsvector('english'::regconfig, COALESCE(d.description, ''::TEXT)) ||
-     to_tsvector('english'::regconfig, array_to_string(COALESCE(dta.tags, ARRAY[]::VARCHAR[]), ' '::TEXT))) AS search_tsv
-FROM dsa_core.datasets d
-LEFT JOIN dsa_auth.users u ON d.created_by = u.id
-LEFT JOIN dataset_tags_agg dta ON d.id = dta.dataset_id
-WITH NO DATA;
+    search_tsv TSVECTOR NOT NULL
+);
+
+-- Recompute summary rows for the given datasets (all datasets when NULL).
+-- Rows whose dataset no longer exists are removed.
+CREATE OR REPLACE FUNCTION dsa_search.refresh_datasets_summary(
+    p_dataset_ids INTEGER[] DEFAULT NULL
+) RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_deleted INTEGER;
+    v_upserted INTEGER;
+BEGIN
+    DELETE FROM dsa_search.datasets_summary s
+    WHERE (p_dataset_ids IS NULL OR s.dataset_id = ANY(p_dataset_ids))
+      AND NOT EXISTS (SELECT 1 FROM dsa_core.datasets d WHERE d.id = s.dataset_id);
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+
+    INSERT INTO dsa_search.datasets_summary (
+        dataset_id, name, description, created_by_id, created_by_name,
+        created_at, updated_at, tags, search_text, search_tsv
+    )
+    SELECT
+        d.id,
+        d.name,
+        d.description,
+        d.created_by,
+        u.soeid,
+        d.created_at,
+        d.updated_at,
+        COALESCE(dta.tags, ARRAY[]::VARCHAR[]),
+        (d.name::TEXT || ' '::TEXT || COALESCE(d.description, ''::TEXT) || ' '::TEXT ||
+         array_to_string(COALESCE(dta.tags, ARRAY[]::VARCHAR[]), ' '::TEXT)),
+        (to_tsvector('english'::regconfig, d.name::TEXT) ||
+         to_tsvector('english'::regconfig, COALESCE(d.description, ''::TEXT)) ||
+         to_tsvector('english'::regconfig, array_to_string(COALESCE(dta.tags, ARRAY[]::VARCHAR[]), ' '::TEXT)))
+    FROM dsa_core.datasets d
+    LEFT JOIN dsa_auth.users u ON d.created_by = u.id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(t.tag_name ORDER BY t.tag_name) AS tags
+        FROM dsa_core.dataset_tags dt
+        JOIN dsa_core.tags t ON dt.tag_id = t.id
+        WHERE dt.dataset_id = d.id
+    ) dta ON TRUE
+    WHERE p_dataset_ids IS NULL OR d.id = ANY(p_dataset_ids)
+    ON CONFLICT (dataset_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        description = EXCLUDED.description,
+        created_by_id = EXCLUDED.created_by_id,
+        created_by_name = EXCLUDED.created_by_name,
+        created_at = EXCLUDED.created_at,
+        updated_at = EXCLUDED.updated_at,
+        tags = EXCLUDED.tags,
+        search_text = EXCLUDED.search_text,
+        search_tsv = EXCLUDED.search_tsv;
+    GET DIAGNOSTICS v_upserted = ROW_COUNT;
+
+    RETURN v_deleted + v_upserted;
+END;
+$$;
 
 -- Create indexes for search performance
 CREATE UNIQUE INDEX idx_datasets_summary_id ON dsa_search.datasets_summary(dataset_id);
@@ -375,6 +952,13 @@ CREATE INDEX idx_datasets_summary_created_by_name ON dsa_search.datasets_summary
 -- SEARCH FUNCTION: With 0.05 similarity threshold and keyword parsing fix
 -- =============================================================================
 
+-- Previous signature without keyset cursor arguments
+DROP FUNCTION IF EXISTS dsa_search.search(
+    INTEGER, TEXT, BOOLEAN, TEXT[], INTEGER[],
+    TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE,
+    INTEGER, INTEGER, TEXT, TEXT, BOOLEAN, TEXT[]
+);
+
 CREATE OR REPLACE FUNCTION dsa_search.search(
     p_current_user_id INTEGER,
     p_query TEXT DEFAULT NULL,
@@ -390,7 +974,11 @@ CREATE OR REPLACE FUNCTION dsa_search.search(
     p_sort_by TEXT DEFAULT 'relevance',
     p_sort_order TEXT DEFAULT 'desc',
     p_include_facets BOOLEAN DEFAULT TRUE,
-    p_facet_fields TEXT[] DEFAULT ARRAY['tags', 'created_by']
+    p_facet_fields TEXT[] DEFAULT ARRAY['tags', 'created_by'],
+    -- Keyset cursor (last row of the previous page); replaces p_offset when set
+    p_cursor_score REAL DEFAULT NULL,
+    p_cursor_updated_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    p_cursor_id INTEGER DEFAULT NULL
 )
 RETURNS JSONB
 LANGUAGE plpgsql
@@ -408,10 +996,18 @@ DECLARE
     v_kv_match RECORD;
     v_parsed_tags TEXT[] := '{}';
     v_parsed_users TEXT[] := '{}';
+    v_sort_key TEXT;
+    v_sort_dir TEXT := CASE WHEN lower(p_sort_order) = 'asc' THEN 'asc' ELSE 'desc' END;
+    v_keyset_clause TEXT := '';
+    v_use_keyset BOOLEAN := p_cursor_id IS NOT NULL;
+    v_has_more BOOLEAN;
 BEGIN
     -- Validate and sanitize inputs
     p_limit := LEAST(GREATEST(p_limit, 1), 100);
     p_offset := GREATEST(p_offset, 0);
+    IF v_use_keyset THEN
+        p_offset := 0;
+    END IF;
 
     -- PERMISSION MODEL: Uses an INNER JOIN for performance
     v_base_from := format(
@@ -495,16 +1091,41 @@ BEGIN
         v_where_clauses := v_where_clauses || format('s.updated_at <= %L', p_updated_before);
     END IF;
 
+    -- Resolve the effective sort key; dataset_id breaks ties so pages are stable
+    IF v_main_query_text IS NOT NULL AND v_main_query_text <> '' AND p_sort_by = 'relevance' THEN
+        v_sort_key := 'score';
+    ELSIF p_sort_by IN ('name', 'created_at', 'updated_at') THEN
+        v_sort_key := p_sort_by;
+    ELSE
+        v_sort_key := 'updated_at';
+        v_sort_dir := 'desc';
+    END IF;
+
     -- Build ORDER BY clause
     v_order_by_clause := CASE
-        WHEN v_main_query_text IS NOT NULL AND v_main_query_text <> '' AND p_sort_by = 'relevance' THEN
-            format('similarity(fr.search_text, %L) %s', v_main_query_text, p_sort_order)
-        WHEN p_sort_by = 'name' THEN 'fr.name ' || p_sort_order
-        WHEN p_sort_by = 'created_at' THEN 'fr.created_at ' || p_sort_order
-        WHEN p_sort_by = 'updated_at' THEN 'fr.updated_at ' || p_sort_order
-        ELSE 'fr.updated_at DESC'
+        WHEN v_sort_key = 'score' THEN
+            format('similarity(fr.search_text, %L)::real %s, fr.dataset_id %s', v_main_query_text, v_sort_dir, v_sort_dir)
+        ELSE format('fr.%I %s, fr.dataset_id %s', v_sort_key, v_sort_dir, v_sort_dir)
     END;
 
+    -- Keyset cursor: continue strictly after the last row of the previous page
+    IF v_use_keyset THEN
+        v_keyset_clause := CASE
+            WHEN v_sort_key = 'score' AND p_cursor_score IS NOT NULL THEN
+                format('WHERE (similarity(fr.search_text, %L)::real, fr.dataset_id) %s (%L::real, %L::integer)',
+                       v_main_query_text, CASE WHEN v_sort_dir = 'asc' THEN '>' ELSE '<' END,
+                       p_cursor_score, p_cursor_id)
+            WHEN v_sort_key = 'updated_at' AND p_cursor_updated_at IS NOT NULL THEN
+                format('WHERE (fr.updated_at, fr.dataset_id) %s (%L::timestamptz, %L::integer)',
+                       CASE WHEN v_sort_dir = 'asc' THEN '>' ELSE '<' END,
+                       p_cursor_updated_at, p_cursor_id)
+        END;
+        IF v_keyset_clause IS NULL THEN
+            RAISE EXCEPTION 'Cursor does not match sort key %', v_sort_key
+                USING ERRCODE = 'invalid_parameter_value';
+        END IF;
+    END IF;
+
     -- Build and execute main query
     DECLARE
         v_where_string TEXT := CASE
@@ -519,10 +1140,11 @@ BEGIN
             v_base_from, v_where_string
         );
     BEGIN
-        -- Get results and total count
+        -- Get one extra row to detect further pages; the total is only
+        -- counted for the first page of a keyset scan
         v_sql := v_base_cte || format('
             SELECT
-                (SELECT COUNT(*) FROM filtered_results),
+                (SELECT CASE WHEN %L THEN NULL ELSE COUNT(*) END FROM filtered_results),
                 (SELECT COALESCE(jsonb_agg(r), ''[]''::jsonb)
                  FROM (
                      SELECT
@@ -537,15 +1159,22 @@ BEGIN
                          (CASE WHEN %L IS NOT NULL THEN similarity(fr.search_text, %L) ELSE NULL END)::real AS score,
                          fr.user_permission
                      FROM filtered_results fr
+                     %s
                      ORDER BY %s
                      LIMIT %L
                      OFFSET %L
                  ) r)',
-            v_main_query_text, v_main_query_text, v_order_by_clause, p_limit, p_offset
+            v_use_keyset, v_main_query_text, v_main_query_text, v_keyset_clause,
+            v_order_by_clause, p_limit + 1, p_offset
         );
 
         EXECUTE v_sql INTO v_total_count, v_results;
 
+        v_has_more := jsonb_array_length(v_results) > p_limit;
+        IF v_has_more THEN
+            v_results := v_results - p_limit;
+        END IF;
+
         -- Calculate facets if requested
         IF p_include_facets THEN
             DECLARE v_tag_facets jsonb; v_created_by_facets jsonb;
@@ -588,7 +1217,8 @@ BEGIN
         'total', v_total_count,
         'limit', p_limit,
         'offset', p_offset,
-        'has_more', (p_offset + p_limit) < v_total_count,
+        'has_more', v_has_more,
+        'sort_key', v_sort_key,
         'query', p_query,
         'execution_time_ms', (EXTRACT(EPOCH FROM clock_timestamp() - v_start_time) * 1000)::int,
         'facets', CASE WHEN p_include_facets THEN v_facets ELSE NULL END
@@ -682,8 +1312,9 @@ ON CONFLICT (role_name) DO NOTHING;
 -- 1. SIMILARITY THRESHOLD: The search function uses a similarity threshold of 0.02
 --    for very permissive fuzzy matching.
 --
--- 2. MATERIALIZED VIEW REFRESH: The search index should be refreshed periodically:
---    REFRESH MATERIALIZED VIEW CONCURRENTLY dsa_search.datasets_summary;
+-- 2. SEARCH INDEX: datasets_summary is a regular table kept up to date per dataset
+--    by the application (SearchIndexEventHandler). A full rebuild is available via:
+--    SELECT dsa_search.refresh_datasets_summary();
 --
 -- 3. SEARCH FUNCTION: Fixed to handle empty queries after keyword extraction
 --    (e.g., when query is only "user:username" with no other text)
@@ -696,4 +1327,12 @@ ON CONFLICT (role_name) DO NOTHING;
 --
 -- 6. PERMISSIONS: All application queries must use fully-qualified table names
 --    (e.g., SELECT * FROM dsa_auth.users;) or set the search_path appropriately
+--
+-- 7. MANIFEST CHUNKS: Writers stage row keys in dsa_staging.import_row_keys
+--    and call dsa_core.seal_staged_table(commit_id, table_key), or share a
+--    parent's table with dsa_core.derive_commit_table(...). Readers use
+--    dsa_core.commit_manifest, dsa_core.commit_table_entries and
+--    dsa_core.commit_table_row_count. Commits created before chunking keep
+--    their entries in commit_rows and are sealed lazily; to seal them up
+--    front, run seal_commit_manifests.py.
 -- =============================================================================
\ No newline at end of file